@@ -0,0 +1,36 @@
+"""Add chunk embedding cache
+
+Revision ID: 3c5e1f0a9b2d
+Revises: 238b84885828
+Create Date: 2025-05-27 10:12:41.318209
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "3c5e1f0a9b2d"
+down_revision = "238b84885828"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "chunk_embedding_cache",
+        sa.Column("content_hash", sa.String(), nullable=False),
+        sa.Column("embedding", sa.LargeBinary(), nullable=False),
+        sa.Column(
+            "time_created",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=True,
+        ),
+        sa.PrimaryKeyConstraint("content_hash"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("chunk_embedding_cache")
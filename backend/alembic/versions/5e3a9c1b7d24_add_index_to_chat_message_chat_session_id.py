@@ -0,0 +1,28 @@
+"""add index to chat_message.chat_session_id
+
+Revision ID: 5e3a9c1b7d24
+Revises: 9d4b7e2f1c6a
+Create Date: 2025-06-09 11:12:43.502816
+
+"""
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "5e3a9c1b7d24"
+down_revision = "9d4b7e2f1c6a"
+branch_labels: None = None
+depends_on: None = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        op.f("ix_chat_message_chat_session_id"),
+        "chat_message",
+        ["chat_session_id"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(op.f("ix_chat_message_chat_session_id"), table_name="chat_message")
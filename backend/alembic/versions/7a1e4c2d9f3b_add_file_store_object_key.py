@@ -0,0 +1,37 @@
+"""Add object storage columns to file store
+
+Revision ID: 7a1e4c2d9f3b
+Revises: 3c5e1f0a9b2d
+Create Date: 2025-05-29 14:03:12.551842
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "7a1e4c2d9f3b"
+down_revision = "3c5e1f0a9b2d"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("file_store", sa.Column("object_key", sa.String(), nullable=True))
+    op.add_column("file_store", sa.Column("content_hash", sa.String(), nullable=True))
+    op.create_index(
+        op.f("ix_file_store_object_key"), "file_store", ["object_key"], unique=False
+    )
+    op.alter_column("file_store", "lobj_oid", existing_type=sa.Integer(), nullable=True)
+
+
+def downgrade() -> None:
+    # files that only live in object storage can't be represented anymore
+    op.execute("DELETE FROM file_store WHERE lobj_oid IS NULL")
+    op.alter_column(
+        "file_store", "lobj_oid", existing_type=sa.Integer(), nullable=False
+    )
+    op.drop_index(op.f("ix_file_store_object_key"), table_name="file_store")
+    op.drop_column("file_store", "content_hash")
+    op.drop_column("file_store", "object_key")
@@ -0,0 +1,51 @@
+"""Add document count by connector credential pair
+
+Revision ID: 9d4b7e2f1c6a
+Revises: 7a1e4c2d9f3b
+Create Date: 2025-06-02 09:41:27.118355
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "9d4b7e2f1c6a"
+down_revision = "7a1e4c2d9f3b"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "document_count_by_connector_credential_pair",
+        sa.Column("cc_pair_id", sa.Integer(), nullable=False),
+        sa.Column("document_count", sa.Integer(), nullable=False),
+        sa.Column("time_reconciled", sa.DateTime(timezone=True), nullable=True),
+        sa.ForeignKeyConstraint(
+            ["cc_pair_id"],
+            ["connector_credential_pair.id"],
+            ondelete="CASCADE",
+        ),
+        sa.PrimaryKeyConstraint("cc_pair_id"),
+    )
+
+    # seed the counts, from here on they are maintained incrementally
+    op.execute(
+        """
+        INSERT INTO document_count_by_connector_credential_pair
+            (cc_pair_id, document_count, time_reconciled)
+        SELECT ccp.id, COUNT(dcc.id), now()
+        FROM connector_credential_pair ccp
+        LEFT JOIN document_by_connector_credential_pair dcc
+            ON dcc.connector_id = ccp.connector_id
+            AND dcc.credential_id = ccp.credential_id
+            AND dcc.has_been_indexed
+        GROUP BY ccp.id
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("document_count_by_connector_credential_pair")
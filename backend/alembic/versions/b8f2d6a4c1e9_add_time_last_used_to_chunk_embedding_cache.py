@@ -0,0 +1,43 @@
+"""add time_last_used to chunk_embedding_cache
+
+Revision ID: b8f2d6a4c1e9
+Revises: 5e3a9c1b7d24
+Create Date: 2025-06-12 09:41:27.163058
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "b8f2d6a4c1e9"
+down_revision = "5e3a9c1b7d24"
+branch_labels: None = None
+depends_on: None = None
+
+
+def upgrade() -> None:
+    # existing rows count as used now, they are pruned once unused for long enough
+    op.add_column(
+        "chunk_embedding_cache",
+        sa.Column(
+            "time_last_used",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+    )
+    op.create_index(
+        op.f("ix_chunk_embedding_cache_time_last_used"),
+        "chunk_embedding_cache",
+        ["time_last_used"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(
+        op.f("ix_chunk_embedding_cache_time_last_used"),
+        table_name="chunk_embedding_cache",
+    )
+    op.drop_column("chunk_embedding_cache", "time_last_used")
@@ -71,6 +71,24 @@ SLACK_PERMISSION_DOC_SYNC_FREQUENCY = int(
 NUM_PERMISSION_WORKERS = int(os.environ.get("NUM_PERMISSION_WORKERS") or 2)
 
 
+#####
+# Post Query Censoring
+#####
+# The set of sources with censoring enabled is cached per process and invalidated when
+# cc pairs are added or removed, the TTL only bounds staleness if an invalidation is lost
+CENSORING_ENABLED_SOURCES_CACHE_TTL_SECONDS = int(
+    os.environ.get("CENSORING_ENABLED_SOURCES_CACHE_TTL_SECONDS") or 5 * 60
+)
+# Salesforce object access of a user is cached briefly, chat follow ups tend to
+# retrieve the same objects again
+SALESFORCE_OBJECT_ACCESS_CACHE_TTL_SECONDS = int(
+    os.environ.get("SALESFORCE_OBJECT_ACCESS_CACHE_TTL_SECONDS") or 60
+)
+SALESFORCE_OBJECT_ACCESS_CACHE_SIZE = int(
+    os.environ.get("SALESFORCE_OBJECT_ACCESS_CACHE_SIZE") or 10_000
+)
+
+
 ####
 # Celery Job Frequency
 ####
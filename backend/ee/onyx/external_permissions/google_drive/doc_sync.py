@@ -1,3 +1,4 @@
+from collections import defaultdict
 from collections.abc import Callable
 from collections.abc import Generator
 from datetime import datetime
@@ -12,6 +13,9 @@ from ee.onyx.external_permissions.google_drive.models import PermissionType
 from ee.onyx.external_permissions.google_drive.permission_retrieval import (
     get_permissions_by_ids,
 )
+from ee.onyx.external_permissions.google_drive.permission_retrieval import (
+    get_permissions_for_docs_by_ids,
+)
 from ee.onyx.external_permissions.perm_sync_types import FetchAllDocumentsFunction
 from onyx.access.models import DocExternalAccess
 from onyx.access.models import ExternalAccess
@@ -94,19 +98,69 @@ def _fetch_permissions_for_permission_ids(
     )
 
 
+def _prefetch_permissions(
+    google_drive_connector: GoogleDriveConnector,
+    slim_docs: list[SlimDocument],
+) -> dict[str, list[GoogleDrivePermission]]:
+    """
+    Fetches the permissions of the documents that only come with permission IDs,
+    in batched calls per owner rather than in one call per document. Documents
+    missing from the result are left to _fetch_permissions_for_permission_ids.
+    """
+    permission_ids_by_owner: dict[str, dict[str, list[str]]] = defaultdict(dict)
+    for slim_doc in slim_docs:
+        permission_info = slim_doc.perm_sync_data or {}
+        doc_id = permission_info.get("doc_id")
+        permission_ids = permission_info.get("permission_ids")
+        if permission_info.get("permissions") or not doc_id or not permission_ids:
+            continue
+        owner_email = (
+            permission_info.get("owner_email")
+            or google_drive_connector.primary_admin_email
+        )
+        permission_ids_by_owner[owner_email][doc_id] = permission_ids
+
+    prefetched_permissions: dict[str, list[GoogleDrivePermission]] = {}
+    for owner_email, permission_ids_by_doc_id in permission_ids_by_owner.items():
+        try:
+            permissions_by_doc_id = get_permissions_for_docs_by_ids(
+                drive_service=get_drive_service(
+                    creds=google_drive_connector.creds, user_email=owner_email
+                ),
+                permission_ids_by_doc_id=permission_ids_by_doc_id,
+            )
+        except Exception as e:
+            logger.warning(
+                f"Batched permission fetch failed, fetching one by one: "
+                f"owner={owner_email} docs={len(permission_ids_by_doc_id)} error={e}"
+            )
+            continue
+
+        for doc_id, permissions in permissions_by_doc_id.items():
+            if permissions is not None:
+                prefetched_permissions[doc_id] = permissions
+
+    return prefetched_permissions
+
+
 def _get_permissions_from_slim_doc(
     google_drive_connector: GoogleDriveConnector,
     slim_doc: SlimDocument,
+    prefetched_permissions: dict[str, list[GoogleDrivePermission]] | None = None,
 ) -> ExternalAccess:
     permission_info = slim_doc.perm_sync_data or {}
 
     permissions_list: list[GoogleDrivePermission] = []
     raw_permissions_list = permission_info.get("permissions", [])
     if not raw_permissions_list:
-        permissions_list = _fetch_permissions_for_permission_ids(
-            google_drive_connector=google_drive_connector,
-            permission_info=permission_info,
-        )
+        doc_id = permission_info.get("doc_id")
+        if prefetched_permissions is not None and doc_id in prefetched_permissions:
+            permissions_list = prefetched_permissions[doc_id]
+        else:
+            permissions_list = _fetch_permissions_for_permission_ids(
+                google_drive_connector=google_drive_connector,
+                permission_info=permission_info,
+            )
         if not permissions_list:
             logger.warning(f"No permissions found for document {slim_doc.id}")
             return ExternalAccess(
@@ -201,6 +255,10 @@ def gdrive_doc_sync(
     slim_doc_generator = _get_slim_doc_generator(cc_pair, google_drive_connector)
 
     for slim_doc_batch in slim_doc_generator:
+        prefetched_permissions = _prefetch_permissions(
+            google_drive_connector=google_drive_connector,
+            slim_docs=slim_doc_batch,
+        )
         for slim_doc in slim_doc_batch:
             if callback:
                 if callback.should_stop():
@@ -211,6 +269,7 @@ def gdrive_doc_sync(
             ext_access = _get_permissions_from_slim_doc(
                 google_drive_connector=google_drive_connector,
                 slim_doc=slim_doc,
+                prefetched_permissions=prefetched_permissions,
             )
             yield DocExternalAccess(
                 external_access=ext_access,
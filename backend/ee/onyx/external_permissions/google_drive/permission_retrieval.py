@@ -1,10 +1,18 @@
+from googleapiclient.errors import HttpError  # type: ignore
+
 from ee.onyx.external_permissions.google_drive.models import GoogleDrivePermission
+from onyx.connectors.google_utils.google_utils import execute_batched_requests
 from onyx.connectors.google_utils.google_utils import execute_paginated_retrieval
+from onyx.connectors.google_utils.resources import GoogleDriveService
 from onyx.connectors.google_utils.resources import RefreshableDriveObject
 from onyx.utils.logger import setup_logger
 
 logger = setup_logger()
 
+PERMISSION_FIELDS = (
+    "permissions(id, emailAddress, type, domain, permissionDetails),nextPageToken"
+)
+
 
 def get_permissions_by_ids(
     drive_service: RefreshableDriveObject,
@@ -33,7 +41,7 @@ def get_permissions_by_ids(
         retrieval_function=drive_service.permissions().list,
         list_key="permissions",
         fileId=doc_id,
-        fields="permissions(id, emailAddress, type, domain, permissionDetails),nextPageToken",
+        fields=PERMISSION_FIELDS,
         supportsAllDrives=True,
         continue_on_404_or_403=True,
     )
@@ -57,3 +65,55 @@ def get_permissions_by_ids(
         )
 
     return filtered_permissions
+
+
+def get_permissions_for_docs_by_ids(
+    drive_service: GoogleDriveService,
+    permission_ids_by_doc_id: dict[str, list[str]],
+) -> dict[str, list[GoogleDrivePermission] | None]:
+    """
+    Fetches the permissions of many documents with batched calls.
+
+    Args:
+        drive_service: The Google Drive service instance, the documents must be
+            visible to its user
+        permission_ids_by_doc_id: The permission IDs to filter by for each document
+
+    Returns:
+        The GoogleDrivePermission objects matching the provided permission IDs for
+        each document. None for documents whose permissions couldn't be fetched in
+        a single call, these should be fetched with get_permissions_by_ids.
+    """
+    responses = execute_batched_requests(
+        drive_service,
+        {
+            doc_id: drive_service.permissions().list(
+                fileId=doc_id,
+                fields=PERMISSION_FIELDS,
+                supportsAllDrives=True,
+            )
+            for doc_id, permission_ids in permission_ids_by_doc_id.items()
+            if permission_ids
+        },
+    )
+
+    permissions_by_doc_id: dict[str, list[GoogleDrivePermission] | None] = {}
+    for doc_id, permission_ids in permission_ids_by_doc_id.items():
+        response = responses.get(doc_id)
+        if response is None:
+            permissions_by_doc_id[doc_id] = []
+        elif isinstance(response, HttpError) and response.resp.status in (403, 404):
+            # same as continue_on_404_or_403 in get_permissions_by_ids
+            logger.debug(f"No access to permissions: doc={doc_id} error={response}")
+            permissions_by_doc_id[doc_id] = []
+        elif isinstance(response, Exception) or response.get("nextPageToken"):
+            permissions_by_doc_id[doc_id] = None
+        else:
+            permission_id_set = set(permission_ids)
+            permissions_by_doc_id[doc_id] = [
+                GoogleDrivePermission.from_drive_permission(permission)
+                for permission in response.get("permissions", [])
+                if permission.get("id") in permission_id_set
+            ]
+
+    return permissions_by_doc_id
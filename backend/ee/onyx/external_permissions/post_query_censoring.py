@@ -1,5 +1,7 @@
 from collections.abc import Callable
+from typing import cast
 
+from ee.onyx.configs.app_configs import CENSORING_ENABLED_SOURCES_CACHE_TTL_SECONDS
 from ee.onyx.db.connector_credential_pair import get_all_auto_sync_cc_pairs
 from ee.onyx.external_permissions.salesforce.postprocessing import (
     censor_salesforce_chunks,
@@ -8,7 +10,11 @@ from onyx.configs.constants import DocumentSource
 from onyx.context.search.pipeline import InferenceChunk
 from onyx.db.engine import get_session_context_manager
 from onyx.db.models import User
+from onyx.redis.redis_pool import get_redis_client
 from onyx.utils.logger import setup_logger
+from onyx.utils.threadpool_concurrency import run_functions_tuples_in_parallel
+from onyx.utils.ttl_cache import TTLCache
+from shared_configs.contextvars import get_current_tenant_id
 
 logger = setup_logger()
 
@@ -21,6 +27,34 @@ DOC_SOURCE_TO_CHUNK_CENSORING_FUNCTION: dict[
 }
 
 
+# Bumped in Redis whenever the set of sources with censoring enabled may have changed
+_ENABLED_SOURCES_GENERATION_KEY = "censoring_enabled_sources_generation"
+
+# tenant id -> (generation, sources with censoring enabled)
+_ENABLED_SOURCES_CACHE: TTLCache[str, tuple[int, frozenset[DocumentSource]]] = TTLCache(
+    maxsize=1024, ttl=CENSORING_ENABLED_SOURCES_CACHE_TTL_SECONDS
+)
+
+
+def _get_enabled_sources_generation() -> int | None:
+    try:
+        generation = get_redis_client().get(_ENABLED_SOURCES_GENERATION_KEY)
+    except Exception:
+        logger.exception("Failed to read the censoring enabled sources generation")
+        return None
+    return int(cast(bytes, generation)) if generation is not None else 0
+
+
+def _load_censoring_enabled_sources() -> set[DocumentSource]:
+    with get_session_context_manager() as db_session:
+        enabled_sync_connectors = get_all_auto_sync_cc_pairs(db_session)
+        return {
+            cc_pair.connector.source
+            for cc_pair in enabled_sync_connectors
+            if cc_pair.connector.source in DOC_SOURCE_TO_CHUNK_CENSORING_FUNCTION
+        }
+
+
 def _get_all_censoring_enabled_sources() -> set[DocumentSource]:
     """
     Returns the set of sources that have censoring enabled.
@@ -31,14 +65,47 @@ def _get_all_censoring_enabled_sources() -> set[DocumentSource]:
     all chunks for that source will be censored, even if the connector that
     indexed that chunk is not sync. This was done to avoid getting the cc_pair
     for every single chunk.
+
+    The set is cached per process for as long as the generation in Redis doesn't
+    change. The generation is read before the cc pairs, so a set loaded while
+    it was being bumped is stored under the old generation and never served.
     """
-    with get_session_context_manager() as db_session:
-        enabled_sync_connectors = get_all_auto_sync_cc_pairs(db_session)
-        return {
-            cc_pair.connector.source
-            for cc_pair in enabled_sync_connectors
-            if cc_pair.connector.source in DOC_SOURCE_TO_CHUNK_CENSORING_FUNCTION
-        }
+    tenant_id = get_current_tenant_id()
+    generation = _get_enabled_sources_generation()
+    if generation is not None:
+        cached = _ENABLED_SOURCES_CACHE.get(tenant_id)
+        if cached is not None and cached[0] == generation:
+            return set(cached[1])
+
+    sources = _load_censoring_enabled_sources()
+    if generation is not None:
+        _ENABLED_SOURCES_CACHE.set(tenant_id, (generation, frozenset(sources)))
+    return sources
+
+
+def invalidate_censoring_enabled_sources() -> None:
+    """Must be called after committing a change to which cc pairs are sync, i.e. a
+    sync cc pair being added or removed"""
+    _ENABLED_SOURCES_CACHE.delete(get_current_tenant_id())
+    try:
+        get_redis_client().incr(_ENABLED_SOURCES_GENERATION_KEY)
+    except Exception:
+        # other processes pick up the change once their cached set expires
+        logger.exception("Failed to invalidate the censoring enabled sources")
+
+
+def _censor_chunks_for_source(
+    source: DocumentSource, chunks: list[InferenceChunk], user_email: str
+) -> list[InferenceChunk]:
+    censor_chunks_for_source = DOC_SOURCE_TO_CHUNK_CENSORING_FUNCTION[source]
+    try:
+        return censor_chunks_for_source(chunks, user_email)
+    except Exception as e:
+        logger.exception(
+            f"Failed to censor chunks for source {source} so throwing out all"
+            f" chunks for this source and continuing: {e}"
+        )
+        return []
 
 
 # NOTE: This is only called if ee is enabled.
@@ -67,19 +134,14 @@ def _post_query_chunk_censoring(
             final_chunk_dict[chunk.unique_id] = chunk
 
     # For each source, filter out the chunks using the permission
-    # check function for that source
-    # TODO: Use a threadpool/multiprocessing to process the sources in parallel
-    for source, chunks_for_source in chunks_to_process.items():
-        censor_chunks_for_source = DOC_SOURCE_TO_CHUNK_CENSORING_FUNCTION[source]
-        try:
-            censored_chunks = censor_chunks_for_source(chunks_for_source, user.email)
-        except Exception as e:
-            logger.exception(
-                f"Failed to censor chunks for source {source} so throwing out all"
-                f" chunks for this source and continuing: {e}"
-            )
-            continue
-
+    # check function for that source, the sources are checked in parallel
+    censored_chunks_per_source = run_functions_tuples_in_parallel(
+        [
+            (_censor_chunks_for_source, (source, chunks_for_source, user.email))
+            for source, chunks_for_source in chunks_to_process.items()
+        ]
+    )
+    for censored_chunks in censored_chunks_per_source:
         for censored_chunk in censored_chunks:
             final_chunk_dict[censored_chunk.unique_id] = censored_chunk
 
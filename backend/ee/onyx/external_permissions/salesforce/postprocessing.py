@@ -1,5 +1,7 @@
 import time
 
+from ee.onyx.configs.app_configs import SALESFORCE_OBJECT_ACCESS_CACHE_SIZE
+from ee.onyx.configs.app_configs import SALESFORCE_OBJECT_ACCESS_CACHE_TTL_SECONDS
 from ee.onyx.db.external_perm import fetch_external_groups_for_user_email_and_group_ids
 from ee.onyx.external_permissions.salesforce.utils import (
     get_any_salesforce_client_for_doc_id,
@@ -12,6 +14,8 @@ from onyx.configs.app_configs import BLURB_SIZE
 from onyx.context.search.models import InferenceChunk
 from onyx.db.engine import get_session_context_manager
 from onyx.utils.logger import setup_logger
+from onyx.utils.ttl_cache import TTLCache
+from shared_configs.contextvars import get_current_tenant_id
 
 logger = setup_logger()
 
@@ -20,6 +24,12 @@ logger = setup_logger()
 ChunkKey = tuple[str, int]  # (doc_id, chunk_id)
 ContentRange = tuple[int, int | None]  # (start_index, end_index) None means to the end
 
+# (tenant_id, user_email, object_id) -> whether the user can read the object
+# Short lived, so a change of access in Salesforce is picked up soon
+_OBJECT_ACCESS_CACHE: TTLCache[tuple[str, str, str], bool] = TTLCache(
+    SALESFORCE_OBJECT_ACCESS_CACHE_SIZE, SALESFORCE_OBJECT_ACCESS_CACHE_TTL_SECONDS
+)
+
 
 # NOTE: Used for testing timing
 def _get_dummy_object_access_map(
@@ -40,7 +50,20 @@ def _get_objects_access_for_user_email_from_salesforce(
     """
     This function wraps the salesforce call as we may want to change how this
     is done in the future. (E.g. replace it with the above function)
+
+    Only the objects whose access for this user isn't cached are looked up.
     """
+    tenant_id = get_current_tenant_id()
+    object_id_to_access: dict[str, bool] = {}
+    for object_id in object_ids:
+        has_access = _OBJECT_ACCESS_CACHE.get((tenant_id, user_email, object_id))
+        if has_access is not None:
+            object_id_to_access[object_id] = has_access
+
+    object_ids_to_check = object_ids - object_id_to_access.keys()
+    if not object_ids_to_check:
+        return object_id_to_access
+
     # This is cached in the function so the first query takes an extra 0.1-0.3 seconds
     # but subsequent queries for this source are essentially instant
     first_doc_id = chunks[0].document_id
@@ -61,11 +84,15 @@ def _get_objects_access_for_user_email_from_salesforce(
         logger.warning(f"User '{user_email}' not found in Salesforce")
         return None
 
-    # This is the only query that is not cached in the function
-    # so it takes 0.1-0.2 seconds total
-    object_id_to_access = get_objects_access_for_user_id(
-        salesforce_client, user_id, list(object_ids)
+    # This query is only cached for a short time (see _OBJECT_ACCESS_CACHE)
+    # so it takes 0.1-0.2 seconds total when objects are seen for the first time
+    checked_object_id_to_access = get_objects_access_for_user_id(
+        salesforce_client, user_id, list(object_ids_to_check)
     )
+    for object_id, has_access in checked_object_id_to_access.items():
+        _OBJECT_ACCESS_CACHE.set((tenant_id, user_email, object_id), has_access)
+    object_id_to_access.update(checked_object_id_to_access)
+
     logger.debug(f"Object ID to access: {object_id_to_access}")
     return object_id_to_access
 
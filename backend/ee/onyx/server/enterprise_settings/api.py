@@ -9,6 +9,7 @@ from fastapi import HTTPException
 from fastapi import Response
 from fastapi import status
 from fastapi import UploadFile
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 from pydantic import Field
 from sqlalchemy.orm import Session
@@ -28,7 +29,7 @@ from onyx.auth.users import get_user_manager
 from onyx.auth.users import UserManager
 from onyx.db.engine import get_session
 from onyx.db.models import User
-from onyx.file_store.file_store import PostgresBackedFileStore
+from onyx.file_store.file_store import get_default_file_store
 from onyx.server.utils import BasicAuthenticationError
 from onyx.utils.logger import setup_logger
 from shared_configs.configs import MULTI_TENANT
@@ -142,32 +143,34 @@ def put_logo(
 
 def fetch_logo_helper(db_session: Session) -> Response:
     try:
-        file_store = PostgresBackedFileStore(db_session)
-        onyx_file = file_store.get_file_with_mime_type(get_logo_filename())
-        if not onyx_file:
-            raise ValueError("get_onyx_file returned None!")
+        file_store = get_default_file_store(db_session)
+        streamed_file = file_store.stream_file_with_mime_type(get_logo_filename())
+        if not streamed_file:
+            raise ValueError("stream_file_with_mime_type returned None!")
     except Exception:
         raise HTTPException(
             status_code=404,
             detail="No logo file found",
         )
     else:
-        return Response(content=onyx_file.data, media_type=onyx_file.mime_type)
+        chunks, mime_type = streamed_file
+        return StreamingResponse(chunks, media_type=mime_type)
 
 
 def fetch_logotype_helper(db_session: Session) -> Response:
     try:
-        file_store = PostgresBackedFileStore(db_session)
-        onyx_file = file_store.get_file_with_mime_type(get_logotype_filename())
-        if not onyx_file:
-            raise ValueError("get_onyx_file returned None!")
+        file_store = get_default_file_store(db_session)
+        streamed_file = file_store.stream_file_with_mime_type(get_logotype_filename())
+        if not streamed_file:
+            raise ValueError("stream_file_with_mime_type returned None!")
     except Exception:
         raise HTTPException(
             status_code=404,
             detail="No logotype file found",
         )
     else:
-        return Response(content=onyx_file.data, media_type=onyx_file.mime_type)
+        chunks, mime_type = streamed_file
+        return StreamingResponse(chunks, media_type=mime_type)
 
 
 @basic_router.get("/logotype")
@@ -29,12 +29,17 @@ from model_server.constants import DEFAULT_VERTEX_MODEL
 from model_server.constants import DEFAULT_VOYAGE_MODEL
 from model_server.constants import EmbeddingModelTextType
 from model_server.constants import EmbeddingProvider
+from model_server.query_embedding_batcher import QueryEmbeddingBatcher
+from model_server.query_embedding_batcher import QueryEmbeddingBatchKey
 from model_server.utils import pass_aws_key
 from model_server.utils import simple_log_function_time
 from onyx.utils.logger import setup_logger
 from shared_configs.configs import API_BASED_EMBEDDING_TIMEOUT
 from shared_configs.configs import INDEXING_ONLY
 from shared_configs.configs import OPENAI_EMBEDDING_TIMEOUT
+from shared_configs.configs import QUERY_EMBEDDING_BATCH_WINDOW_MS
+from shared_configs.configs import QUERY_EMBEDDING_BATCHING_ENABLED
+from shared_configs.configs import QUERY_EMBEDDING_MAX_BATCH_SIZE
 from shared_configs.configs import VERTEXAI_EMBEDDING_LOCAL_BATCH_SIZE
 from shared_configs.enums import EmbedTextType
 from shared_configs.enums import RerankerProvider
@@ -404,6 +409,28 @@ def get_local_reranking_model(
     return _RERANK_MODEL
 
 
+def _encode_query_batch(
+    key: QueryEmbeddingBatchKey, texts: list[str]
+) -> list[Embedding]:
+    local_model = get_embedding_model(
+        model_name=key.model_name, max_context_length=key.max_context_length
+    )
+    embeddings_vectors = local_model.encode(
+        texts, normalize_embeddings=key.normalize_embeddings
+    )
+    return [
+        embedding if isinstance(embedding, list) else embedding.tolist()
+        for embedding in embeddings_vectors
+    ]
+
+
+_QUERY_EMBEDDING_BATCHER = QueryEmbeddingBatcher(
+    encode_fn=_encode_query_batch,
+    window_ms=QUERY_EMBEDDING_BATCH_WINDOW_MS,
+    max_batch_size=QUERY_EMBEDDING_MAX_BATCH_SIZE,
+)
+
+
 @simple_log_function_time()
 async def embed_text(
     texts: list[str],
@@ -486,20 +513,31 @@ async def embed_text(
 
         prefixed_texts = [f"{prefix}{text}" for text in texts] if prefix else texts
 
-        local_model = get_embedding_model(
-            model_name=model_name, max_context_length=max_context_length
-        )
-        # Run CPU-bound embedding in a thread pool
-        embeddings_vectors = await asyncio.get_event_loop().run_in_executor(
-            None,
-            lambda: local_model.encode(
-                prefixed_texts, normalize_embeddings=normalize_embeddings
-            ),
-        )
-        embeddings = [
-            embedding if isinstance(embedding, list) else embedding.tolist()
-            for embedding in embeddings_vectors
-        ]
+        if QUERY_EMBEDDING_BATCHING_ENABLED and text_type == EmbedTextType.QUERY:
+            # coalesce with other concurrent queries for the same model
+            embeddings = await _QUERY_EMBEDDING_BATCHER.embed(
+                QueryEmbeddingBatchKey(
+                    model_name=model_name,
+                    max_context_length=max_context_length,
+                    normalize_embeddings=normalize_embeddings,
+                ),
+                prefixed_texts,
+            )
+        else:
+            local_model = get_embedding_model(
+                model_name=model_name, max_context_length=max_context_length
+            )
+            # Run CPU-bound embedding in a thread pool
+            embeddings_vectors = await asyncio.get_event_loop().run_in_executor(
+                None,
+                lambda: local_model.encode(
+                    prefixed_texts, normalize_embeddings=normalize_embeddings
+                ),
+            )
+            embeddings = [
+                embedding if isinstance(embedding, list) else embedding.tolist()
+                for embedding in embeddings_vectors
+            ]
 
         elapsed = time.monotonic() - start
         logger.info(
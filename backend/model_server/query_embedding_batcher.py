@@ -0,0 +1,144 @@
+import asyncio
+import time
+from collections.abc import Callable
+from dataclasses import dataclass
+
+from prometheus_client import Histogram
+
+from onyx.utils.logger import setup_logger
+from shared_configs.model_server_models import Embedding
+
+logger = setup_logger()
+
+
+_QUEUE_WAIT_SECONDS = Histogram(
+    "onyx_query_embedding_queue_wait_seconds",
+    "Time a query embedding request waited to be picked up in a batch",
+    ["model"],
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25),
+)
+_BATCH_SIZE = Histogram(
+    "onyx_query_embedding_batch_size",
+    "Number of texts embedded in a single coalesced query embedding batch",
+    ["model"],
+    buckets=(1, 2, 4, 8, 16, 32, 64, 128),
+)
+
+
+@dataclass(frozen=True)
+class QueryEmbeddingBatchKey:
+    """Only requests that would produce identical embeddings for the same text can
+    share a forward pass."""
+
+    model_name: str
+    max_context_length: int
+    normalize_embeddings: bool
+
+
+@dataclass
+class _PendingEmbedRequest:
+    texts: list[str]
+    future: "asyncio.Future[list[Embedding]]"
+    enqueued_at: float
+
+
+class QueryEmbeddingBatcher:
+    """Coalesces concurrent query embedding requests into batched `encode` calls.
+
+    The first request for a key opens a window of `window_ms`. Every request for the
+    same key that arrives before the window closes (or before `max_batch_size` texts are
+    pending) is run through the model together and the results are fanned back out to
+    the individual callers. Failures are propagated to every request in the batch.
+
+    `encode_fn` is blocking and is run in the default executor."""
+
+    def __init__(
+        self,
+        encode_fn: Callable[[QueryEmbeddingBatchKey, list[str]], list[Embedding]],
+        window_ms: float,
+        max_batch_size: int,
+    ) -> None:
+        self._encode_fn = encode_fn
+        self._window_seconds = window_ms / 1000
+        self._max_batch_size = max(1, max_batch_size)
+
+        self._pending: dict[QueryEmbeddingBatchKey, list[_PendingEmbedRequest]] = {}
+        self._pending_text_counts: dict[QueryEmbeddingBatchKey, int] = {}
+        self._flush_handles: dict[QueryEmbeddingBatchKey, asyncio.TimerHandle] = {}
+        # keep references so in flight batches aren't garbage collected
+        self._running_batches: set[asyncio.Task] = set()
+
+    async def embed(
+        self, key: QueryEmbeddingBatchKey, texts: list[str]
+    ) -> list[Embedding]:
+        loop = asyncio.get_running_loop()
+        future: asyncio.Future[list[Embedding]] = loop.create_future()
+
+        self._pending.setdefault(key, []).append(
+            _PendingEmbedRequest(
+                texts=texts, future=future, enqueued_at=time.monotonic()
+            )
+        )
+        self._pending_text_counts[key] = self._pending_text_counts.get(key, 0) + len(
+            texts
+        )
+
+        if self._pending_text_counts[key] >= self._max_batch_size:
+            self._flush(key)
+        elif key not in self._flush_handles:
+            self._flush_handles[key] = loop.call_later(
+                self._window_seconds, self._flush, key
+            )
+
+        return await future
+
+    def _flush(self, key: QueryEmbeddingBatchKey) -> None:
+        handle = self._flush_handles.pop(key, None)
+        if handle:
+            handle.cancel()
+
+        requests = self._pending.pop(key, [])
+        self._pending_text_counts.pop(key, None)
+        if not requests:
+            return
+
+        task = asyncio.ensure_future(self._run_batch(key, requests))
+        self._running_batches.add(task)
+        task.add_done_callback(self._running_batches.discard)
+
+    async def _run_batch(
+        self, key: QueryEmbeddingBatchKey, requests: list[_PendingEmbedRequest]
+    ) -> None:
+        start = time.monotonic()
+        for request in requests:
+            _QUEUE_WAIT_SECONDS.labels(key.model_name).observe(
+                start - request.enqueued_at
+            )
+
+        texts = [text for request in requests for text in request.texts]
+        _BATCH_SIZE.labels(key.model_name).observe(len(texts))
+
+        try:
+            embeddings = await asyncio.get_running_loop().run_in_executor(
+                None, self._encode_fn, key, texts
+            )
+        except Exception as e:
+            for request in requests:
+                if not request.future.done():
+                    request.future.set_exception(e)
+            return
+
+        logger.debug(
+            f"event=query_embedding_batch "
+            f"model={key.model_name} "
+            f"requests={len(requests)} "
+            f"texts={len(texts)} "
+            f"elapsed={time.monotonic() - start:.3f}"
+        )
+
+        offset = 0
+        for request in requests:
+            num_texts = len(request.texts)
+            if not request.future.done():
+                request.future.set_result(embeddings[offset : offset + num_texts])
+            offset += num_texts
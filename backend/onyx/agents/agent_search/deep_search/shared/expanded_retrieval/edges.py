@@ -17,8 +17,8 @@ def parallel_retrieval_edge(
     state: ExpandedRetrievalState, config: RunnableConfig
 ) -> list[Send | Hashable]:
     """
-    LangGraph edge to parallelize the retrieval process for each of the
-    generated sub-queries and the original question.
+    LangGraph edge to retrieve the documents for the generated sub-queries and the
+    original question. The queries are searched for together, in a single node.
     """
     graph_config = cast(GraphConfig, config["metadata"]["config"])
     question = (
@@ -33,12 +33,11 @@ def parallel_retrieval_edge(
         Send(
             "retrieve_documents",
             RetrievalInput(
-                query_to_retrieve=query,
+                queries_to_retrieve=query_expansions,
                 question=question,
                 base_search=False,
                 sub_question_id=state.sub_question_id,
                 log_messages=[],
             ),
         )
-        for query in query_expansions
     ]
@@ -11,3 +11,12 @@ class QuestionRetrievalResult(BaseModel):
     verified_reranked_documents: list[InferenceSection] = []
     context_documents: list[InferenceSection] = []
     retrieval_stats: AgentChunkRetrievalStats = AgentChunkRetrievalStats()
+
+
+class DocumentVerdict(BaseModel):
+    document_number: int
+    relevant: bool
+
+
+class BatchDocumentVerificationResult(BaseModel):
+    verdicts: list[DocumentVerdict]
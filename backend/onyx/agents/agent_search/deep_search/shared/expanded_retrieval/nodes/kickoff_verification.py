@@ -10,6 +10,7 @@ from onyx.agents.agent_search.deep_search.shared.expanded_retrieval.states impor
 from onyx.agents.agent_search.deep_search.shared.expanded_retrieval.states import (
     ExpandedRetrievalState,
 )
+from onyx.configs.agent_configs import AGENT_DOCUMENT_VERIFICATION_BATCH_SIZE
 from onyx.configs.agent_configs import AGENT_MAX_VERIFICATION_HITS
 
 
@@ -27,19 +28,24 @@ def kickoff_verification(
     verification_question = state.question
 
     sub_question_id = state.sub_question_id
+    # several documents are verified by each LLM call
     return Command(
         update={},
         goto=[
             Send(
                 node="verify_documents",
                 arg=DocVerificationInput(
-                    retrieved_document_to_verify=document,
+                    retrieved_documents_to_verify=retrieved_documents[
+                        start : start + AGENT_DOCUMENT_VERIFICATION_BATCH_SIZE
+                    ],
                     question=verification_question,
                     base_search=False,
                     sub_question_id=sub_question_id,
                     log_messages=[],
                 ),
             )
-            for document in retrieved_documents
+            for start in range(
+                0, len(retrieved_documents), AGENT_DOCUMENT_VERIFICATION_BATCH_SIZE
+            )
         ],
     )
@@ -23,11 +23,6 @@ from onyx.configs.agent_configs import AGENT_RETRIEVAL_STATS
 from onyx.context.search.models import InferenceSection
 from onyx.db.engine import get_session_context_manager
 from onyx.tools.models import SearchQueryInfo
-from onyx.tools.models import SearchToolOverrideKwargs
-from onyx.tools.tool_implementations.search.search_tool import (
-    SEARCH_RESPONSE_SUMMARY_ID,
-)
-from onyx.tools.tool_implementations.search.search_tool import SearchResponseSummary
 from onyx.utils.timing import log_function_time
 
 
@@ -36,16 +31,18 @@ def retrieve_documents(
     state: RetrievalInput, config: RunnableConfig
 ) -> DocRetrievalUpdate:
     """
-    LangGraph node to retrieve documents from the search tool.
+    LangGraph node to retrieve documents from the search tool, for all of the
+    queries at once.
     """
     node_start_time = datetime.now()
-    query_to_retrieve = state.query_to_retrieve
+    queries_to_retrieve = [
+        query for query in state.queries_to_retrieve if query.strip()
+    ]
     graph_config = cast(GraphConfig, config["metadata"]["config"])
     search_tool = graph_config.tooling.search_tool
 
-    retrieved_docs: list[InferenceSection] = []
-    if not query_to_retrieve.strip():
-        logger.warning("Empty query, skipping retrieval")
+    if not queries_to_retrieve:
+        logger.warning("Empty queries, skipping retrieval")
 
         return DocRetrievalUpdate(
             query_retrieval_results=[],
@@ -55,60 +52,52 @@ def retrieve_documents(
                     graph_component="shared - expanded retrieval",
                     node_name="retrieve documents",
                     node_start_time=node_start_time,
-                    result="Empty query, skipping retrieval",
+                    result="Empty queries, skipping retrieval",
                 )
             ],
         )
 
-    query_info = None
     if search_tool is None:
         raise ValueError("search_tool must be provided for agentic search")
 
-    callback_container: list[list[InferenceSection]] = []
-
     # new db session to avoid concurrency issues
     with get_session_context_manager() as db_session:
-        for tool_response in search_tool.run(
-            query=query_to_retrieve,
-            override_kwargs=SearchToolOverrideKwargs(
-                force_no_rerank=True,
-                alternate_db_session=db_session,
-                retrieved_sections_callback=callback_container.append,
-                skip_query_analysis=not state.base_search,
-            ),
-        ):
-            # get retrieved docs to send to the rest of the graph
-            if tool_response.id == SEARCH_RESPONSE_SUMMARY_ID:
-                response = cast(SearchResponseSummary, tool_response.response)
-                retrieved_docs = response.top_sections
-                query_info = SearchQueryInfo(
+        responses = search_tool.retrieve_sections_for_queries(
+            queries=queries_to_retrieve,
+            question=state.question,
+            db_session=db_session,
+        )
+
+    query_retrieval_results: list[QueryRetrievalResult] = []
+    retrieved_documents: list[InferenceSection] = []
+    for query_to_retrieve, response in zip(queries_to_retrieve, responses):
+        retrieved_docs = response.top_sections[:AGENT_MAX_QUERY_RETRIEVAL_RESULTS]
+
+        if AGENT_RETRIEVAL_STATS:
+            fit_scores = get_fit_scores(
+                response.top_sections,
+                retrieved_docs,
+            )
+        else:
+            fit_scores = None
+
+        query_retrieval_results.append(
+            QueryRetrievalResult(
+                query=query_to_retrieve,
+                retrieved_documents=retrieved_docs,
+                stats=fit_scores,
+                query_info=SearchQueryInfo(
                     predicted_search=response.predicted_search,
                     final_filters=response.final_filters,
                     recency_bias_multiplier=response.recency_bias_multiplier,
-                )
-                break
-
-    retrieved_docs = retrieved_docs[:AGENT_MAX_QUERY_RETRIEVAL_RESULTS]
-
-    if AGENT_RETRIEVAL_STATS:
-        pre_rerank_docs = callback_container[0] if callback_container else []
-        fit_scores = get_fit_scores(
-            pre_rerank_docs,
-            retrieved_docs,
+                ),
+            )
         )
-    else:
-        fit_scores = None
-
-    expanded_retrieval_result = QueryRetrievalResult(
-        query=query_to_retrieve,
-        retrieved_documents=retrieved_docs,
-        stats=fit_scores,
-        query_info=query_info,
-    )
+        retrieved_documents.extend(retrieved_docs)
 
     return DocRetrievalUpdate(
-        query_retrieval_results=[expanded_retrieval_result],
-        retrieved_documents=retrieved_docs,
+        query_retrieval_results=query_retrieval_results,
+        retrieved_documents=retrieved_documents,
         log_messages=[
             get_langgraph_node_log_string(
                 graph_component="shared - expanded retrieval",
@@ -1,10 +1,12 @@
 from datetime import datetime
 from typing import cast
 
-from langchain_core.messages import BaseMessage
 from langchain_core.messages import HumanMessage
 from langchain_core.runnables.config import RunnableConfig
 
+from onyx.agents.agent_search.deep_search.shared.expanded_retrieval.models import (
+    BatchDocumentVerificationResult,
+)
 from onyx.agents.agent_search.deep_search.shared.expanded_retrieval.states import (
     DocVerificationInput,
 )
@@ -25,15 +27,25 @@ from onyx.agents.agent_search.shared_graph_utils.models import LLMNodeErrorStrin
 from onyx.agents.agent_search.shared_graph_utils.utils import (
     get_langgraph_node_log_string,
 )
+from onyx.configs.agent_configs import AGENT_MAX_TOKENS_BATCH_VALIDATION_OVERHEAD
+from onyx.configs.agent_configs import AGENT_MAX_TOKENS_BATCH_VALIDATION_PER_DOCUMENT
 from onyx.configs.agent_configs import AGENT_MAX_TOKENS_VALIDATION
 from onyx.configs.agent_configs import AGENT_TIMEOUT_CONNECT_LLM_DOCUMENT_VERIFICATION
+from onyx.configs.agent_configs import AGENT_TIMEOUT_LLM_BATCH_DOCUMENT_VERIFICATION
 from onyx.configs.agent_configs import AGENT_TIMEOUT_LLM_DOCUMENT_VERIFICATION
+from onyx.context.search.models import InferenceSection
 from onyx.llm.chat_llm import LLMRateLimitError
 from onyx.llm.chat_llm import LLMTimeoutError
+from onyx.llm.interfaces import LLM
+from onyx.natural_language_processing.utils import get_tokenizer
+from onyx.natural_language_processing.utils import tokenizer_trim_content
+from onyx.prompts.agent_search import BATCH_DOCUMENT_VERIFICATION_DOCUMENT_TEMPLATE
+from onyx.prompts.agent_search import BATCH_DOCUMENT_VERIFICATION_PROMPT
 from onyx.prompts.agent_search import (
     DOCUMENT_VERIFICATION_PROMPT,
 )
 from onyx.utils.logger import setup_logger
+from onyx.utils.threadpool_concurrency import run_functions_tuples_in_parallel
 from onyx.utils.threadpool_concurrency import run_with_timeout
 from onyx.utils.timing import log_function_time
 
@@ -45,34 +57,28 @@ _llm_node_error_strings = LLMNodeErrorStrings(
     general_error="The LLM encountered an error. The document could not be verified. The document will be treated as 'relevant'",
 )
 
+# kept of each document of a batch, even if the batch then exceeds the context
+_MIN_TOKENS_PER_BATCH_DOCUMENT = 128
 
-@log_function_time(print_only=True)
-def verify_documents(
-    state: DocVerificationInput, config: RunnableConfig
-) -> DocVerificationUpdate:
-    """
-    LangGraph node to check whether the document is relevant for the original user question
-
-    Args:
-        state (DocVerificationInput): The current state
-        config (RunnableConfig): Configuration containing AgentSearchConfig
 
-    Updates:
-        verified_documents: list[InferenceSection]
-    """
-
-    node_start_time = datetime.now()
+def _verification_cache_key(
+    question: str, document: InferenceSection
+) -> tuple[str, str, int]:
+    return (
+        question,
+        document.center_chunk.document_id,
+        document.center_chunk.chunk_id,
+    )
 
-    question = state.question
-    retrieved_document_to_verify = state.retrieved_document_to_verify
-    document_content = retrieved_document_to_verify.combined_content
-
-    graph_config = cast(GraphConfig, config["metadata"]["config"])
-    fast_llm = graph_config.tooling.fast_llm
 
+def _verify_document(
+    question: str, document: InferenceSection, fast_llm: LLM
+) -> bool | None:
+    """Whether the document is relevant for the question, None if the LLM could not
+    tell (timeout or rate limit)"""
     document_content = trim_prompt_piece(
         config=fast_llm.config,
-        prompt_piece=document_content,
+        prompt_piece=document.combined_content,
         reserved_str=DOCUMENT_VERIFICATION_PROMPT + question,
     )
 
@@ -84,12 +90,6 @@ def verify_documents(
         )
     ]
 
-    response: BaseMessage | None = None
-
-    verified_documents = [
-        retrieved_document_to_verify
-    ]  # default is to treat document as relevant
-
     try:
         response = run_with_timeout(
             AGENT_TIMEOUT_LLM_DOCUMENT_VERIFICATION,
@@ -100,10 +100,9 @@ def verify_documents(
         )
 
         assert isinstance(response.content, str)
-        if not binary_string_test(
+        return binary_string_test(
             text=response.content, positive_value=AGENT_POSITIVE_VALUE_STR
-        ):
-            verified_documents = []
+        )
 
     except (LLMTimeoutError, TimeoutError):
         # In this case, we decide to continue and don't raise an error, as
@@ -115,6 +114,175 @@ def verify_documents(
         # little harm in letting some docs through that are less relevant.
         logger.error("LLM Rate Limit Error - verify documents")
 
+    return None
+
+
+def _verify_documents_batch(
+    question: str, documents: list[InferenceSection], fast_llm: LLM
+) -> list[bool | None] | None:
+    """
+    Verifies all of the documents with a single LLM call. Returns the verdict of each
+    document (None if the LLM could not tell), or None if the response could not be
+    parsed, in which case the documents should be verified one by one.
+    """
+    reserved_str = BATCH_DOCUMENT_VERIFICATION_PROMPT + question
+    documents_content = [document.combined_content for document in documents]
+    # no need to trim if a conservative estimate of one token per character fits
+    if (
+        len(reserved_str) + sum(len(content) for content in documents_content)
+        >= fast_llm.config.max_input_tokens
+    ):
+        llm_tokenizer = get_tokenizer(
+            provider_type=fast_llm.config.model_provider,
+            model_name=fast_llm.config.model_name,
+        )
+        # the prompt is reserved once, the documents share the rest equally
+        tokens_per_document = max(
+            (fast_llm.config.max_input_tokens - len(llm_tokenizer.encode(reserved_str)))
+            // len(documents),
+            _MIN_TOKENS_PER_BATCH_DOCUMENT,
+        )
+        documents_content = [
+            tokenizer_trim_content(
+                content=content,
+                desired_length=tokens_per_document,
+                tokenizer=llm_tokenizer,
+            )
+            for content in documents_content
+        ]
+
+    documents_str = "\n\n".join(
+        BATCH_DOCUMENT_VERIFICATION_DOCUMENT_TEMPLATE.format(
+            document_number=document_number, document_content=document_content
+        )
+        for document_number, document_content in enumerate(documents_content, start=1)
+    )
+
+    msg = [
+        HumanMessage(
+            content=BATCH_DOCUMENT_VERIFICATION_PROMPT.format(
+                question=question, documents=documents_str
+            )
+        )
+    ]
+
+    try:
+        response = run_with_timeout(
+            AGENT_TIMEOUT_LLM_BATCH_DOCUMENT_VERIFICATION,
+            fast_llm.invoke,
+            prompt=msg,
+            timeout_override=AGENT_TIMEOUT_CONNECT_LLM_DOCUMENT_VERIFICATION,
+            max_tokens=AGENT_MAX_TOKENS_BATCH_VALIDATION_OVERHEAD
+            + AGENT_MAX_TOKENS_BATCH_VALIDATION_PER_DOCUMENT * len(documents),
+        )
+    except (LLMTimeoutError, TimeoutError):
+        # same as for single documents, not worth retrying them one by one
+        logger.error("LLM Timeout Error - verify documents batch")
+        return [None] * len(documents)
+    except LLMRateLimitError:
+        logger.error("LLM Rate Limit Error - verify documents batch")
+        return [None] * len(documents)
+
+    cleaned_response = (
+        str(response.content).replace("```json\n", "").replace("\n```", "")
+    )
+    first_bracket = cleaned_response.find("{")
+    last_bracket = cleaned_response.rfind("}")
+    cleaned_response = cleaned_response[first_bracket : last_bracket + 1]
+
+    try:
+        verification_result = BatchDocumentVerificationResult.model_validate_json(
+            cleaned_response
+        )
+    except ValueError:
+        logger.warning(
+            f"Failed to parse the batch document verification response: "
+            f"num_documents={len(documents)}"
+        )
+        return None
+
+    verdicts: dict[int, bool] = {
+        verdict.document_number: verdict.relevant
+        for verdict in verification_result.verdicts
+    }
+    if set(verdicts) != set(range(1, len(documents) + 1)):
+        logger.warning(
+            f"Batch document verification response does not cover each document once: "
+            f"num_documents={len(documents)} document_numbers={sorted(verdicts)}"
+        )
+        return None
+
+    return [
+        verdicts[document_number] for document_number in range(1, len(documents) + 1)
+    ]
+
+
+@log_function_time(print_only=True)
+def verify_documents(
+    state: DocVerificationInput, config: RunnableConfig
+) -> DocVerificationUpdate:
+    """
+    LangGraph node to check whether the documents are relevant for the original user question.
+    The documents are verified together in a single LLM call, or one by one if its response
+    can't be parsed.
+
+    Args:
+        state (DocVerificationInput): The current state
+        config (RunnableConfig): Configuration containing AgentSearchConfig
+
+    Updates:
+        verified_documents: list[InferenceSection]
+    """
+
+    node_start_time = datetime.now()
+
+    question = state.question
+    retrieved_documents_to_verify = state.retrieved_documents_to_verify
+
+    graph_config = cast(GraphConfig, config["metadata"]["config"])
+    fast_llm = graph_config.tooling.fast_llm
+    verification_cache = graph_config.tooling.document_verification_cache
+
+    verdicts: list[bool | None] = [
+        verification_cache.get(_verification_cache_key(question, document))
+        for document in retrieved_documents_to_verify
+    ]
+    indices_to_verify = [
+        index for index, verdict in enumerate(verdicts) if verdict is None
+    ]
+
+    new_verdicts: list[bool | None] | None = None
+    if len(indices_to_verify) > 1:
+        new_verdicts = _verify_documents_batch(
+            question,
+            [retrieved_documents_to_verify[index] for index in indices_to_verify],
+            fast_llm,
+        )
+    if new_verdicts is None:
+        new_verdicts = run_functions_tuples_in_parallel(
+            [
+                (
+                    _verify_document,
+                    (question, retrieved_documents_to_verify[index], fast_llm),
+                )
+                for index in indices_to_verify
+            ]
+        )
+
+    for index, verdict in zip(indices_to_verify, new_verdicts):
+        verdicts[index] = verdict
+        if verdict is not None:
+            verification_cache[
+                _verification_cache_key(question, retrieved_documents_to_verify[index])
+            ] = verdict
+
+    # documents that could not be verified are treated as relevant
+    verified_documents = [
+        document
+        for document, verdict in zip(retrieved_documents_to_verify, verdicts)
+        if verdict is not False
+    ]
+
     return DocVerificationUpdate(
         verified_documents=verified_documents,
         log_messages=[
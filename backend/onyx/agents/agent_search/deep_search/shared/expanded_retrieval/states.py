@@ -88,8 +88,8 @@ class ExpandedRetrievalState(
 
 
 class DocVerificationInput(ExpandedRetrievalInput):
-    retrieved_document_to_verify: InferenceSection
+    retrieved_documents_to_verify: list[InferenceSection]
 
 
 class RetrievalInput(ExpandedRetrievalInput):
-    query_to_retrieve: str
+    queries_to_retrieve: list[str]
@@ -38,6 +38,9 @@ class GraphTooling(BaseModel):
     # force tool args IF the tool is used
     force_use_tool: ForceUseTool
     using_tool_calling_llm: bool = False
+    # Verdicts of the retrieved document verification by (question, document id,
+    # chunk id), so documents retrieved again during the run are not verified again
+    document_verification_cache: dict[tuple[str, str, int], bool] = {}
 
     class Config:
         arbitrary_types_allowed = True
@@ -297,6 +297,7 @@ celery_app.autodiscover_tasks(
         "onyx.background.celery.tasks.shared",
         "onyx.background.celery.tasks.vespa",
         "onyx.background.celery.tasks.llm_model_update",
+        "onyx.background.celery.tasks.file_store_migration",
         "onyx.background.celery.tasks.user_file_folder_sync",
     ]
 )
@@ -2,6 +2,7 @@ import copy
 from datetime import timedelta
 from typing import Any
 
+from onyx.configs.app_configs import FILE_STORE_BACKEND
 from onyx.configs.app_configs import LLM_MODEL_UPDATE_API_URL
 from onyx.configs.constants import ONYX_CLOUD_CELERY_TASK_PREFIX
 from onyx.configs.constants import OnyxCeleryPriority
@@ -102,6 +103,24 @@ beat_task_templates.extend(
                 "expires": BEAT_EXPIRES_DEFAULT,
             },
         },
+        {
+            "name": "reconcile-cc-pair-document-counts",
+            "task": OnyxCeleryTask.RECONCILE_CC_PAIR_DOCUMENT_COUNTS,
+            "schedule": timedelta(hours=6),
+            "options": {
+                "priority": OnyxCeleryPriority.LOW,
+                "expires": BEAT_EXPIRES_DEFAULT,
+            },
+        },
+        {
+            "name": "prune-chunk-embedding-cache",
+            "task": OnyxCeleryTask.PRUNE_CHUNK_EMBEDDING_CACHE,
+            "schedule": timedelta(days=1),
+            "options": {
+                "priority": OnyxCeleryPriority.LOW,
+                "expires": BEAT_EXPIRES_DEFAULT,
+            },
+        },
         {
             "name": "monitor-background-processes",
             "task": OnyxCeleryTask.MONITOR_BACKGROUND_PROCESSES,
@@ -129,6 +148,20 @@ if LLM_MODEL_UPDATE_API_URL:
         }
     )
 
+# Only move files out of Postgres large objects if an object storage is configured
+if FILE_STORE_BACKEND != "postgres":
+    beat_task_templates.append(
+        {
+            "name": "migrate-file-store-to-object-storage",
+            "task": OnyxCeleryTask.MIGRATE_FILE_STORE_TO_OBJECT_STORAGE,
+            "schedule": timedelta(minutes=10),
+            "options": {
+                "priority": OnyxCeleryPriority.LOW,
+                "expires": BEAT_EXPIRES_DEFAULT,
+            },
+        }
+    )
+
 
 def make_cloud_generator_task(task: dict[str, Any]) -> dict[str, Any]:
     cloud_task: dict[str, Any] = {}
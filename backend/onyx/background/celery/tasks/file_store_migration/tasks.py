@@ -0,0 +1,86 @@
+import time
+
+from celery import shared_task
+from celery import Task
+from redis.lock import Lock as RedisLock
+
+from onyx.background.celery.apps.app_base import task_logger
+from onyx.configs.app_configs import FILE_STORE_MIGRATION_BATCH_SIZE
+from onyx.configs.app_configs import JOB_TIMEOUT
+from onyx.configs.constants import OnyxCeleryTask
+from onyx.configs.constants import OnyxRedisLocks
+from onyx.db.engine import get_session_with_current_tenant
+from onyx.file_store.blob_storage import get_blob_storage
+from onyx.file_store.file_store import ObjectStoreBackedFileStore
+from onyx.redis.redis_pool import get_redis_client
+
+# renewed after every batch, a batch of large files can take a while to upload
+_MIGRATION_LOCK_TIMEOUT = 30 * 60
+
+
+@shared_task(
+    name=OnyxCeleryTask.MIGRATE_FILE_STORE_TO_OBJECT_STORAGE,
+    ignore_result=True,
+    soft_time_limit=JOB_TIMEOUT,
+    trail=False,
+    bind=True,
+)
+def migrate_file_store_to_object_storage(self: Task, *, tenant_id: str) -> int | None:
+    """Moves the files of the tenant that are still kept in Postgres large objects into
+    the configured object storage, batch by batch, until none are left or the time
+    limit is close. The next run picks up where this one stopped. Files that fail to
+    migrate are skipped and tried again by the next run."""
+    blob_storage = get_blob_storage()
+    if blob_storage is None:
+        return None
+
+    time_start = time.monotonic()
+
+    redis_client = get_redis_client()
+    lock: RedisLock = redis_client.lock(
+        OnyxRedisLocks.MIGRATE_FILE_STORE_LOCK,
+        timeout=_MIGRATION_LOCK_TIMEOUT,
+    )
+
+    # these tasks should never overlap
+    if not lock.acquire(blocking=False):
+        return None
+
+    num_migrated = 0
+    num_failed = 0
+    after_file_name: str | None = None
+    try:
+        while time.monotonic() - time_start < JOB_TIMEOUT / 2:
+            with get_session_with_current_tenant() as db_session:
+                file_store = ObjectStoreBackedFileStore(
+                    db_session=db_session,
+                    blob_storage=blob_storage,
+                    tenant_id=tenant_id,
+                )
+                batch = file_store.migrate_large_objects(
+                    FILE_STORE_MIGRATION_BATCH_SIZE, after_file_name=after_file_name
+                )
+
+            num_migrated += batch.num_migrated
+            num_failed += batch.num_failed
+            if batch.num_migrated + batch.num_failed < FILE_STORE_MIGRATION_BATCH_SIZE:
+                break
+            after_file_name = batch.last_file_name
+            lock.reacquire()
+    except Exception:
+        task_logger.exception(
+            f"Failed to migrate files to object storage: "
+            f"tenant={tenant_id} migrated={num_migrated} failed={num_failed}"
+        )
+        return None
+    finally:
+        if lock.owned():
+            lock.release()
+
+    if num_migrated or num_failed:
+        task_logger.info(
+            f"Migrated files to object storage: "
+            f"tenant={tenant_id} migrated={num_migrated} failed={num_failed} "
+            f"elapsed={time.monotonic() - time_start:.2f}"
+        )
+    return num_migrated
@@ -2,20 +2,36 @@
 # Periodic Tasks
 #####
 import json
+import time
+from datetime import timedelta
 from typing import Any
 
 from celery import shared_task
+from celery import Task
 from celery.contrib.abortable import AbortableTask  # type: ignore
 from celery.exceptions import TaskRevokedError
+from redis.lock import Lock as RedisLock
 from sqlalchemy import inspect
 from sqlalchemy import text
 from sqlalchemy.orm import Session
 
 from onyx.background.celery.apps.app_base import task_logger
+from onyx.configs.app_configs import CHUNK_EMBEDDING_CACHE_MAX_UNUSED_DAYS
 from onyx.configs.app_configs import JOB_TIMEOUT
 from onyx.configs.constants import OnyxCeleryTask
+from onyx.configs.constants import OnyxRedisLocks
 from onyx.configs.constants import PostgresAdvisoryLocks
+from onyx.db.chunk import delete_unused_cached_chunk_embeddings
+from onyx.db.connector_credential_pair import get_connector_credential_pairs
+from onyx.db.document import reconcile_document_count_for_cc_pair
 from onyx.db.engine import get_session_with_current_tenant
+from onyx.redis.redis_pool import get_redis_client
+
+# renewed after every cc pair, counting a large cc pair can take a while
+_RECONCILE_LOCK_TIMEOUT = 30 * 60
+
+# renewed after every batch of deleted cache rows
+_PRUNE_CHUNK_EMBEDDING_CACHE_LOCK_TIMEOUT = 5 * 60
 
 
 @shared_task(
@@ -136,3 +152,113 @@ def kombu_message_cleanup_task_helper(ctx: dict, db_session: Session) -> bool:
         ctx["last_processed_id"] = msg[0]
 
     return True
+
+
+@shared_task(
+    name=OnyxCeleryTask.RECONCILE_CC_PAIR_DOCUMENT_COUNTS,
+    ignore_result=True,
+    soft_time_limit=JOB_TIMEOUT,
+    trail=False,
+    bind=True,
+)
+def reconcile_cc_pair_document_counts(self: Task, *, tenant_id: str) -> int | None:
+    """Recounts the indexed documents of every cc pair and fixes the incrementally
+    maintained counts that drifted (e.g. through writes that bypass the counters).
+    Each cc pair is counted in its own transaction using the cc pair index.
+
+    Returns the number of cc pairs whose count was fixed."""
+    time_start = time.monotonic()
+
+    redis_client = get_redis_client()
+    lock: RedisLock = redis_client.lock(
+        OnyxRedisLocks.RECONCILE_CC_PAIR_DOCUMENT_COUNTS_LOCK,
+        timeout=_RECONCILE_LOCK_TIMEOUT,
+    )
+
+    # these tasks should never overlap
+    if not lock.acquire(blocking=False):
+        return None
+
+    num_fixed = 0
+    try:
+        with get_session_with_current_tenant() as db_session:
+            cc_pair_ids = [
+                cc_pair.id
+                for cc_pair in get_connector_credential_pairs(
+                    db_session, include_user_files=True
+                )
+            ]
+
+            for cc_pair_id in cc_pair_ids:
+                lock.reacquire()
+                counts = reconcile_document_count_for_cc_pair(db_session, cc_pair_id)
+                if not counts or counts[0] == counts[1]:
+                    continue
+
+                num_fixed += 1
+                task_logger.warning(
+                    f"Fixed drifted cc pair document count: "
+                    f"cc_pair={cc_pair_id} tracked={counts[0]} actual={counts[1]}"
+                )
+    finally:
+        if lock.owned():
+            lock.release()
+
+    task_logger.info(
+        f"Reconciled cc pair document counts: "
+        f"tenant={tenant_id} cc_pairs={len(cc_pair_ids)} fixed={num_fixed} "
+        f"elapsed={time.monotonic() - time_start:.2f}"
+    )
+    return num_fixed
+
+
+@shared_task(
+    name=OnyxCeleryTask.PRUNE_CHUNK_EMBEDDING_CACHE,
+    ignore_result=True,
+    soft_time_limit=JOB_TIMEOUT,
+    trail=False,
+    bind=True,
+)
+def prune_chunk_embedding_cache(self: Task, *, tenant_id: str) -> int | None:
+    """Deletes the cached chunk embeddings that no indexing run used for
+    CHUNK_EMBEDDING_CACHE_MAX_UNUSED_DAYS, batch by batch so that no single
+    transaction holds many rows.
+
+    Returns the number of deleted embeddings."""
+    time_start = time.monotonic()
+
+    redis_client = get_redis_client()
+    lock: RedisLock = redis_client.lock(
+        OnyxRedisLocks.PRUNE_CHUNK_EMBEDDING_CACHE_LOCK,
+        timeout=_PRUNE_CHUNK_EMBEDDING_CACHE_LOCK_TIMEOUT,
+    )
+
+    # these tasks should never overlap
+    if not lock.acquire(blocking=False):
+        return None
+
+    batch_size = 1000
+    num_deleted = 0
+    try:
+        with get_session_with_current_tenant() as db_session:
+            while True:
+                num_batch = delete_unused_cached_chunk_embeddings(
+                    unused_for=timedelta(days=CHUNK_EMBEDDING_CACHE_MAX_UNUSED_DAYS),
+                    db_session=db_session,
+                    batch_size=batch_size,
+                )
+                num_deleted += num_batch
+                if num_batch < batch_size:
+                    break
+                lock.reacquire()
+    finally:
+        if lock.owned():
+            lock.release()
+
+    if num_deleted:
+        task_logger.info(
+            f"Pruned chunk embedding cache: "
+            f"tenant={tenant_id} deleted={num_deleted} "
+            f"elapsed={time.monotonic() - time_start:.2f}"
+        )
+    return num_deleted
@@ -4,7 +4,9 @@ from tenacity import retry_if_exception_type
 from tenacity import stop_after_delay
 from tenacity import wait_random_exponential
 
+from onyx.document_index.interfaces import DocumentFieldsUpdate
 from onyx.document_index.interfaces import DocumentIndex
+from onyx.document_index.interfaces import DocumentUpdateResult
 from onyx.document_index.interfaces import VespaDocumentFields
 from onyx.document_index.interfaces import VespaDocumentUserFields
 
@@ -63,3 +65,16 @@ class RetryDocumentIndex:
             fields=fields,
             user_fields=user_fields,
         )
+
+    @retry(
+        retry=retry_if_exception_type(httpx.ReadTimeout),
+        wait=wait_random_exponential(multiplier=1, max=MAX_WAIT),
+        stop=stop_after_delay(STOP_AFTER),
+    )
+    def update_multiple(
+        self,
+        updates: list[DocumentFieldsUpdate],
+        *,
+        tenant_id: str,
+    ) -> list[DocumentUpdateResult]:
+        return self.index.update_multiple(updates, tenant_id=tenant_id)
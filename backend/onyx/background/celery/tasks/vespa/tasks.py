@@ -15,6 +15,7 @@ from sqlalchemy.orm import Session
 from tenacity import RetryError
 
 from onyx.access.access import get_access_for_document
+from onyx.access.access import get_access_for_documents
 from onyx.background.celery.apps.app_base import task_logger
 from onyx.background.celery.tasks.shared.RetryDocumentIndex import RetryDocumentIndex
 from onyx.background.celery.tasks.shared.tasks import LIGHT_SOFT_TIME_LIMIT
@@ -29,10 +30,13 @@ from onyx.configs.constants import OnyxRedisLocks
 from onyx.db.connector_credential_pair import get_connector_credential_pairs
 from onyx.db.document import count_documents_by_needs_sync
 from onyx.db.document import get_document
+from onyx.db.document import get_documents_by_ids
 from onyx.db.document import mark_document_as_synced
+from onyx.db.document import mark_documents_as_synced
 from onyx.db.document_set import delete_document_set
 from onyx.db.document_set import fetch_document_sets
 from onyx.db.document_set import fetch_document_sets_for_document
+from onyx.db.document_set import fetch_document_sets_for_documents
 from onyx.db.document_set import get_document_set_by_id
 from onyx.db.document_set import mark_document_set_as_synced
 from onyx.db.engine import get_session_with_current_tenant
@@ -45,6 +49,7 @@ from onyx.db.sync_record import cleanup_sync_records
 from onyx.db.sync_record import insert_sync_record
 from onyx.db.sync_record import update_sync_record_status
 from onyx.document_index.factory import get_default_document_index
+from onyx.document_index.interfaces import DocumentFieldsUpdate
 from onyx.document_index.interfaces import VespaDocumentFields
 from onyx.httpx.httpx_pool import HttpxPool
 from onyx.redis.redis_connector_credential_pair import RedisConnectorCredentialPair
@@ -641,3 +646,188 @@ def vespa_metadata_sync_task(self: Task, document_id: str, *, tenant_id: str) ->
         )
 
     return completion_status == OnyxCeleryTaskCompletionStatus.SUCCEEDED
+
+
+@shared_task(
+    name=OnyxCeleryTask.VESPA_METADATA_SYNC_BATCH_TASK,
+    bind=True,
+    soft_time_limit=LIGHT_SOFT_TIME_LIMIT,
+    time_limit=LIGHT_TIME_LIMIT,
+    max_retries=3,
+)
+def vespa_metadata_sync_batch_task(
+    self: Task, document_ids: list[str], *, tenant_id: str
+) -> bool:
+    """Batched version of vespa_metadata_sync_task. Document sets and access are
+    loaded for the whole batch with bulk queries, the Vespa partial updates are sent
+    together and the batch is marked as synced in a single transaction.
+
+    Documents are updated independently. The ones that were updated are marked as
+    synced even if others failed, and a retry only covers the failed documents."""
+    start = time.monotonic()
+
+    # the documents a retry has to cover
+    pending_document_ids = document_ids
+
+    completion_status = OnyxCeleryTaskCompletionStatus.UNDEFINED
+
+    try:
+        with get_session_with_current_tenant() as db_session:
+            active_search_settings = get_active_search_settings(db_session)
+            doc_index = get_default_document_index(
+                search_settings=active_search_settings.primary,
+                secondary_search_settings=active_search_settings.secondary,
+                httpx_client=HttpxPool.get("vespa"),
+            )
+
+            retry_index = RetryDocumentIndex(doc_index)
+
+            docs = get_documents_by_ids(db_session, document_ids)
+            if not docs:
+                elapsed = time.monotonic() - start
+                task_logger.info(
+                    f"docs={len(document_ids)} "
+                    f"action=no_operation "
+                    f"elapsed={elapsed:.2f}"
+                )
+                completion_status = OnyxCeleryTaskCompletionStatus.SKIPPED
+            else:
+                found_doc_ids = [doc.id for doc in docs]
+
+                # document set sync
+                doc_id_to_doc_sets: dict[str, set[str]] = {
+                    doc_id: set(doc_sets)
+                    for doc_id, doc_sets in fetch_document_sets_for_documents(
+                        found_doc_ids, db_session
+                    )
+                }
+
+                # User group sync
+                doc_id_to_access = get_access_for_documents(
+                    document_ids=found_doc_ids, db_session=db_session
+                )
+
+                updates = [
+                    DocumentFieldsUpdate(
+                        doc_id=doc.id,
+                        chunk_count=doc.chunk_count,
+                        fields=VespaDocumentFields(
+                            document_sets=doc_id_to_doc_sets.get(doc.id, set()),
+                            access=doc_id_to_access[doc.id],
+                            boost=doc.boost,
+                            hidden=doc.hidden,
+                        ),
+                    )
+                    for doc in docs
+                ]
+
+                # update Vespa. OK if docs don't exist. Failures are reported per doc.
+                results = retry_index.update_multiple(updates, tenant_id=tenant_id)
+                synced_doc_ids = [
+                    result.doc_id for result in results if result.succeeded
+                ]
+                retryable_failures = [
+                    result
+                    for result in results
+                    if not result.succeeded and result.retryable
+                ]
+                non_retryable_failures = [
+                    result
+                    for result in results
+                    if not result.succeeded and not result.retryable
+                ]
+
+                # update db last. Worst case = we crash right before this and
+                # the sync might repeat again later
+                mark_documents_as_synced(synced_doc_ids, db_session)
+
+                if retryable_failures:
+                    # only the docs that failed need to be retried
+                    pending_document_ids = [
+                        result.doc_id for result in retryable_failures
+                    ]
+                    raise RuntimeError(
+                        f"Failed to update documents in Vespa: "
+                        f"failed={len(retryable_failures)} "
+                        f"first_error={retryable_failures[0].error}"
+                    )
+
+                elapsed = time.monotonic() - start
+                if non_retryable_failures:
+                    # the same as for a 400 from Vespa below, these are not retried
+                    task_logger.error(
+                        f"Non-retryable document update failures: "
+                        f"docs={len(document_ids)} "
+                        f"failed={len(non_retryable_failures)} "
+                        f"first_error={non_retryable_failures[0].error} "
+                        f"elapsed={elapsed:.2f}"
+                    )
+                    completion_status = (
+                        OnyxCeleryTaskCompletionStatus.NON_RETRYABLE_EXCEPTION
+                    )
+                else:
+                    task_logger.info(
+                        f"docs={len(document_ids)} "
+                        f"found={len(found_doc_ids)} "
+                        f"action=sync "
+                        f"elapsed={elapsed:.2f}"
+                    )
+                    completion_status = OnyxCeleryTaskCompletionStatus.SUCCEEDED
+    except SoftTimeLimitExceeded:
+        task_logger.info(f"SoftTimeLimitExceeded exception. docs={len(document_ids)}")
+        completion_status = OnyxCeleryTaskCompletionStatus.SOFT_TIME_LIMIT
+    except Exception as ex:
+        e: Exception | None = None
+        while True:
+            if isinstance(ex, RetryError):
+                task_logger.warning(
+                    f"Tenacity retry failed: num_attempts={ex.last_attempt.attempt_number}"
+                )
+
+                # only set the inner exception if it is of type Exception
+                e_temp = ex.last_attempt.exception()
+                if isinstance(e_temp, Exception):
+                    e = e_temp
+            else:
+                e = ex
+
+            if isinstance(e, httpx.HTTPStatusError):
+                if e.response.status_code == HTTPStatus.BAD_REQUEST:
+                    task_logger.exception(
+                        f"Non-retryable HTTPStatusError: "
+                        f"docs={len(document_ids)} "
+                        f"status={e.response.status_code}"
+                    )
+                completion_status = (
+                    OnyxCeleryTaskCompletionStatus.NON_RETRYABLE_EXCEPTION
+                )
+                break
+
+            task_logger.exception(
+                f"vespa_metadata_sync_batch_task exceptioned: docs={len(document_ids)}"
+            )
+
+            completion_status = OnyxCeleryTaskCompletionStatus.RETRYABLE_EXCEPTION
+            if (
+                self.max_retries is not None
+                and self.request.retries >= self.max_retries
+            ):
+                completion_status = (
+                    OnyxCeleryTaskCompletionStatus.NON_RETRYABLE_EXCEPTION
+                )
+
+            # Exponential backoff from 2^4 to 2^6 ... i.e. 16, 32, 64
+            countdown = 2 ** (self.request.retries + 4)
+            self.retry(
+                exc=e,
+                countdown=countdown,
+                kwargs=dict(document_ids=pending_document_ids, tenant_id=tenant_id),
+            )  # this will raise a celery exception
+            break  # we won't hit this, but it looks weird not to have it
+    finally:
+        task_logger.info(
+            f"vespa_metadata_sync_batch_task completed: "
+            f"status={completion_status.value} docs={len(document_ids)}"
+        )
+
+    return completion_status == OnyxCeleryTaskCompletionStatus.SUCCEEDED
@@ -12,6 +12,7 @@ from onyx.background.indexing.checkpointing_utils import check_checkpoint_size
 from onyx.background.indexing.checkpointing_utils import get_latest_valid_checkpoint
 from onyx.background.indexing.checkpointing_utils import save_checkpoint
 from onyx.background.indexing.memory_tracer import MemoryTracer
+from onyx.configs.app_configs import ENABLE_PIPELINED_INDEXING
 from onyx.configs.app_configs import INDEX_BATCH_SIZE
 from onyx.configs.app_configs import INDEXING_SIZE_WARNING_THRESHOLD
 from onyx.configs.app_configs import INDEXING_TRACER_INTERVAL
@@ -24,6 +25,7 @@ from onyx.connectors.connector_runner import ConnectorRunner
 from onyx.connectors.exceptions import ConnectorValidationError
 from onyx.connectors.exceptions import UnexpectedValidationError
 from onyx.connectors.factory import instantiate_connector
+from onyx.connectors.models import ConnectorCheckpoint
 from onyx.connectors.models import ConnectorFailure
 from onyx.connectors.models import Document
 from onyx.connectors.models import IndexAttemptMetadata
@@ -53,6 +55,10 @@ from onyx.httpx.httpx_pool import HttpxPool
 from onyx.indexing.embedder import DefaultIndexingEmbedder
 from onyx.indexing.indexing_heartbeat import IndexingHeartbeatInterface
 from onyx.indexing.indexing_pipeline import build_indexing_pipeline
+from onyx.indexing.indexing_pipeline import build_pipelined_indexer
+from onyx.indexing.indexing_pipeline import IndexingPipelineProtocol
+from onyx.indexing.indexing_pipeline import IndexingPipelineResult
+from onyx.indexing.indexing_pipeline import PipelinedIndexer
 from onyx.natural_language_processing.search_nlp_models import (
     InformationContentClassificationModel,
 )
@@ -360,18 +366,32 @@ def _run_indexing(
         httpx_client=HttpxPool.get("vespa"),
     )
 
-    indexing_pipeline = build_indexing_pipeline(
-        embedder=embedding_model,
-        information_content_classification_model=information_content_classification_model,
-        document_index=document_index,
-        ignore_time_skip=(
-            ctx.from_beginning
-            or (ctx.search_settings_status == IndexModelStatus.FUTURE)
-        ),
-        db_session=db_session,
-        tenant_id=tenant_id,
-        callback=callback,
+    ignore_time_skip = ctx.from_beginning or (
+        ctx.search_settings_status == IndexModelStatus.FUTURE
     )
+    # exactly one of them is used to index the batches
+    pipelined_indexer: PipelinedIndexer | None = None
+    indexing_pipeline: IndexingPipelineProtocol | None = None
+    if ENABLE_PIPELINED_INDEXING:
+        pipelined_indexer = build_pipelined_indexer(
+            embedder=embedding_model,
+            information_content_classification_model=information_content_classification_model,
+            document_index=document_index,
+            ignore_time_skip=ignore_time_skip,
+            db_session=db_session,
+            tenant_id=tenant_id,
+            callback=callback,
+        )
+    else:
+        indexing_pipeline = build_indexing_pipeline(
+            embedder=embedding_model,
+            information_content_classification_model=information_content_classification_model,
+            document_index=document_index,
+            ignore_time_skip=ignore_time_skip,
+            db_session=db_session,
+            tenant_id=tenant_id,
+            callback=callback,
+        )
 
     # Initialize memory tracer. NOTE: won't actually do anything if
     # `INDEXING_TRACER_INTERVAL` is 0.
@@ -386,6 +406,7 @@ def _run_indexing(
 
     total_failures = 0
     batch_num = 0
+    submitted_batch_num = 0
     net_doc_change = 0
     document_count = 0
     chunk_count = 0
@@ -447,6 +468,113 @@ def _run_indexing(
                 error for error in unresolved_errors if error.entity_id
             ]
 
+        # (sequence number of the last batch fetched before it, checkpoint)
+        pending_checkpoints: list[tuple[int, ConnectorCheckpoint]] = []
+
+        def _save_written_checkpoints() -> None:
+            if not pipelined_indexer:
+                return
+
+            latest_written: ConnectorCheckpoint | None = None
+            while (
+                pending_checkpoints
+                and pending_checkpoints[0][0] <= pipelined_indexer.completed_through
+            ):
+                _, latest_written = pending_checkpoints.pop(0)
+
+            if latest_written is None:
+                return
+
+            with get_session_with_current_tenant() as db_session_temp:
+                save_checkpoint(
+                    db_session=db_session_temp,
+                    index_attempt_id=index_attempt_id,
+                    checkpoint=latest_written,
+                )
+
+        def _handle_index_pipeline_result(
+            document_batch: list[Document],
+            index_pipeline_result: IndexingPipelineResult,
+        ) -> None:
+            nonlocal batch_num, net_doc_change, chunk_count, document_count
+            nonlocal total_failures
+
+            batch_num += 1
+            net_doc_change += index_pipeline_result.new_docs
+            chunk_count += index_pipeline_result.total_chunks
+            document_count += index_pipeline_result.total_docs
+
+            # resolve errors for documents that were successfully indexed
+            failed_document_ids = [
+                failure.failed_document.document_id
+                for failure in index_pipeline_result.failures
+                if failure.failed_document
+            ]
+            successful_document_ids = [
+                document.id
+                for document in document_batch
+                if document.id not in failed_document_ids
+            ]
+            for document_id in successful_document_ids:
+                with get_session_with_current_tenant() as db_session_temp:
+                    if document_id in doc_id_to_unresolved_errors:
+                        logger.info(
+                            f"Resolving IndexAttemptError for document '{document_id}'"
+                        )
+                        for error in doc_id_to_unresolved_errors[document_id]:
+                            error.is_resolved = True
+                            db_session_temp.add(error)
+                    db_session_temp.commit()
+
+            # add brand new failures
+            if index_pipeline_result.failures:
+                total_failures += len(index_pipeline_result.failures)
+                with get_session_with_current_tenant() as db_session_temp:
+                    for failure in index_pipeline_result.failures:
+                        create_index_attempt_error(
+                            index_attempt_id,
+                            ctx.cc_pair_id,
+                            failure,
+                            db_session_temp,
+                        )
+
+                _check_failure_threshold(
+                    total_failures,
+                    document_count,
+                    batch_num,
+                    index_pipeline_result.failures[-1],
+                )
+
+            # This new value is updated every batch, so UI can refresh per batch update
+            with get_session_with_current_tenant() as db_session_temp:
+                # NOTE: Postgres uses the start of the transactions when computing `NOW()`
+                # so we need either to commit() or to use a new session
+                update_docs_indexed(
+                    db_session=db_session_temp,
+                    index_attempt_id=index_attempt_id,
+                    total_docs_indexed=document_count,
+                    new_docs_indexed=net_doc_change,
+                    docs_removed_from_index=0,
+                )
+
+            if callback:
+                callback.progress("_run_indexing", len(document_batch))
+
+            # Add telemetry for indexing progress
+            optional_telemetry(
+                record_type=RecordType.INDEXING_PROGRESS,
+                data={
+                    "index_attempt_id": index_attempt_id,
+                    "cc_pair_id": ctx.cc_pair_id,
+                    "current_docs_indexed": document_count,
+                    "current_chunks_indexed": chunk_count,
+                    "source": ctx.source.value,
+                },
+                tenant_id=tenant_id,
+            )
+
+            memory_tracer.increment_and_maybe_trace()
+
         while checkpoint.has_more:
             logger.info(
                 f"Running '{ctx.source.value}' connector with checkpoint: {checkpoint}"
@@ -523,105 +651,63 @@ def _run_indexing(
                 logger.debug(f"Indexing batch of documents: {batch_description}")
 
                 index_attempt_md.request_id = make_randomized_onyx_request_id("CIX")
-                index_attempt_md.structured_id = (
-                    f"{tenant_id}:{ctx.cc_pair_id}:{index_attempt_id}:{batch_num}"
-                )
-                index_attempt_md.batch_num = batch_num + 1  # use 1-index for this
-
-                # real work happens here!
-                index_pipeline_result = indexing_pipeline(
-                    document_batch=doc_batch_cleaned,
-                    index_attempt_metadata=index_attempt_md,
-                )
-
-                batch_num += 1
-                net_doc_change += index_pipeline_result.new_docs
-                chunk_count += index_pipeline_result.total_chunks
-                document_count += index_pipeline_result.total_docs
-
-                # resolve errors for documents that were successfully indexed
-                failed_document_ids = [
-                    failure.failed_document.document_id
-                    for failure in index_pipeline_result.failures
-                    if failure.failed_document
-                ]
-                successful_document_ids = [
-                    document.id
-                    for document in document_batch
-                    if document.id not in failed_document_ids
-                ]
-                for document_id in successful_document_ids:
-                    with get_session_with_current_tenant() as db_session_temp:
-                        if document_id in doc_id_to_unresolved_errors:
-                            logger.info(
-                                f"Resolving IndexAttemptError for document '{document_id}'"
-                            )
-                            for error in doc_id_to_unresolved_errors[document_id]:
-                                error.is_resolved = True
-                                db_session_temp.add(error)
-                        db_session_temp.commit()
-
-                # add brand new failures
-                if index_pipeline_result.failures:
-                    total_failures += len(index_pipeline_result.failures)
-                    with get_session_with_current_tenant() as db_session_temp:
-                        for failure in index_pipeline_result.failures:
-                            create_index_attempt_error(
-                                index_attempt_id,
-                                ctx.cc_pair_id,
-                                failure,
-                                db_session_temp,
-                            )
-
-                    _check_failure_threshold(
-                        total_failures,
-                        document_count,
-                        batch_num,
-                        index_pipeline_result.failures[-1],
+                index_attempt_md.structured_id = f"{tenant_id}:{ctx.cc_pair_id}:{index_attempt_id}:{submitted_batch_num}"
+                # use 1-index for this
+                index_attempt_md.batch_num = submitted_batch_num + 1
+                submitted_batch_num += 1
+
+                if pipelined_indexer:
+                    # the metadata object is shared by all steps of a batch, so
+                    # every batch in flight needs its own copy
+                    pipelined_indexer.submit(
+                        document_batch=doc_batch_cleaned,
+                        index_attempt_metadata=index_attempt_md.model_copy(),
                     )
-
-                # This new value is updated every batch, so UI can refresh per batch update
-                with get_session_with_current_tenant() as db_session_temp:
-                    # NOTE: Postgres uses the start of the transactions when computing `NOW()`
-                    # so we need either to commit() or to use a new session
-                    update_docs_indexed(
-                        db_session=db_session_temp,
-                        index_attempt_id=index_attempt_id,
-                        total_docs_indexed=document_count,
-                        new_docs_indexed=net_doc_change,
-                        docs_removed_from_index=0,
+                    for (
+                        finished_batch,
+                        index_pipeline_result,
+                    ) in pipelined_indexer.pop_completed():
+                        _handle_index_pipeline_result(
+                            finished_batch, index_pipeline_result
+                        )
+                    _save_written_checkpoints()
+                elif indexing_pipeline:
+                    # real work happens here!
+                    index_pipeline_result = indexing_pipeline(
+                        document_batch=doc_batch_cleaned,
+                        index_attempt_metadata=index_attempt_md,
+                    )
+                    _handle_index_pipeline_result(
+                        doc_batch_cleaned, index_pipeline_result
                     )
-
-                if callback:
-                    callback.progress("_run_indexing", len(doc_batch_cleaned))
-
-                # Add telemetry for indexing progress
-                optional_telemetry(
-                    record_type=RecordType.INDEXING_PROGRESS,
-                    data={
-                        "index_attempt_id": index_attempt_id,
-                        "cc_pair_id": ctx.cc_pair_id,
-                        "current_docs_indexed": document_count,
-                        "current_chunks_indexed": chunk_count,
-                        "source": ctx.source.value,
-                    },
-                    tenant_id=tenant_id,
-                )
-
-                memory_tracer.increment_and_maybe_trace()
 
             # `make sure the checkpoints aren't getting too large`at some regular interval
             CHECKPOINT_SIZE_CHECK_INTERVAL = 100
             if batch_num % CHECKPOINT_SIZE_CHECK_INTERVAL == 0:
                 check_checkpoint_size(checkpoint)
 
-            # save latest checkpoint
-            with get_session_with_current_tenant() as db_session_temp:
-                save_checkpoint(
-                    db_session=db_session_temp,
-                    index_attempt_id=index_attempt_id,
-                    checkpoint=checkpoint,
+            if pipelined_indexer:
+                # a checkpoint may only be saved once every batch fetched before
+                # it has been written
+                pending_checkpoints.append(
+                    (pipelined_indexer.last_submitted, checkpoint)
                 )
+                _save_written_checkpoints()
+            else:
+                # save latest checkpoint
+                with get_session_with_current_tenant() as db_session_temp:
+                    save_checkpoint(
+                        db_session=db_session_temp,
+                        index_attempt_id=index_attempt_id,
+                        checkpoint=checkpoint,
+                    )
+
+        if pipelined_indexer:
+            for finished_batch, index_pipeline_result in pipelined_indexer.drain():
+                _handle_index_pipeline_result(finished_batch, index_pipeline_result)
+            _save_written_checkpoints()
+            pipelined_indexer.shutdown()
+            pipelined_indexer.log_utilization()
 
         optional_telemetry(
             record_type=RecordType.INDEXING_COMPLETE,
@@ -637,6 +723,11 @@ def _run_indexing(
         )
 
     except Exception as e:
+        if pipelined_indexer:
+            # batches still in flight are dropped, their checkpoints were never saved
+            pipelined_indexer.shutdown()
+            pipelined_indexer.log_utilization()
+
         logger.exception(
             "Connector run exceptioned after elapsed time: "
             f"{time.monotonic() - start_time} seconds"
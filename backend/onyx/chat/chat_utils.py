@@ -4,6 +4,7 @@ from uuid import UUID
 
 from fastapi import HTTPException
 from fastapi.datastructures import Headers
+from sqlalchemy import Row
 from sqlalchemy.orm import Session
 
 from onyx.auth.users import is_user_admin
@@ -17,7 +18,8 @@ from onyx.context.search.models import InferenceSection
 from onyx.context.search.models import RerankingDetails
 from onyx.context.search.models import RetrievalDetails
 from onyx.db.chat import create_chat_session
-from onyx.db.chat import get_chat_messages_by_session
+from onyx.db.chat import get_chat_messages_by_ids
+from onyx.db.chat import get_mainline_chat_message_chain
 from onyx.db.llm import fetch_existing_doc_sets
 from onyx.db.llm import fetch_existing_tools
 from onyx.db.models import ChatMessage
@@ -145,63 +147,66 @@ def create_chat_chain(
     prefetch_tool_calls: bool = True,
     # Optional id at which we finish processing
     stop_at_message_id: int | None = None,
+    # Optional token budget for the history, older messages that don't fit are not
+    # loaded. Based on the stored token counts of the messages.
+    max_history_tokens: int | None = None,
 ) -> tuple[ChatMessage, list[ChatMessage]]:
     """Build the linear chain of messages without including the root message"""
-    mainline_messages: list[ChatMessage] = []
-
-    all_chat_messages = get_chat_messages_by_session(
+    chain = get_mainline_chat_message_chain(
         chat_session_id=chat_session_id,
-        user_id=None,
         db_session=db_session,
-        skip_permission_check=True,
-        prefetch_tool_calls=prefetch_tool_calls,
+        stop_at_message_id=stop_at_message_id,
     )
-    id_to_msg = {msg.id: msg for msg in all_chat_messages}
 
-    if not all_chat_messages:
+    if not chain:
         raise RuntimeError("No messages in Chat Session")
 
-    root_message = all_chat_messages[0]
-    if root_message.parent_message is not None:
+    if len(chain) > 1 and chain[1].depth == 0:
         raise RuntimeError(
             "Invalid root message, unable to fetch valid chat message sequence"
         )
 
-    current_message: ChatMessage | None = root_message
-    previous_message: ChatMessage | None = None
-    while current_message is not None:
-        child_msg = current_message.latest_child_message
-
-        # Break if at the end of the chain
-        # or have reached the `final_id` of the submitted message
-        if not child_msg or (
-            stop_at_message_id and current_message.id == stop_at_message_id
-        ):
-            break
-        current_message = id_to_msg.get(child_msg)
-
-        if current_message is None:
-            raise RuntimeError(
-                "Invalid message chain,"
-                "could not find next message in the same session"
-            )
+    last_link = chain[-1]
+    if last_link.latest_child_message and last_link.id != stop_at_message_id:
+        raise RuntimeError(
+            "Invalid message chain," "could not find next message in the same session"
+        )
 
+    mainline_links: list[Row] = []
+    previous_link: Row | None = None
+    for link in chain[1:]:
         if (
-            current_message.message_type == MessageType.ASSISTANT
-            and previous_message is not None
-            and previous_message.message_type == MessageType.ASSISTANT
-            and mainline_messages
+            link.message_type == MessageType.ASSISTANT
+            and previous_link is not None
+            and previous_link.message_type == MessageType.ASSISTANT
+            and mainline_links
         ):
-            if current_message.refined_answer_improvement:
-                mainline_messages[-1] = current_message
+            if link.refined_answer_improvement:
+                mainline_links[-1] = link
         else:
-            mainline_messages.append(current_message)
+            mainline_links.append(link)
 
-        previous_message = current_message
+        previous_link = link
 
-    if not mainline_messages:
+    if not mainline_links:
         raise RuntimeError("Could not trace chat message history")
 
+    history_start = 0
+    if max_history_tokens is not None:
+        history_tokens = 0
+        history_start = len(mainline_links) - 1
+        while history_start > 0:
+            history_tokens += mainline_links[history_start - 1].token_count
+            if history_tokens > max_history_tokens:
+                break
+            history_start -= 1
+
+    mainline_messages = get_chat_messages_by_ids(
+        chat_message_ids=[link.id for link in mainline_links[history_start:]],
+        db_session=db_session,
+        prefetch_tool_calls=prefetch_tool_calls,
+    )
+
     return mainline_messages[-1], mainline_messages[:-1]
 
 
@@ -747,11 +747,16 @@ def stream_chat_message_objects(
 
         user_message = None
 
+        # history beyond the LLM's input limit is always dropped by the prompt
+        # builder, so it doesn't need to be loaded
+        max_history_tokens = llm.config.max_input_tokens
+
         if new_msg_req.regenerate:
             final_msg, history_msgs = create_chat_chain(
                 stop_at_message_id=parent_id,
                 chat_session_id=chat_session_id,
                 db_session=db_session,
+                max_history_tokens=max_history_tokens,
             )
 
         elif not use_existing_user_message:
@@ -770,7 +775,9 @@ def stream_chat_message_objects(
             )
             # re-create linear history of messages
             final_msg, history_msgs = create_chat_chain(
-                chat_session_id=chat_session_id, db_session=db_session
+                chat_session_id=chat_session_id,
+                db_session=db_session,
+                max_history_tokens=max_history_tokens,
             )
             if final_msg.id != user_message.id:
                 db_session.rollback()
@@ -784,7 +791,9 @@ def stream_chat_message_objects(
         else:
             # re-create linear history of messages
             final_msg, history_msgs = create_chat_chain(
-                chat_session_id=chat_session_id, db_session=db_session
+                chat_session_id=chat_session_id,
+                db_session=db_session,
+                max_history_tokens=max_history_tokens,
             )
             if existing_assistant_message_id is None:
                 if final_msg.message_type != MessageType.USER:
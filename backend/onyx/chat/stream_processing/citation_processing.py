@@ -11,12 +11,50 @@ from onyx.utils.logger import setup_logger
 
 logger = setup_logger()
 
+CITATION_PATTERN = re.compile(r"\[(\d+)\]|\[\[(\d+)\]\]")  # [1], [[1]], etc.
+
 
 def in_code_block(llm_text: str) -> bool:
     count = llm_text.count(TRIPLE_BACKTICK)
     return count % 2 != 0
 
 
+def ends_with_possible_citation(text: str) -> bool:
+    r"""Equivalent to `re.search(r"\[+\d*$", text)` ([1, [, [[, [[2, etc.) but only looks
+    at the end of the text. Like `$`, a single trailing newline is ignored."""
+    end = len(text)
+    if text.endswith("\n"):
+        end -= 1
+    # `\d` matches any unicode decimal digit, same as `str.isdecimal`
+    while end > 0 and text[end - 1].isdecimal():
+        end -= 1
+    return end > 0 and text[end - 1] == "["
+
+
+class CodeFenceTracker:
+    """Incrementally tracks whether streamed text is inside a ``` code block.
+
+    Gives the same answer as calling `in_code_block` on all text seen so far, without
+    rescanning it for every token. Only the last (up to 2) characters that could be the
+    start of a fence split across tokens are carried over."""
+
+    def __init__(self) -> None:
+        self.fence_count = 0
+        self._tail = ""
+
+    def update(self, token: str) -> None:
+        text = self._tail + token
+        scan_from = 0
+        while (idx := text.find(TRIPLE_BACKTICK, scan_from)) != -1:
+            self.fence_count += 1
+            scan_from = idx + len(TRIPLE_BACKTICK)
+        self._tail = text[max(scan_from, len(text) - len(TRIPLE_BACKTICK) + 1) :]
+
+    @property
+    def in_code_block(self) -> bool:
+        return self.fence_count % 2 != 0
+
+
 class CitationProcessor:
     def __init__(
         self,
@@ -31,9 +69,14 @@ class CitationProcessor:
         self.stop_stream = stop_stream
         self.final_order_mapping = final_doc_id_to_rank_map.order_mapping
         self.display_order_mapping = display_doc_id_to_rank_map.order_mapping
-        self.llm_out = ""
+        # only the length and code fence state of the full output are needed, keeping
+        # (and rescanning) the whole output would make streaming quadratic
+        self.llm_out_len = 0
+        self.code_fences = CodeFenceTracker()
         self.max_citation_num = len(context_docs)
         self.citation_order: list[int] = []  # order of citations in the LLM output
+        # final citation num -> 1-based position in citation_order
+        self.citation_order_idx: dict[int, int] = {}
         self.curr_segment = ""
         self.cited_inds: set[int] = set()
         self.hold = ""
@@ -59,7 +102,9 @@ class CitationProcessor:
             self.hold = ""
 
         self.curr_segment += token
-        self.llm_out += token
+        self.llm_out_len += len(token)
+        self.code_fences.update(token)
+        is_in_code_block = self.code_fences.in_code_block
 
         # Handle code blocks without language tags
         if "`" in self.curr_segment:
@@ -67,21 +112,17 @@ class CitationProcessor:
                 pass
             elif "```" in self.curr_segment:
                 piece_that_comes_after = self.curr_segment.split("```")[1][0]
-                if piece_that_comes_after == "\n" and in_code_block(self.llm_out):
+                if piece_that_comes_after == "\n" and is_in_code_block:
                     self.curr_segment = self.curr_segment.replace("```", "```plaintext")
 
-        citation_pattern = r"\[(\d+)\]|\[\[(\d+)\]\]"  # [1], [[1]], etc.
-        citations_found = list(re.finditer(citation_pattern, self.curr_segment))
-        possible_citation_pattern = r"(\[+\d*$)"  # [1, [, [[, [[2, etc.
-        possible_citation_found = re.search(
-            possible_citation_pattern, self.curr_segment
-        )
+        citations_found = list(CITATION_PATTERN.finditer(self.curr_segment))
+        possible_citation_found = ends_with_possible_citation(self.curr_segment)
 
-        if len(citations_found) == 0 and len(self.llm_out) - self.past_cite_count > 5:
+        if len(citations_found) == 0 and self.llm_out_len - self.past_cite_count > 5:
             self.current_citations = []
 
         result = ""
-        if citations_found and not in_code_block(self.llm_out):
+        if citations_found and not is_in_code_block:
             last_citation_end = 0
             length_to_add = 0
             while len(citations_found) > 0:
@@ -98,10 +139,13 @@ class CitationProcessor:
                     context_llm_doc.document_id
                 ]
 
-                if final_citation_num not in self.citation_order:
+                if final_citation_num not in self.citation_order_idx:
                     self.citation_order.append(final_citation_num)
+                    self.citation_order_idx[final_citation_num] = len(
+                        self.citation_order
+                    )
 
-                citation_order_idx = self.citation_order.index(final_citation_num) + 1
+                citation_order_idx = self.citation_order_idx[final_citation_num]
 
                 # get the value that was displayed to user, should always
                 # be in the display_doc_order_dict. But check anyways
@@ -151,7 +195,7 @@ class CitationProcessor:
 
                 link = context_llm_doc.link
 
-                self.past_cite_count = len(self.llm_out)
+                self.past_cite_count = self.llm_out_len
                 self.current_citations.append(final_citation_num)
 
                 if citation_order_idx not in self.cited_inds:
@@ -53,6 +53,17 @@ AGENT_MAX_QUERY_RETRIEVAL_RESULTS = int(
     os.environ.get("AGENT_MAX_QUERY_RETRIEVAL_RESULTS") or AGENT_DEFAULT_RETRIEVAL_HITS
 )  # 15
 
+# Number of retrieved documents verified by a single LLM call, 1 verifies each
+# document with its own call
+AGENT_DEFAULT_DOCUMENT_VERIFICATION_BATCH_SIZE = 10
+AGENT_DOCUMENT_VERIFICATION_BATCH_SIZE = max(
+    1,
+    int(
+        os.environ.get("AGENT_DOCUMENT_VERIFICATION_BATCH_SIZE")
+        or AGENT_DEFAULT_DOCUMENT_VERIFICATION_BATCH_SIZE
+    ),
+)  # 10
+
 # Reranking agent configs
 # Reranking stats - no influence on flow outside of stats collection
 AGENT_RERANKING_STATS = (
@@ -195,6 +206,12 @@ AGENT_TIMEOUT_LLM_DOCUMENT_VERIFICATION = int(
     or AGENT_DEFAULT_TIMEOUT_LLM_DOCUMENT_VERIFICATION
 )
 
+AGENT_DEFAULT_TIMEOUT_LLM_BATCH_DOCUMENT_VERIFICATION = 15  # in seconds
+AGENT_TIMEOUT_LLM_BATCH_DOCUMENT_VERIFICATION = int(
+    os.environ.get("AGENT_TIMEOUT_LLM_BATCH_DOCUMENT_VERIFICATION")
+    or AGENT_DEFAULT_TIMEOUT_LLM_BATCH_DOCUMENT_VERIFICATION
+)
+
 
 AGENT_DEFAULT_TIMEOUT_CONNECT_LLM_GENERAL_GENERATION = 5  # in seconds
 AGENT_TIMEOUT_CONNECT_LLM_GENERAL_GENERATION = int(
@@ -343,6 +360,21 @@ AGENT_MAX_TOKENS_VALIDATION = int(
     os.environ.get("AGENT_MAX_TOKENS_VALIDATION") or AGENT_DEFAULT_MAX_TOKENS_VALIDATION
 )
 
+# per document of a batch verification, the verdicts are returned as JSON. A verdict
+# takes ~15 tokens, ~20 if the JSON is indented
+AGENT_DEFAULT_MAX_TOKENS_BATCH_VALIDATION_PER_DOCUMENT = 24
+AGENT_MAX_TOKENS_BATCH_VALIDATION_PER_DOCUMENT = int(
+    os.environ.get("AGENT_MAX_TOKENS_BATCH_VALIDATION_PER_DOCUMENT")
+    or AGENT_DEFAULT_MAX_TOKENS_BATCH_VALIDATION_PER_DOCUMENT
+)
+
+# once per batch verification, for the JSON object around the verdicts and a code fence
+AGENT_DEFAULT_MAX_TOKENS_BATCH_VALIDATION_OVERHEAD = 32
+AGENT_MAX_TOKENS_BATCH_VALIDATION_OVERHEAD = int(
+    os.environ.get("AGENT_MAX_TOKENS_BATCH_VALIDATION_OVERHEAD")
+    or AGENT_DEFAULT_MAX_TOKENS_BATCH_VALIDATION_OVERHEAD
+)
+
 AGENT_DEFAULT_MAX_TOKENS_SUBANSWER_GENERATION = 256
 AGENT_MAX_TOKENS_SUBANSWER_GENERATION = int(
     os.environ.get("AGENT_MAX_TOKENS_SUBANSWER_GENERATION")
@@ -160,6 +160,13 @@ VESPA_DEPLOYMENT_ZIP = (
 VESPA_CLOUD_CERT_PATH = os.environ.get("VESPA_CLOUD_CERT_PATH")
 VESPA_CLOUD_KEY_PATH = os.environ.get("VESPA_CLOUD_KEY_PATH")
 
+# If set, chunks are streamed to Vespa with a bounded number of in-flight operations
+# over the shared client instead of being sent in fixed size thread pool batches
+VESPA_FEED_STREAMING_ENABLED = (
+    os.environ.get("VESPA_FEED_STREAMING_ENABLED", "").lower() == "true"
+)
+VESPA_FEED_MAX_IN_FLIGHT = int(os.environ.get("VESPA_FEED_MAX_IN_FLIGHT") or 64)
+
 # Number of documents in a batch during indexing (further batching done by chunks before passing to bi-encoder)
 INDEX_BATCH_SIZE = int(os.environ.get("INDEX_BATCH_SIZE") or 16)
 
@@ -262,6 +269,18 @@ REDIS_POOL_MAX_CONNECTIONS = int(os.environ.get("REDIS_POOL_MAX_CONNECTIONS", 12
 REDIS_SSL_CERT_REQS = os.getenv("REDIS_SSL_CERT_REQS", "none")
 REDIS_SSL_CA_CERTS = os.getenv("REDIS_SSL_CA_CERTS", None)
 
+# In-process cache in front of the Redis/Postgres key value store. Writes and deletes
+# are broadcast over Redis pub/sub so every process drops its copy. While a process is
+# not subscribed (e.g. Redis is unreachable) its cache is bypassed.
+KV_STORE_NEAR_CACHE_ENABLED = (
+    os.environ.get("KV_STORE_NEAR_CACHE_ENABLED") or "true"
+).lower() == "true"
+KV_STORE_NEAR_CACHE_SIZE = int(os.environ.get("KV_STORE_NEAR_CACHE_SIZE") or 1024)
+# upper bound on staleness should an invalidation ever get lost
+KV_STORE_NEAR_CACHE_TTL_SECONDS = int(
+    os.environ.get("KV_STORE_NEAR_CACHE_TTL_SECONDS") or 300
+)
+
 CELERY_RESULT_EXPIRES = int(os.environ.get("CELERY_RESULT_EXPIRES", 86400))  # seconds
 
 # https://docs.celeryq.dev/en/stable/userguide/configuration.html#broker-pool-limit
@@ -312,6 +331,9 @@ except ValueError:
 # The maximum number of tasks that can be queued up to sync to Vespa in a single pass
 VESPA_SYNC_MAX_TASKS = 1024
 
+# The number of documents synced to Vespa by a single metadata sync task
+VESPA_SYNC_BATCH_SIZE = int(os.environ.get("VESPA_SYNC_BATCH_SIZE") or 64)
+
 DB_YIELD_PER_DEFAULT = 64
 
 #####
@@ -342,6 +364,21 @@ WEB_CONNECTOR_OAUTH_CLIENT_ID = os.environ.get("WEB_CONNECTOR_OAUTH_CLIENT_ID")
 WEB_CONNECTOR_OAUTH_CLIENT_SECRET = os.environ.get("WEB_CONNECTOR_OAUTH_CLIENT_SECRET")
 WEB_CONNECTOR_OAUTH_TOKEN_URL = os.environ.get("WEB_CONNECTOR_OAUTH_TOKEN_URL")
 WEB_CONNECTOR_VALIDATE_URLS = os.environ.get("WEB_CONNECTOR_VALIDATE_URLS")
+# Only used by web connectors with crawler mode enabled
+WEB_CONNECTOR_MAX_CONCURRENT_FETCHES = int(
+    os.environ.get("WEB_CONNECTOR_MAX_CONCURRENT_FETCHES") or 8
+)
+# Each concurrent browser page is a separate headless browser, these are memory heavy
+WEB_CONNECTOR_MAX_CONCURRENT_BROWSER_PAGES = int(
+    os.environ.get("WEB_CONNECTOR_MAX_CONCURRENT_BROWSER_PAGES") or 2
+)
+# Politeness limits, applied per host
+WEB_CONNECTOR_MAX_CONCURRENT_FETCHES_PER_HOST = int(
+    os.environ.get("WEB_CONNECTOR_MAX_CONCURRENT_FETCHES_PER_HOST") or 4
+)
+WEB_CONNECTOR_MIN_SECONDS_BETWEEN_HOST_REQUESTS = float(
+    os.environ.get("WEB_CONNECTOR_MIN_SECONDS_BETWEEN_HOST_REQUESTS") or 0.1
+)
 
 HTML_BASED_CONNECTOR_TRANSFORM_LINKS_STRATEGY = os.environ.get(
     "HTML_BASED_CONNECTOR_TRANSFORM_LINKS_STRATEGY",
@@ -380,6 +417,14 @@ CONFLUENCE_CONNECTOR_ATTACHMENT_SIZE_THRESHOLD = int(
 CONFLUENCE_CONNECTOR_ATTACHMENT_CHAR_COUNT_THRESHOLD = int(
     os.environ.get("CONFLUENCE_CONNECTOR_ATTACHMENT_CHAR_COUNT_THRESHOLD", 200_000)
 )
+# Shared by all workers using the same Confluence credential, 0 disables the limit
+CONFLUENCE_CONNECTOR_MAX_REQUESTS_PER_MINUTE = int(
+    os.environ.get("CONFLUENCE_CONNECTOR_MAX_REQUESTS_PER_MINUTE") or 0
+)
+# Attachments downloaded and extracted at once, shared by the pages of a batch
+CONFLUENCE_CONNECTOR_MAX_CONCURRENT_ATTACHMENT_FETCHES = int(
+    os.environ.get("CONFLUENCE_CONNECTOR_MAX_CONCURRENT_ATTACHMENT_FETCHES") or 4
+)
 
 # A JSON-formatted array. Each item in the array should have the following structure:
 # {
@@ -494,6 +539,11 @@ MAX_PRUNING_DOCUMENT_RETRIEVAL_PER_MINUTE = int(
 ZENDESK_CONNECTOR_SKIP_ARTICLE_LABELS = os.environ.get(
     "ZENDESK_CONNECTOR_SKIP_ARTICLE_LABELS", ""
 ).split(",")
+# Shared by all workers indexing the same Zendesk account, 0 disables the limit.
+# Zendesk's limits depend on the plan, the lowest one is 200
+ZENDESK_CONNECTOR_MAX_REQUESTS_PER_MINUTE = int(
+    os.environ.get("ZENDESK_CONNECTOR_MAX_REQUESTS_PER_MINUTE") or 0
+)
 
 
 #####
@@ -514,11 +564,59 @@ DISABLE_INDEX_UPDATE_ON_SWAP = (
 ENABLE_MULTIPASS_INDEXING = (
     os.environ.get("ENABLE_MULTIPASS_INDEXING", "").lower() == "true"
 )
+# Reuse embeddings of chunk texts that have already been embedded with the same model
+# settings (e.g. when a connector re-fetches unchanged documents) instead of sending
+# them to the embedding model again. Embeddings are stored in Postgres.
+ENABLE_CHUNK_EMBEDDING_CACHE = (
+    os.environ.get("ENABLE_CHUNK_EMBEDDING_CACHE", "").lower() == "true"
+)
+# Cached embeddings that no re-index has used for this many days are deleted, e.g. the
+# embeddings of a model that was replaced
+CHUNK_EMBEDDING_CACHE_MAX_UNUSED_DAYS = int(
+    os.environ.get("CHUNK_EMBEDDING_CACHE_MAX_UNUSED_DAYS") or 30
+)
+# Overlap fetching from the connector with chunking, embedding and writing to the
+# document index instead of running them one after another for every batch. Each
+# stage has its own workers, stages are connected by bounded queues.
+ENABLE_PIPELINED_INDEXING = (
+    os.environ.get("ENABLE_PIPELINED_INDEXING", "").lower() == "true"
+)
+PIPELINED_INDEXING_CHUNK_WORKERS = int(
+    os.environ.get("PIPELINED_INDEXING_CHUNK_WORKERS") or 1
+)
+PIPELINED_INDEXING_EMBED_WORKERS = int(
+    os.environ.get("PIPELINED_INDEXING_EMBED_WORKERS") or 1
+)
+# Batches are only written in the order they were fetched when the chunk, embed and
+# write stages each have a single worker. More workers are safe w.r.t. Vespa (documents
+# are locked while written), but a document that shows up in two batches of the same
+# run may end up with the older copy.
+PIPELINED_INDEXING_WRITE_WORKERS = int(
+    os.environ.get("PIPELINED_INDEXING_WRITE_WORKERS") or 1
+)
+# Max number of batches waiting in front of each stage
+PIPELINED_INDEXING_MAX_QUEUED_BATCHES = int(
+    os.environ.get("PIPELINED_INDEXING_MAX_QUEUED_BATCHES") or 2
+)
 # Enable contextual retrieval
 ENABLE_CONTEXTUAL_RAG = os.environ.get("ENABLE_CONTEXTUAL_RAG", "").lower() == "true"
 
 DEFAULT_CONTEXTUAL_RAG_LLM_NAME = "gpt-4o-mini"
 DEFAULT_CONTEXTUAL_RAG_LLM_PROVIDER = "DevEnvPresetOpenAI"
+# Max number of contextual RAG LLM calls in flight for an indexing batch, shared by the
+# document summaries and chunk contexts of all documents in the batch
+CONTEXTUAL_RAG_MAX_CONCURRENT_CALLS = int(
+    os.environ.get("CONTEXTUAL_RAG_MAX_CONCURRENT_CALLS") or 16
+)
+# Max number of contextual RAG LLM calls started per minute, 0 means no limit
+CONTEXTUAL_RAG_MAX_CALLS_PER_MINUTE = int(
+    os.environ.get("CONTEXTUAL_RAG_MAX_CALLS_PER_MINUTE") or 0
+)
+# How long the summaries and chunk contexts of a document are kept so that retried or
+# repeated indexing of unchanged documents does not call the LLM again
+CONTEXTUAL_RAG_CACHE_TTL_SECONDS = int(
+    os.environ.get("CONTEXTUAL_RAG_CACHE_TTL_SECONDS") or 60 * 60 * 24 * 7
+)
 # Finer grained chunking for more detail retention
 # Slightly larger since the sentence aware split is a max cutoff so most minichunks will be under MINI_CHUNK_SIZE
 # tokens. But we need it to be at least as big as 1/4th chunk size to avoid having a tiny mini-chunk at the end
@@ -560,6 +658,19 @@ MAX_FILE_SIZE_BYTES = int(
     os.environ.get("MAX_FILE_SIZE_BYTES") or 2 * 1024 * 1024 * 1024
 )  # 2GB in bytes
 
+# Files (e.g. of a zip upload) are parsed in up to this many worker processes when
+# there are enough of them to be worth starting the workers. 1 parses them in the
+# calling process.
+FILE_EXTRACTION_MAX_WORKERS = int(os.environ.get("FILE_EXTRACTION_MAX_WORKERS") or 4)
+# A worker parsing a single file for longer than this is killed, the file is skipped
+FILE_EXTRACTION_TIMEOUT_SECONDS = int(
+    os.environ.get("FILE_EXTRACTION_TIMEOUT_SECONDS") or 300
+)
+# Address space limit of each worker process. 0 disables the limit.
+FILE_EXTRACTION_MEMORY_LIMIT_MB = int(
+    os.environ.get("FILE_EXTRACTION_MEMORY_LIMIT_MB") or 4096
+)
+
 # Use document summary for contextual rag
 USE_DOCUMENT_SUMMARY = os.environ.get("USE_DOCUMENT_SUMMARY", "true").lower() == "true"
 # Use chunk summary for contextual rag
@@ -571,6 +682,30 @@ AVERAGE_SUMMARY_EMBEDDINGS = (
 
 MAX_TOKENS_FOR_FULL_INCLUSION = 4096
 
+#####
+# File Store Configs
+#####
+# Where file contents are kept, file metadata always lives in Postgres.
+# "postgres" stores contents as Postgres large objects, "local" in a directory and "s3"
+# in an S3 compatible object store (AWS, MinIO, R2, ...). Files written before switching
+# away from "postgres" stay readable and are moved over in the background.
+FILE_STORE_BACKEND = (os.environ.get("FILE_STORE_BACKEND") or "postgres").lower()
+FILE_STORE_LOCAL_DIR = os.environ.get("FILE_STORE_LOCAL_DIR") or "/var/lib/onyx/files"
+FILE_STORE_S3_BUCKET = os.environ.get("FILE_STORE_S3_BUCKET") or ""
+# set for S3 compatible stores that are not AWS
+FILE_STORE_S3_ENDPOINT_URL = os.environ.get("FILE_STORE_S3_ENDPOINT_URL") or None
+FILE_STORE_S3_REGION = os.environ.get("FILE_STORE_S3_REGION") or None
+# if not set, the default AWS credential chain is used
+FILE_STORE_S3_ACCESS_KEY_ID = os.environ.get("FILE_STORE_S3_ACCESS_KEY_ID") or None
+FILE_STORE_S3_SECRET_ACCESS_KEY = (
+    os.environ.get("FILE_STORE_S3_SECRET_ACCESS_KEY") or None
+)
+# Number of files moved from Postgres large objects to the object store per batch of
+# the background migration
+FILE_STORE_MIGRATION_BATCH_SIZE = int(
+    os.environ.get("FILE_STORE_MIGRATION_BATCH_SIZE") or 100
+)
+
 #####
 # Miscellaneous
 #####
@@ -743,6 +878,16 @@ IMAGE_ANALYSIS_SYSTEM_PROMPT = os.environ.get(
     DEFAULT_IMAGE_ANALYSIS_SYSTEM_PROMPT,
 )
 
+# Max number of images of an indexing batch that are summarized concurrently
+IMAGE_SUMMARIZATION_MAX_WORKERS = int(
+    os.environ.get("IMAGE_SUMMARIZATION_MAX_WORKERS") or 8
+)
+# Image summaries are cached by image content (and vision model), so images that show
+# up on many pages (logos, icons, shared screenshots) are only summarized once
+IMAGE_SUMMARY_CACHE_TTL_SECONDS = int(
+    os.environ.get("IMAGE_SUMMARY_CACHE_TTL_SECONDS") or 60 * 60 * 24 * 30
+)
+
 DISABLE_AUTO_AUTH_REFRESH = (
     os.environ.get("DISABLE_AUTO_AUTH_REFRESH", "").lower() == "true"
 )
@@ -342,6 +342,9 @@ class OnyxRedisLocks:
     MONITOR_BACKGROUND_PROCESSES_LOCK = "da_lock:monitor_background_processes"
     CHECK_AVAILABLE_TENANTS_LOCK = "da_lock:check_available_tenants"
     CLOUD_PRE_PROVISION_TENANT_LOCK = "da_lock:pre_provision_tenant"
+    MIGRATE_FILE_STORE_LOCK = "da_lock:migrate_file_store"
+    RECONCILE_CC_PAIR_DOCUMENT_COUNTS_LOCK = "da_lock:reconcile_cc_pair_document_counts"
+    PRUNE_CHUNK_EMBEDDING_CACHE_LOCK = "da_lock:prune_chunk_embedding_cache"
 
     CONNECTOR_DOC_PERMISSIONS_SYNC_LOCK_PREFIX = (
         "da_lock:connector_doc_permissions_sync"
@@ -422,6 +425,9 @@ class OnyxCeleryTask:
     CHECK_FOR_EXTERNAL_GROUP_SYNC = "check_for_external_group_sync"
     CHECK_FOR_LLM_MODEL_UPDATE = "check_for_llm_model_update"
     CHECK_FOR_USER_FILE_FOLDER_SYNC = "check_for_user_file_folder_sync"
+    MIGRATE_FILE_STORE_TO_OBJECT_STORAGE = "migrate_file_store_to_object_storage"
+    RECONCILE_CC_PAIR_DOCUMENT_COUNTS = "reconcile_cc_pair_document_counts"
+    PRUNE_CHUNK_EMBEDDING_CACHE = "prune_chunk_embedding_cache"
 
     # Connector checkpoint cleanup
     CHECK_FOR_CHECKPOINT_CLEANUP = "check_for_checkpoint_cleanup"
@@ -446,6 +452,7 @@ class OnyxCeleryTask:
     CONNECTOR_PRUNING_GENERATOR_TASK = "connector_pruning_generator_task"
     DOCUMENT_BY_CC_PAIR_CLEANUP_TASK = "document_by_cc_pair_cleanup_task"
     VESPA_METADATA_SYNC_TASK = "vespa_metadata_sync_task"
+    VESPA_METADATA_SYNC_BATCH_TASK = "vespa_metadata_sync_batch_task"
 
     # chat retention
     CHECK_TTL_MANAGEMENT_TASK = "check_ttl_management_task"
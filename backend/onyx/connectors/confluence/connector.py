@@ -1,4 +1,9 @@
+import contextvars
 import copy
+from collections import deque
+from collections.abc import Iterator
+from concurrent.futures import Future
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from datetime import timedelta
 from datetime import timezone
@@ -9,6 +14,9 @@ from requests.exceptions import HTTPError
 from typing_extensions import override
 
 from onyx.configs.app_configs import CONFLUENCE_CONNECTOR_LABELS_TO_SKIP
+from onyx.configs.app_configs import (
+    CONFLUENCE_CONNECTOR_MAX_CONCURRENT_ATTACHMENT_FETCHES,
+)
 from onyx.configs.app_configs import CONFLUENCE_TIMEZONE_OFFSET
 from onyx.configs.app_configs import CONTINUE_ON_CONNECTOR_FAILURE
 from onyx.configs.app_configs import INDEX_BATCH_SIZE
@@ -16,9 +24,11 @@ from onyx.configs.constants import DocumentSource
 from onyx.connectors.confluence.onyx_confluence import extract_text_from_confluence_html
 from onyx.connectors.confluence.onyx_confluence import OnyxConfluence
 from onyx.connectors.confluence.utils import build_confluence_document_id
+from onyx.connectors.confluence.utils import CachedAttachmentContent
 from onyx.connectors.confluence.utils import convert_attachment_to_content
 from onyx.connectors.confluence.utils import datetime_from_string
-from onyx.connectors.confluence.utils import process_attachment
+from onyx.connectors.confluence.utils import load_cached_attachment_content
+from onyx.connectors.confluence.utils import save_cached_attachment_content
 from onyx.connectors.confluence.utils import update_param_in_path
 from onyx.connectors.confluence.utils import validate_attachment_filetype
 from onyx.connectors.exceptions import ConnectorValidationError
@@ -75,6 +85,11 @@ ONE_DAY = ONE_HOUR * 24
 
 MAX_CACHED_IDS = 100
 
+# an attachment of a page and the future of its converted content
+_AttachmentConversion = tuple[
+    dict[str, Any], Future[tuple[str | None, str | None] | None]
+]
+
 
 def _should_propagate_error(e: Exception) -> bool:
     return "field 'updated' is invalid" in str(e)
@@ -268,7 +283,7 @@ class ConfluenceConnector(
     ) -> Document | ConnectorFailure:
         """
         Converts a Confluence page to a Document object.
-        Includes the page content, comments, and attachments.
+        Includes the page content and comments, attachments are added afterwards.
         """
         page_id = page_url = ""
         try:
@@ -297,41 +312,6 @@ class ConfluenceConnector(
                     TextSection(text=comment_text, link=f"{page_url}#comments")
                 )
 
-            # Process attachments
-            if "children" in page and "attachment" in page["children"]:
-                attachments = self.confluence_client.get_attachments_for_page(
-                    page_id, expand="metadata"
-                )
-
-                for attachment in attachments.get("results", []):
-                    # Process each attachment
-                    result = process_attachment(
-                        self.confluence_client,
-                        attachment,
-                        page_id,
-                        self.allow_images,
-                    )
-
-                    if result and result.text:
-                        # Create a section for the attachment text
-                        attachment_section = TextSection(
-                            text=result.text,
-                            link=f"{page_url}#attachment-{attachment['id']}",
-                        )
-                        sections.append(attachment_section)
-                    elif result and result.file_name:
-                        # Create an ImageSection for image attachments
-                        image_section = ImageSection(
-                            link=f"{page_url}#attachment-{attachment['id']}",
-                            image_file_name=result.file_name,
-                        )
-                        sections.append(image_section)
-                    else:
-                        logger.warning(
-                            f"Error processing attachment '{attachment.get('title')}':",
-                            f"{result.error if result else 'Unknown error'}",
-                        )
-
             # Extract metadata
             metadata = {}
             if "space" in page:
@@ -378,10 +358,10 @@ class ConfluenceConnector(
                 exception=e,
             )
 
-    def _fetch_page_attachments(
-        self, page: dict[str, Any], doc: Document
-    ) -> Document | ConnectorFailure:
+    def _get_page_attachments(self, page: dict[str, Any]) -> list[dict[str, Any]]:
+        """Lists the attachments of the page that should be indexed"""
         attachment_query = self._construct_attachment_query(page["id"])
+        attachments: list[dict[str, Any]] = []
 
         for attachment in self.confluence_client.paginated_cql_retrieval(
             cql=attachment_query,
@@ -407,40 +387,81 @@ class ConfluenceConnector(
                 )
                 continue
 
-            logger.info(
-                f"Processing attachment: {attachment['title']} attached to page {page['title']}"
+            attachments.append(attachment)
+
+        return attachments
+
+    def _convert_attachment(
+        self, attachment: dict[str, Any], page: dict[str, Any]
+    ) -> tuple[str | None, str | None] | None:
+        """
+        Downloads the attachment and extracts its content, runs on the attachment
+        workers. Content extracted from the same version of the attachment by a
+        previous run is reused instead.
+        """
+        version: int | None = attachment.get("version", {}).get("number")
+        if version is not None:
+            cached = load_cached_attachment_content(
+                self.wiki_base, attachment["id"], version
             )
+            if cached:
+                logger.info(
+                    f"Skipping unchanged attachment: "
+                    f"title={attachment['title']} version={version}"
+                )
+                return cached.text, cached.file_name
 
-            # Attempt to get textual content or image summarization:
+        logger.info(
+            f"Processing attachment: {attachment['title']} attached to page {page['title']}"
+        )
+        response = convert_attachment_to_content(
+            confluence_client=self.confluence_client,
+            attachment=attachment,
+            page_id=page["id"],
+            allow_images=self.allow_images,
+        )
+
+        if response is not None and version is not None:
+            content_text, file_storage_name = response
+            save_cached_attachment_content(
+                self.wiki_base,
+                attachment["id"],
+                CachedAttachmentContent(
+                    version=version,
+                    text=content_text,
+                    file_name=file_storage_name,
+                    media_type=attachment.get("metadata", {}).get("mediaType", ""),
+                ),
+            )
+        return response
+
+    def _submit_page_attachments(
+        self, page: dict[str, Any], executor: ThreadPoolExecutor
+    ) -> list[_AttachmentConversion]:
+        return [
+            (
+                attachment,
+                executor.submit(
+                    contextvars.copy_context().run,
+                    self._convert_attachment,
+                    attachment,
+                    page,
+                ),
+            )
+            for attachment in self._get_page_attachments(page)
+        ]
+
+    def _add_page_attachments(
+        self, doc: Document, conversions: list[_AttachmentConversion]
+    ) -> Document | ConnectorFailure:
+        """Waits for the attachments of the page and adds them to its document in the
+        order Confluence returned them"""
+        for attachment, future in conversions:
             object_url = build_confluence_document_id(
                 self.wiki_base, attachment["_links"]["webui"], self.is_cloud
             )
             try:
-                response = convert_attachment_to_content(
-                    confluence_client=self.confluence_client,
-                    attachment=attachment,
-                    page_id=page["id"],
-                    allow_images=self.allow_images,
-                )
-                if response is None:
-                    continue
-
-                content_text, file_storage_name = response
-
-                if content_text:
-                    doc.sections.append(
-                        TextSection(
-                            text=content_text,
-                            link=object_url,
-                        )
-                    )
-                elif file_storage_name:
-                    doc.sections.append(
-                        ImageSection(
-                            link=object_url,
-                            image_file_name=file_storage_name,
-                        )
-                    )
+                response = future.result()
             except Exception as e:
                 logger.error(
                     f"Failed to extract/summarize attachment {attachment['title']}",
@@ -456,6 +477,25 @@ class ConfluenceConnector(
                     failure_message=f"Failed to extract/summarize attachment {attachment['title']} for doc {doc.id}",
                     exception=e,
                 )
+
+            if response is None:
+                continue
+
+            content_text, file_storage_name = response
+            if content_text:
+                doc.sections.append(
+                    TextSection(
+                        text=content_text,
+                        link=object_url,
+                    )
+                )
+            elif file_storage_name:
+                doc.sections.append(
+                    ImageSection(
+                        link=object_url,
+                        image_file_name=file_storage_name,
+                    )
+                )
         return doc
 
     def _fetch_document_batches(
@@ -470,6 +510,10 @@ class ConfluenceConnector(
          - Then fetch attachments. For each attachment:
              - Attempt to convert it with convert_attachment_to_content(...)
              - If successful, create a new Section with the extracted text or summary.
+
+        Attachments are downloaded and converted by a pool of workers shared by the
+        pages of the batch while the following pages are retrieved. Documents are
+        still yielded in page order, and all of them before the checkpoint moves on.
         """
         checkpoint = copy.deepcopy(checkpoint)
 
@@ -484,26 +528,60 @@ class ConfluenceConnector(
         def store_next_page_url(next_page_url: str) -> None:
             checkpoint.next_page_url = next_page_url
 
-        for page in self.confluence_client.paginated_page_retrieval(
-            cql_url=page_query_url,
-            limit=self.batch_size,
-            next_page_callback=store_next_page_url,
-        ):
-            # Build doc from page
-            doc_or_failure = self._convert_page_to_document(page)
-
-            if isinstance(doc_or_failure, ConnectorFailure):
+        # documents of the batch that haven't been yielded yet, in page order
+        pending_docs: deque[
+            tuple[Document | ConnectorFailure, list[_AttachmentConversion]]
+        ] = deque()
+
+        def finished_docs(wait: bool) -> Iterator[Document | ConnectorFailure]:
+            while pending_docs:
+                doc_or_failure, conversions = pending_docs[0]
+                if not wait and not all(future.done() for _, future in conversions):
+                    return
+
+                pending_docs.popleft()
+                if isinstance(doc_or_failure, Document):
+                    doc_or_failure = self._add_page_attachments(
+                        doc_or_failure, conversions
+                    )
                 yield doc_or_failure
-                continue
-            # Now get attachments for that page:
-            doc_or_failure = self._fetch_page_attachments(page, doc_or_failure)
 
-            # yield completed document (or failure)
-            yield doc_or_failure
+        executor = ThreadPoolExecutor(
+            max_workers=CONFLUENCE_CONNECTOR_MAX_CONCURRENT_ATTACHMENT_FETCHES
+        )
+        try:
+            for page in self.confluence_client.paginated_page_retrieval(
+                cql_url=page_query_url,
+                limit=self.batch_size,
+                next_page_callback=store_next_page_url,
+            ):
+                # Build doc from page
+                doc_or_failure = self._convert_page_to_document(page)
+
+                if isinstance(doc_or_failure, ConnectorFailure):
+                    pending_docs.append((doc_or_failure, []))
+                    yield from finished_docs(wait=False)
+                    continue
+
+                # Now start getting attachments for that page
+                pending_docs.append(
+                    (doc_or_failure, self._submit_page_attachments(page, executor))
+                )
+
+                # yield completed documents (or failures)
+                yield from finished_docs(wait=False)
+
+                # Create checkpoint once a full page of results is returned
+                if (
+                    checkpoint.next_page_url
+                    and checkpoint.next_page_url != page_query_url
+                ):
+                    yield from finished_docs(wait=True)
+                    return checkpoint
 
-            # Create checkpoint once a full page of results is returned
-            if checkpoint.next_page_url and checkpoint.next_page_url != page_query_url:
-                return checkpoint
+            yield from finished_docs(wait=True)
+        finally:
+            executor.shutdown(wait=True, cancel_futures=True)
 
         checkpoint.has_more = False
         return checkpoint
@@ -16,6 +16,7 @@ from atlassian import Confluence  # type:ignore
 from redis import Redis
 from requests import HTTPError
 
+from onyx.configs.app_configs import CONFLUENCE_CONNECTOR_MAX_REQUESTS_PER_MINUTE
 from onyx.configs.app_configs import CONFLUENCE_CONNECTOR_USER_PROFILES_OVERRIDE
 from onyx.configs.app_configs import OAUTH_CONFLUENCE_CLOUD_CLIENT_ID
 from onyx.configs.app_configs import OAUTH_CONFLUENCE_CLOUD_CLIENT_SECRET
@@ -27,6 +28,13 @@ from onyx.connectors.confluence.utils import _handle_http_error
 from onyx.connectors.confluence.utils import confluence_refresh_tokens
 from onyx.connectors.confluence.utils import get_start_param_from_url
 from onyx.connectors.confluence.utils import update_param_in_path
+from onyx.connectors.cross_connector_utils.rate_limit_wrapper import (
+    DistributedRateLimiter,
+)
+from onyx.connectors.cross_connector_utils.rate_limit_wrapper import (
+    mount_rate_limiter,
+)
+from onyx.connectors.cross_connector_utils.rate_limit_wrapper import RequestBudget
 from onyx.connectors.interfaces import CredentialsProviderInterface
 from onyx.file_processing.html_utils import format_document_soup
 from onyx.redis.redis_pool import get_redis_client
@@ -52,6 +60,14 @@ class ConfluenceRateLimitError(Exception):
     pass
 
 
+CONFLUENCE_REQUEST_BUDGET = (
+    RequestBudget(
+        max_requests=CONFLUENCE_CONNECTOR_MAX_REQUESTS_PER_MINUTE, period_seconds=60
+    )
+    if CONFLUENCE_CONNECTOR_MAX_REQUESTS_PER_MINUTE > 0
+    else None
+)
+
 _DEFAULT_PAGINATION_LIMIT = 1000
 _MINIMUM_PAGINATION_LIMIT = 50
 
@@ -103,6 +119,17 @@ class OnyxConfluence:
 
         self._kwargs: Any = None
 
+        # shared by all workers using the credential, including permission syncing
+        self._rate_limiter = (
+            DistributedRateLimiter(
+                key=f"confluence:credential_{self._credentials_provider.get_provider_key()}",
+                budget=CONFLUENCE_REQUEST_BUDGET,
+                tenant_id=self._credentials_provider.get_tenant_id(),
+            )
+            if CONFLUENCE_REQUEST_BUDGET
+            else None
+        )
+
         self.shared_base_kwargs: dict[str, str | int | bool] = {
             "api_version": "cloud" if is_cloud else "latest",
             "backoff_and_retry": True,
@@ -308,6 +335,8 @@ class OnyxConfluence:
                     **kwargs,
                 )
 
+        if self._rate_limiter:
+            mount_rate_limiter(confluence.session, self._rate_limiter)
         return confluence
 
     # https://developer.atlassian.com/cloud/confluence/rate-limiting/
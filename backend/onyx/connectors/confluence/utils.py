@@ -29,11 +29,13 @@ from onyx.configs.constants import FileOrigin
 if TYPE_CHECKING:
     from onyx.connectors.confluence.onyx_confluence import OnyxConfluence
 
+from onyx.connectors.cross_connector_utils.connector_state import (
+    build_connector_state_file_name,
+)
+from onyx.connectors.cross_connector_utils.connector_state import load_connector_state
+from onyx.connectors.cross_connector_utils.connector_state import save_connector_state
 from onyx.db.engine import get_session_with_current_tenant
 from onyx.db.models import PGFileStore
-from onyx.db.pg_file_store import create_populate_lobj
-from onyx.db.pg_file_store import save_bytes_to_pgfilestore
-from onyx.db.pg_file_store import upsert_pgfilestore
 from onyx.file_processing.extract_file_text import (
     OnyxExtensionType,
     extract_file_text,
@@ -41,6 +43,7 @@ from onyx.file_processing.extract_file_text import (
 )
 from onyx.file_processing.file_validation import is_valid_image_type
 from onyx.file_processing.image_utils import store_image_and_create_section
+from onyx.file_store.file_store import get_default_file_store
 from onyx.utils.logger import setup_logger
 
 logger = setup_logger()
@@ -285,13 +288,16 @@ def _process_text_attachment(
     # Save the attachment
     try:
         with get_session_with_current_tenant() as db_session:
-            saved_record = save_bytes_to_pgfilestore(
-                db_session=db_session,
-                raw_bytes=raw_bytes,
-                media_type=media_type,
-                identifier=attachment["id"],
+            file_store = get_default_file_store(db_session)
+            file_name = f"{FileOrigin.OTHER.name.lower()}_{attachment['id']}"
+            file_store.save_file(
+                file_name=file_name,
+                content=BytesIO(raw_bytes),
                 display_name=attachment["title"],
+                file_origin=FileOrigin.OTHER,
+                file_type=media_type,
             )
+            saved_record = file_store.read_file_record(file_name)
     except Exception as e:
         msg = f"Failed to save attachment '{attachment['title']}' to PG: {e}"
         logger.error(msg, exc_info=e)
@@ -335,6 +341,51 @@ def convert_attachment_to_content(
     return result.text, result.file_name
 
 
+class CachedAttachmentContent(BaseModel):
+    """The content extracted from a version of an attachment, kept between runs so
+    that unchanged attachments don't have to be downloaded again"""
+
+    version: int
+    text: str | None
+    file_name: str | None
+    media_type: str
+
+
+def _attachment_cache_file_name(wiki_base: str, attachment_id: str) -> str:
+    return build_connector_state_file_name(
+        "confluence_attachment_content", wiki_base, attachment_id
+    )
+
+
+def load_cached_attachment_content(
+    wiki_base: str, attachment_id: str, version: int
+) -> CachedAttachmentContent | None:
+    """Returns the cached content of the attachment if it was extracted from this
+    version and any stored image is still in the file store"""
+    cached = load_connector_state(
+        _attachment_cache_file_name(wiki_base, attachment_id), CachedAttachmentContent
+    )
+    if cached is None or cached.version != version:
+        return None
+
+    if cached.file_name:
+        with get_session_with_current_tenant() as db_session:
+            if not get_default_file_store(db_session).has_file(
+                file_name=cached.file_name,
+                file_origin=FileOrigin.CONNECTOR,
+                file_type=cached.media_type,
+            ):
+                return None
+
+    return cached
+
+
+def save_cached_attachment_content(
+    wiki_base: str, attachment_id: str, content: CachedAttachmentContent
+) -> None:
+    save_connector_state(_attachment_cache_file_name(wiki_base, attachment_id), content)
+
+
 def build_confluence_document_id(
     base_url: str, content_url: str, is_cloud: bool
 ) -> str:
@@ -559,16 +610,15 @@ def attachment_to_file_record(
 
     # Save image to file store
     file_name = f"confluence_attachment_{attachment['id']}"
-    lobj_oid = create_populate_lobj(BytesIO(image_data), db_session)
-    pgfilestore = upsert_pgfilestore(
+    file_store = get_default_file_store(db_session)
+    file_store.save_file(
         file_name=file_name,
+        content=BytesIO(image_data),
         display_name=attachment["title"],
         file_origin=FileOrigin.OTHER,
         file_type=file_type,
-        lobj_oid=lobj_oid,
-        db_session=db_session,
-        commit=True,
     )
+    pgfilestore = file_store.read_file_record(file_name)
 
     return pgfilestore, image_data
 
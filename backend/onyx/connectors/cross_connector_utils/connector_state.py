@@ -0,0 +1,65 @@
+"""State that connectors keep between indexing runs (e.g. change feed positions or
+crawl results), stored as JSON in the file store"""
+
+import hashlib
+from io import BytesIO
+from typing import TypeVar
+
+from pydantic import BaseModel
+
+from onyx.configs.app_configs import POLL_CONNECTOR_OFFSET
+from onyx.configs.constants import FileOrigin
+from onyx.db.engine import get_session_with_current_tenant
+from onyx.file_store.file_store import get_default_file_store
+from onyx.utils.logger import setup_logger
+
+logger = setup_logger()
+
+StateT = TypeVar("StateT", bound=BaseModel)
+
+_CONNECTOR_STATE_FILE_TYPE = "application/json"
+
+
+def build_connector_state_file_name(prefix: str, *parts: str) -> str:
+    """The parts identify what the state belongs to (e.g. the connector's settings)"""
+    key = hashlib.sha256("\n".join(parts).encode("utf-8")).hexdigest()
+    return f"{prefix}__{key}"
+
+
+def load_connector_state(file_name: str, state_type: type[StateT]) -> StateT | None:
+    with get_session_with_current_tenant() as db_session:
+        file_store = get_default_file_store(db_session)
+        if not file_store.has_file(
+            file_name=file_name,
+            file_origin=FileOrigin.CONNECTOR,
+            file_type=_CONNECTOR_STATE_FILE_TYPE,
+        ):
+            return None
+
+        content = file_store.read_file(file_name, mode="b").read()
+
+    try:
+        return state_type.model_validate_json(content)
+    except ValueError:
+        logger.exception(f"Ignoring unreadable connector state: file={file_name}")
+        return None
+
+
+def save_connector_state(file_name: str, state: BaseModel) -> None:
+    with get_session_with_current_tenant() as db_session:
+        get_default_file_store(db_session).save_file(
+            file_name=file_name,
+            content=BytesIO(state.model_dump_json().encode("utf-8")),
+            display_name=None,
+            file_origin=FileOrigin.CONNECTOR,
+            file_type=_CONNECTOR_STATE_FILE_TYPE,
+        )
+
+
+def is_window_indexed(window_end: float, start: float) -> bool:
+    """Whether everything seen by a run over a window ending at `window_end` was
+    indexed, given the `start` of the current run. State that lets a connector skip
+    unchanged content is only safe to use then: the run that stored it must not
+    have ended after the last successful one, whose end `start` is (minus the poll
+    overlap, plus rounding)."""
+    return window_end <= start + POLL_CONNECTOR_OFFSET * 60 + 1
@@ -1,13 +1,23 @@
+import random
 import time
 from collections.abc import Callable
+from datetime import datetime
+from datetime import timezone
+from email.utils import parsedate_to_datetime
 from functools import wraps
 from typing import Any
 from typing import cast
 from typing import TypeVar
 
 import requests
+from pydantic import BaseModel
+from redis import Redis
+from redis.exceptions import RedisError
+from requests.adapters import HTTPAdapter
 
+from onyx.redis.redis_pool import get_raw_redis_client
 from onyx.utils.logger import setup_logger
+from shared_configs.contextvars import get_current_tenant_id
 
 logger = setup_logger()
 
@@ -88,6 +98,242 @@ class _RateLimitDecorator:
 rate_limit_builder = _RateLimitDecorator
 
 
+class RequestBudget(BaseModel):
+    """The requests a connector may make per credential/source, shared by every worker
+    using it. Bursts of up to `max_requests` are allowed after idle periods."""
+
+    max_requests: int
+    period_seconds: float
+
+
+_DISTRIBUTED_RATE_LIMIT_PREFIX = "ratelimit"
+
+# Token bucket kept in a hash, refilled based on the Redis server clock so all workers
+# agree on time. Returns 0 if the tokens were taken, otherwise the milliseconds to wait.
+# KEYS: bucket, blocked until. ARGV: capacity, tokens per ms, cost, ttl in ms
+_TAKE_TOKENS_SCRIPT = """
+local now_parts = redis.call('TIME')
+local now = tonumber(now_parts[1]) * 1000 + math.floor(tonumber(now_parts[2]) / 1000)
+
+local blocked_until = tonumber(redis.call('GET', KEYS[2]) or '0')
+if blocked_until > now then
+    return blocked_until - now
+end
+
+local capacity = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local cost = tonumber(ARGV[3])
+
+local bucket = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(bucket[1])
+local ts = tonumber(bucket[2])
+if tokens == nil or ts == nil then
+    tokens = capacity
+    ts = now
+end
+tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate)
+
+local wait = 0
+if tokens >= cost then
+    tokens = tokens - cost
+else
+    wait = math.ceil((cost - tokens) / rate)
+end
+
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', tostring(now))
+redis.call('PEXPIRE', KEYS[1], ARGV[4])
+return wait
+"""
+
+# KEYS: blocked until. ARGV: milliseconds to block for
+_BLOCK_SCRIPT = """
+local now_parts = redis.call('TIME')
+local now = tonumber(now_parts[1]) * 1000 + math.floor(tonumber(now_parts[2]) / 1000)
+local block_ms = tonumber(ARGV[1])
+
+local blocked_until = tonumber(redis.call('GET', KEYS[1]) or '0')
+if now + block_ms > blocked_until then
+    redis.call('SET', KEYS[1], tostring(now + block_ms), 'PX', block_ms)
+end
+return 0
+"""
+
+
+class DistributedRateLimiter:
+    """Token bucket rate limiter kept in Redis, so that every worker calling an external
+    API with the same credential draws from the same budget. Once the API reports a
+    rate limit (e.g. a 429 with Retry-After), `block_for` stops all workers until it
+    passes, rather than each of them running into the limit on its own.
+
+    If Redis is unavailable requests are let through, the external API's own rate
+    limiting still applies.
+
+    Thread safe."""
+
+    _REDIS_ERROR_BACKOFF_SECONDS = 60
+
+    def __init__(
+        self,
+        key: str,
+        budget: RequestBudget,
+        tenant_id: str | None = None,
+        max_wait_seconds: float = 600,
+        redis_client: Redis | None = None,
+    ) -> None:
+        if budget.max_requests < 1 or budget.period_seconds <= 0:
+            raise ValueError(f"Invalid request budget: {budget}")
+
+        self.budget = budget
+        self.max_wait_seconds = max_wait_seconds
+
+        # the raw client is used since scripts are not tenant prefixed
+        prefix = (
+            f"{tenant_id or get_current_tenant_id()}:{_DISTRIBUTED_RATE_LIMIT_PREFIX}"
+        )
+        self._bucket_key = f"{prefix}:{key}:bucket"
+        self._blocked_key = f"{prefix}:{key}:blocked_until"
+
+        self._redis_client = redis_client or get_raw_redis_client()
+        self._take_tokens_script = self._redis_client.register_script(
+            _TAKE_TOKENS_SCRIPT
+        )
+        self._block_script = self._redis_client.register_script(_BLOCK_SCRIPT)
+        self._redis_unavailable_until = 0.0
+
+    def acquire(self, cost: int = 1) -> None:
+        """Blocks until `cost` requests may be made"""
+        if cost > self.budget.max_requests:
+            raise ValueError(
+                f"Cost {cost} exceeds the budget of {self.budget.max_requests} requests"
+            )
+
+        deadline = time.monotonic() + self.max_wait_seconds
+        tokens_per_ms = self.budget.max_requests / (self.budget.period_seconds * 1000)
+        # idle buckets expire once they would be full again
+        ttl_ms = max(int(self.budget.period_seconds * 1000), 1000)
+
+        while True:
+            if time.monotonic() < self._redis_unavailable_until:
+                return
+
+            try:
+                wait_ms = int(
+                    cast(
+                        int,
+                        self._take_tokens_script(
+                            keys=[self._bucket_key, self._blocked_key],
+                            args=[
+                                self.budget.max_requests,
+                                tokens_per_ms,
+                                cost,
+                                ttl_ms,
+                            ],
+                        ),
+                    )
+                )
+            except RedisError as e:
+                self._on_redis_error(e)
+                return
+
+            if wait_ms <= 0:
+                return
+
+            wait = wait_ms / 1000
+            if time.monotonic() + wait > deadline:
+                raise RateLimitTriedTooManyTimesError(
+                    f"Waited more than {self.max_wait_seconds} seconds for the rate "
+                    f"limit of {self._bucket_key}"
+                )
+
+            # jitter so that waiting workers don't all retry at the same moment
+            time.sleep(wait + random.uniform(0, min(wait, 1) / 10))
+
+    def block_for(self, seconds: float) -> None:
+        """Makes every user of this limiter wait for `seconds` before the next request"""
+        block_ms = int(seconds * 1000)
+        if block_ms <= 0:
+            return
+
+        logger.notice(f"Rate limited, blocking {self._blocked_key} for {seconds}s")
+        try:
+            self._block_script(keys=[self._blocked_key], args=[block_ms])
+        except RedisError as e:
+            self._on_redis_error(e)
+            # still honor it in this process
+            time.sleep(seconds)
+
+    def _on_redis_error(self, e: RedisError) -> None:
+        logger.warning(
+            f"Redis unavailable for rate limiting, not limiting for "
+            f"{self._REDIS_ERROR_BACKOFF_SECONDS}s: key={self._bucket_key} error={e}"
+        )
+        self._redis_unavailable_until = (
+            time.monotonic() + self._REDIS_ERROR_BACKOFF_SECONDS
+        )
+
+
+def get_retry_after_seconds(
+    response: requests.Response, default_wait_time_sec: float
+) -> float:
+    """Reads the Retry-After header, which is either a number of seconds or an HTTP
+    date"""
+    retry_after = response.headers.get("Retry-After")
+    if retry_after is None:
+        return default_wait_time_sec
+
+    try:
+        return max(float(retry_after), 0)
+    except ValueError:
+        pass
+
+    try:
+        retry_at = parsedate_to_datetime(retry_after)
+    except (TypeError, ValueError):
+        return default_wait_time_sec
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max((retry_at - datetime.now(timezone.utc)).total_seconds(), 0)
+
+
+class RateLimitedHTTPAdapter(HTTPAdapter):
+    """Makes every request of a requests session draw from a DistributedRateLimiter and
+    reports rate limit responses to it. The responses are still returned to the caller,
+    so existing retry handling keeps working (and then waits on the shared limiter)."""
+
+    RATE_LIMITED_STATUS_CODES = (429,)
+
+    def __init__(
+        self,
+        rate_limiter: DistributedRateLimiter,
+        default_wait_time_sec: float = 30,
+        **kwargs: Any,
+    ) -> None:
+        super().__init__(**kwargs)
+        self.rate_limiter = rate_limiter
+        self.default_wait_time_sec = default_wait_time_sec
+
+    def send(  # type: ignore[override]
+        self, request: requests.PreparedRequest, *args: Any, **kwargs: Any
+    ) -> requests.Response:
+        self.rate_limiter.acquire()
+        response = super().send(request, *args, **kwargs)
+        if response.status_code in self.RATE_LIMITED_STATUS_CODES or (
+            response.status_code == 503 and "Retry-After" in response.headers
+        ):
+            self.rate_limiter.block_for(
+                get_retry_after_seconds(response, self.default_wait_time_sec)
+            )
+        return response
+
+
+def mount_rate_limiter(
+    session: requests.Session, rate_limiter: DistributedRateLimiter
+) -> None:
+    adapter = RateLimitedHTTPAdapter(rate_limiter)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+
+
 """If you want to allow the external service to tell you when you've hit the rate limit,
 use the following instead"""
 
@@ -95,20 +341,27 @@ R = TypeVar("R", bound=Callable[..., requests.Response])
 
 
 def wrap_request_to_handle_ratelimiting(
-    request_fn: R, default_wait_time_sec: int = 30, max_waits: int = 30
+    request_fn: R,
+    default_wait_time_sec: int = 30,
+    max_waits: int = 30,
+    rate_limiter: DistributedRateLimiter | None = None,
 ) -> R:
+    """If a rate_limiter is given, requests draw from it and a rate limit response
+    makes every worker sharing it wait, not just this one."""
+
     def wrapped_request(*args: list, **kwargs: dict[str, Any]) -> requests.Response:
         for _ in range(max_waits):
+            if rate_limiter:
+                rate_limiter.acquire()
+
             response = request_fn(*args, **kwargs)
             if response.status_code == 429:
-                try:
-                    wait_time = int(
-                        response.headers.get("Retry-After", default_wait_time_sec)
-                    )
-                except ValueError:
-                    wait_time = default_wait_time_sec
-
-                time.sleep(wait_time)
+                wait_time = get_retry_after_seconds(response, default_wait_time_sec)
+                if rate_limiter:
+                    # the next acquire waits for it
+                    rate_limiter.block_for(wait_time)
+                else:
+                    time.sleep(wait_time)
                 continue
 
             return response
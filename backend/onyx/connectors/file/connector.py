@@ -1,6 +1,8 @@
 import os
+from collections.abc import Iterator
 from datetime import datetime
 from datetime import timezone
+from io import BytesIO
 from pathlib import Path
 from typing import Any
 from typing import IO
@@ -20,9 +22,12 @@ from onyx.connectors.models import TextSection
 from onyx.db.engine import get_session_with_current_tenant
 from onyx.db.pg_file_store import get_pgfilestore_by_file_name
 from onyx.file_processing.extract_file_text import extract_text_and_images
+from onyx.file_processing.extract_file_text import ExtractionResult
 from onyx.file_processing.extract_file_text import get_file_ext
 from onyx.file_processing.extract_file_text import is_accepted_file_ext
 from onyx.file_processing.extract_file_text import OnyxExtensionType
+from onyx.file_processing.extraction_pool import FileExtractionPool
+from onyx.file_processing.extraction_pool import FileExtractionTask
 from onyx.file_processing.image_utils import store_image_and_create_section
 from onyx.file_store.file_store import get_default_file_store
 from onyx.utils.logger import setup_logger
@@ -95,11 +100,13 @@ def _process_file(
     metadata: dict[str, Any] | None,
     pdf_pass: str | None,
     db_session: Session,
+    extraction_result: ExtractionResult | None = None,
 ) -> list[Document]:
     """
     Process a file and return a list of Documents.
     For images, creates ImageSection objects without summarization.
     For documents with embedded images, extracts and stores the images.
+    The text and images are extracted here unless extraction_result is given.
     """
     if metadata is None:
         metadata = {}
@@ -212,11 +219,12 @@ def _process_file(
     file.seek(0)
 
     # Extract text and images from the file
-    extraction_result = extract_text_and_images(
-        file=file,
-        file_name=file_name,
-        pdf_pass=pdf_pass,
-    )
+    if extraction_result is None:
+        extraction_result = extract_text_and_images(
+            file=file,
+            file_name=file_name,
+            pdf_pass=pdf_pass,
+        )
 
     # Merge file-specific metadata (from file content) with provided metadata
     if extraction_result.metadata:
@@ -296,35 +304,50 @@ class LocalFileConnector(LoadConnector):
             os.path.basename(file_name), {}
         )
 
+    def _read_files(self, db_session: Session) -> Iterator[FileExtractionTask]:
+        for file_path in self.file_locations:
+            file_io = _read_file_from_filestore(
+                file_name=file_path,
+                db_session=db_session,
+            )
+            if not file_io:
+                # typically an unsupported extension
+                continue
+
+            yield FileExtractionTask(
+                file_name=file_path, content=file_io.read(), pdf_pass=self.pdf_pass
+            )
+
     def load_from_state(self) -> GenerateDocumentsOutput:
         """
         Iterates over each file path, fetches from Postgres, tries to parse text
-        or images, and yields Document batches.
+        or images, and yields Document batches. Files are parsed in parallel by
+        a FileExtractionPool, the rest of the processing happens here in order.
         """
         documents: list[Document] = []
 
-        with get_session_with_current_tenant() as db_session:
-            for file_path in self.file_locations:
+        with (
+            get_session_with_current_tenant() as db_session,
+            FileExtractionPool(
+                expected_file_count=len(self.file_locations)
+            ) as extraction_pool,
+        ):
+            for task, extraction_result in extraction_pool.extract_text_and_images(
+                self._read_files(db_session)
+            ):
                 current_datetime = datetime.now(timezone.utc)
 
-                file_io = _read_file_from_filestore(
-                    file_name=file_path,
-                    db_session=db_session,
-                )
-                if not file_io:
-                    # typically an unsupported extension
-                    continue
-
-                metadata = self._get_file_metadata(file_path)
+                metadata = self._get_file_metadata(task.file_name)
                 metadata["time_updated"] = metadata.get(
                     "time_updated", current_datetime
                 )
                 new_docs = _process_file(
-                    file_name=file_path,
-                    file=file_io,
+                    file_name=task.file_name,
+                    file=BytesIO(task.content),
                     metadata=metadata,
                     pdf_pass=self.pdf_pass,
                     db_session=db_session,
+                    extraction_result=extraction_result,
                 )
                 documents.extend(new_docs)
 
@@ -1,6 +1,7 @@
 import copy
 import threading
 from collections.abc import Callable
+from collections.abc import Generator
 from collections.abc import Iterator
 from datetime import datetime
 from enum import Enum
@@ -20,6 +21,12 @@ from onyx.configs.app_configs import GOOGLE_DRIVE_CONNECTOR_SIZE_THRESHOLD
 from onyx.configs.app_configs import INDEX_BATCH_SIZE
 from onyx.configs.app_configs import MAX_DRIVE_WORKERS
 from onyx.configs.constants import DocumentSource
+from onyx.connectors.cross_connector_utils.connector_state import (
+    build_connector_state_file_name,
+)
+from onyx.connectors.cross_connector_utils.connector_state import is_window_indexed
+from onyx.connectors.cross_connector_utils.connector_state import load_connector_state
+from onyx.connectors.cross_connector_utils.connector_state import save_connector_state
 from onyx.connectors.exceptions import ConnectorValidationError
 from onyx.connectors.exceptions import CredentialExpiredError
 from onyx.connectors.exceptions import InsufficientPermissionsError
@@ -32,8 +39,14 @@ from onyx.connectors.google_drive.file_retrieval import get_all_files_for_oauth
 from onyx.connectors.google_drive.file_retrieval import (
     get_all_files_in_my_drive_and_shared,
 )
+from onyx.connectors.google_drive.file_retrieval import get_changed_files
 from onyx.connectors.google_drive.file_retrieval import get_files_in_shared_drive
 from onyx.connectors.google_drive.file_retrieval import get_root_folder_id
+from onyx.connectors.google_drive.file_retrieval import get_start_page_token
+from onyx.connectors.google_drive.file_retrieval import (
+    get_start_page_tokens_for_drives,
+)
+from onyx.connectors.google_drive.models import DriveChangesState
 from onyx.connectors.google_drive.models import DriveRetrievalStage
 from onyx.connectors.google_drive.models import GoogleDriveCheckpoint
 from onyx.connectors.google_drive.models import GoogleDriveFileType
@@ -80,6 +93,9 @@ DRIVE_BATCH_SIZE = 80
 SHARED_DRIVES_PER_CHECKPOINT = 1
 FOLDERS_PER_CHECKPOINT = 1
 
+# statuses changes.list answers with when a page token is no longer valid
+_EXPIRED_PAGE_TOKEN_STATUSES = {400, 404, 410}
+
 
 def _extract_str_list_from_comma_str(string: str | None) -> list[str]:
     if not string:
@@ -151,6 +167,9 @@ class GoogleDriveConnector(SlimConnector, CheckpointedConnector[GoogleDriveCheck
         shared_folder_urls: str | None = None,
         specific_user_emails: str | None = None,
         batch_size: int = INDEX_BATCH_SIZE,
+        # read the change feeds of My Drives and shared drives rather than crawling
+        # them on each poll, see _get_changed_or_crawled_files
+        incremental_sync: bool = False,
         # OLD PARAMETERS
         folder_paths: list[str] | None = None,
         include_shared: bool | None = None,
@@ -225,6 +244,8 @@ class GoogleDriveConnector(SlimConnector, CheckpointedConnector[GoogleDriveCheck
         # ids of folders and shared drives that have been traversed
         self._retrieved_folder_and_drive_ids: set[str] = set()
 
+        self.incremental_sync = incremental_sync
+
         self.allow_images = False
 
         self.size_threshold = GOOGLE_DRIVE_CONNECTOR_SIZE_THRESHOLD
@@ -281,6 +302,177 @@ class GoogleDriveConnector(SlimConnector, CheckpointedConnector[GoogleDriveCheck
     def _update_traversed_parent_ids(self, folder_id: str) -> None:
         self._retrieved_folder_and_drive_ids.add(folder_id)
 
+    def _use_changes(self, is_slim: bool) -> bool:
+        # slim retrievals (pruning, permission syncing) need every file, not changes
+        return self.incremental_sync and not is_slim
+
+    @property
+    def _changes_state_file_name(self) -> str:
+        return build_connector_state_file_name(
+            "google_drive_changes_state",
+            self.primary_admin_email,
+            str(self.include_shared_drives),
+            str(self.include_my_drives),
+            str(self.include_files_shared_with_me),
+            ",".join(sorted(self._requested_shared_drive_ids)),
+            ",".join(sorted(self._requested_my_drive_emails)),
+            ",".join(sorted(self._specific_user_emails)),
+        )
+
+    def _load_previous_page_tokens(
+        self, start: SecondsSinceUnixEpoch, checkpoint: GoogleDriveCheckpoint
+    ) -> None:
+        state = load_connector_state(self._changes_state_file_name, DriveChangesState)
+        # changes before the stored positions are never read again
+        if state is None or not is_window_indexed(state.window_end, start):
+            logger.info("No usable Drive change feed positions, crawling all drives")
+            return
+
+        checkpoint.previous_user_page_tokens = state.user_page_tokens
+        checkpoint.previous_drive_page_tokens = state.drive_page_tokens
+        logger.info(
+            f"Reading Drive change feeds: "
+            f"users={len(state.user_page_tokens)} "
+            f"drives={len(state.drive_page_tokens)}"
+        )
+
+    def _get_changed_or_crawled_files(
+        self,
+        feed_id: str,
+        previous_page_token: str | None,
+        page_tokens: dict[str, str],
+        read_changes: Callable[[str], Generator[GoogleDriveFileType, None, str]],
+        get_new_page_token: Callable[[], str],
+        crawl: Callable[[], Iterator[GoogleDriveFileType]],
+    ) -> Iterator[GoogleDriveFileType]:
+        """
+        Incremental sync of a user's My Drive or of a shared drive. If the last
+        completed run left a position in its change feed, only the files changed since
+        then are read from the feed. Otherwise, or if the position expired, the current
+        position is taken and the files are crawled as usual. Either way, the position
+        to continue from on the next run is recorded in page_tokens.
+        """
+        if previous_page_token is not None:
+            try:
+                page_tokens[feed_id] = yield from read_changes(previous_page_token)
+                return
+            except HttpError as e:
+                if e.resp.status == 403:
+                    # as when crawling, another user may have access
+                    logger.debug(f"No access to change feed: feed={feed_id} error={e}")
+                    return
+                if e.resp.status not in _EXPIRED_PAGE_TOKEN_STATUSES:
+                    raise
+                logger.warning(
+                    f"Change feed position expired, crawling instead: "
+                    f"feed={feed_id} error={e}"
+                )
+
+        if feed_id not in page_tokens:
+            try:
+                page_tokens[feed_id] = get_new_page_token()
+            except HttpError as e:
+                logger.debug(
+                    f"Failed to get change feed position: feed={feed_id} error={e}"
+                )
+
+        yield from crawl()
+
+    def _get_changed_drive_files(
+        self, drive_service: GoogleDriveService, drive_id: str, page_token: str
+    ) -> Generator[GoogleDriveFileType, None, str]:
+        new_page_token = yield from get_changed_files(
+            drive_service, page_token, drive_id=drive_id
+        )
+        # all changes to the drive were read, it doesn't need to be crawled
+        self._update_traversed_parent_ids(drive_id)
+        return new_page_token
+
+    def _capture_drive_page_tokens(
+        self,
+        drive_service: GoogleDriveService,
+        drive_ids: list[str],
+        checkpoint: GoogleDriveCheckpoint,
+    ) -> None:
+        """Takes the change feed positions of the shared drives that are going to be
+        crawled in batched calls, rather than one call before each drive's crawl"""
+        drive_ids_to_crawl = [
+            drive_id
+            for drive_id in drive_ids
+            if drive_id not in checkpoint.previous_drive_page_tokens
+            and drive_id not in checkpoint.drive_page_tokens
+        ]
+        if drive_ids_to_crawl:
+            checkpoint.drive_page_tokens.update(
+                get_start_page_tokens_for_drives(drive_service, drive_ids_to_crawl)
+            )
+
+    def _get_my_drive_files(
+        self,
+        drive_service: GoogleDriveService,
+        user_email: str,
+        is_slim: bool,
+        checkpoint: GoogleDriveCheckpoint,
+        start: SecondsSinceUnixEpoch | None = None,
+        end: SecondsSinceUnixEpoch | None = None,
+    ) -> Iterator[GoogleDriveFileType]:
+        crawl = partial(
+            get_all_files_in_my_drive_and_shared,
+            service=drive_service,
+            update_traversed_ids_func=self._update_traversed_parent_ids,
+            is_slim=is_slim,
+            include_shared_with_me=self.include_files_shared_with_me,
+            start=start,
+            end=end,
+        )
+        if not self._use_changes(is_slim):
+            return crawl()
+
+        return self._get_changed_or_crawled_files(
+            feed_id=user_email,
+            previous_page_token=checkpoint.previous_user_page_tokens.get(user_email),
+            page_tokens=checkpoint.user_page_tokens,
+            read_changes=partial(
+                get_changed_files,
+                drive_service,
+                include_shared_with_me=self.include_files_shared_with_me,
+            ),
+            get_new_page_token=partial(get_start_page_token, drive_service),
+            crawl=crawl,
+        )
+
+    def _get_drive_files(
+        self,
+        drive_service: GoogleDriveService,
+        drive_id: str,
+        is_slim: bool,
+        checkpoint: GoogleDriveCheckpoint,
+        start: SecondsSinceUnixEpoch | None = None,
+        end: SecondsSinceUnixEpoch | None = None,
+    ) -> Iterator[GoogleDriveFileType]:
+        crawl = partial(
+            get_files_in_shared_drive,
+            service=drive_service,
+            drive_id=drive_id,
+            is_slim=is_slim,
+            update_traversed_ids_func=self._update_traversed_parent_ids,
+            start=start,
+            end=end,
+        )
+        if not self._use_changes(is_slim):
+            return crawl()
+
+        return self._get_changed_or_crawled_files(
+            feed_id=drive_id,
+            previous_page_token=checkpoint.previous_drive_page_tokens.get(drive_id),
+            page_tokens=checkpoint.drive_page_tokens,
+            read_changes=partial(
+                self._get_changed_drive_files, drive_service, drive_id
+            ),
+            get_new_page_token=partial(get_start_page_token, drive_service, drive_id),
+            crawl=crawl,
+        )
+
     def _get_all_user_emails(self) -> list[str]:
         if self._specific_user_emails:
             return self._specific_user_emails
@@ -474,13 +666,17 @@ class GoogleDriveConnector(SlimConnector, CheckpointedConnector[GoogleDriveCheck
                     f"Getting all files in my drive as '{user_email}. Resuming: {resuming}"
                 )
 
+                my_drive_start = curr_stage.completed_until if resuming else start
+                if user_email in checkpoint.previous_user_page_tokens:
+                    # completed_until doesn't apply to files from the change feed
+                    my_drive_start = start
                 yield from add_retrieval_info(
-                    get_all_files_in_my_drive_and_shared(
-                        service=drive_service,
-                        update_traversed_ids_func=self._update_traversed_parent_ids,
+                    self._get_my_drive_files(
+                        drive_service=drive_service,
+                        user_email=user_email,
                         is_slim=is_slim,
-                        include_shared_with_me=self.include_files_shared_with_me,
-                        start=curr_stage.completed_until if resuming else start,
+                        checkpoint=checkpoint,
+                        start=my_drive_start,
                         end=end,
                     ),
                     user_email,
@@ -496,11 +692,11 @@ class GoogleDriveConnector(SlimConnector, CheckpointedConnector[GoogleDriveCheck
                 drive_id: str, drive_start: SecondsSinceUnixEpoch | None
             ) -> Iterator[RetrievedDriveFile]:
                 yield from add_retrieval_info(
-                    get_files_in_shared_drive(
-                        service=drive_service,
+                    self._get_drive_files(
+                        drive_service=drive_service,
                         drive_id=drive_id,
                         is_slim=is_slim,
-                        update_traversed_ids_func=self._update_traversed_parent_ids,
+                        checkpoint=checkpoint,
                         start=drive_start,
                         end=end,
                     ),
@@ -519,7 +715,12 @@ class GoogleDriveConnector(SlimConnector, CheckpointedConnector[GoogleDriveCheck
                         "and resumed."
                     )
                 else:
-                    resume_start = curr_stage.completed_until
+                    resume_start: SecondsSinceUnixEpoch | None = (
+                        curr_stage.completed_until
+                    )
+                    if drive_id in checkpoint.previous_drive_page_tokens:
+                        # completed_until doesn't apply to files from the change feed
+                        resume_start = start
                     yield from _yield_from_drive(drive_id, resume_start)
                 # Don't enter resuming case for folder retrieval
                 resuming = False
@@ -632,6 +833,12 @@ class GoogleDriveConnector(SlimConnector, CheckpointedConnector[GoogleDriveCheck
         sorted_drive_ids, sorted_folder_ids = self._determine_retrieval_ids(
             checkpoint, is_slim, DriveRetrievalStage.MY_DRIVE_FILES
         )
+        if self._use_changes(is_slim):
+            self._capture_drive_page_tokens(
+                get_drive_service(self.creds, self.primary_admin_email),
+                sorted_drive_ids,
+                checkpoint,
+            )
 
         # Setup initial completion map on first connector run
         for email in all_org_emails:
@@ -750,6 +957,7 @@ class GoogleDriveConnector(SlimConnector, CheckpointedConnector[GoogleDriveCheck
         self,
         is_slim: bool,
         drive_service: GoogleDriveService,
+        checkpoint: GoogleDriveCheckpoint,
         start: SecondsSinceUnixEpoch | None = None,
         end: SecondsSinceUnixEpoch | None = None,
     ) -> Iterator[RetrievedDriveFile]:
@@ -763,16 +971,44 @@ class GoogleDriveConnector(SlimConnector, CheckpointedConnector[GoogleDriveCheck
             f"include_shared_drives={self.include_shared_drives}."
             f"Using '{self.primary_admin_email}' as the account."
         )
+        crawl = partial(
+            get_all_files_for_oauth,
+            service=drive_service,
+            include_files_shared_with_me=self.include_files_shared_with_me,
+            include_my_drives=self.include_my_drives,
+            include_shared_drives=self.include_shared_drives,
+            is_slim=is_slim,
+            start=start,
+            end=end,
+        )
+        files: Iterator[GoogleDriveFileType]
+        if not self._use_changes(is_slim):
+            files = crawl()
+        else:
+            files = self._get_changed_or_crawled_files(
+                feed_id=self.primary_admin_email,
+                previous_page_token=checkpoint.previous_user_page_tokens.get(
+                    self.primary_admin_email
+                ),
+                page_tokens=checkpoint.user_page_tokens,
+                read_changes=partial(
+                    get_changed_files,
+                    drive_service,
+                    # as in get_all_files_for_oauth
+                    include_items_from_all_drives=(
+                        self.include_shared_drives
+                        and self.include_my_drives
+                        and self.include_files_shared_with_me
+                    ),
+                    include_my_drive_files=self.include_my_drives,
+                    include_shared_with_me=self.include_files_shared_with_me,
+                ),
+                get_new_page_token=partial(get_start_page_token, drive_service),
+                crawl=crawl,
+            )
+
         yield from add_retrieval_info(
-            get_all_files_for_oauth(
-                service=drive_service,
-                include_files_shared_with_me=self.include_files_shared_with_me,
-                include_my_drives=self.include_my_drives,
-                include_shared_drives=self.include_shared_drives,
-                is_slim=is_slim,
-                start=start,
-                end=end,
-            ),
+            files,
             self.primary_admin_email,
             DriveRetrievalStage.OAUTH_FILES,
         )
@@ -790,11 +1026,11 @@ class GoogleDriveConnector(SlimConnector, CheckpointedConnector[GoogleDriveCheck
             drive_id: str, drive_start: SecondsSinceUnixEpoch | None
         ) -> Iterator[RetrievedDriveFile]:
             yield from add_retrieval_info(
-                get_files_in_shared_drive(
-                    service=drive_service,
+                self._get_drive_files(
+                    drive_service=drive_service,
                     drive_id=drive_id,
                     is_slim=is_slim,
-                    update_traversed_ids_func=self._update_traversed_parent_ids,
+                    checkpoint=checkpoint,
                     start=drive_start,
                     end=end,
                 ),
@@ -803,6 +1039,11 @@ class GoogleDriveConnector(SlimConnector, CheckpointedConnector[GoogleDriveCheck
                 parent_id=drive_id,
             )
 
+        if self._use_changes(is_slim):
+            self._capture_drive_page_tokens(
+                drive_service, drive_ids_to_retrieve, checkpoint
+            )
+
         # If we are resuming from a checkpoint, we need to finish retrieving the files from the last drive we retrieved
         if (
             checkpoint.completion_map[self.primary_admin_email].stage
@@ -813,9 +1054,12 @@ class GoogleDriveConnector(SlimConnector, CheckpointedConnector[GoogleDriveCheck
             ].current_folder_or_drive_id
             if drive_id is None:
                 raise ValueError("drive id not set in checkpoint")
-            resume_start = checkpoint.completion_map[
+            resume_start: SecondsSinceUnixEpoch | None = checkpoint.completion_map[
                 self.primary_admin_email
             ].completed_until
+            if drive_id in checkpoint.previous_drive_page_tokens:
+                # completed_until doesn't apply to files from the change feed
+                resume_start = start
             yield from _yield_from_drive(drive_id, resume_start)
 
         for drive_id in drive_ids_to_retrieve:
@@ -946,13 +1190,18 @@ class GoogleDriveConnector(SlimConnector, CheckpointedConnector[GoogleDriveCheck
         if checkpoint.completion_stage == DriveRetrievalStage.OAUTH_FILES:
             completion = checkpoint.completion_map[self.primary_admin_email]
             all_files_start = start
-            # if resuming from a checkpoint
-            if completion.stage == DriveRetrievalStage.OAUTH_FILES:
+            # if resuming from a checkpoint (completed_until doesn't apply to files
+            # from the change feed)
+            if (
+                completion.stage == DriveRetrievalStage.OAUTH_FILES
+                and self.primary_admin_email not in checkpoint.previous_user_page_tokens
+            ):
                 all_files_start = completion.completed_until
 
             yield from self._oauth_retrieval_all_files(
                 drive_service=drive_service,
                 is_slim=is_slim,
+                checkpoint=checkpoint,
                 start=all_files_start,
                 end=end,
             )
@@ -1131,6 +1380,12 @@ class GoogleDriveConnector(SlimConnector, CheckpointedConnector[GoogleDriveCheck
         )
         checkpoint = copy.deepcopy(checkpoint)
         self._retrieved_folder_and_drive_ids = checkpoint.retrieved_folder_and_drive_ids
+        if (
+            self.incremental_sync
+            and checkpoint.completion_stage == DriveRetrievalStage.START
+        ):
+            self._load_previous_page_tokens(start, checkpoint)
+
         try:
             yield from self._extract_docs_from_google_drive(checkpoint, start, end)
         except Exception as e:
@@ -1140,6 +1395,15 @@ class GoogleDriveConnector(SlimConnector, CheckpointedConnector[GoogleDriveCheck
         checkpoint.retrieved_folder_and_drive_ids = self._retrieved_folder_and_drive_ids
         if checkpoint.completion_stage == DriveRetrievalStage.DONE:
             checkpoint.has_more = False
+            if self.incremental_sync:
+                save_connector_state(
+                    self._changes_state_file_name,
+                    DriveChangesState(
+                        window_end=end,
+                        user_page_tokens=checkpoint.user_page_tokens,
+                        drive_page_tokens=checkpoint.drive_page_tokens,
+                    ),
+                )
         return checkpoint
 
     def _extract_slim_docs_from_google_drive(
@@ -1,7 +1,9 @@
 from collections.abc import Callable
+from collections.abc import Generator
 from collections.abc import Iterator
 from datetime import datetime
 from datetime import timezone
+from typing import Any
 
 from googleapiclient.discovery import Resource  # type: ignore
 from googleapiclient.errors import HttpError  # type: ignore
@@ -11,6 +13,7 @@ from onyx.connectors.google_drive.constants import DRIVE_SHORTCUT_TYPE
 from onyx.connectors.google_drive.models import DriveRetrievalStage
 from onyx.connectors.google_drive.models import GoogleDriveFileType
 from onyx.connectors.google_drive.models import RetrievedDriveFile
+from onyx.connectors.google_utils.google_utils import execute_batched_requests
 from onyx.connectors.google_utils.google_utils import execute_paginated_retrieval
 from onyx.connectors.google_utils.google_utils import GoogleFields
 from onyx.connectors.google_utils.google_utils import ORDER_BY_KEY
@@ -33,6 +36,11 @@ SLIM_FILE_FIELDS = (
     "permissionIds, webViewLink, owners(emailAddress), modifiedTime)"
 )
 FOLDER_FIELDS = "nextPageToken, files(id, name, permissions, modifiedTime, webViewLink, shortcutDetails)"
+CHANGE_FIELDS = (
+    "nextPageToken, newStartPageToken, changes(removed, file(mimeType, id, name, "
+    "permissions, modifiedTime, webViewLink, shortcutDetails, owners(emailAddress), "
+    "size, ownedByMe, trashed, driveId))"
+)
 
 
 def generate_time_range_filter(
@@ -321,6 +329,103 @@ def get_all_files_for_oauth(
     )
 
 
+def get_start_page_token(
+    service: GoogleDriveService, drive_id: str | None = None
+) -> str:
+    """The position of the latest change in the user's or shared drive's change feed"""
+    kwargs = {"driveId": drive_id} if drive_id else {}
+    return (
+        service.changes()
+        .getStartPageToken(supportsAllDrives=True, **kwargs)
+        .execute()["startPageToken"]
+    )
+
+
+def get_start_page_tokens_for_drives(
+    service: GoogleDriveService, drive_ids: list[str]
+) -> dict[str, str]:
+    """Batched get_start_page_token for shared drives. Drives whose token couldn't be
+    retrieved, e.g. because the user isn't a member, are left out."""
+    responses = execute_batched_requests(
+        service,
+        {
+            drive_id: service.changes().getStartPageToken(
+                driveId=drive_id, supportsAllDrives=True
+            )
+            for drive_id in drive_ids
+        },
+    )
+
+    page_tokens: dict[str, str] = {}
+    for drive_id, response in responses.items():
+        if isinstance(response, Exception):
+            logger.debug(
+                f"Failed to get start page token for drive {drive_id}: {response}"
+            )
+            continue
+        page_tokens[drive_id] = response["startPageToken"]
+    return page_tokens
+
+
+def get_changed_files(
+    service: GoogleDriveService,
+    page_token: str,
+    drive_id: str | None = None,
+    include_items_from_all_drives: bool = False,
+    include_my_drive_files: bool = True,
+    include_shared_with_me: bool = True,
+) -> Generator[GoogleDriveFileType, None, str]:
+    """
+    Yields the files of the user's (or shared drive's) change feed that changed since
+    the page token was issued, then returns the page token to continue from next time.
+    For a user's feed, files owned by the user are considered to be in their My Drive,
+    as in get_all_files_in_my_drive_and_shared.
+
+    Folders and removed or trashed files are skipped, deleted documents are cleaned up
+    by pruning. Raises an HttpError if the page token is no longer valid.
+    """
+    new_page_token = page_token
+    kwargs: dict[str, Any] = {
+        # required to read a shared drive's feed
+        "includeItemsFromAllDrives": include_items_from_all_drives
+        or drive_id is not None,
+    }
+    if drive_id:
+        kwargs["driveId"] = drive_id
+    for results in execute_paginated_retrieval(
+        retrieval_function=service.changes().list,
+        pageToken=page_token,
+        spaces="drive",
+        supportsAllDrives=True,
+        includeRemoved=False,
+        pageSize=1000,
+        fields=CHANGE_FIELDS,
+        **kwargs,
+    ):
+        for change in results.get("changes", []):
+            file = change.get("file")
+            if (
+                change.get("removed")
+                or not file
+                or file.get("trashed")
+                or file.get("mimeType") == DRIVE_FOLDER_TYPE
+            ):
+                continue
+
+            if not drive_id and not file.get("driveId"):
+                owned_by_me = file.get("ownedByMe", False)
+                if owned_by_me and not include_my_drive_files:
+                    continue
+                if not owned_by_me and not include_shared_with_me:
+                    continue
+
+            yield file
+
+        new_page_token = results.get("newStartPageToken", new_page_token)
+
+    return new_page_token
+
+
 # Just in case we need to get the root folder id
 def get_root_folder_id(service: Resource) -> str:
     # we dont paginate here because there is only one root folder per user
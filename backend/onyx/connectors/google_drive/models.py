@@ -145,6 +145,16 @@ class GoogleDriveCheckpoint(ConnectorCheckpoint):
     # cached user emails
     user_emails: list[str] | None = None
 
+    # Incremental sync only. Change feed positions of the users' My Drives (by email)
+    # and of the shared drives (by id) after the last completed run. Feeds with a
+    # position are read instead of being crawled.
+    previous_user_page_tokens: dict[str, str] = {}
+    previous_drive_page_tokens: dict[str, str] = {}
+
+    # Incremental sync only. The positions to continue from after this run
+    user_page_tokens: dict[str, str] = {}
+    drive_page_tokens: dict[str, str] = {}
+
     @field_serializer("completion_map")
     def serialize_completion_map(
         self, completion_map: ThreadSafeDict[str, StageCompletion], _info: Any
@@ -157,3 +167,13 @@ class GoogleDriveCheckpoint(ConnectorCheckpoint):
         return ThreadSafeDict(
             {k: StageCompletion.model_validate(val) for k, val in v.items()}
         )
+
+
+class DriveChangesState(BaseModel):
+    """The change feed positions reached by the last completed incremental sync run,
+    kept between indexing runs"""
+
+    # end of the indexing window the run ran for
+    window_end: SecondsSinceUnixEpoch
+    user_page_tokens: dict[str, str]
+    drive_page_tokens: dict[str, str]
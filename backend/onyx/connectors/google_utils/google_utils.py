@@ -10,6 +10,7 @@ from typing import Any
 from googleapiclient.errors import HttpError  # type: ignore
 
 from onyx.connectors.google_drive.models import GoogleDriveFileType
+from onyx.utils.batching import batch_generator
 from onyx.utils.logger import setup_logger
 from onyx.utils.retry_wrapper import retry_builder
 
@@ -24,6 +25,10 @@ logger = setup_logger()
 # This is no longer necessary due to checkpointing.
 add_retries = retry_builder(tries=5, max_delay=10)
 
+# Google accepts at most 100 calls in a single batch request
+MAX_BATCH_REQUEST_SIZE = 100
+_MAX_BATCH_ATTEMPTS = 5
+
 NEXT_PAGE_TOKEN_KEY = "nextPageToken"
 PAGE_TOKEN_KEY = "pageToken"
 ORDER_BY_KEY = "orderBy"
@@ -188,3 +193,51 @@ def execute_paginated_retrieval(
                 yield item
         else:
             yield results
+
+
+def execute_batched_requests(
+    service: Any,
+    requests: dict[str, Any],
+) -> dict[str, GoogleDriveFileType | Exception]:
+    """Executes the requests (e.g. service.files().get(...), without calling execute)
+    with as few HTTP calls as possible, using batch requests.
+
+    Calls that are rate limited or hit a server error are retried in a later batch.
+    The result of every other failed call is its exception.
+    """
+    results: dict[str, GoogleDriveFileType | Exception] = {}
+    pending = dict(requests)
+
+    for attempt in range(1, _MAX_BATCH_ATTEMPTS + 1):
+        retryable: dict[str, Any] = {}
+
+        def _callback(
+            request_id: str,
+            response: GoogleDriveFileType,
+            exception: Exception | None,
+        ) -> None:
+            if exception is None:
+                results[request_id] = response
+            elif (
+                isinstance(exception, HttpError)
+                and (exception.resp.status == 429 or exception.resp.status >= 500)
+                and attempt < _MAX_BATCH_ATTEMPTS
+            ):
+                retryable[request_id] = pending[request_id]
+            else:
+                results[request_id] = exception
+
+        for batch in batch_generator(pending.items(), MAX_BATCH_REQUEST_SIZE):
+            batch_request = service.new_batch_http_request(callback=_callback)
+            for request_id, request in batch:
+                batch_request.add(request, request_id=request_id)
+            batch_request.execute()
+
+        if not retryable:
+            break
+
+        logger.info(f"Retrying batched calls: attempt={attempt} calls={len(retryable)}")
+        time.sleep(2**attempt)
+        pending = retryable
+
+    return results
@@ -1,8 +1,16 @@
+import copy
+import hashlib
 import io
 import ipaddress
 import random
 import socket
+import threading
 import time
+from collections.abc import Iterator
+from concurrent.futures import FIRST_COMPLETED
+from concurrent.futures import Future
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import wait
 from datetime import datetime
 from datetime import timezone
 from enum import Enum
@@ -16,25 +24,51 @@ import requests
 from bs4 import BeautifulSoup
 from oauthlib.oauth2 import BackendApplicationClient
 from playwright.sync_api import BrowserContext
+from playwright.sync_api import Page
 from playwright.sync_api import Playwright
 from playwright.sync_api import sync_playwright
+from pydantic import BaseModel
 from requests_oauthlib import OAuth2Session  # type:ignore
 from urllib3.exceptions import MaxRetryError
 
 from onyx.configs.app_configs import INDEX_BATCH_SIZE
+from onyx.configs.app_configs import WEB_CONNECTOR_MAX_CONCURRENT_BROWSER_PAGES
+from onyx.configs.app_configs import WEB_CONNECTOR_MAX_CONCURRENT_FETCHES
+from onyx.configs.app_configs import (
+    WEB_CONNECTOR_MAX_CONCURRENT_FETCHES_PER_HOST,
+)
+from onyx.configs.app_configs import (
+    WEB_CONNECTOR_MIN_SECONDS_BETWEEN_HOST_REQUESTS,
+)
 from onyx.configs.app_configs import WEB_CONNECTOR_OAUTH_CLIENT_ID
 from onyx.configs.app_configs import WEB_CONNECTOR_OAUTH_CLIENT_SECRET
 from onyx.configs.app_configs import WEB_CONNECTOR_OAUTH_TOKEN_URL
 from onyx.configs.app_configs import WEB_CONNECTOR_VALIDATE_URLS
 from onyx.configs.constants import DocumentSource
+from onyx.connectors.cross_connector_utils.connector_state import (
+    build_connector_state_file_name,
+)
+from onyx.connectors.cross_connector_utils.connector_state import is_window_indexed
+from onyx.connectors.cross_connector_utils.connector_state import load_connector_state
+from onyx.connectors.cross_connector_utils.connector_state import save_connector_state
 from onyx.connectors.exceptions import ConnectorValidationError
 from onyx.connectors.exceptions import CredentialExpiredError
 from onyx.connectors.exceptions import InsufficientPermissionsError
 from onyx.connectors.exceptions import UnexpectedValidationError
+from onyx.connectors.interfaces import CheckpointedConnector
+from onyx.connectors.interfaces import CheckpointOutput
 from onyx.connectors.interfaces import GenerateDocumentsOutput
 from onyx.connectors.interfaces import LoadConnector
+from onyx.connectors.interfaces import SecondsSinceUnixEpoch
+from onyx.connectors.models import ConnectorCheckpoint
+from onyx.connectors.models import ConnectorFailure
 from onyx.connectors.models import Document
+from onyx.connectors.models import DocumentFailure
 from onyx.connectors.models import TextSection
+from onyx.connectors.web.crawler import BrowserPool
+from onyx.connectors.web.crawler import HostPolitenessLimiter
+from onyx.connectors.web.crawler import WebCrawlState
+from onyx.connectors.web.crawler import WebPageRecord
 from onyx.file_processing.extract_file_text import read_pdf_file
 from onyx.file_processing.html_utils import web_html_cleanup
 from onyx.utils.logger import setup_logger
@@ -81,11 +115,47 @@ class ScrapeResult:
     retry: bool = False
 
 
+class CrawledPage(BaseModel):
+    """A page fetched in crawler mode"""
+
+    # the URL after following redirects
+    url: str
+    record: WebPageRecord
+    not_modified: bool = False
+    # set if the page was fetched but can't be indexed
+    skip_reason: str | None = None
+
+    title: str | None = None
+    text: str = ""
+    metadata: dict[str, Any] = {}
+    links: set[str] = set()
+    last_modified: str | None = None
+
+
+class WebConnectorCheckpoint(ConnectorCheckpoint):
+    """Only used in crawler mode"""
+
+    crawl_started: bool = False
+    to_visit: list[str] = []
+    # every URL that was queued in this crawl, each is only fetched once
+    queued: set[str] = set()
+    # the pages fetched in this crawl, or found to be unchanged
+    pages: dict[str, WebPageRecord] = {}
+    # validators for conditional requests, from the last completed crawl
+    previous_pages: dict[str, WebPageRecord] = {}
+    content_hashes: set[str] = set()
+    last_error: str | None = None
+
+
 WEB_CONNECTOR_MAX_SCROLL_ATTEMPTS = 20
 # Threshold for determining when to replace vs append iframe content
 IFRAME_TEXT_LENGTH_THRESHOLD = 700
 # Message indicating JavaScript is disabled, which often appears when scraping fails
 JAVASCRIPT_DISABLED_MESSAGE = "You have JavaScript disabled in your browser"
+# In crawler mode, pages fetched over plain HTTP that have less text than this and
+# mention JavaScript are rendered in a browser instead
+MIN_TEXT_LENGTH_WITHOUT_JAVASCRIPT = 300
+WEB_CONNECTOR_HTTP_TIMEOUT_SECONDS = 30
 
 # Define common headers that mimic a real browser
 DEFAULT_USER_AGENT = (
@@ -428,8 +498,47 @@ def _handle_cookies(context: BrowserContext, url: str) -> None:
         )
 
 
-class WebConnector(LoadConnector):
+def _merge_iframe_texts(cleaned_text: str, iframe_texts: list[str]) -> str:
+    document_text = "\n".join(iframe_texts)
+    """ 700 is the threshold value for the length of the text extracted
+    from the iframe based on the issue faced """
+    if len(cleaned_text) < IFRAME_TEXT_LENGTH_THRESHOLD:
+        return document_text
+    return cleaned_text + "\n" + document_text
+
+
+def _needs_javascript(cleaned_text: str) -> bool:
+    """Guesses if a page fetched without a browser only shows its content with
+    JavaScript enabled"""
+    if JAVASCRIPT_DISABLED_MESSAGE in cleaned_text:
+        return True
+
+    text = cleaned_text.strip()
+    return not text or (
+        len(text) < MIN_TEXT_LENGTH_WITHOUT_JAVASCRIPT and "javascript" in text.lower()
+    )
+
+
+def _scroll_to_bottom(page: Page) -> None:
+    scroll_attempts = 0
+    previous_height = page.evaluate("document.body.scrollHeight")
+    while scroll_attempts < WEB_CONNECTOR_MAX_SCROLL_ATTEMPTS:
+        page.evaluate("window.scrollTo(0, document.body.scrollHeight)")
+        # wait for the content to load if we scrolled
+        page.wait_for_load_state("networkidle", timeout=30000)
+        time.sleep(0.5)  # let javascript run
+
+        new_height = page.evaluate("document.body.scrollHeight")
+        if new_height == previous_height:
+            break  # Stop scrolling when no more content is loaded
+        previous_height = new_height
+        scroll_attempts += 1
+
+
+class WebConnector(LoadConnector, CheckpointedConnector[WebConnectorCheckpoint]):
     MAX_RETRIES = 3
+    # crawler mode returns a checkpoint after at most this many pages
+    PAGES_PER_CHECKPOINT = 200
 
     def __init__(
         self,
@@ -438,6 +547,9 @@ class WebConnector(LoadConnector):
         mintlify_cleanup: bool = True,  # Mostly ok to apply to other websites as well
         batch_size: int = INDEX_BATCH_SIZE,
         scroll_before_scraping: bool = False,
+        # Fetches pages concurrently, over plain HTTP unless they need JavaScript, and
+        # skips pages that are unchanged since the last successful run
+        crawler_mode: bool = False,
         **kwargs: Any,
     ) -> None:
         self.mintlify_cleanup = mintlify_cleanup
@@ -445,6 +557,17 @@ class WebConnector(LoadConnector):
         self.recursive = False
         self.scroll_before_scraping = scroll_before_scraping
         self.web_connector_type = web_connector_type
+        self.crawler_mode = crawler_mode
+
+        self._crawl_state_file_name = build_connector_state_file_name(
+            "web_connector_crawl_state", web_connector_type, base_url
+        )
+        self._host_limiter = HostPolitenessLimiter(
+            max_concurrent=WEB_CONNECTOR_MAX_CONCURRENT_FETCHES_PER_HOST,
+            min_interval=WEB_CONNECTOR_MIN_SECONDS_BETWEEN_HOST_REQUESTS,
+        )
+        self._thread_local = threading.local()
+
         if web_connector_type == WEB_CONNECTOR_VALID_SETTINGS.RECURSIVE.value:
             self.recursive = True
             self.to_visit_list = [_ensure_valid_url(base_url)]
@@ -555,19 +678,7 @@ class WebConnector(LoadConnector):
 
             # If we got here, the request was successful
             if self.scroll_before_scraping:
-                scroll_attempts = 0
-                previous_height = page.evaluate("document.body.scrollHeight")
-                while scroll_attempts < WEB_CONNECTOR_MAX_SCROLL_ATTEMPTS:
-                    page.evaluate("window.scrollTo(0, document.body.scrollHeight)")
-                    # wait for the content to load if we scrolled
-                    page.wait_for_load_state("networkidle", timeout=30000)
-                    time.sleep(0.5)  # let javascript run
-
-                    new_height = page.evaluate("document.body.scrollHeight")
-                    if new_height == previous_height:
-                        break  # Stop scrolling when no more content is loaded
-                    previous_height = new_height
-                    scroll_attempts += 1
+                _scroll_to_bottom(page)
 
             content = page.content()
             soup = BeautifulSoup(content, "html.parser")
@@ -601,13 +712,9 @@ class WebConnector(LoadConnector):
                     iframe_texts = (
                         page.frame_locator("iframe").locator("html").all_inner_texts()
                     )
-                    document_text = "\n".join(iframe_texts)
-                    """ 700 is the threshold value for the length of the text extracted
-                    from the iframe based on the issue faced """
-                    if len(parsed_html.cleaned_text) < IFRAME_TEXT_LENGTH_THRESHOLD:
-                        parsed_html.cleaned_text = document_text
-                    else:
-                        parsed_html.cleaned_text += "\n" + document_text
+                    parsed_html.cleaned_text = _merge_iframe_texts(
+                        parsed_html.cleaned_text, iframe_texts
+                    )
 
             # Sometimes pages with #! will serve duplicate content
             # There are also just other ways this can happen
@@ -713,6 +820,353 @@ class WebConnector(LoadConnector):
 
         session_ctx.stop()
 
+    def build_dummy_checkpoint(self) -> WebConnectorCheckpoint:
+        return WebConnectorCheckpoint(has_more=True)
+
+    def validate_checkpoint_json(self, checkpoint_json: str) -> WebConnectorCheckpoint:
+        return WebConnectorCheckpoint.model_validate_json(checkpoint_json)
+
+    def load_from_checkpoint(
+        self,
+        start: SecondsSinceUnixEpoch,
+        end: SecondsSinceUnixEpoch,
+        checkpoint: WebConnectorCheckpoint,
+    ) -> CheckpointOutput[WebConnectorCheckpoint]:
+        checkpoint = copy.deepcopy(checkpoint)
+
+        if not self.crawler_mode:
+            for doc_batch in self.load_from_state():
+                yield from doc_batch
+            checkpoint.has_more = False
+            return checkpoint
+
+        if not checkpoint.crawl_started:
+            self._start_crawl(start, checkpoint)
+
+        yield from self._crawl(checkpoint)
+
+        if not checkpoint.to_visit:
+            if not checkpoint.pages:
+                raise RuntimeError(checkpoint.last_error or "No valid pages found.")
+
+            save_connector_state(
+                self._crawl_state_file_name,
+                WebCrawlState(window_end=end, pages=checkpoint.pages),
+            )
+            checkpoint.has_more = False
+
+        return checkpoint
+
+    def _start_crawl(
+        self, start: SecondsSinceUnixEpoch, checkpoint: WebConnectorCheckpoint
+    ) -> None:
+        if not self.to_visit_list:
+            raise ValueError("No URLs to visit")
+
+        check_internet_connection(self.to_visit_list[0])
+
+        checkpoint.crawl_started = True
+        checkpoint.to_visit = list(self.to_visit_list)
+
+        previous_state = load_connector_state(
+            self._crawl_state_file_name, WebCrawlState
+        )
+        if previous_state and is_window_indexed(previous_state.window_end, start):
+            checkpoint.previous_pages = previous_state.pages
+            if self.recursive:
+                # unchanged pages are not parsed, so the pages they link to are only
+                # known from the previous crawl
+                checkpoint.to_visit.extend(
+                    url for url in previous_state.pages if url not in self.to_visit_list
+                )
+
+        checkpoint.queued = set(checkpoint.to_visit)
+        logger.info(
+            f"Starting web crawl: urls={len(checkpoint.to_visit)} "
+            f"conditional={bool(checkpoint.previous_pages)}"
+        )
+
+    def _crawl(
+        self, checkpoint: WebConnectorCheckpoint
+    ) -> Iterator[Document | ConnectorFailure]:
+        """Crawls up to PAGES_PER_CHECKPOINT pages from the checkpoint's to_visit list,
+        along with the pages they link to. All pages started are finished before
+        returning, so the checkpoint is consistent with what was yielded."""
+        pages_started = 0
+        in_flight: dict[Future[CrawledPage], str] = {}
+
+        with (
+            ThreadPoolExecutor(
+                max_workers=WEB_CONNECTOR_MAX_CONCURRENT_FETCHES
+            ) as executor,
+            BrowserPool(
+                size=WEB_CONNECTOR_MAX_CONCURRENT_BROWSER_PAGES,
+                start_browser=start_playwright,
+            ) as browser_pool,
+        ):
+            while in_flight or (
+                checkpoint.to_visit and pages_started < self.PAGES_PER_CHECKPOINT
+            ):
+                while (
+                    checkpoint.to_visit
+                    and pages_started < self.PAGES_PER_CHECKPOINT
+                    and len(in_flight) < WEB_CONNECTOR_MAX_CONCURRENT_FETCHES
+                ):
+                    url = checkpoint.to_visit.pop()
+                    pages_started += 1
+                    future = executor.submit(
+                        self._crawl_page,
+                        url,
+                        checkpoint.previous_pages.get(url),
+                        browser_pool,
+                    )
+                    in_flight[future] = url
+
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    url = in_flight.pop(future)
+                    try:
+                        page = future.result()
+                    except Exception as e:
+                        checkpoint.last_error = f"Failed to fetch '{url}': {e}"
+                        logger.exception(checkpoint.last_error)
+                        yield ConnectorFailure(
+                            failed_document=DocumentFailure(
+                                document_id=url, document_link=url
+                            ),
+                            failure_message=checkpoint.last_error,
+                            exception=e,
+                        )
+                        continue
+
+                    doc = self._process_crawled_page(url, page, checkpoint)
+                    if doc:
+                        yield doc
+
+    def _process_crawled_page(
+        self, requested_url: str, page: CrawledPage, checkpoint: WebConnectorCheckpoint
+    ) -> Document | None:
+        if page.skip_reason:
+            checkpoint.last_error = (
+                f"Skipped indexing {requested_url} due to {page.skip_reason}"
+            )
+            logger.info(checkpoint.last_error)
+            return None
+
+        if page.url != requested_url:
+            if page.url in checkpoint.queued:
+                logger.info(
+                    f"{requested_url} redirected to {page.url} - already queued"
+                )
+                return None
+            checkpoint.queued.add(page.url)
+
+        # records are keyed by the URL that is requested again in the next crawl
+        checkpoint.pages[requested_url] = page.record
+        if page.not_modified:
+            return None
+
+        for link in page.links:
+            if link not in checkpoint.queued:
+                checkpoint.queued.add(link)
+                checkpoint.to_visit.append(link)
+
+        # Sometimes pages with #! will serve duplicate content
+        content_hash = hashlib.sha256(
+            f"{page.title}\n{page.text}".encode("utf-8")
+        ).hexdigest()
+        if content_hash in checkpoint.content_hashes:
+            logger.info(f"Skipping duplicate title + content for {page.url}")
+            return None
+        checkpoint.content_hashes.add(content_hash)
+
+        return Document(
+            id=page.url,
+            sections=[TextSection(link=page.url, text=page.text)],
+            source=DocumentSource.WEB,
+            semantic_identifier=page.title or page.url,
+            metadata=page.metadata,
+            doc_updated_at=(
+                _get_datetime_from_last_modified_header(page.last_modified)
+                if page.last_modified
+                else None
+            ),
+        )
+
+    def _crawl_page(
+        self, url: str, previous: WebPageRecord | None, browser_pool: BrowserPool
+    ) -> CrawledPage:
+        """Runs on a crawler thread"""
+        try:
+            protected_url_check(url)
+        except Exception as e:
+            return CrawledPage(
+                url=url, record=WebPageRecord(), skip_reason=f"invalid URL: {e}"
+            )
+
+        retry_count = 0
+        while True:
+            try:
+                return self._fetch_page(url, previous, browser_pool)
+            except Exception as e:
+                retry_count += 1
+                if retry_count >= self.MAX_RETRIES:
+                    raise
+
+                delay = min(2**retry_count + random.uniform(0, 1), 10)
+                logger.info(
+                    f"Retry {retry_count}/{self.MAX_RETRIES} for {url} after "
+                    f"{delay:.2f}s delay: {e}"
+                )
+                time.sleep(delay)
+
+    def _http_session(self) -> requests.Session:
+        # sessions keep connections alive, but are not thread safe
+        session = getattr(self._thread_local, "session", None)
+        if session is None:
+            session = requests.Session()
+            session.headers.update(DEFAULT_HEADERS)
+            self._thread_local.session = session
+        return session
+
+    def _fetch_page(
+        self, url: str, previous: WebPageRecord | None, browser_pool: BrowserPool
+    ) -> CrawledPage:
+        headers: dict[str, str] = {}
+        if previous and previous.etag:
+            headers["If-None-Match"] = previous.etag
+        if previous and previous.last_modified:
+            headers["If-Modified-Since"] = previous.last_modified
+
+        with self._host_limiter.limit(url):
+            response = self._http_session().get(
+                url, headers=headers, timeout=WEB_CONNECTOR_HTTP_TIMEOUT_SECONDS
+            )
+
+        if response.status_code == 304 and previous:
+            return CrawledPage(url=url, record=previous, not_modified=True)
+
+        final_url = response.url
+        if final_url != url:
+            protected_url_check(final_url)
+
+        if response.status_code in (401, 403):
+            # usually bot detection or auth that only the browser is set up for
+            return browser_pool.submit(
+                lambda context: self._render_page(context, url)
+            ).result()
+        if response.status_code == 429 or response.status_code >= 500:
+            response.raise_for_status()
+        if response.status_code >= 400:
+            return CrawledPage(
+                url=final_url,
+                record=WebPageRecord(),
+                skip_reason=f"HTTP {response.status_code} response",
+            )
+
+        record = WebPageRecord(
+            etag=response.headers.get("ETag"),
+            last_modified=response.headers.get("Last-Modified"),
+        )
+
+        if is_pdf_content(response) or final_url.lower().endswith(".pdf"):
+            page_text, metadata, _ = read_pdf_file(file=io.BytesIO(response.content))
+            return CrawledPage(
+                url=final_url,
+                record=record,
+                title=final_url.split("/")[-1],
+                text=page_text,
+                metadata=metadata,
+                last_modified=record.last_modified,
+            )
+
+        content_type = response.headers.get("content-type", "text/html").lower()
+        if not content_type.startswith(("text/", "application/xhtml")):
+            return CrawledPage(
+                url=final_url,
+                record=record,
+                skip_reason=f"unsupported content type {content_type}",
+            )
+
+        page = self._parse_html(final_url, response.text)
+        if self.scroll_before_scraping or _needs_javascript(page.text):
+            page = browser_pool.submit(
+                lambda context: self._render_page(context, url)
+            ).result()
+        else:
+            page.last_modified = record.last_modified
+
+        # the next crawl revalidates over plain HTTP, so keep the HTTP validators
+        page.record = record
+        return page
+
+    def _render_page(self, context: BrowserContext, url: str) -> CrawledPage:
+        """Runs on a browser thread"""
+        _handle_cookies(context, url)
+
+        page = context.new_page()
+        try:
+            with self._host_limiter.limit(url):
+                # Can't use wait_until="networkidle" because it interferes with the scrolling behavior
+                page_response = page.goto(
+                    url, timeout=30000, wait_until="domcontentloaded"
+                )
+
+            final_url = page.url
+            if final_url != url:
+                protected_url_check(final_url)
+
+            status = page_response.status if page_response else 200
+            if status == 429 or status >= 500:
+                raise RuntimeError(f"HTTP {status} response for {final_url}")
+            if status >= 400:
+                return CrawledPage(
+                    url=final_url,
+                    record=WebPageRecord(),
+                    skip_reason=f"HTTP {status} response",
+                )
+
+            if self.scroll_before_scraping:
+                _scroll_to_bottom(page)
+
+            content = page.content()
+            iframe_texts: list[str] = []
+            if JAVASCRIPT_DISABLED_MESSAGE in content:
+                iframe_texts = (
+                    page.frame_locator("iframe").locator("html").all_inner_texts()
+                )
+
+            crawled_page = self._parse_html(final_url, content, iframe_texts)
+            crawled_page.last_modified = (
+                page_response.header_value("Last-Modified") if page_response else None
+            )
+            return crawled_page
+        finally:
+            page.close()
+
+    def _parse_html(
+        self, url: str, html: str, iframe_texts: list[str] | None = None
+    ) -> CrawledPage:
+        soup = BeautifulSoup(html, "html.parser")
+        links = (
+            get_internal_links(self.to_visit_list[0], url, soup)
+            if self.recursive
+            else set()
+        )
+
+        parsed_html = web_html_cleanup(soup, self.mintlify_cleanup)
+        text = parsed_html.cleaned_text
+        if iframe_texts and JAVASCRIPT_DISABLED_MESSAGE in text:
+            text = _merge_iframe_texts(text, iframe_texts)
+
+        return CrawledPage(
+            url=url,
+            record=WebPageRecord(),
+            title=parsed_html.title,
+            text=text,
+            links=links,
+        )
+
     def validate_connector_settings(self) -> None:
         # Make sure we have at least one valid URL to check
         if not self.to_visit_list:
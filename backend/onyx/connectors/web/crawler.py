@@ -0,0 +1,159 @@
+import queue
+import threading
+import time
+from collections.abc import Callable
+from collections.abc import Iterator
+from concurrent.futures import Future
+from contextlib import contextmanager
+from typing import Any
+from typing import TypeVar
+from urllib.parse import urlparse
+
+from playwright.sync_api import BrowserContext
+from playwright.sync_api import Playwright
+from pydantic import BaseModel
+
+from onyx.utils.logger import setup_logger
+
+logger = setup_logger()
+
+R = TypeVar("R")
+
+
+class HostPolitenessLimiter:
+    """Limits the load put on any single host: at most `max_concurrent` requests are in
+    flight and request starts are spaced at least `min_interval` seconds apart."""
+
+    def __init__(self, max_concurrent: int, min_interval: float) -> None:
+        self._max_concurrent = max_concurrent
+        self._min_interval = min_interval
+
+        self._lock = threading.Lock()
+        self._semaphores: dict[str, threading.BoundedSemaphore] = {}
+        self._next_start: dict[str, float] = {}
+
+    @contextmanager
+    def limit(self, url: str) -> Iterator[None]:
+        host = urlparse(url).netloc
+        with self._lock:
+            semaphore = self._semaphores.setdefault(
+                host, threading.BoundedSemaphore(self._max_concurrent)
+            )
+
+        with semaphore:
+            with self._lock:
+                now = time.monotonic()
+                start_at = max(now, self._next_start.get(host, now))
+                self._next_start[host] = start_at + self._min_interval
+
+            if start_at > now:
+                time.sleep(start_at - now)
+            yield
+
+
+def _stop_browser(
+    playwright: Playwright | None, context: BrowserContext | None
+) -> None:
+    try:
+        if context:
+            context.close()
+    finally:
+        if playwright:
+            playwright.stop()
+
+
+class BrowserPool:
+    """Runs functions against headless browsers on up to `size` worker threads.
+
+    Playwright's sync API objects can only be used from the thread that created them,
+    so every worker owns its browser. Browsers are started for the first page a worker
+    renders and restarted after a failed page, which may have left them in a bad state.
+    """
+
+    def __init__(
+        self,
+        size: int,
+        start_browser: Callable[[], tuple[Playwright, BrowserContext]],
+    ) -> None:
+        self._size = size
+        self._start_browser = start_browser
+
+        self._lock = threading.Lock()
+        self._jobs: queue.Queue[
+            tuple[Callable[[BrowserContext], Any], Future[Any]] | None
+        ] = queue.Queue()
+        self._workers: list[threading.Thread] = []
+
+    def submit(self, fn: Callable[[BrowserContext], R]) -> Future[R]:
+        future: Future[R] = Future()
+        self._jobs.put((fn, future))
+
+        with self._lock:
+            if len(self._workers) < self._size:
+                worker = threading.Thread(
+                    target=self._work,
+                    name=f"web-connector-browser-{len(self._workers)}",
+                    daemon=True,
+                )
+                worker.start()
+                self._workers.append(worker)
+
+        return future
+
+    def close(self) -> None:
+        with self._lock:
+            workers = self._workers
+            self._workers = []
+
+        for _ in workers:
+            self._jobs.put(None)
+        for worker in workers:
+            worker.join()
+
+    def __enter__(self) -> "BrowserPool":
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        self.close()
+
+    def _work(self) -> None:
+        playwright: Playwright | None = None
+        context: BrowserContext | None = None
+        try:
+            while True:
+                job = self._jobs.get()
+                if job is None:
+                    return
+
+                fn, future = job
+                if not future.set_running_or_notify_cancel():
+                    continue
+
+                try:
+                    if context is None:
+                        playwright, context = self._start_browser()
+                    future.set_result(fn(context))
+                except BaseException as e:
+                    future.set_exception(e)
+                    try:
+                        _stop_browser(playwright, context)
+                    except Exception:
+                        logger.exception("Failed to stop browser after a failed page")
+                    playwright, context = None, None
+        finally:
+            _stop_browser(playwright, context)
+
+
+class WebPageRecord(BaseModel):
+    """The validators needed to re-fetch a page conditionally"""
+
+    etag: str | None = None
+    last_modified: str | None = None
+
+
+class WebCrawlState(BaseModel):
+    """The outcome of the last completed crawl of a site, kept between indexing runs"""
+
+    # end of the indexing window the crawl ran for
+    window_end: float
+    pages: dict[str, WebPageRecord]
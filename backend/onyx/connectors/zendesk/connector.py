@@ -9,11 +9,19 @@ from pydantic import BaseModel
 from requests.exceptions import HTTPError
 from typing_extensions import override
 
+from onyx.configs.app_configs import ZENDESK_CONNECTOR_MAX_REQUESTS_PER_MINUTE
 from onyx.configs.app_configs import ZENDESK_CONNECTOR_SKIP_ARTICLE_LABELS
 from onyx.configs.constants import DocumentSource
 from onyx.connectors.cross_connector_utils.miscellaneous_utils import (
     time_str_to_utc,
 )
+from onyx.connectors.cross_connector_utils.rate_limit_wrapper import (
+    DistributedRateLimiter,
+)
+from onyx.connectors.cross_connector_utils.rate_limit_wrapper import (
+    get_retry_after_seconds,
+)
+from onyx.connectors.cross_connector_utils.rate_limit_wrapper import RequestBudget
 from onyx.connectors.exceptions import ConnectorValidationError
 from onyx.connectors.exceptions import CredentialExpiredError
 from onyx.connectors.exceptions import InsufficientPermissionsError
@@ -35,6 +43,14 @@ from onyx.utils.retry_wrapper import retry_builder
 
 
 MAX_PAGE_SIZE = 30  # Zendesk API maximum
+ZENDESK_REQUEST_BUDGET = (
+    RequestBudget(
+        max_requests=ZENDESK_CONNECTOR_MAX_REQUESTS_PER_MINUTE, period_seconds=60
+    )
+    if ZENDESK_CONNECTOR_MAX_REQUESTS_PER_MINUTE > 0
+    else None
+)
+_DEFAULT_RETRY_AFTER_SECONDS = 60
 MAX_AUTHOR_MAP_SIZE = 50_000  # Reset author map cache if it gets too large
 _SLIM_BATCH_SIZE = 1000
 
@@ -47,19 +63,34 @@ class ZendeskCredentialsNotSetUpError(PermissionError):
 
 
 class ZendeskClient:
-    def __init__(self, subdomain: str, email: str, token: str):
+    def __init__(
+        self,
+        subdomain: str,
+        email: str,
+        token: str,
+        rate_limiter: DistributedRateLimiter | None = None,
+    ):
         self.base_url = f"https://{subdomain}.zendesk.com/api/v2"
         self.auth = (f"{email}/token", token)
+        self.rate_limiter = rate_limiter
 
     @retry_builder()
     def make_request(self, endpoint: str, params: dict[str, Any]) -> dict[str, Any]:
+        if self.rate_limiter:
+            self.rate_limiter.acquire()
+
         response = requests.get(
             f"{self.base_url}/{endpoint}", auth=self.auth, params=params
         )
 
         if response.status_code == 429:
             retry_after = response.headers.get("Retry-After")
-            if retry_after is not None:
+            if self.rate_limiter:
+                # every worker on this account waits, the retry waits in acquire
+                self.rate_limiter.block_for(
+                    get_retry_after_seconds(response, _DEFAULT_RETRY_AFTER_SECONDS)
+                )
+            elif retry_after is not None:
                 # Sleep for the duration indicated by the Retry-After header
                 time.sleep(int(retry_after))
 
@@ -375,7 +406,17 @@ class ZendeskConnector(
         self.subdomain = subdomain
 
         self.client = ZendeskClient(
-            subdomain, credentials["zendesk_email"], credentials["zendesk_token"]
+            subdomain,
+            credentials["zendesk_email"],
+            credentials["zendesk_token"],
+            # Zendesk rate limits are per account
+            rate_limiter=(
+                DistributedRateLimiter(
+                    key=f"zendesk:{subdomain}", budget=ZENDESK_REQUEST_BUDGET
+                )
+                if ZENDESK_REQUEST_BUDGET
+                else None
+            ),
         )
         return None
 
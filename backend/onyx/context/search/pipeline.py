@@ -1,3 +1,4 @@
+import time
 from collections import defaultdict
 from collections.abc import Callable
 from collections.abc import Iterator
@@ -25,10 +26,14 @@ from onyx.context.search.models import SearchQuery
 from onyx.context.search.models import SearchRequest
 from onyx.context.search.postprocessing.postprocessing import cleanup_chunks
 from onyx.context.search.postprocessing.postprocessing import search_postprocessing
+from onyx.context.search.preprocessing.preprocessing import get_processed_keywords
 from onyx.context.search.preprocessing.preprocessing import retrieval_preprocessing
+from onyx.context.search.retrieval.search_runner import embed_queries
+from onyx.context.search.retrieval.search_runner import get_query_embedding_model
 from onyx.context.search.retrieval.search_runner import (
     retrieve_chunks,
 )
+from onyx.context.search.retrieval.search_runner import retrieve_chunks_for_queries
 from onyx.context.search.utils import inference_section_from_chunks
 from onyx.context.search.utils import relevant_sections_to_indices
 from onyx.db.models import User
@@ -36,12 +41,17 @@ from onyx.db.search_settings import get_current_search_settings
 from onyx.document_index.factory import get_default_document_index
 from onyx.document_index.interfaces import VespaChunkRequest
 from onyx.llm.interfaces import LLM
+from onyx.natural_language_processing.search_nlp_models import EmbeddingModel
 from onyx.secondary_llm_flows.agentic_evaluation import evaluate_inference_section
 from onyx.utils.logger import setup_logger
 from onyx.utils.threadpool_concurrency import FunctionCall
 from onyx.utils.threadpool_concurrency import run_functions_in_parallel
+from onyx.utils.threadpool_concurrency import run_in_background
+from onyx.utils.threadpool_concurrency import TimeoutThread
+from onyx.utils.threadpool_concurrency import wait_on_background
 from onyx.utils.timing import log_function_time
 from onyx.utils.variable_functionality import fetch_ee_implementation_or_noop
+from shared_configs.model_server_models import Embedding
 
 logger = setup_logger()
 
@@ -88,6 +98,9 @@ class SearchPipeline:
         # Preprocessing steps generate this
         self._search_query: SearchQuery | None = None
         self._predicted_search_type: SearchType | None = None
+        # The query embeddings are computed while the preprocessing LLM calls run
+        self._query_embedding_thread: TimeoutThread[list[Embedding]] | None = None
+        self._embedded_queries: list[str] = []
 
         # Initial document index retrieval chunks
         self._retrieved_chunks: list[InferenceChunk] | None = None
@@ -110,9 +123,55 @@ class SearchPipeline:
         # No longer computed but keeping around in case it's reintroduced later
         self._predicted_flow: QueryFlow | None = QueryFlow.QUESTION_ANSWER
 
+        # Seconds spent in each stage of the search, logged once results are ready
+        self._stage_timings: dict[str, float] = {}
+
+    def _record_stage_time(self, stage: str, start_time: float) -> None:
+        self._stage_timings[stage] = time.monotonic() - start_time
+
+    def _log_stage_timings(self) -> None:
+        breakdown = " ".join(
+            f"{stage}={seconds:.3f}s" for stage, seconds in self._stage_timings.items()
+        )
+        logger.notice(f"Search latency breakdown: {breakdown}")
+
+    def _evaluates_section_relevance(self) -> bool:
+        return (
+            self.search_query.evaluation_type
+            in (LLMEvaluationType.BASIC, LLMEvaluationType.AGENTIC)
+            and not DISABLE_LLM_DOC_RELEVANCE
+        )
+
     """Pre-processing"""
 
+    def _embed_queries(
+        self, model: EmbeddingModel, queries: list[str]
+    ) -> list[Embedding]:
+        start_time = time.monotonic()
+        query_embeddings = embed_queries(queries, model)
+        self._record_stage_time("query_embedding", start_time)
+        return query_embeddings
+
+    def start_query_embeddings(self, queries: list[str]) -> None:
+        """The query embeddings only depend on the query texts, so the model server
+        call doesn't have to wait for the preprocessing LLM calls to finish. Only the
+        first call starts embeddings, to embed other queries than the request's it has
+        to be made before the preprocessing runs."""
+        if self._query_embedding_thread is not None:
+            return
+
+        # built here since the search settings belong to this thread's db session
+        model = get_query_embedding_model(self.search_settings)
+        self._embedded_queries = queries
+        self._query_embedding_thread = run_in_background(
+            self._embed_queries, model, queries
+        )
+
     def _run_preprocessing(self) -> None:
+        if self.search_request.precomputed_query_embedding is None:
+            self.start_query_embeddings([self.search_request.query])
+
+        start_time = time.monotonic()
         final_search_query = retrieval_preprocessing(
             search_request=self.search_request,
             user=self.user,
@@ -121,9 +180,40 @@ class SearchPipeline:
             db_session=self.db_session,
             bypass_acl=self.bypass_acl,
         )
+        self._record_stage_time("preprocessing", start_time)
+
         self._search_query = final_search_query
         self._predicted_search_type = final_search_query.search_type
 
+    def _wait_for_query_embeddings(self) -> dict[str, Embedding]:
+        """Embeddings of the queries embedded ahead of retrieval, by query. Empty if
+        none were started or computing them failed, retrieval embeds the queries
+        itself when no embedding was precomputed."""
+        if self._query_embedding_thread is None:
+            return {}
+
+        query_embedding_thread = self._query_embedding_thread
+        self._query_embedding_thread = None
+
+        start_time = time.monotonic()
+        try:
+            query_embeddings = wait_on_background(query_embedding_thread)
+        except Exception:
+            logger.exception("Failed to compute the query embedding ahead of retrieval")
+            return {}
+        finally:
+            self._record_stage_time("query_embedding_wait", start_time)
+
+        return dict(zip(self._embedded_queries, query_embeddings))
+
+    def _join_query_embedding(self) -> None:
+        search_query = self.search_query
+        query_embedding = self._wait_for_query_embeddings().get(search_query.query)
+        if query_embedding is not None:
+            self._search_query = search_query.model_copy(
+                update={"precomputed_query_embedding": query_embedding}
+            )
+
     @property
     def search_query(self) -> SearchQuery:
         if self._search_query is not None:
@@ -155,13 +245,17 @@ class SearchPipeline:
         if self._retrieved_chunks is not None:
             return self._retrieved_chunks
 
+        self._join_query_embedding()
+
         # These chunks do not include large chunks and have been deduped
+        start_time = time.monotonic()
         self._retrieved_chunks = retrieve_chunks(
             query=self.search_query,
             document_index=self.document_index,
             db_session=self.db_session,
             retrieval_metrics_callback=self.retrieval_metrics_callback,
         )
+        self._record_stage_time("retrieval", start_time)
 
         return cast(list[InferenceChunk], self._retrieved_chunks)
 
@@ -225,22 +319,35 @@ class SearchPipeline:
 
         # These chunks are ordered, deduped, and contain no large chunks
         retrieved_chunks = self._get_chunks()
+        expansion_start_time = time.monotonic()
+
+        censored_chunks = self._censor_chunks(retrieved_chunks)
+        self._retrieved_sections = self._expand_chunks_to_sections([censored_chunks])[0]
+
+        self._record_stage_time("section_expansion", expansion_start_time)
+        return self._retrieved_sections
 
+    def _censor_chunks(self, chunks: list[InferenceChunk]) -> list[InferenceChunk]:
         # If ee is enabled, censor the chunk sections based on user access
         # Otherwise, return the retrieved chunks
-        censored_chunks: list[InferenceChunk] = fetch_ee_implementation_or_noop(
+        return fetch_ee_implementation_or_noop(
             "onyx.external_permissions.post_query_censoring",
             "_post_query_chunk_censoring",
-            retrieved_chunks,
+            chunks,
         )(
-            chunks=retrieved_chunks,
+            chunks=chunks,
             user=self.user,
         )
 
+    def _expand_chunks_to_sections(
+        self, chunks_per_query: list[list[InferenceChunk]]
+    ) -> list[list[InferenceSection]]:
+        """Builds the section around each chunk, for each list of retrieved chunks. The
+        surrounding chunks of all of the lists are fetched from the document index at
+        once, so chunks retrieved for several queries are only fetched once."""
         above = self.search_query.chunks_above
         below = self.search_query.chunks_below
 
-        expanded_inference_sections = []
         inference_chunks: list[InferenceChunk] = []
         chunk_requests: list[VespaChunkRequest] = []
 
@@ -249,14 +356,15 @@ class SearchPipeline:
             seen_document_ids = set()
 
             # This preserves the ordering since the chunks are retrieved in score order
-            for chunk in censored_chunks:
-                if chunk.document_id not in seen_document_ids:
-                    seen_document_ids.add(chunk.document_id)
-                    chunk_requests.append(
-                        VespaChunkRequest(
-                            document_id=chunk.document_id,
+            for chunks in chunks_per_query:
+                for chunk in chunks:
+                    if chunk.document_id not in seen_document_ids:
+                        seen_document_ids.add(chunk.document_id)
+                        chunk_requests.append(
+                            VespaChunkRequest(
+                                document_id=chunk.document_id,
+                            )
                         )
-                    )
 
             inference_chunks.extend(
                 cleanup_chunks(
@@ -274,21 +382,28 @@ class SearchPipeline:
                     grouped_inference_chunks[chunk.document_id] = []
                 grouped_inference_chunks[chunk.document_id].append(chunk)
 
-            for chunk_group in grouped_inference_chunks.values():
-                inference_section = inference_section_from_chunks(
-                    center_chunk=chunk_group[0],
-                    chunks=chunk_group,
-                )
-
-                if inference_section is not None:
-                    expanded_inference_sections.append(inference_section)
-                else:
-                    logger.warning(
-                        "Skipped creation of section for full docs, no chunks found"
+            full_doc_sections_per_query: list[list[InferenceSection]] = []
+            for chunks in chunks_per_query:
+                query_document_ids = {chunk.document_id for chunk in chunks}
+                expanded_inference_sections = []
+                for document_id, chunk_group in grouped_inference_chunks.items():
+                    if document_id not in query_document_ids:
+                        continue
+
+                    inference_section = inference_section_from_chunks(
+                        center_chunk=chunk_group[0],
+                        chunks=chunk_group,
                     )
 
-            self._retrieved_sections = expanded_inference_sections
-            return expanded_inference_sections
+                    if inference_section is not None:
+                        expanded_inference_sections.append(inference_section)
+                    else:
+                        logger.warning(
+                            "Skipped creation of section for full docs, no chunks found"
+                        )
+                full_doc_sections_per_query.append(expanded_inference_sections)
+
+            return full_doc_sections_per_query
 
         # General flow:
         # - Combine chunks into lists by document_id
@@ -299,16 +414,17 @@ class SearchPipeline:
         #   This maintains the original chunks ordering. Note, we cannot simply sort by score here
         #   as reranking flow may wipe the scores for a lot of the chunks.
         doc_chunk_ranges_map = defaultdict(list)
-        for chunk in censored_chunks:
-            # The list of ranges for each document is ordered by score
-            doc_chunk_ranges_map[chunk.document_id].append(
-                ChunkRange(
-                    chunks=[chunk],
-                    start=max(0, chunk.chunk_id - above),
-                    # No max known ahead of time, filter will handle this anyway
-                    end=chunk.chunk_id + below,
+        for chunks in chunks_per_query:
+            for chunk in chunks:
+                # The list of ranges for each document is ordered by score
+                doc_chunk_ranges_map[chunk.document_id].append(
+                    ChunkRange(
+                        chunks=[chunk],
+                        start=max(0, chunk.chunk_id - above),
+                        # No max known ahead of time, filter will handle this anyway
+                        end=chunk.chunk_id + below,
+                    )
                 )
-            )
 
         # List of ranges, outside list represents documents, inner list represents ranges
         merged_ranges = [
@@ -347,37 +463,109 @@ class SearchPipeline:
         }
 
         # In case of failed parallel calls to Vespa, at least we should have the initial retrieved chunks
-        doc_chunk_ind_to_chunk.update(
-            {(chunk.document_id, chunk.chunk_id): chunk for chunk in censored_chunks}
-        )
+        for chunks in chunks_per_query:
+            doc_chunk_ind_to_chunk.update(
+                {(chunk.document_id, chunk.chunk_id): chunk for chunk in chunks}
+            )
 
-        # Build the surroundings for all of the initial retrieved chunks
-        for chunk in censored_chunks:
-            start_ind = max(0, chunk.chunk_id - above)
-            end_ind = chunk.chunk_id + below
+        sections_per_query: list[list[InferenceSection]] = []
+        for chunks in chunks_per_query:
+            expanded_inference_sections = []
+
+            # Build the surroundings for all of the initial retrieved chunks
+            for chunk in chunks:
+                start_ind = max(0, chunk.chunk_id - above)
+                end_ind = chunk.chunk_id + below
+
+                # Since the index of the max_chunk is unknown, just allow it to be None and filter after
+                surrounding_chunks_or_none = [
+                    doc_chunk_ind_to_chunk.get((chunk.document_id, chunk_ind))
+                    for chunk_ind in range(
+                        start_ind, end_ind + 1
+                    )  # end_ind is inclusive
+                ]
+                # The None will apply to the would be "chunks" that are larger than the index of the last chunk
+                # of the document
+                surrounding_chunks = [
+                    chunk for chunk in surrounding_chunks_or_none if chunk is not None
+                ]
 
-            # Since the index of the max_chunk is unknown, just allow it to be None and filter after
-            surrounding_chunks_or_none = [
-                doc_chunk_ind_to_chunk.get((chunk.document_id, chunk_ind))
-                for chunk_ind in range(start_ind, end_ind + 1)  # end_ind is inclusive
-            ]
-            # The None will apply to the would be "chunks" that are larger than the index of the last chunk
-            # of the document
-            surrounding_chunks = [
-                chunk for chunk in surrounding_chunks_or_none if chunk is not None
-            ]
+                inference_section = inference_section_from_chunks(
+                    center_chunk=chunk,
+                    chunks=surrounding_chunks,
+                )
+                if inference_section is not None:
+                    expanded_inference_sections.append(inference_section)
+                else:
+                    logger.warning("Skipped creation of section, no chunks found")
+
+            sections_per_query.append(expanded_inference_sections)
+
+        return sections_per_query
+
+    def retrieve_sections_for_queries(
+        self, queries: list[str]
+    ) -> list[list[InferenceSection]]:
+        """Retrieval for several queries (e.g. rephrasings of the request's query) sharing
+        the preprocessing of the search request: the filters, recency bias and search type
+        found for the request's query apply to all of them.
+
+        All of the queries are embedded in a single model server call, the hybrid searches
+        are sent to the document index together and the surrounding chunks are fetched once
+        for all of the queries. Returns the retrieved sections of each query, merged by
+        document (see `merged_retrieved_sections`), without reranking."""
+        unique_queries = list(dict.fromkeys(queries))
+        self.start_query_embeddings(unique_queries)
+        search_query = self.search_query
+
+        query_embeddings = self._wait_for_query_embeddings()
+        search_queries = [
+            search_query.model_copy(
+                update={
+                    "query": query,
+                    "processed_keywords": get_processed_keywords(
+                        query, self.search_request
+                    ),
+                    "precomputed_query_embedding": query_embeddings.get(query),
+                }
+            )
+            for query in unique_queries
+        ]
 
-            inference_section = inference_section_from_chunks(
-                center_chunk=chunk,
-                chunks=surrounding_chunks,
+        start_time = time.monotonic()
+        chunks_per_query = retrieve_chunks_for_queries(
+            queries=search_queries,
+            document_index=self.document_index,
+            db_session=self.db_session,
+        )
+        self._record_stage_time("retrieval", start_time)
+
+        start_time = time.monotonic()
+        # censored together, any chunk may have been retrieved for several queries
+        allowed_chunk_keys = {
+            (chunk.document_id, chunk.chunk_id)
+            for chunk in self._censor_chunks(
+                [chunk for chunks in chunks_per_query for chunk in chunks]
             )
-            if inference_section is not None:
-                expanded_inference_sections.append(inference_section)
-            else:
-                logger.warning("Skipped creation of section, no chunks found")
+        }
+        sections_per_query = self._expand_chunks_to_sections(
+            [
+                [
+                    chunk
+                    for chunk in chunks
+                    if (chunk.document_id, chunk.chunk_id) in allowed_chunk_keys
+                ]
+                for chunks in chunks_per_query
+            ]
+        )
+        self._record_stage_time("section_expansion", start_time)
+        self._log_stage_timings()
 
-        self._retrieved_sections = expanded_inference_sections
-        return expanded_inference_sections
+        sections_by_query = {
+            query: _merge_sections(sections=sections)
+            for query, sections in zip(unique_queries, sections_per_query)
+        }
+        return [sections_by_query[query] for query in queries]
 
     @property
     def retrieved_sections(self) -> list[InferenceSection]:
@@ -409,6 +597,7 @@ class SearchPipeline:
         if self.retrieved_sections_callback is not None:
             self.retrieved_sections_callback(retrieved_sections)
 
+        start_time = time.monotonic()
         self._postprocessing_generator = search_postprocessing(
             search_query=self.search_query,
             retrieved_sections=retrieved_sections,
@@ -419,6 +608,10 @@ class SearchPipeline:
         self._reranked_sections = cast(
             list[InferenceSection], next(self._postprocessing_generator)
         )
+        self._record_stage_time("reranking", start_time)
+        # otherwise logged once section relevance is evaluated, the last stage
+        if not self._evaluates_section_relevance():
+            self._log_stage_timings()
 
         return self._reranked_sections
 
@@ -470,8 +663,11 @@ class SearchPipeline:
                 + "The search query evaluation type should have been specified."
             )
 
+        # both evaluation types work off of the final sections, which are timed as
+        # earlier stages
         if self.search_query.evaluation_type == LLMEvaluationType.AGENTIC:
             sections = self.final_context_sections
+            start_time = time.monotonic()
             functions = [
                 FunctionCall(
                     evaluate_inference_section,
@@ -495,6 +691,7 @@ class SearchPipeline:
             # NOTE: final_context_sections must be accessed before accessing self._postprocessing_generator
             # since the property sets the generator. DO NOT REMOVE.
             _ = self.final_context_sections
+            start_time = time.monotonic()
 
             self._section_relevance = next(
                 cast(
@@ -509,6 +706,8 @@ class SearchPipeline:
                 f"Unexpected evaluation type: {self.search_query.evaluation_type}"
             )
 
+        self._record_stage_time("section_relevance", start_time)
+        self._log_stage_timings()
         return self._section_relevance
 
     @property
@@ -44,6 +44,16 @@ def query_analysis(query: str) -> tuple[bool, list[str]]:
     return analysis_model.predict(query)
 
 
+def get_processed_keywords(query: str, search_request: SearchRequest) -> list[str]:
+    all_query_terms = query.split()
+    return (
+        remove_stop_words_and_punctuation(all_query_terms)
+        # If the user is using a different language, don't edit the query or remove english stopwords
+        if not search_request.multilingual_expansion
+        else all_query_terms
+    )
+
+
 @log_function_time(print_only=True)
 def retrieval_preprocessing(
     search_request: SearchRequest,
@@ -153,13 +163,7 @@ def retrieval_preprocessing(
     elif run_query_analysis:
         is_keyword, _extracted_keywords = parallel_results[run_query_analysis.result_id]
 
-    all_query_terms = query.split()
-    processed_keywords = (
-        remove_stop_words_and_punctuation(all_query_terms)
-        # If the user is using a different language, don't edit the query or remove english stopwords
-        if not search_request.multilingual_expansion
-        else all_query_terms
-    )
+    processed_keywords = get_processed_keywords(query, search_request)
 
     user_acl_filters = (
         None if bypass_acl else build_access_filters_for_user(user, db_session)
@@ -18,9 +18,11 @@ from onyx.context.search.postprocessing.postprocessing import cleanup_chunks
 from onyx.context.search.preprocessing.preprocessing import HYBRID_ALPHA
 from onyx.context.search.preprocessing.preprocessing import HYBRID_ALPHA_KEYWORD
 from onyx.context.search.utils import inference_section_from_chunks
+from onyx.db.models import SearchSettings
 from onyx.db.search_settings import get_current_search_settings
 from onyx.db.search_settings import get_multilingual_expansion
 from onyx.document_index.interfaces import DocumentIndex
+from onyx.document_index.interfaces import HybridRetrievalRequest
 from onyx.document_index.interfaces import VespaChunkRequest
 from onyx.document_index.vespa.shared_utils.utils import (
     replace_invalid_doc_id_characters,
@@ -115,32 +117,28 @@ def combine_retrieval_results(
     return sorted_chunks
 
 
-def get_query_embedding(query: str, db_session: Session) -> Embedding:
-    search_settings = get_current_search_settings(db_session)
-
-    model = EmbeddingModel.from_db_model(
+def get_query_embedding_model(search_settings: SearchSettings) -> EmbeddingModel:
+    """Reads everything needed off of the search settings, so the returned model can
+    be used from another thread than the one owning the settings' db session"""
+    return EmbeddingModel.from_db_model(
         search_settings=search_settings,
         # The below are globally set, this flow always uses the indexing one
         server_host=MODEL_SERVER_HOST,
         server_port=MODEL_SERVER_PORT,
     )
 
-    query_embedding = model.encode([query], text_type=EmbedTextType.QUERY)[0]
-    return query_embedding
 
+def embed_queries(queries: list[str], model: EmbeddingModel) -> list[Embedding]:
+    return model.encode(queries, text_type=EmbedTextType.QUERY)
 
-def get_query_embeddings(queries: list[str], db_session: Session) -> list[Embedding]:
-    search_settings = get_current_search_settings(db_session)
 
-    model = EmbeddingModel.from_db_model(
-        search_settings=search_settings,
-        # The below are globally set, this flow always uses the indexing one
-        server_host=MODEL_SERVER_HOST,
-        server_port=MODEL_SERVER_PORT,
-    )
+def get_query_embedding(query: str, db_session: Session) -> Embedding:
+    return get_query_embeddings([query], db_session)[0]
 
-    query_embedding = model.encode(queries, text_type=EmbedTextType.QUERY)
-    return query_embedding
+
+def get_query_embeddings(queries: list[str], db_session: Session) -> list[Embedding]:
+    search_settings = get_current_search_settings(db_session)
+    return embed_queries(queries, get_query_embedding_model(search_settings))
 
 
 @log_function_time(print_only=True)
@@ -275,6 +273,16 @@ def doc_index_retrieval(
 
     logger.info(f"Overall number of top initial retrieval chunks: {len(top_chunks)}")
 
+    return _resolve_large_chunks(top_chunks, query.filters, document_index)
+
+
+def _resolve_large_chunks(
+    top_chunks: list[InferenceChunkUncleaned],
+    filters: IndexFilters,
+    document_index: DocumentIndex,
+) -> list[InferenceChunk]:
+    """Replaces the large chunks among the retrieved ones by the normal chunks they
+    reference, dedupes, and cleans the chunks"""
     retrieval_requests: list[VespaChunkRequest] = []
     normal_chunks: list[InferenceChunkUncleaned] = []
     referenced_chunk_scores: dict[tuple[str, int], float] = {}
@@ -304,7 +312,7 @@ def doc_index_retrieval(
     # Retrieve and return the referenced normal chunks from the large chunks
     retrieved_inference_chunks = document_index.id_based_retrieval(
         chunk_requests=retrieval_requests,
-        filters=query.filters,
+        filters=filters,
         batch_retrieval=True,
     )
 
@@ -385,10 +393,15 @@ def retrieve_chunks(
             q_copy = query.model_copy(
                 update={
                     "query": rephrase,
-                    # need to recompute for each rephrase
+                    # need to recompute for each rephrase, except for the original
+                    # query whose embedding may have been computed already
                     # note that `SearchQuery` is a frozen model, so we can't update
                     # it below
-                    "precomputed_query_embedding": None,
+                    "precomputed_query_embedding": (
+                        query.precomputed_query_embedding
+                        if rephrase == query.query
+                        else None
+                    ),
                 },
                 deep=True,
             )
@@ -427,6 +440,74 @@ def retrieve_chunks(
     return top_chunks
 
 
+@log_function_time(print_only=True)
+def retrieve_chunks_for_queries(
+    queries: list[SearchQuery],
+    document_index: DocumentIndex,
+    db_session: Session,
+) -> list[list[InferenceChunk]]:
+    """Same as `retrieve_chunks` for each of the queries, but the missing query embeddings
+    are computed in a single model server call and the hybrid searches are sent to the
+    document index together. Returns the chunks of each query in order."""
+    multilingual_expansion = get_multilingual_expansion(db_session)
+    if multilingual_expansion or any(query.expanded_queries for query in queries):
+        # these fan out into several searches per query already
+        return [
+            retrieve_chunks(
+                query=query, document_index=document_index, db_session=db_session
+            )
+            for query in queries
+        ]
+
+    queries_to_embed = [
+        query.query for query in queries if query.precomputed_query_embedding is None
+    ]
+    computed_embeddings = dict(
+        zip(
+            queries_to_embed,
+            (
+                get_query_embeddings(queries_to_embed, db_session)
+                if queries_to_embed
+                else []
+            ),
+        )
+    )
+
+    chunks_per_query = document_index.batch_hybrid_retrieval(
+        [
+            HybridRetrievalRequest(
+                query=query.query,
+                query_embedding=(
+                    query.precomputed_query_embedding
+                    or computed_embeddings[query.query]
+                ),
+                final_keywords=query.processed_keywords,
+                filters=query.filters,
+                hybrid_alpha=query.hybrid_alpha,
+                time_decay_multiplier=query.recency_bias_multiplier,
+                num_to_retrieve=query.num_hits,
+                ranking_profile_type=QueryExpansionType.SEMANTIC,
+                offset=query.offset,
+            )
+            for query in queries
+        ]
+    )
+
+    retrieved_chunks: list[list[InferenceChunk]] = []
+    for query, top_chunks in zip(queries, chunks_per_query):
+        if not top_chunks:
+            logger.warning(
+                f"Hybrid ({query.search_type.value.capitalize()}) search returned no results "
+                f"with filters: {query.filters}"
+            )
+        retrieved_chunks.append(
+            _resolve_large_chunks(
+                _dedupe_chunks(top_chunks), query.filters, document_index
+            )
+        )
+    return retrieved_chunks
+
+
 def inference_sections_from_ids(
     doc_identifiers: list[tuple[str, int]],
     document_index: DocumentIndex,
@@ -10,12 +10,14 @@ from fastapi import HTTPException
 from sqlalchemy import delete
 from sqlalchemy import desc
 from sqlalchemy import func
+from sqlalchemy import literal_column
 from sqlalchemy import nullsfirst
 from sqlalchemy import or_
 from sqlalchemy import Row
 from sqlalchemy import select
 from sqlalchemy import update
 from sqlalchemy.exc import MultipleResultsFound
+from sqlalchemy.orm import aliased
 from sqlalchemy.orm import joinedload
 from sqlalchemy.orm import Session
 
@@ -47,7 +49,8 @@ from onyx.db.models import ToolCall
 from onyx.db.models import User
 from onyx.db.models import UserFile
 from onyx.db.persona import get_best_persona_id_for_user
-from onyx.db.pg_file_store import delete_lobj_by_name
+from onyx.db.pg_file_store import get_pgfilestore_by_file_name_optional
+from onyx.file_store.file_store import get_default_file_store
 from onyx.file_store.models import FileDescriptor
 from onyx.file_store.models import InMemoryChatFile
 from onyx.llm.override_models import LLMOverride
@@ -225,14 +228,18 @@ def delete_messages_and_files_from_chat_session(
         )
     ).fetchall()
 
+    file_store = get_default_file_store(db_session)
     for id, files in messages_with_files:
         delete_tool_call_for_message_id(message_id=id, db_session=db_session)
         delete_search_doc_message_relationship(message_id=id, db_session=db_session)
         for file_info in files or {}:
             lobj_name = file_info.get("id")
             if lobj_name:
+                if not get_pgfilestore_by_file_name_optional(lobj_name, db_session):
+                    logger.info(f"no file with name {lobj_name} found")
+                    continue
                 logger.info(f"Deleting file with name: {lobj_name}")
-                delete_lobj_by_name(lobj_name, db_session)
+                file_store.delete_file(lobj_name)
 
     db_session.execute(
         delete(ChatMessage).where(ChatMessage.chat_session_id == chat_session_id)
@@ -560,6 +567,80 @@ def get_chat_messages_by_session(
     return list(result)
 
 
+def get_mainline_chat_message_chain(
+    chat_session_id: UUID,
+    db_session: Session,
+    stop_at_message_id: int | None = None,
+) -> Sequence[Row]:
+    """
+    Follows the latest_child_message pointers from the root message of the session,
+    in a recursive query, so that messages of edited or regenerated branches are
+    never loaded. Ends after stop_at_message_id if given.
+
+    Returns the id, latest_child_message, message_type, token_count and
+    refined_answer_improvement of each message in order, starting with the root.
+    """
+    chain = (
+        select(
+            ChatMessage.id,
+            ChatMessage.latest_child_message,
+            ChatMessage.message_type,
+            ChatMessage.token_count,
+            ChatMessage.refined_answer_improvement,
+            literal_column("0").label("depth"),
+        )
+        .where(
+            ChatMessage.chat_session_id == chat_session_id,
+            ChatMessage.parent_message.is_(None),
+        )
+        .cte("mainline_chain", recursive=True)
+    )
+
+    child = aliased(ChatMessage)
+    next_link = (
+        select(
+            child.id,
+            child.latest_child_message,
+            child.message_type,
+            child.token_count,
+            child.refined_answer_improvement,
+            (chain.c.depth + 1).label("depth"),
+        )
+        .join(chain, child.id == chain.c.latest_child_message)
+        .where(child.chat_session_id == chat_session_id)
+    )
+    if stop_at_message_id is not None:
+        next_link = next_link.where(chain.c.id != stop_at_message_id)
+
+    chain = chain.union_all(next_link)
+    return db_session.execute(select(chain).order_by(chain.c.depth)).all()
+
+
+def get_chat_messages_by_ids(
+    chat_message_ids: list[int],
+    db_session: Session,
+    prefetch_tool_calls: bool = False,
+) -> list[ChatMessage]:
+    """Returns the messages in the order of chat_message_ids"""
+    stmt = select(ChatMessage).where(ChatMessage.id.in_(chat_message_ids))
+    if prefetch_tool_calls:
+        stmt = stmt.options(
+            joinedload(ChatMessage.tool_call),
+            joinedload(ChatMessage.sub_questions).joinedload(
+                AgentSubQuestion.sub_queries
+            ),
+        )
+
+    id_to_message = {
+        message.id: message for message in db_session.scalars(stmt).unique().all()
+    }
+    return [
+        id_to_message[chat_message_id]
+        for chat_message_id in chat_message_ids
+        if chat_message_id in id_to_message
+    ]
+
+
 def get_or_create_root_message(
     chat_session_id: UUID,
     db_session: Session,
@@ -1,11 +1,19 @@
+from array import array
 from datetime import datetime
+from datetime import timedelta
 from datetime import timezone
 
 from sqlalchemy import delete
+from sqlalchemy import func
+from sqlalchemy import select
+from sqlalchemy import update
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.orm import Session
 
+from onyx.db.models import ChunkEmbeddingCache
 from onyx.db.models import ChunkStats
 from onyx.indexing.models import UpdatableChunkData
+from shared_configs.model_server_models import Embedding
 
 
 def update_chunk_boost_components__no_commit(
@@ -61,3 +69,85 @@ def delete_chunk_stats_by_connector_credential_pair__no_commit(
     stmt = delete(ChunkStats).where(ChunkStats.document_id.in_(document_ids))
 
     db_session.execute(stmt)
+
+
+def get_cached_chunk_embeddings(
+    content_hashes: list[str],
+    db_session: Session,
+) -> dict[str, Embedding]:
+    if not content_hashes:
+        return {}
+
+    rows = db_session.execute(
+        select(ChunkEmbeddingCache.content_hash, ChunkEmbeddingCache.embedding).where(
+            ChunkEmbeddingCache.content_hash.in_(content_hashes)
+        )
+    )
+    return {
+        content_hash: array("f", embedding).tolist() for content_hash, embedding in rows
+    }
+
+
+def upsert_cached_chunk_embeddings__no_commit(
+    hash_to_embedding: dict[str, Embedding],
+    db_session: Session,
+) -> None:
+    if not hash_to_embedding:
+        return
+
+    # The hash covers the text and model settings, so an existing row is identical
+    insert_stmt = insert(ChunkEmbeddingCache).values(
+        [
+            {
+                "content_hash": content_hash,
+                "embedding": array("f", embedding).tobytes(),
+            }
+            for content_hash, embedding in hash_to_embedding.items()
+        ]
+    )
+    db_session.execute(insert_stmt.on_conflict_do_nothing())
+
+
+# how stale the last use of a cache hit may get before it is refreshed, so that hits
+# don't rewrite their rows on every re-index
+_CHUNK_EMBEDDING_LAST_USED_RESOLUTION = timedelta(days=1)
+
+
+def mark_cached_chunk_embeddings_used__no_commit(
+    content_hashes: list[str],
+    db_session: Session,
+) -> None:
+    if not content_hashes:
+        return
+
+    db_session.execute(
+        update(ChunkEmbeddingCache)
+        .where(
+            ChunkEmbeddingCache.content_hash.in_(content_hashes),
+            ChunkEmbeddingCache.time_last_used
+            < func.now() - _CHUNK_EMBEDDING_LAST_USED_RESOLUTION,
+        )
+        .values(time_last_used=func.now())
+    )
+
+
+def delete_unused_cached_chunk_embeddings(
+    unused_for: timedelta,
+    db_session: Session,
+    batch_size: int = 1000,
+) -> int:
+    """Deletes one batch of the cached embeddings that were not used for `unused_for`.
+    Returns the number of deleted rows, less than `batch_size` once none are left."""
+    stale_hashes = (
+        select(ChunkEmbeddingCache.content_hash)
+        .where(ChunkEmbeddingCache.time_last_used < func.now() - unused_for)
+        .limit(batch_size)
+        .scalar_subquery()
+    )
+    result = db_session.execute(
+        delete(ChunkEmbeddingCache).where(
+            ChunkEmbeddingCache.content_hash.in_(stale_hashes)
+        )
+    )
+    db_session.commit()
+    return result.rowcount  # type: ignore
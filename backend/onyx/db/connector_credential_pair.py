@@ -558,6 +558,12 @@ def add_credential_to_connector(
 
     db_session.commit()
 
+    if access_type == AccessType.SYNC:
+        fetch_ee_implementation_or_noop(
+            "onyx.external_permissions.post_query_censoring",
+            "invalidate_censoring_enabled_sources",
+        )()
+
     return StatusResponse(
         success=True,
         message=f"Creating new association between Connector {connector_id} and Credential {credential_id}",
@@ -604,8 +610,15 @@ def remove_credential_from_connector(
             db_session=db_session,
             cc_pair_id=association.id,
         )
+        access_type = association.access_type
         db_session.delete(association)
         db_session.commit()
+
+        if access_type == AccessType.SYNC:
+            fetch_ee_implementation_or_noop(
+                "onyx.external_permissions.post_query_censoring",
+                "invalidate_censoring_enabled_sources",
+            )()
         return StatusResponse(
             success=True,
             message=f"Credential {credential_id} removed from Connector",
@@ -19,6 +19,7 @@ from onyx.db.models import ConnectorCredentialPair
 from onyx.db.models import Credential
 from onyx.db.models import Credential__UserGroup
 from onyx.db.models import DocumentByConnectorCredentialPair
+from onyx.db.models import DocumentCountByConnectorCredentialPair
 from onyx.db.models import User
 from onyx.db.models import User__UserGroup
 from onyx.server.documents.models import CredentialBase
@@ -388,6 +389,18 @@ def _delete_credential_internal(
             # Delete DocumentByConnectorCredentialPair records first
             for doc_cc_pair in associated_doc_cc_pairs:
                 db_session.delete(doc_cc_pair)
+            # every document of the credential's cc pairs is gone, same as
+            # delete_all_documents_by_connector_credential_pair__no_commit
+            if associated_connectors:
+                db_session.execute(
+                    update(DocumentCountByConnectorCredentialPair)
+                    .where(
+                        DocumentCountByConnectorCredentialPair.cc_pair_id.in_(
+                            [cc_pair.id for cc_pair in associated_connectors]
+                        )
+                    )
+                    .values(document_count=0)
+                )
 
             # Then delete ConnectorCredentialPair records
             for connector in associated_connectors:
@@ -10,6 +10,7 @@ from sqlalchemy import and_
 from sqlalchemy import delete
 from sqlalchemy import exists
 from sqlalchemy import func
+from sqlalchemy import literal
 from sqlalchemy import or_
 from sqlalchemy import Select
 from sqlalchemy import select
@@ -34,6 +35,7 @@ from onyx.db.models import ConnectorCredentialPair
 from onyx.db.models import Credential
 from onyx.db.models import Document as DbDocument
 from onyx.db.models import DocumentByConnectorCredentialPair
+from onyx.db.models import DocumentCountByConnectorCredentialPair
 from onyx.db.models import User
 from onyx.db.tag import delete_document_tags_for_documents__no_commit
 from onyx.db.utils import model_to_dict
@@ -250,35 +252,121 @@ def get_document_connector_counts(
 def get_document_counts_for_cc_pairs(
     db_session: Session, cc_pairs: list[ConnectorCredentialPairIdentifier]
 ) -> Sequence[tuple[int, int, int]]:
-    """Returns a sequence of tuples of (connector_id, credential_id, document count)"""
+    """Returns a sequence of tuples of (connector_id, credential_id, document count)
+
+    The counts are read from the incrementally maintained
+    DocumentCountByConnectorCredentialPair rather than counted."""
 
     # Prepare a list of (connector_id, credential_id) tuples
     cc_ids = [(x.connector_id, x.credential_id) for x in cc_pairs]
 
     stmt = (
         select(
-            DocumentByConnectorCredentialPair.connector_id,
-            DocumentByConnectorCredentialPair.credential_id,
-            func.count(),
+            ConnectorCredentialPair.connector_id,
+            ConnectorCredentialPair.credential_id,
+            # a decrement may have been applied before its row was created
+            func.greatest(DocumentCountByConnectorCredentialPair.document_count, 0),
         )
-        .where(
-            and_(
-                tuple_(
-                    DocumentByConnectorCredentialPair.connector_id,
-                    DocumentByConnectorCredentialPair.credential_id,
-                ).in_(cc_ids),
-                DocumentByConnectorCredentialPair.has_been_indexed.is_(True),
-            )
+        .join(
+            DocumentCountByConnectorCredentialPair,
+            DocumentCountByConnectorCredentialPair.cc_pair_id
+            == ConnectorCredentialPair.id,
         )
-        .group_by(
-            DocumentByConnectorCredentialPair.connector_id,
-            DocumentByConnectorCredentialPair.credential_id,
+        .where(
+            tuple_(
+                ConnectorCredentialPair.connector_id,
+                ConnectorCredentialPair.credential_id,
+            ).in_(cc_ids)
         )
     )
 
     return db_session.execute(stmt).all()  # type: ignore
 
 
+def count_indexed_documents_for_cc_pair(
+    db_session: Session, connector_id: int, credential_id: int
+) -> int:
+    """The actual count that the DocumentCountByConnectorCredentialPair tracks."""
+    stmt = select(func.count()).where(
+        and_(
+            DocumentByConnectorCredentialPair.connector_id == connector_id,
+            DocumentByConnectorCredentialPair.credential_id == credential_id,
+            DocumentByConnectorCredentialPair.has_been_indexed.is_(True),
+        )
+    )
+    return db_session.scalar(stmt) or 0
+
+
+def update_document_counts_for_cc_pairs__no_commit(
+    db_session: Session,
+    count_deltas: dict[tuple[int, int], int],
+) -> None:
+    """Adds the deltas, keyed by (connector_id, credential_id), to the document counts
+    of the cc pairs. Must be called after the documents were changed, in the same
+    transaction, `reconcile_document_count_for_cc_pair` relies on that."""
+    # always lock the counter rows in the same order to avoid deadlocks
+    for (connector_id, credential_id), delta in sorted(count_deltas.items()):
+        if not delta:
+            continue
+
+        insert_stmt = insert(DocumentCountByConnectorCredentialPair).from_select(
+            ["cc_pair_id", "document_count"],
+            select(ConnectorCredentialPair.id, literal(delta)).where(
+                and_(
+                    ConnectorCredentialPair.connector_id == connector_id,
+                    ConnectorCredentialPair.credential_id == credential_id,
+                )
+            ),
+        )
+        db_session.execute(
+            insert_stmt.on_conflict_do_update(
+                index_elements=[DocumentCountByConnectorCredentialPair.cc_pair_id],
+                set_={
+                    "document_count": DocumentCountByConnectorCredentialPair.document_count
+                    + insert_stmt.excluded.document_count
+                },
+            )
+        )
+
+
+def reconcile_document_count_for_cc_pair(
+    db_session: Session, cc_pair_id: int
+) -> tuple[int, int] | None:
+    """Recounts the indexed documents of the cc pair and fixes its counter if it
+    drifted. Returns (tracked count, actual count), None if the cc pair doesn't exist.
+
+    The counter row is locked before counting. Transactions that change documents update
+    the counter after the documents, so they either committed before the lock was granted
+    (and are part of the count, READ COMMITTED takes a new snapshot per statement) or
+    can only apply their delta after we are done."""
+    cc_pair = get_connector_credential_pair_from_id(
+        db_session=db_session, cc_pair_id=cc_pair_id
+    )
+    if not cc_pair:
+        return None
+
+    db_session.execute(
+        insert(DocumentCountByConnectorCredentialPair)
+        .values(cc_pair_id=cc_pair_id, document_count=0)
+        .on_conflict_do_nothing()
+    )
+    counter = db_session.scalars(
+        select(DocumentCountByConnectorCredentialPair)
+        .where(DocumentCountByConnectorCredentialPair.cc_pair_id == cc_pair_id)
+        .with_for_update()
+    ).one()
+    tracked_count = counter.document_count
+
+    actual_count = count_indexed_documents_for_cc_pair(
+        db_session, cc_pair.connector_id, cc_pair.credential_id
+    )
+    counter.document_count = actual_count
+    counter.time_reconciled = datetime.now(timezone.utc)
+    db_session.commit()
+
+    return tracked_count, actual_count
+
+
 # For use with our thread-level parallelism utils. Note that any relationships
 # you wish to use MUST be eagerly loaded, as the session will not be available
 # after this function to allow lazy loading.
@@ -452,17 +540,21 @@ def mark_document_as_indexed_for_cc_pair__no_commit(
     document_ids: Iterable[str],
 ) -> None:
     """Should be called only after a successful index operation for a batch."""
-    db_session.execute(
+    result = db_session.execute(
         update(DocumentByConnectorCredentialPair)
         .where(
             and_(
                 DocumentByConnectorCredentialPair.connector_id == connector_id,
                 DocumentByConnectorCredentialPair.credential_id == credential_id,
                 DocumentByConnectorCredentialPair.id.in_(document_ids),
+                DocumentByConnectorCredentialPair.has_been_indexed.is_(False),
             )
         )
         .values(has_been_indexed=True)
     )
+    update_document_counts_for_cc_pairs__no_commit(
+        db_session, {(connector_id, credential_id): result.rowcount}  # type: ignore
+    )
 
 
 def update_docs_updated_at__no_commit(
@@ -528,6 +620,21 @@ def mark_document_as_synced(document_id: str, db_session: Session) -> None:
     db_session.commit()
 
 
+def mark_documents_as_synced(document_ids: list[str], db_session: Session) -> None:
+    """Marks all of the given documents as synced in a single transaction.
+    Document ids that no longer exist are ignored."""
+    if not document_ids:
+        return
+
+    stmt = (
+        update(DbDocument)
+        .where(DbDocument.id.in_(document_ids))
+        .values(last_synced=datetime.now(timezone.utc))
+    )
+    db_session.execute(stmt)
+    db_session.commit()
+
+
 def delete_document_by_connector_credential_pair__no_commit(
     db_session: Session,
     document_id: str,
@@ -571,7 +678,20 @@ def delete_documents_by_connector_credential_pair__no_commit(
                 == connector_credential_pair_identifier.credential_id,
             )
         )
-    db_session.execute(stmt)
+    deleted_rows = db_session.execute(
+        stmt.returning(
+            DocumentByConnectorCredentialPair.connector_id,
+            DocumentByConnectorCredentialPair.credential_id,
+            DocumentByConnectorCredentialPair.has_been_indexed,
+        )
+    ).all()
+
+    count_deltas: dict[tuple[int, int], int] = {}
+    for connector_id, credential_id, has_been_indexed in deleted_rows:
+        if has_been_indexed:
+            key = (connector_id, credential_id)
+            count_deltas[key] = count_deltas.get(key, 0) - 1
+    update_document_counts_for_cc_pairs__no_commit(db_session, count_deltas)
 
 
 def delete_all_documents_by_connector_credential_pair__no_commit(
@@ -595,6 +715,21 @@ def delete_all_documents_by_connector_credential_pair__no_commit(
     )
     db_session.execute(stmt)
 
+    db_session.execute(
+        update(DocumentCountByConnectorCredentialPair)
+        .where(
+            DocumentCountByConnectorCredentialPair.cc_pair_id.in_(
+                select(ConnectorCredentialPair.id).where(
+                    and_(
+                        ConnectorCredentialPair.connector_id == connector_id,
+                        ConnectorCredentialPair.credential_id == credential_id,
+                    )
+                )
+            )
+        )
+        .values(document_count=0)
+    )
+
 
 def delete_documents__no_commit(db_session: Session, document_ids: list[str]) -> None:
     db_session.execute(delete(DbDocument).where(DbDocument.id.in_(document_ids)))
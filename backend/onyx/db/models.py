@@ -604,6 +604,25 @@ class Document(Base):
     )
 
 
+class ChunkEmbeddingCache(Base):
+    """Embeddings of texts that have been sent to the embedding model during indexing.
+    `content_hash` covers the exact text as well as the model settings, so a re-index of
+    unchanged content can skip the embedding model entirely."""
+
+    __tablename__ = "chunk_embedding_cache"
+
+    content_hash: Mapped[str] = mapped_column(String, primary_key=True)
+    # float32 values, packed
+    embedding: Mapped[bytes] = mapped_column(LargeBinary, nullable=False)
+    time_created: Mapped[datetime.datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now()
+    )
+    # refreshed at most daily on cache hits, rows unused for a long time are pruned
+    time_last_used: Mapped[datetime.datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), index=True
+    )
+
+
 class ChunkStats(Base):
     __tablename__ = "chunk_stats"
     # NOTE: if more sensitive data is added here for display, make sure to add user/group permission
@@ -1159,6 +1178,25 @@ class DocumentByConnectorCredentialPair(Base):
     )
 
 
+class DocumentCountByConnectorCredentialPair(Base):
+    """Number of documents indexed for a cc pair, i.e. the number of its
+    DocumentByConnectorCredentialPair rows with has_been_indexed set. Maintained in the
+    same transactions that index or delete documents, so that reading the counts doesn't
+    require counting millions of rows, and periodically reconciled with the real count.
+    """
+
+    __tablename__ = "document_count_by_connector_credential_pair"
+
+    cc_pair_id: Mapped[int] = mapped_column(
+        ForeignKey("connector_credential_pair.id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    document_count: Mapped[int] = mapped_column(Integer, default=0)
+    time_reconciled: Mapped[datetime.datetime | None] = mapped_column(
+        DateTime(timezone=True), nullable=True
+    )
+
+
 """
 Messages Tables
 """
@@ -1319,7 +1357,7 @@ class ChatMessage(Base):
 
     id: Mapped[int] = mapped_column(primary_key=True)
     chat_session_id: Mapped[UUID] = mapped_column(
-        PGUUID(as_uuid=True), ForeignKey("chat_session.id")
+        PGUUID(as_uuid=True), ForeignKey("chat_session.id"), index=True
     )
 
     alternate_assistant_id = mapped_column(
@@ -2061,7 +2099,12 @@ class PGFileStore(Base):
     file_origin: Mapped[FileOrigin] = mapped_column(Enum(FileOrigin, native_enum=False))
     file_type: Mapped[str] = mapped_column(String, default="text/plain")
     file_metadata: Mapped[JSON_ro] = mapped_column(postgresql.JSONB(), nullable=True)
-    lobj_oid: Mapped[int] = mapped_column(Integer, nullable=False)
+    # the content lives either in a Postgres large object or, for the object storage
+    # backed file stores, in a blob under `object_key`
+    lobj_oid: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    object_key: Mapped[str | None] = mapped_column(String, nullable=True, index=True)
+    # sha256 of the content, blobs are content addressed and shared between files
+    content_hash: Mapped[str | None] = mapped_column(String, nullable=True)
 
 
 class AgentSearchMetrics(Base):
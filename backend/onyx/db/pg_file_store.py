@@ -1,8 +1,10 @@
 import tempfile
 from io import BytesIO
+from typing import cast
 from typing import IO
 
 from psycopg2.extensions import connection
+from sqlalchemy import func
 from sqlalchemy.orm import Session
 from sqlalchemy.sql import and_
 from sqlalchemy.sql import select
@@ -41,6 +43,58 @@ def get_pgfilestore_by_file_name(
     return pgfilestore
 
 
+def get_pgfilestores_by_file_names(
+    file_names: list[str],
+    db_session: Session,
+) -> list[PGFileStore]:
+    """Files that do not exist are left out of the result."""
+    if not file_names:
+        return []
+    return list(
+        db_session.scalars(
+            select(PGFileStore).where(PGFileStore.file_name.in_(file_names))
+        )
+    )
+
+
+def get_pgfilestores_with_lobj(
+    limit: int,
+    db_session: Session,
+    after_file_name: str | None = None,
+) -> list[PGFileStore]:
+    """Files whose content is still kept in a Postgres large object, ordered by file
+    name and starting after `after_file_name` if given."""
+    stmt = select(PGFileStore).where(PGFileStore.lobj_oid.is_not(None))
+    if after_file_name is not None:
+        stmt = stmt.where(PGFileStore.file_name > after_file_name)
+    return list(db_session.scalars(stmt.order_by(PGFileStore.file_name).limit(limit)))
+
+
+def lock_object_key__no_commit(
+    object_key: str,
+    db_session: Session,
+) -> None:
+    """Serializes storing and deleting the blob of `object_key` across sessions. The
+    lock is held until the transaction of `db_session` ends."""
+    db_session.execute(
+        select(func.pg_advisory_xact_lock(func.hashtextextended(object_key, 0)))
+    )
+
+
+def count_pgfilestores_by_object_key(
+    object_key: str,
+    db_session: Session,
+) -> int:
+    return (
+        db_session.scalar(
+            select(func.count())
+            .select_from(PGFileStore)
+            .where(PGFileStore.object_key == object_key)
+        )
+        or 0
+    )
+
+
 def delete_pgfilestore_by_file_name(
     file_name: str,
     db_session: Session,
@@ -99,29 +153,44 @@ def read_lobj(
         return BytesIO(large_object.read())
 
 
-def delete_lobj_by_id(
+def read_lobj_range(
     lobj_oid: int,
     db_session: Session,
-) -> None:
+    start: int = 0,
+    end: int | None = None,
+) -> IO[bytes]:
+    """Copies the bytes [start, end) of the large object into a temporary file, chunk
+    by chunk, so that they can still be read after the session is closed."""
     pg_conn = get_pg_conn_from_session(db_session)
-    pg_conn.lobject(lobj_oid).unlink()
+    large_object = pg_conn.lobject(lobj_oid, mode="rb")
+    large_object.seek(start)
+
+    remaining = None if end is None else max(0, end - start)
+    temp_file = tempfile.SpooledTemporaryFile(max_size=MAX_IN_MEMORY_SIZE)
+    while remaining is None or remaining > 0:
+        size = (
+            STANDARD_CHUNK_SIZE
+            if remaining is None
+            else min(STANDARD_CHUNK_SIZE, remaining)
+        )
+        chunk = large_object.read(size)
+        if not chunk:
+            break
+        temp_file.write(chunk)
+        if remaining is not None:
+            remaining -= len(chunk)
+    large_object.close()
 
+    temp_file.seek(0)
+    return cast(IO[bytes], temp_file)
 
-def delete_lobj_by_name(
-    lobj_name: str,
+
+def delete_lobj_by_id(
+    lobj_oid: int,
     db_session: Session,
 ) -> None:
-    try:
-        pgfilestore = get_pgfilestore_by_file_name(lobj_name, db_session)
-    except RuntimeError:
-        logger.info(f"no file with name {lobj_name} found")
-        return
-
     pg_conn = get_pg_conn_from_session(db_session)
-    pg_conn.lobject(pgfilestore.lobj_oid).unlink()
-
-    delete_pgfilestore_by_file_name(lobj_name, db_session)
-    db_session.commit()
+    pg_conn.lobject(lobj_oid).unlink()
 
 
 def upsert_pgfilestore(
@@ -129,25 +198,33 @@ def upsert_pgfilestore(
     display_name: str | None,
     file_origin: FileOrigin,
     file_type: str,
-    lobj_oid: int,
+    lobj_oid: int | None,
     db_session: Session,
     commit: bool = False,
     file_metadata: dict | None = None,
+    object_key: str | None = None,
+    content_hash: str | None = None,
 ) -> PGFileStore:
+    """The content is either in the large object `lobj_oid` or in the blob
+    `object_key`. Replacing the blob of an existing file does not delete the old blob,
+    blobs may be shared so that is left to the file store."""
     pgfilestore = db_session.query(PGFileStore).filter_by(file_name=file_name).first()
 
     if pgfilestore:
-        try:
-            # This should not happen in normal execution
-            delete_lobj_by_id(lobj_oid=pgfilestore.lobj_oid, db_session=db_session)
-        except Exception:
-            # If the delete fails as well, the large object doesn't exist anyway and even if it
-            # fails to delete, it's not too terrible as most files sizes are insignificant
-            logger.error(
-                f"Failed to delete large object with oid {pgfilestore.lobj_oid}"
-            )
+        if pgfilestore.lobj_oid is not None:
+            try:
+                # This should not happen in normal execution
+                delete_lobj_by_id(lobj_oid=pgfilestore.lobj_oid, db_session=db_session)
+            except Exception:
+                # If the delete fails as well, the large object doesn't exist anyway and even if it
+                # fails to delete, it's not too terrible as most files sizes are insignificant
+                logger.error(
+                    f"Failed to delete large object with oid {pgfilestore.lobj_oid}"
+                )
 
         pgfilestore.lobj_oid = lobj_oid
+        pgfilestore.object_key = object_key
+        pgfilestore.content_hash = content_hash
     else:
         pgfilestore = PGFileStore(
             file_name=file_name,
@@ -156,6 +233,8 @@ def upsert_pgfilestore(
             file_type=file_type,
             file_metadata=file_metadata,
             lobj_oid=lobj_oid,
+            object_key=object_key,
+            content_hash=content_hash,
         )
         db_session.add(pgfilestore)
 
@@ -165,31 +244,6 @@ def upsert_pgfilestore(
     return pgfilestore
 
 
-def save_bytes_to_pgfilestore(
-    db_session: Session,
-    raw_bytes: bytes,
-    media_type: str,
-    identifier: str,
-    display_name: str,
-    file_origin: FileOrigin = FileOrigin.OTHER,
-) -> PGFileStore:
-    """
-    Saves raw bytes to PGFileStore and returns the resulting record.
-    """
-    file_name = f"{file_origin.name.lower()}_{identifier}"
-    lobj_oid = create_populate_lobj(BytesIO(raw_bytes), db_session)
-    pgfilestore = upsert_pgfilestore(
-        file_name=file_name,
-        display_name=display_name,
-        file_origin=file_origin,
-        file_type=media_type,
-        lobj_oid=lobj_oid,
-        db_session=db_session,
-        commit=True,
-    )
-    return pgfilestore
-
-
 def get_query_history_export_files(
     db_session: Session,
 ) -> list[PGFileStore]:
@@ -10,6 +10,7 @@ from onyx.context.search.models import IndexFilters
 from onyx.context.search.models import InferenceChunkUncleaned
 from onyx.db.enums import EmbeddingPrecision
 from onyx.indexing.models import DocMetadataAwareIndexChunk
+from onyx.utils.threadpool_concurrency import run_functions_tuples_in_parallel
 from shared_configs.model_server_models import Embedding
 
 
@@ -38,6 +39,22 @@ class VespaChunkRequest:
         return None
 
 
+@dataclass(frozen=True)
+class HybridRetrievalRequest:
+    """The arguments of a single `hybrid_retrieval` call, see there for details"""
+
+    query: str
+    query_embedding: Embedding
+    final_keywords: list[str] | None
+    filters: IndexFilters
+    hybrid_alpha: float
+    time_decay_multiplier: float
+    num_to_retrieve: int
+    ranking_profile_type: QueryExpansionType
+    offset: int = 0
+    title_content_ratio: float | None = TITLE_CONTENT_RATIO
+
+
 @dataclass
 class IndexBatchParams:
     """
@@ -116,6 +133,33 @@ class VespaDocumentUserFields:
     user_folder_id: str | None = None
 
 
+@dataclass
+class DocumentFieldsUpdate:
+    """
+    Fields to update for all chunks of a single document, see `Updatable.update_multiple`.
+    """
+
+    doc_id: str
+    chunk_count: int | None
+    fields: VespaDocumentFields | None = None
+    user_fields: VespaDocumentUserFields | None = None
+
+
+@dataclass
+class DocumentUpdateResult:
+    doc_id: str
+    chunks_affected: int = 0
+    # set if any of the document's chunks could not be updated
+    error: str | None = None
+    # False if the update itself was rejected (e.g. a 400 from Vespa), retrying it
+    # won't help
+    retryable: bool = True
+
+    @property
+    def succeeded(self) -> bool:
+        return self.error is None
+
+
 @dataclass
 class UpdateRequest:
     """
@@ -289,6 +333,39 @@ class Updatable(abc.ABC):
         """
         raise NotImplementedError
 
+    def update_multiple(
+        self,
+        updates: list[DocumentFieldsUpdate],
+        *,
+        tenant_id: str,
+    ) -> list[DocumentUpdateResult]:
+        """
+        Bulk version of `update_single`. A failure only affects the document it happened
+        for, the outcome of every document is reported in the returned results (in the
+        same order as `updates`).
+
+        Implementations should override this with something faster than the default of
+        calling `update_single` for one document after the other.
+        """
+        results: list[DocumentUpdateResult] = []
+        for update in updates:
+            try:
+                chunks_affected = self.update_single(
+                    update.doc_id,
+                    tenant_id=tenant_id,
+                    chunk_count=update.chunk_count,
+                    fields=update.fields,
+                    user_fields=update.user_fields,
+                )
+                results.append(
+                    DocumentUpdateResult(
+                        doc_id=update.doc_id, chunks_affected=chunks_affected
+                    )
+                )
+            except Exception as e:
+                results.append(DocumentUpdateResult(doc_id=update.doc_id, error=str(e)))
+        return results
+
     @abc.abstractmethod
     def update(self, update_requests: list[UpdateRequest], *, tenant_id: str) -> None:
         """
@@ -386,6 +463,37 @@ class HybridCapable(abc.ABC):
         """
         raise NotImplementedError
 
+    def batch_hybrid_retrieval(
+        self, requests: list[HybridRetrievalRequest]
+    ) -> list[list[InferenceChunkUncleaned]]:
+        """
+        Runs several hybrid searches, e.g. for the rephrasings of a question, returning the
+        chunks of each in the order of the requests.
+
+        The default runs the searches in parallel, implementations can override this to
+        send them in fewer round trips.
+        """
+        return run_functions_tuples_in_parallel(
+            [
+                (
+                    self.hybrid_retrieval,
+                    (
+                        request.query,
+                        request.query_embedding,
+                        request.final_keywords,
+                        request.filters,
+                        request.hybrid_alpha,
+                        request.time_decay_multiplier,
+                        request.num_to_retrieve,
+                        request.ranking_profile_type,
+                        request.offset,
+                        request.title_content_ratio,
+                    ),
+                )
+                for request in requests
+            ]
+        )
+
 
 class AdminCapable(abc.ABC):
     """
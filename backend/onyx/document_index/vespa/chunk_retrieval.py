@@ -2,6 +2,7 @@ import json
 import string
 from collections.abc import Callable
 from collections.abc import Mapping
+from collections.abc import Sequence
 from datetime import datetime
 from datetime import timezone
 from typing import Any
@@ -14,6 +15,8 @@ from onyx.configs.app_configs import LOG_VESPA_TIMING_INFORMATION
 from onyx.context.search.models import IndexFilters
 from onyx.context.search.models import InferenceChunkUncleaned
 from onyx.document_index.interfaces import VespaChunkRequest
+from onyx.document_index.vespa.shared_utils.utils import build_document_id_selection
+from onyx.document_index.vespa.shared_utils.utils import get_pooled_vespa_http_client
 from onyx.document_index.vespa.shared_utils.utils import get_vespa_http_client
 from onyx.document_index.vespa.shared_utils.vespa_request_builders import (
     build_vespa_filters,
@@ -37,6 +40,7 @@ from onyx.document_index.vespa_constants import IMAGE_FILE_NAME
 from onyx.document_index.vespa_constants import LARGE_CHUNK_REFERENCE_IDS
 from onyx.document_index.vespa_constants import MAX_ID_SEARCH_QUERY_SIZE
 from onyx.document_index.vespa_constants import MAX_OR_CONDITIONS
+from onyx.document_index.vespa_constants import MAX_VISIT_SELECTION_DOCUMENTS
 from onyx.document_index.vespa_constants import METADATA
 from onyx.document_index.vespa_constants import METADATA_SUFFIX
 from onyx.document_index.vespa_constants import PRIMARY_OWNERS
@@ -48,6 +52,7 @@ from onyx.document_index.vespa_constants import SEMANTIC_IDENTIFIER
 from onyx.document_index.vespa_constants import SOURCE_LINKS
 from onyx.document_index.vespa_constants import SOURCE_TYPE
 from onyx.document_index.vespa_constants import TITLE
+from onyx.document_index.vespa_constants import VISIT_API_MAX_CONCURRENCY
 from onyx.document_index.vespa_constants import YQL_BASE
 from onyx.utils.logger import setup_logger
 from onyx.utils.threadpool_concurrency import run_functions_tuples_in_parallel
@@ -153,13 +158,28 @@ def _vespa_hit_to_inference_chunk(
     )
 
 
-def _get_chunks_via_visit_api(
+def _build_visit_selection(
     chunk_request: VespaChunkRequest,
     index_name: str,
+) -> str:
+    selection = build_document_id_selection(index_name, chunk_request.document_id)
+
+    if chunk_request.is_capped:
+        selection += f" and {index_name}.chunk_id>={chunk_request.min_chunk_ind or 0}"
+        selection += f" and {index_name}.chunk_id<={chunk_request.max_chunk_ind}"
+    return selection
+
+
+def _get_chunks_via_visit_api(
+    chunk_requests: list[VespaChunkRequest],
+    index_name: str,
     filters: IndexFilters,
+    http_client: httpx.Client,
     field_names: list[str] | None = None,
     get_large_chunks: bool = False,
 ) -> list[dict]:
+    """Retrieves the chunks for all of the requests with a single visit selection
+    (paginated via the continuation token)."""
     # Constructing the URL for the Visit API
     # NOTE: visit API uses the same URL as the document API, but with different params
     url = DOCUMENT_ID_ENDPOINT.format(index_name=index_name)
@@ -180,13 +200,12 @@ def _get_chunks_via_visit_api(
     field_set = ",".join(field_set_list) if field_set_list else None
 
     # build filters
-    selection = f"{index_name}.document_id=='{chunk_request.document_id}'"
-
-    if chunk_request.is_capped:
-        selection += f" and {index_name}.chunk_id>={chunk_request.min_chunk_ind or 0}"
-        selection += f" and {index_name}.chunk_id<={chunk_request.max_chunk_ind}"
+    selection = " or ".join(
+        f"({_build_visit_selection(chunk_request, index_name)})"
+        for chunk_request in chunk_requests
+    )
     if not get_large_chunks:
-        selection += f" and {index_name}.large_chunk_reference_ids == null"
+        selection = f"({selection}) and {index_name}.large_chunk_reference_ids == null"
 
     # Setting up the selection criteria in the query parameters
     params = {
@@ -202,9 +221,8 @@ def _get_chunks_via_visit_api(
     while True:
         try:
             filtered_params = {k: v for k, v in params.items() if v is not None}
-            with get_vespa_http_client() as http_client:
-                response = http_client.get(url, params=filtered_params)
-                response.raise_for_status()
+            response = http_client.get(url, params=filtered_params)
+            response.raise_for_status()
         except httpx.HTTPError as e:
             error_base = "Failed to query Vespa"
             logger.error(
@@ -262,17 +280,32 @@ def parallel_visit_api_retrieval(
     chunk_requests: list[VespaChunkRequest],
     filters: IndexFilters,
     get_large_chunks: bool = False,
+    http_client: httpx.Client | None = None,
 ) -> list[InferenceChunkUncleaned]:
+    """Requests are combined into selections of up to MAX_VISIT_SELECTION_DOCUMENTS
+    documents, so a retrieval takes a roughly constant number of visits. The visits run
+    with bounded concurrency over a single (pooled by default) http client."""
+    http_client = http_client or get_pooled_vespa_http_client()
+
     functions_with_args: list[tuple[Callable, tuple]] = [
         (
             _get_chunks_via_visit_api,
-            (chunk_request, index_name, filters, get_large_chunks),
+            (
+                chunk_requests[start : start + MAX_VISIT_SELECTION_DOCUMENTS],
+                index_name,
+                filters,
+                http_client,
+                None,
+                get_large_chunks,
+            ),
         )
-        for chunk_request in chunk_requests
+        for start in range(0, len(chunk_requests), MAX_VISIT_SELECTION_DOCUMENTS)
     ]
 
     parallel_results = run_functions_tuples_in_parallel(
-        functions_with_args, allow_failures=True
+        functions_with_args,
+        allow_failures=True,
+        max_workers=VISIT_API_MAX_CONCURRENCY,
     )
 
     # Any failures to retrieve would give a None, drop the Nones and empty lists
@@ -282,6 +315,18 @@ def parallel_visit_api_retrieval(
     for chunk_set in vespa_chunk_sets:
         flattened_vespa_chunks.extend(chunk_set)
 
+    # A selection returns chunks in no particular document order, callers rely on
+    # the documents coming back in the order they were requested in
+    document_order = {
+        chunk_request.document_id: ind
+        for ind, chunk_request in reversed(list(enumerate(chunk_requests)))
+    }
+    flattened_vespa_chunks.sort(
+        key=lambda chunk: document_order.get(
+            chunk["fields"].get(DOCUMENT_ID), len(document_order)
+        )
+    )
+
     inference_chunks = [
         _vespa_hit_to_inference_chunk(chunk, null_score=True)
         for chunk in flattened_vespa_chunks
@@ -293,6 +338,7 @@ def parallel_visit_api_retrieval(
 @retry(tries=3, delay=1, backoff=2)
 def query_vespa(
     query_params: Mapping[str, str | int | float],
+    http_client: httpx.Client | None = None,
 ) -> list[InferenceChunkUncleaned]:
     if "query" in query_params and not cast(str, query_params["query"]).strip():
         raise ValueError("No/empty query received")
@@ -309,9 +355,12 @@ def query_vespa(
     )
 
     try:
-        with get_vespa_http_client() as http_client:
+        if http_client is None:
+            with get_vespa_http_client() as own_http_client:
+                response = own_http_client.post(SEARCH_ENDPOINT, json=params)
+        else:
             response = http_client.post(SEARCH_ENDPOINT, json=params)
-            response.raise_for_status()
+        response.raise_for_status()
     except httpx.HTTPError as e:
         error_base = "Failed to query Vespa"
         logger.error(
@@ -369,6 +418,20 @@ def query_vespa(
     return inference_chunks
 
 
+def batch_query_vespa(
+    query_params_list: Sequence[Mapping[str, str | int | float]],
+) -> list[list[InferenceChunkUncleaned]]:
+    """Sends the queries concurrently over the pooled http client, instead of opening a
+    connection per query. The chunks of each query are returned in order."""
+    http_client = get_pooled_vespa_http_client()
+    return run_functions_tuples_in_parallel(
+        [
+            (query_vespa, (query_params, http_client))
+            for query_params in query_params_list
+        ]
+    )
+
+
 def _get_chunks_via_batch_search(
     index_name: str,
     chunk_requests: list[VespaChunkRequest],
@@ -0,0 +1,188 @@
+import concurrent.futures
+import threading
+import time
+from collections.abc import Iterable
+from dataclasses import dataclass
+from dataclasses import field
+from http import HTTPStatus
+from typing import Any
+
+import httpx
+
+from onyx.configs.app_configs import VESPA_FEED_MAX_IN_FLIGHT
+from onyx.utils.logger import setup_logger
+
+logger = setup_logger()
+
+
+# Vespa signals that it is temporarily overloaded with these, the operation should
+# be retried after backing off instead of failing the whole feed
+RETRYABLE_FEED_STATUS_CODES = {
+    HTTPStatus.TOO_MANY_REQUESTS,
+    HTTPStatus.SERVICE_UNAVAILABLE,
+    HTTPStatus.GATEWAY_TIMEOUT,
+}
+
+
+@dataclass
+class VespaFeedOperation:
+    document_id: str
+    url: str
+    method: str
+    body: dict[str, Any] | None = None
+
+
+@dataclass
+class VespaFeedStats:
+    operations: int = 0
+    retries: int = 0
+    elapsed: float = 0.0
+    status_counts: dict[int, int] = field(default_factory=dict)
+    # document id -> error of the first operation that failed for it, only filled in
+    # when the client does not raise on errors
+    failures: dict[str, str] = field(default_factory=dict)
+    # the failed documents that Vespa rejected with a client error (4xx), sending the
+    # same operation again won't succeed
+    client_error_failures: set[str] = field(default_factory=set)
+
+    @property
+    def operations_per_second(self) -> float:
+        if not self.elapsed:
+            return 0.0
+        return self.operations / self.elapsed
+
+
+class VespaFeedClient:
+    """Streams document/v1 operations to Vespa, modeled after the official feed client.
+
+    Operations are pulled lazily from an iterable and sent over a single (HTTP/2)
+    client while keeping at most `max_in_flight` operations outstanding. Unlike the
+    batch based helpers, a slow operation does not hold back the next batch, so the
+    pipe to Vespa stays full. Overload responses (429/503/504) and transport errors are
+    retried per operation with exponential backoff; any other error stops the feed and
+    is raised to the caller. With `raise_on_error=False` the feed continues instead and
+    the failed documents are recorded in `stats.failures`.
+
+    The http client's lifecycle is owned by the caller."""
+
+    def __init__(
+        self,
+        http_client: httpx.Client,
+        max_in_flight: int = VESPA_FEED_MAX_IN_FLIGHT,
+        max_retries: int = 5,
+        initial_backoff: float = 0.5,
+        max_backoff: float = 10.0,
+        raise_on_error: bool = True,
+    ) -> None:
+        self._http_client = http_client
+        self._max_in_flight = max(1, max_in_flight)
+        self._max_retries = max_retries
+        self._initial_backoff = initial_backoff
+        self._max_backoff = max_backoff
+        self._raise_on_error = raise_on_error
+
+        self.stats = VespaFeedStats()
+        self._stats_lock = threading.Lock()
+
+    def _backoff(self, attempt: int) -> None:
+        with self._stats_lock:
+            self.stats.retries += 1
+        time.sleep(min(self._initial_backoff * (2**attempt), self._max_backoff))
+
+    def _send(self, operation: VespaFeedOperation) -> httpx.Response:
+        attempt = 0
+        while True:
+            try:
+                response = self._http_client.request(
+                    operation.method,
+                    operation.url,
+                    headers={"Content-Type": "application/json"},
+                    json=operation.body,
+                )
+            except httpx.TransportError:
+                if attempt >= self._max_retries:
+                    raise
+                self._backoff(attempt)
+                attempt += 1
+                continue
+
+            if (
+                response.status_code in RETRYABLE_FEED_STATUS_CODES
+                and attempt < self._max_retries
+            ):
+                self._backoff(attempt)
+                attempt += 1
+                continue
+
+            try:
+                response.raise_for_status()
+            except httpx.HTTPStatusError:
+                logger.error(
+                    f"Failed to feed operation: "
+                    f"method={operation.method} "
+                    f"document_id={operation.document_id} "
+                    f"status={response.status_code} "
+                    f"response={response.text}"
+                )
+                if response.status_code == HTTPStatus.INSUFFICIENT_STORAGE:
+                    logger.error(
+                        "NOTE: HTTP Status 507 Insufficient Storage usually means "
+                        "you need to allocate more memory or disk space to the "
+                        "Vespa/index container."
+                    )
+                raise
+
+            return response
+
+    def _collect(
+        self,
+        future: concurrent.futures.Future[httpx.Response],
+        operation: VespaFeedOperation,
+    ) -> None:
+        try:
+            # Will raise if the operation failed after all retries
+            response = future.result()
+        except Exception as e:
+            if self._raise_on_error:
+                raise
+            self.stats.failures.setdefault(operation.document_id, str(e))
+            if isinstance(e, httpx.HTTPStatusError) and e.response.is_client_error:
+                self.stats.client_error_failures.add(operation.document_id)
+            return
+
+        self.stats.operations += 1
+        self.stats.status_counts[response.status_code] = (
+            self.stats.status_counts.get(response.status_code, 0) + 1
+        )
+
+    def feed(self, operations: Iterable[VespaFeedOperation]) -> VespaFeedStats:
+        start = time.monotonic()
+
+        in_flight: dict[
+            concurrent.futures.Future[httpx.Response], VespaFeedOperation
+        ] = {}
+        with concurrent.futures.ThreadPoolExecutor(
+            max_workers=self._max_in_flight
+        ) as executor:
+            try:
+                for operation in operations:
+                    if len(in_flight) >= self._max_in_flight:
+                        done, _ = concurrent.futures.wait(
+                            in_flight, return_when=concurrent.futures.FIRST_COMPLETED
+                        )
+                        for future in done:
+                            self._collect(future, in_flight.pop(future))
+
+                    in_flight[executor.submit(self._send, operation)] = operation
+
+                for future in concurrent.futures.as_completed(list(in_flight)):
+                    self._collect(future, in_flight.pop(future))
+            except Exception:
+                # don't keep feeding once an operation has permanently failed
+                for future in in_flight:
+                    future.cancel()
+                raise
+            finally:
+                self.stats.elapsed += time.monotonic() - start
+
+        return self.stats
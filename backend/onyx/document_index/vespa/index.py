@@ -7,6 +7,7 @@ import re
 import time
 import urllib
 import zipfile
+from collections.abc import Iterator
 from dataclasses import dataclass
 from datetime import datetime
 from datetime import timedelta
@@ -21,6 +22,7 @@ import requests  # type: ignore
 from retry import retry
 
 from onyx.agents.agent_search.shared_graph_utils.models import QueryExpansionType
+from onyx.configs.app_configs import VESPA_FEED_STREAMING_ENABLED
 from onyx.configs.chat_configs import DOC_TIME_DECAY
 from onyx.configs.chat_configs import NUM_RETURNED_HITS
 from onyx.configs.chat_configs import TITLE_CONTENT_RATIO
@@ -30,25 +32,35 @@ from onyx.context.search.models import IndexFilters
 from onyx.context.search.models import InferenceChunkUncleaned
 from onyx.db.enums import EmbeddingPrecision
 from onyx.document_index.document_index_utils import get_document_chunk_ids
+from onyx.document_index.interfaces import DocumentFieldsUpdate
 from onyx.document_index.interfaces import DocumentIndex
 from onyx.document_index.interfaces import DocumentInsertionRecord
+from onyx.document_index.interfaces import DocumentUpdateResult
 from onyx.document_index.interfaces import EnrichedDocumentIndexingInfo
+from onyx.document_index.interfaces import HybridRetrievalRequest
 from onyx.document_index.interfaces import IndexBatchParams
 from onyx.document_index.interfaces import MinimalDocumentIndexingInfo
 from onyx.document_index.interfaces import UpdateRequest
 from onyx.document_index.interfaces import VespaChunkRequest
 from onyx.document_index.interfaces import VespaDocumentFields
 from onyx.document_index.interfaces import VespaDocumentUserFields
+from onyx.document_index.vespa.chunk_retrieval import batch_query_vespa
 from onyx.document_index.vespa.chunk_retrieval import batch_search_api_retrieval
 from onyx.document_index.vespa.chunk_retrieval import (
     parallel_visit_api_retrieval,
 )
 from onyx.document_index.vespa.chunk_retrieval import query_vespa
 from onyx.document_index.vespa.deletion import delete_vespa_chunks
+from onyx.document_index.vespa.feed_client import VespaFeedClient
+from onyx.document_index.vespa.feed_client import VespaFeedOperation
 from onyx.document_index.vespa.indexing_utils import BaseHTTPXClientContext
 from onyx.document_index.vespa.indexing_utils import batch_index_vespa_chunks
+from onyx.document_index.vespa.indexing_utils import (
+    build_vespa_chunk_feed_operations,
+)
 from onyx.document_index.vespa.indexing_utils import check_for_final_chunk_existence
 from onyx.document_index.vespa.indexing_utils import clean_chunk_id_copy
+from onyx.document_index.vespa.indexing_utils import get_existing_document_ids
 from onyx.document_index.vespa.indexing_utils import GlobalHTTPXClientContext
 from onyx.document_index.vespa.indexing_utils import TemporaryHTTPXClientContext
 from onyx.document_index.vespa.shared_utils.utils import get_vespa_http_client
@@ -126,6 +138,40 @@ def add_ngrams_to_schema(schema_content: str) -> str:
     return schema_content
 
 
+def _build_update_dict(
+    fields: VespaDocumentFields | None,
+    user_fields: VespaDocumentUserFields | None,
+) -> dict[str, dict]:
+    """Builds the body of a Vespa partial update that assigns all set fields."""
+    update_dict: dict[str, dict] = {"fields": {}}
+
+    if fields is not None:
+        if fields.boost is not None:
+            update_dict["fields"][BOOST] = {"assign": fields.boost}
+
+        if fields.document_sets is not None:
+            update_dict["fields"][DOCUMENT_SETS] = {
+                "assign": {document_set: 1 for document_set in fields.document_sets}
+            }
+
+        if fields.access is not None:
+            update_dict["fields"][ACCESS_CONTROL_LIST] = {
+                "assign": {acl_entry: 1 for acl_entry in fields.access.to_acl()}
+            }
+
+        if fields.hidden is not None:
+            update_dict["fields"][HIDDEN] = {"assign": fields.hidden}
+
+    if user_fields is not None:
+        if user_fields.user_file_id is not None:
+            update_dict["fields"][USER_FILE] = {"assign": user_fields.user_file_id}
+
+        if user_fields.user_folder_id is not None:
+            update_dict["fields"][USER_FOLDER] = {"assign": user_fields.user_folder_id}
+
+    return update_dict
+
+
 class VespaIndex(DocumentIndex):
 
     VESPA_SCHEMA_JINJA_FILENAME = "danswer_chunk.sd.jinja"
@@ -393,59 +439,70 @@ class VespaIndex(DocumentIndex):
 
         existing_docs: set[str] = set()
 
-        # NOTE: using `httpx` here since `requests` doesn't support HTTP2. This is beneficial for
-        # indexing / updates / deletes since we have to make a large volume of requests.
-        with (
-            concurrent.futures.ThreadPoolExecutor(max_workers=NUM_THREADS) as executor,
-            self.httpx_client_context as http_client,
-        ):
-            # We require the start and end index for each document in order to
-            # know precisely which chunks to delete. This information exists for
-            # documents that have `chunk_count` in the database, but not for
-            # `old_version` documents.
-
-            enriched_doc_infos: list[EnrichedDocumentIndexingInfo] = [
-                VespaIndex.enrich_basic_chunk_info(
-                    index_name=self.index_name,
-                    http_client=http_client,
-                    document_id=doc_id,
-                    previous_chunk_count=doc_id_to_previous_chunk_cnt.get(doc_id, 0),
-                    new_chunk_count=doc_id_to_new_chunk_cnt.get(doc_id, 0),
-                )
-                for doc_id in doc_id_to_new_chunk_cnt.keys()
-            ]
-
-            for cleaned_doc_info in enriched_doc_infos:
-                # If the document has previously indexed chunks, we know it previously existed
-                if cleaned_doc_info.chunk_end_index:
-                    existing_docs.add(cleaned_doc_info.doc_id)
-
-            # Now, for each doc, we know exactly where to start and end our deletion
-            # So let's generate the chunk IDs for each chunk to delete
-            chunks_to_delete = get_document_chunk_ids(
-                enriched_document_info_list=enriched_doc_infos,
-                tenant_id=tenant_id,
-                large_chunks_enabled=large_chunks_enabled,
+        if VESPA_FEED_STREAMING_ENABLED:
+            existing_docs = self._stream_index_chunks(
+                cleaned_chunks, index_batch_params
             )
+        else:
+            # NOTE: using `httpx` here since `requests` doesn't support HTTP2. This is beneficial for
+            # indexing / updates / deletes since we have to make a large volume of requests.
+            with (
+                concurrent.futures.ThreadPoolExecutor(
+                    max_workers=NUM_THREADS
+                ) as executor,
+                self.httpx_client_context as http_client,
+            ):
+                # We require the start and end index for each document in order to
+                # know precisely which chunks to delete. This information exists for
+                # documents that have `chunk_count` in the database, but not for
+                # `old_version` documents.
+
+                enriched_doc_infos: list[EnrichedDocumentIndexingInfo] = [
+                    VespaIndex.enrich_basic_chunk_info(
+                        index_name=self.index_name,
+                        http_client=http_client,
+                        document_id=doc_id,
+                        previous_chunk_count=doc_id_to_previous_chunk_cnt.get(
+                            doc_id, 0
+                        ),
+                        new_chunk_count=doc_id_to_new_chunk_cnt.get(doc_id, 0),
+                    )
+                    for doc_id in doc_id_to_new_chunk_cnt.keys()
+                ]
 
-            # Delete old Vespa documents
-            for doc_chunk_ids_batch in batch_generator(chunks_to_delete, BATCH_SIZE):
-                delete_vespa_chunks(
-                    doc_chunk_ids=doc_chunk_ids_batch,
-                    index_name=self.index_name,
-                    http_client=http_client,
-                    executor=executor,
-                )
+                for cleaned_doc_info in enriched_doc_infos:
+                    # If the document has previously indexed chunks, we know it previously existed
+                    if cleaned_doc_info.chunk_end_index:
+                        existing_docs.add(cleaned_doc_info.doc_id)
 
-            for chunk_batch in batch_generator(cleaned_chunks, BATCH_SIZE):
-                batch_index_vespa_chunks(
-                    chunks=chunk_batch,
-                    index_name=self.index_name,
-                    http_client=http_client,
-                    multitenant=self.multitenant,
-                    executor=executor,
+                # Now, for each doc, we know exactly where to start and end our deletion
+                # So let's generate the chunk IDs for each chunk to delete
+                chunks_to_delete = get_document_chunk_ids(
+                    enriched_document_info_list=enriched_doc_infos,
+                    tenant_id=tenant_id,
+                    large_chunks_enabled=large_chunks_enabled,
                 )
 
+                # Delete old Vespa documents
+                for doc_chunk_ids_batch in batch_generator(
+                    chunks_to_delete, BATCH_SIZE
+                ):
+                    delete_vespa_chunks(
+                        doc_chunk_ids=doc_chunk_ids_batch,
+                        index_name=self.index_name,
+                        http_client=http_client,
+                        executor=executor,
+                    )
+
+                for chunk_batch in batch_generator(cleaned_chunks, BATCH_SIZE):
+                    batch_index_vespa_chunks(
+                        chunks=chunk_batch,
+                        index_name=self.index_name,
+                        http_client=http_client,
+                        multitenant=self.multitenant,
+                        executor=executor,
+                    )
+
         all_cleaned_doc_ids = {chunk.source_document.id for chunk in cleaned_chunks}
 
         return {
@@ -456,6 +513,102 @@ class VespaIndex(DocumentIndex):
             for cleaned_doc_id in all_cleaned_doc_ids
         }
 
+    def _stream_index_chunks(
+        self,
+        cleaned_chunks: list[DocMetadataAwareIndexChunk],
+        index_batch_params: IndexBatchParams,
+    ) -> set[str]:
+        """Streaming counterpart of the batched indexing path. Stale chunks are deleted
+        and new chunks written through the VespaFeedClient, and documents without a
+        known chunk count are checked for existence with one visit query instead of
+        being probed chunk by chunk.
+
+        Returns the ids of the documents that already existed in the index."""
+        doc_id_to_previous_chunk_cnt = index_batch_params.doc_id_to_previous_chunk_cnt
+        doc_id_to_new_chunk_cnt = index_batch_params.doc_id_to_new_chunk_cnt
+
+        existing_docs: set[str] = set()
+
+        with self.httpx_client_context as http_client:
+            unknown_chunk_count_doc_ids = [
+                replace_invalid_doc_id_characters(doc_id)
+                for doc_id in doc_id_to_new_chunk_cnt.keys()
+                if doc_id_to_previous_chunk_cnt.get(doc_id, 0) is None
+            ]
+            doc_ids_in_index = (
+                get_existing_document_ids(
+                    unknown_chunk_count_doc_ids, self.index_name, http_client
+                )
+                if unknown_chunk_count_doc_ids
+                else set()
+            )
+
+            enriched_doc_infos: list[EnrichedDocumentIndexingInfo] = []
+            for doc_id, new_chunk_count in doc_id_to_new_chunk_cnt.items():
+                previous_chunk_count = doc_id_to_previous_chunk_cnt.get(doc_id, 0)
+                if (
+                    previous_chunk_count is None
+                    and replace_invalid_doc_id_characters(doc_id)
+                    not in doc_ids_in_index
+                ):
+                    # same result as probing for old chunks and finding none
+                    enriched_doc_infos.append(
+                        EnrichedDocumentIndexingInfo(
+                            doc_id=doc_id,
+                            chunk_start_index=new_chunk_count,
+                            chunk_end_index=new_chunk_count,
+                            old_version=True,
+                        )
+                    )
+                    continue
+
+                enriched_doc_infos.append(
+                    VespaIndex.enrich_basic_chunk_info(
+                        index_name=self.index_name,
+                        http_client=http_client,
+                        document_id=doc_id,
+                        previous_chunk_count=previous_chunk_count,
+                        new_chunk_count=new_chunk_count,
+                    )
+                )
+
+            delete_operations: list[VespaFeedOperation] = []
+            for enriched_doc_info in enriched_doc_infos:
+                # If the document has previously indexed chunks, we know it previously existed
+                if enriched_doc_info.chunk_end_index:
+                    existing_docs.add(enriched_doc_info.doc_id)
+
+                for doc_chunk_id in get_document_chunk_ids(
+                    enriched_document_info_list=[enriched_doc_info],
+                    tenant_id=index_batch_params.tenant_id,
+                    large_chunks_enabled=index_batch_params.large_chunks_enabled,
+                ):
+                    delete_operations.append(
+                        VespaFeedOperation(
+                            document_id=enriched_doc_info.doc_id,
+                            url=f"{DOCUMENT_ID_ENDPOINT.format(index_name=self.index_name)}/{doc_chunk_id}",
+                            method="DELETE",
+                        )
+                    )
+
+            feed_client = VespaFeedClient(http_client)
+            feed_client.feed(delete_operations)
+            feed_stats = feed_client.feed(
+                build_vespa_chunk_feed_operations(
+                    cleaned_chunks, self.index_name, self.multitenant
+                )
+            )
+
+        logger.debug(
+            f"Streamed chunks to Vespa: "
+            f"operations={feed_stats.operations} "
+            f"retries={feed_stats.retries} "
+            f"elapsed={feed_stats.elapsed:.2f} "
+            f"ops_per_sec={feed_stats.operations_per_second:.1f}"
+        )
+
+        return existing_docs
+
     @classmethod
     def _apply_updates_batched(
         cls,
@@ -479,17 +632,16 @@ class VespaIndex(DocumentIndex):
 
         # NOTE: using `httpx` here since `requests` doesn't support HTTP2. This is beneficient for
         # indexing / updates / deletes since we have to make a large volume of requests.
+        # NOTE: the caller owns the client's lifecycle (it may be the shared pool client),
+        # so it must not be closed here.
 
-        with (
-            concurrent.futures.ThreadPoolExecutor(max_workers=NUM_THREADS) as executor,
-            httpx_client as http_client,
-        ):
+        with concurrent.futures.ThreadPoolExecutor(max_workers=NUM_THREADS) as executor:
             for update_batch in batch_generator(updates, batch_size):
                 future_to_document_id = {
                     executor.submit(
                         _update_chunk,
                         update,
-                        http_client,
+                        httpx_client,
                     ): update.document_id
                     for update in update_batch
                 }
@@ -513,18 +665,18 @@ class VespaIndex(DocumentIndex):
         update_start = time.monotonic()
 
         processed_updates_requests: list[_VespaUpdateRequest] = []
-        all_doc_chunk_ids: dict[str, list[UUID]] = {}
+        # keyed by (index_name, doc_id) since large chunks may differ per index
+        all_doc_chunk_ids: dict[tuple[str, str], list[UUID]] = {}
 
         # Fetch all chunks for each document ahead of time
-        index_names = [self.index_name]
-        if self.secondary_index_name:
-            index_names.append(self.secondary_index_name)
-
         chunk_id_start_time = time.monotonic()
         with self.httpx_client_context as http_client:
             for update_request in update_requests:
                 for doc_info in update_request.minimal_document_indexing_info:
-                    for index_name in index_names:
+                    for (
+                        index_name,
+                        large_chunks_enabled,
+                    ) in self.index_to_large_chunks_enabled.items():
                         doc_chunk_info = VespaIndex.enrich_basic_chunk_info(
                             index_name=index_name,
                             http_client=http_client,
@@ -535,9 +687,9 @@ class VespaIndex(DocumentIndex):
                         doc_chunk_ids = get_document_chunk_ids(
                             enriched_document_info_list=[doc_chunk_info],
                             tenant_id=tenant_id,
-                            large_chunks_enabled=False,
+                            large_chunks_enabled=large_chunks_enabled,
                         )
-                        all_doc_chunk_ids[doc_info.doc_id] = doc_chunk_ids
+                        all_doc_chunk_ids[(index_name, doc_info.doc_id)] = doc_chunk_ids
 
         logger.debug(
             f"Took {time.monotonic() - chunk_id_start_time:.2f} seconds to fetch all Vespa chunk IDs"
@@ -568,14 +720,17 @@ class VespaIndex(DocumentIndex):
                 continue
 
             for doc_info in update_request.minimal_document_indexing_info:
-                for doc_chunk_id in all_doc_chunk_ids[doc_info.doc_id]:
-                    processed_updates_requests.append(
-                        _VespaUpdateRequest(
-                            document_id=doc_info.doc_id,
-                            url=f"{DOCUMENT_ID_ENDPOINT.format(index_name=self.index_name)}/{doc_chunk_id}",
-                            update_request=update_dict,
+                for index_name in self.index_to_large_chunks_enabled:
+                    for doc_chunk_id in all_doc_chunk_ids[
+                        (index_name, doc_info.doc_id)
+                    ]:
+                        processed_updates_requests.append(
+                            _VespaUpdateRequest(
+                                document_id=doc_info.doc_id,
+                                url=f"{DOCUMENT_ID_ENDPOINT.format(index_name=index_name)}/{doc_chunk_id}",
+                                update_request=update_dict,
+                            )
                         )
-                    )
 
         with self.httpx_client_context as httpx_client:
             self._apply_updates_batched(processed_updates_requests, httpx_client)
@@ -603,34 +758,7 @@ class VespaIndex(DocumentIndex):
         Retries if we encounter transient HTTPStatusError (e.g., overload).
         """
 
-        update_dict: dict[str, dict] = {"fields": {}}
-
-        if fields is not None:
-            if fields.boost is not None:
-                update_dict["fields"][BOOST] = {"assign": fields.boost}
-
-            if fields.document_sets is not None:
-                update_dict["fields"][DOCUMENT_SETS] = {
-                    "assign": {document_set: 1 for document_set in fields.document_sets}
-                }
-
-            if fields.access is not None:
-                update_dict["fields"][ACCESS_CONTROL_LIST] = {
-                    "assign": {acl_entry: 1 for acl_entry in fields.access.to_acl()}
-                }
-
-            if fields.hidden is not None:
-                update_dict["fields"][HIDDEN] = {"assign": fields.hidden}
-
-        if user_fields is not None:
-            if user_fields.user_file_id is not None:
-                update_dict["fields"][USER_FILE] = {"assign": user_fields.user_file_id}
-
-            if user_fields.user_folder_id is not None:
-                update_dict["fields"][USER_FOLDER] = {
-                    "assign": user_fields.user_folder_id
-                }
-
+        update_dict = _build_update_dict(fields, user_fields)
         if not update_dict["fields"]:
             logger.error("Update request received but nothing to update.")
             return
@@ -705,6 +833,100 @@ class VespaIndex(DocumentIndex):
 
         return doc_chunk_count
 
+    def update_multiple(
+        self,
+        updates: list[DocumentFieldsUpdate],
+        *,
+        tenant_id: str,
+    ) -> list[DocumentUpdateResult]:
+        """Streams the partial updates of all chunks of all documents through the
+        VespaFeedClient, so many documents are updated concurrently over the pooled
+        client instead of one chunk at a time. A failing document does not stop the
+        others, it is reported with an error in its result."""
+        update_start = time.monotonic()
+
+        doc_id_to_chunks_affected: dict[str, int] = {}
+        doc_id_to_error: dict[str, str] = {}
+
+        def _build_operations(
+            http_client: httpx.Client,
+        ) -> Iterator[VespaFeedOperation]:
+            for update in updates:
+                update_dict = _build_update_dict(update.fields, update.user_fields)
+                if not update_dict["fields"]:
+                    logger.error(
+                        f"Update request received but nothing to update: "
+                        f"doc_id={update.doc_id}"
+                    )
+                    continue
+
+                cleaned_doc_id = replace_invalid_doc_id_characters(update.doc_id)
+                for (
+                    index_name,
+                    large_chunks_enabled,
+                ) in self.index_to_large_chunks_enabled.items():
+                    try:
+                        enriched_doc_info = VespaIndex.enrich_basic_chunk_info(
+                            index_name=index_name,
+                            http_client=http_client,
+                            document_id=cleaned_doc_id,
+                            previous_chunk_count=update.chunk_count,
+                            new_chunk_count=0,
+                        )
+                    except Exception as e:
+                        logger.exception(
+                            f"Failed to look up chunks for update: doc_id={update.doc_id}"
+                        )
+                        doc_id_to_error.setdefault(update.doc_id, str(e))
+                        break
+
+                    doc_chunk_ids = get_document_chunk_ids(
+                        enriched_document_info_list=[enriched_doc_info],
+                        tenant_id=tenant_id,
+                        large_chunks_enabled=large_chunks_enabled,
+                    )
+                    doc_id_to_chunks_affected[update.doc_id] = (
+                        doc_id_to_chunks_affected.get(update.doc_id, 0)
+                        + len(doc_chunk_ids)
+                    )
+
+                    for doc_chunk_id in doc_chunk_ids:
+                        yield VespaFeedOperation(
+                            document_id=update.doc_id,
+                            url=(
+                                f"{DOCUMENT_ID_ENDPOINT.format(index_name=index_name)}/{doc_chunk_id}"
+                                "?create=true"
+                            ),
+                            method="PUT",
+                            body=update_dict,
+                        )
+
+        with self.httpx_client_context as http_client:
+            feed_client = VespaFeedClient(http_client, raise_on_error=False)
+            feed_stats = feed_client.feed(_build_operations(http_client))
+
+        for doc_id, error in feed_stats.failures.items():
+            doc_id_to_error.setdefault(doc_id, error)
+
+        logger.debug(
+            f"Streamed document updates to Vespa: "
+            f"documents={len(updates)} "
+            f"failed_documents={len(doc_id_to_error)} "
+            f"operations={feed_stats.operations} "
+            f"retries={feed_stats.retries} "
+            f"elapsed={time.monotonic() - update_start:.2f}"
+        )
+
+        return [
+            DocumentUpdateResult(
+                doc_id=update.doc_id,
+                chunks_affected=doc_id_to_chunks_affected.get(update.doc_id, 0),
+                error=doc_id_to_error.get(update.doc_id),
+                retryable=update.doc_id not in feed_stats.client_error_failures,
+            )
+            for update in updates
+        ]
+
     def delete_single(
         self,
         doc_id: str,
@@ -789,7 +1011,7 @@ class VespaIndex(DocumentIndex):
             get_large_chunks=get_large_chunks,
         )
 
-    def hybrid_retrieval(
+    def _hybrid_retrieval_params(
         self,
         query: str,
         query_embedding: Embedding,
@@ -801,7 +1023,7 @@ class VespaIndex(DocumentIndex):
         ranking_profile_type: QueryExpansionType,
         offset: int = 0,
         title_content_ratio: float | None = TITLE_CONTENT_RATIO,
-    ) -> list[InferenceChunkUncleaned]:
+    ) -> dict[str, str | int | float]:
         vespa_where_clauses = build_vespa_filters(filters)
         # Needs to be at least as much as the value set in Vespa schema config
         target_hits = max(10 * num_to_retrieve, 1000)
@@ -843,7 +1065,56 @@ class VespaIndex(DocumentIndex):
             "timeout": VESPA_TIMEOUT,
         }
 
-        return query_vespa(params)
+        return params
+
+    def hybrid_retrieval(
+        self,
+        query: str,
+        query_embedding: Embedding,
+        final_keywords: list[str] | None,
+        filters: IndexFilters,
+        hybrid_alpha: float,
+        time_decay_multiplier: float,
+        num_to_retrieve: int,
+        ranking_profile_type: QueryExpansionType,
+        offset: int = 0,
+        title_content_ratio: float | None = TITLE_CONTENT_RATIO,
+    ) -> list[InferenceChunkUncleaned]:
+        return query_vespa(
+            self._hybrid_retrieval_params(
+                query=query,
+                query_embedding=query_embedding,
+                final_keywords=final_keywords,
+                filters=filters,
+                hybrid_alpha=hybrid_alpha,
+                time_decay_multiplier=time_decay_multiplier,
+                num_to_retrieve=num_to_retrieve,
+                ranking_profile_type=ranking_profile_type,
+                offset=offset,
+                title_content_ratio=title_content_ratio,
+            )
+        )
+
+    def batch_hybrid_retrieval(
+        self, requests: list[HybridRetrievalRequest]
+    ) -> list[list[InferenceChunkUncleaned]]:
+        return batch_query_vespa(
+            [
+                self._hybrid_retrieval_params(
+                    query=request.query,
+                    query_embedding=request.query_embedding,
+                    final_keywords=request.final_keywords,
+                    filters=request.filters,
+                    hybrid_alpha=request.hybrid_alpha,
+                    time_decay_multiplier=request.time_decay_multiplier,
+                    num_to_retrieve=request.num_to_retrieve,
+                    ranking_profile_type=request.ranking_profile_type,
+                    offset=request.offset,
+                    title_content_ratio=request.title_content_ratio,
+                )
+                for request in requests
+            ]
+        )
 
     def admin_retrieval(
         self,
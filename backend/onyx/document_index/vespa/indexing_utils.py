@@ -4,9 +4,12 @@ import uuid
 from abc import ABC
 from abc import abstractmethod
 from collections.abc import Callable
+from collections.abc import Generator
+from collections.abc import Iterable
 from datetime import datetime
 from datetime import timezone
 from http import HTTPStatus
+from typing import Any
 
 import httpx
 from retry import retry
@@ -17,12 +20,15 @@ from onyx.connectors.cross_connector_utils.miscellaneous_utils import (
 from onyx.document_index.document_index_utils import get_uuid_from_chunk
 from onyx.document_index.document_index_utils import get_uuid_from_chunk_info_old
 from onyx.document_index.interfaces import MinimalDocumentIndexingInfo
+from onyx.document_index.vespa.feed_client import VespaFeedOperation
+from onyx.document_index.vespa.shared_utils.utils import build_document_id_selection
 from onyx.document_index.vespa.shared_utils.utils import remove_invalid_unicode_chars
 from onyx.document_index.vespa.shared_utils.utils import (
     replace_invalid_doc_id_characters,
 )
 from onyx.document_index.vespa_constants import ACCESS_CONTROL_LIST
 from onyx.document_index.vespa_constants import AGGREGATED_CHUNK_BOOST_FACTOR
+from onyx.document_index.vespa_constants import BATCH_SIZE
 from onyx.document_index.vespa_constants import BLURB
 from onyx.document_index.vespa_constants import BOOST
 from onyx.document_index.vespa_constants import CHUNK_CONTEXT
@@ -126,22 +132,60 @@ def get_existing_documents_from_chunks(
     return document_ids
 
 
-@retry(tries=5, delay=1, backoff=2)
-def _index_vespa_chunk(
-    chunk: DocMetadataAwareIndexChunk,
+def get_existing_document_ids(
+    document_ids: list[str],
     index_name: str,
     http_client: httpx.Client,
+    batch_size: int = BATCH_SIZE,
+) -> set[str]:
+    """Returns the subset of document_ids that have at least one chunk in the index.
+    Uses a single visit query per batch of documents instead of one existence check
+    per chunk."""
+    url = DOCUMENT_ID_ENDPOINT.format(index_name=index_name)
+
+    existing_document_ids: set[str] = set()
+    for start in range(0, len(document_ids), batch_size):
+        document_id_batch = document_ids[start : start + batch_size]
+        selection = " or ".join(
+            build_document_id_selection(index_name, document_id)
+            for document_id in document_id_batch
+        )
+        params: dict[str, str | int] = {
+            "selection": selection,
+            "wantedDocumentCount": 1_000,
+            "fieldSet": f"{index_name}:{DOCUMENT_ID}",
+        }
+
+        while True:
+            response = http_client.get(url, params=params)
+            response.raise_for_status()
+            response_data = response.json()
+
+            for document in response_data.get("documents", []):
+                existing_document_ids.add(document["fields"][DOCUMENT_ID])
+
+            continuation = response_data.get("continuation")
+            # every document in the batch has been seen, no need to keep visiting
+            if not continuation or existing_document_ids.issuperset(document_id_batch):
+                break
+            params["continuation"] = continuation
+
+    return existing_document_ids
+
+
+def _vespa_chunk_url(chunk: DocMetadataAwareIndexChunk, index_name: str) -> str:
+    vespa_chunk_id = str(get_uuid_from_chunk(chunk))
+    return f"{DOCUMENT_ID_ENDPOINT.format(index_name=index_name)}/{vespa_chunk_id}"
+
+
+def build_vespa_chunk_fields(
+    chunk: DocMetadataAwareIndexChunk,
     multitenant: bool,
-) -> None:
-    json_header = {
-        "Content-Type": "application/json",
-    }
+) -> dict[str, Any]:
     document = chunk.source_document
 
     # No minichunk documents in vespa, minichunk vectors are stored in the chunk itself
 
-    vespa_chunk_id = str(get_uuid_from_chunk(chunk))
-
     embeddings = chunk.embeddings
 
     embeddings_name_vector_map = {"full_chunk": embeddings.full_embedding}
@@ -216,7 +260,25 @@ def _index_vespa_chunk(
     if multitenant:
         if chunk.tenant_id:
             vespa_document_fields[TENANT_ID] = chunk.tenant_id
-    vespa_url = f"{DOCUMENT_ID_ENDPOINT.format(index_name=index_name)}/{vespa_chunk_id}"
+
+    return vespa_document_fields
+
+
+@retry(tries=5, delay=1, backoff=2)
+def _index_vespa_chunk(
+    chunk: DocMetadataAwareIndexChunk,
+    index_name: str,
+    http_client: httpx.Client,
+    multitenant: bool,
+) -> None:
+    json_header = {
+        "Content-Type": "application/json",
+    }
+    document = chunk.source_document
+
+    vespa_document_fields = build_vespa_chunk_fields(chunk, multitenant)
+
+    vespa_url = _vespa_chunk_url(chunk, index_name)
     logger.debug(f'Indexing to URL "{vespa_url}"')
     res = http_client.post(
         vespa_url, headers=json_header, json={"fields": vespa_document_fields}
@@ -238,6 +300,22 @@ def _index_vespa_chunk(
         raise e
 
 
+def build_vespa_chunk_feed_operations(
+    chunks: Iterable[DocMetadataAwareIndexChunk],
+    index_name: str,
+    multitenant: bool,
+) -> Generator[VespaFeedOperation, None, None]:
+    """Lazily builds the document/v1 put operations for the chunks so that the feed
+    client can start sending before every request body has been built."""
+    for chunk in chunks:
+        yield VespaFeedOperation(
+            document_id=chunk.source_document.id,
+            url=_vespa_chunk_url(chunk, index_name),
+            method="POST",
+            body={"fields": build_vespa_chunk_fields(chunk, multitenant)},
+        )
+
+
 def batch_index_vespa_chunks(
     chunks: list[DocMetadataAwareIndexChunk],
     index_name: str,
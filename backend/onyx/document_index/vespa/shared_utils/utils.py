@@ -8,7 +8,9 @@ from onyx.configs.app_configs import MANAGED_VESPA
 from onyx.configs.app_configs import VESPA_CLOUD_CERT_PATH
 from onyx.configs.app_configs import VESPA_CLOUD_KEY_PATH
 from onyx.configs.app_configs import VESPA_REQUEST_TIMEOUT
+from onyx.document_index.vespa_constants import DOCUMENT_ID
 from onyx.document_index.vespa_constants import VESPA_APP_CONTAINER_URL
+from onyx.httpx.httpx_pool import HttpxPool
 from onyx.utils.logger import setup_logger
 
 logger = setup_logger()
@@ -53,6 +55,13 @@ def replace_invalid_doc_id_characters(text: str) -> str:
     return text.replace("'", "_")
 
 
+def build_document_id_selection(index_name: str, document_id: str) -> str:
+    """Document selection matching the chunks of the document. Backslashes and quotes
+    are escape characters in the string literals of the selection language."""
+    escaped_document_id = document_id.replace("\\", "\\\\").replace("'", "\\'")
+    return f"{index_name}.{DOCUMENT_ID}=='{escaped_document_id}'"
+
+
 def remove_invalid_unicode_chars(text: str) -> str:
     """Vespa does not take in unicode chars that aren't valid for XML.
     This removes them."""
@@ -80,6 +89,32 @@ def get_vespa_http_client(no_timeout: bool = False, http2: bool = True) -> httpx
     )
 
 
+# enough for the concurrent visits and queries of a few requests at once
+_POOLED_MAX_KEEPALIVE_CONNECTIONS = 20
+
+
+def get_pooled_vespa_http_client() -> httpx.Client:
+    """Returns the process wide Vespa client from the HttpxPool, creating it with the
+    same settings as `get_vespa_http_client` if the process hasn't set it up already
+    (celery workers do so on startup). The client is shared, do NOT close it."""
+    HttpxPool.init_client(
+        name="vespa",
+        cert=(
+            cast(tuple[str, str], (VESPA_CLOUD_CERT_PATH, VESPA_CLOUD_KEY_PATH))
+            if MANAGED_VESPA
+            else None
+        ),
+        verify=False if not MANAGED_VESPA else True,
+        timeout=VESPA_REQUEST_TIMEOUT,
+        # same as the pool of the celery workers (httpx_init_vespa_pool)
+        http2=False,
+        limits=httpx.Limits(
+            max_keepalive_connections=_POOLED_MAX_KEEPALIVE_CONNECTIONS
+        ),
+    )
+    return HttpxPool.get("vespa")
+
+
 def wait_for_vespa_with_timeout(wait_interval: int = 5, wait_limit: int = 60) -> bool:
     """Waits for Vespa to become ready subject to a timeout.
     Returns True if Vespa is ready, False otherwise."""
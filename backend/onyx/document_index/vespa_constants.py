@@ -33,6 +33,12 @@ MAX_ID_SEARCH_QUERY_SIZE = 400
 # Suspect that adding too many "or" conditions will cause Vespa to timeout and return
 # an empty list of hits (with no error status and coverage: 0 and degraded)
 MAX_OR_CONDITIONS = 10
+# Visit API requests for multiple documents are combined into a single selection.
+# Unlike search, the visit API has no coverage degradation, so the selection can be a
+# lot bigger. Every visit scans all buckets, so fewer visits is strictly better.
+MAX_VISIT_SELECTION_DOCUMENTS = 64
+# max number of visit API selections in flight at once for a single retrieval
+VISIT_API_MAX_CONCURRENCY = 8
 # up from 500ms for now, since we've seen quite a few timeouts
 # in the long term, we are looking to improve the performance of Vespa
 # so that we can bring this back to default
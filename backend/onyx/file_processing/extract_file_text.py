@@ -412,6 +412,7 @@ def extract_file_text(
     file_name: str,
     break_on_unprocessable: bool = True,
     extension: str | None = None,
+    allow_unstructured: bool = True,
 ) -> str:
     """
     Legacy function that returns *only text*, ignoring embedded images.
@@ -419,6 +420,9 @@ def extract_file_text(
 
     NOTE: Ignoring seems to be defined as returning an empty string for files it can't
     handle (such as images).
+
+    allow_unstructured=False skips the lookup of the Unstructured API key, which
+    needs a database connection, and always parses the file locally.
     """
     extension_to_function: dict[str, Callable[[IO[Any]], str]] = {
         ".pdf": pdf_to_text,
@@ -431,7 +435,7 @@ def extract_file_text(
     }
 
     try:
-        if get_unstructured_api_key():
+        if allow_unstructured and get_unstructured_api_key():
             try:
                 return unstructured_to_text(file, file_name)
             except Exception as unstructured_error:
@@ -477,15 +481,17 @@ def extract_text_and_images(
     file: IO[Any],
     file_name: str,
     pdf_pass: str | None = None,
+    allow_unstructured: bool = True,
 ) -> ExtractionResult:
     """
     Primary new function for the updated connector.
     Returns structured extraction result with text content, embedded images, and metadata.
+    See extract_file_text for allow_unstructured.
     """
 
     try:
         # Attempt unstructured if env var is set
-        if get_unstructured_api_key():
+        if allow_unstructured and get_unstructured_api_key():
             # If the user doesn't want embedded images, unstructured is fine
             file.seek(0)
             text_content = unstructured_to_text(file, file_name)
@@ -0,0 +1,332 @@
+import os
+import resource
+import subprocess
+import sys
+import threading
+from collections import deque
+from collections.abc import Callable
+from collections.abc import Iterable
+from collections.abc import Iterator
+from concurrent.futures import Future
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+from multiprocessing.connection import Connection
+from pathlib import Path
+from queue import Empty
+from queue import SimpleQueue
+from types import TracebackType
+from typing import Any
+from typing import cast
+from typing import NamedTuple
+from typing import TypeVar
+
+from onyx.configs.app_configs import FILE_EXTRACTION_MAX_WORKERS
+from onyx.configs.app_configs import FILE_EXTRACTION_MEMORY_LIMIT_MB
+from onyx.configs.app_configs import FILE_EXTRACTION_TIMEOUT_SECONDS
+from onyx.file_processing.extract_file_text import ACCEPTED_IMAGE_FILE_EXTENSIONS
+from onyx.file_processing.extract_file_text import extract_file_text
+from onyx.file_processing.extract_file_text import extract_text_and_images
+from onyx.file_processing.extract_file_text import ExtractionResult
+from onyx.file_processing.extract_file_text import get_file_ext
+from onyx.file_processing.unstructured import get_unstructured_api_key
+from onyx.utils.logger import setup_logger
+
+logger = setup_logger()
+
+R = TypeVar("R")
+
+# A worker process imports the parsing libraries on startup, which takes a few
+# seconds. Fewer files than this are parsed in the calling process.
+MIN_FILES_FOR_WORKER_PROCESSES = 16
+
+_WORKER_MODULE = "onyx.file_processing.extraction_pool"
+_BACKEND_DIR = Path(__file__).resolve().parents[2]
+
+_TEXT_AND_IMAGES = "text_and_images"
+_TEXT = "text"
+
+
+class FileExtractionTask(NamedTuple):
+    file_name: str
+    content: bytes
+    pdf_pass: str | None = None
+
+
+class _WorkerFailure(Exception):
+    """The worker timed out or died (e.g. killed for exceeding its memory limit)"""
+
+
+def _extract(
+    mode: str, task: FileExtractionTask, allow_unstructured: bool = True
+) -> ExtractionResult | str:
+    file = BytesIO(task.content)
+    if mode == _TEXT:
+        return extract_file_text(
+            file=file,
+            file_name=task.file_name,
+            allow_unstructured=allow_unstructured,
+        )
+    return extract_text_and_images(
+        file=file,
+        file_name=task.file_name,
+        pdf_pass=task.pdf_pass,
+        allow_unstructured=allow_unstructured,
+    )
+
+
+class _ExtractionWorker:
+    """
+    A python process parsing the files sent to it over a pipe, one at a time.
+    These are plain subprocesses rather than multiprocessing ones, since indexing runs
+    in daemonic processes, which multiprocessing doesn't allow to have children.
+    """
+
+    def __init__(self, memory_limit_mb: int) -> None:
+        worker_read_fd, parent_write_fd = os.pipe()
+        parent_read_fd, worker_write_fd = os.pipe()
+        python_path = os.environ.get("PYTHONPATH")
+        self._process = subprocess.Popen(
+            [
+                sys.executable,
+                "-m",
+                _WORKER_MODULE,
+                str(worker_read_fd),
+                str(worker_write_fd),
+                str(memory_limit_mb),
+            ],
+            pass_fds=(worker_read_fd, worker_write_fd),
+            stdin=subprocess.DEVNULL,
+            env={
+                **os.environ,
+                "PYTHONPATH": (
+                    f"{_BACKEND_DIR}{os.pathsep}{python_path}"
+                    if python_path
+                    else str(_BACKEND_DIR)
+                ),
+            },
+        )
+        os.close(worker_read_fd)
+        os.close(worker_write_fd)
+        self._requests = Connection(parent_write_fd, readable=False)
+        self._responses = Connection(parent_read_fd, writable=False)
+
+    def extract(
+        self, mode: str, task: FileExtractionTask, timeout: float
+    ) -> ExtractionResult | str:
+        try:
+            self._requests.send((mode, task))
+            if not self._responses.poll(timeout):
+                raise _WorkerFailure(f"timed out after {timeout}s")
+            succeeded, result = self._responses.recv()
+        except (OSError, EOFError) as e:
+            raise _WorkerFailure(
+                f"worker exited with code {self._process.poll()}"
+            ) from e
+
+        if not succeeded:
+            raise result
+        return result
+
+    def close(self) -> None:
+        self._process.kill()
+        self._process.wait()
+        self._requests.close()
+        self._responses.close()
+
+
+class FileExtractionPool:
+    """
+    Parses files in a bounded pool of worker processes, so that CPU heavy parsing
+    (PDFs, office documents) of many files uses more than one core. Results are
+    streamed back in the order of the tasks, which are only read a few at a time
+    ahead of the results being consumed.
+
+    A worker taking longer than the timeout on a file, or running out of memory, is
+    replaced and the file is treated as unparseable.
+    """
+
+    def __init__(
+        self,
+        expected_file_count: int,
+        max_workers: int = FILE_EXTRACTION_MAX_WORKERS,
+        timeout_seconds: float = FILE_EXTRACTION_TIMEOUT_SECONDS,
+        memory_limit_mb: int = FILE_EXTRACTION_MEMORY_LIMIT_MB,
+        min_files_for_workers: int = MIN_FILES_FOR_WORKER_PROCESSES,
+        allow_unstructured: bool = True,
+    ) -> None:
+        self.max_workers = min(max_workers, expected_file_count)
+        self.timeout_seconds = timeout_seconds
+        self.memory_limit_mb = memory_limit_mb
+        self.allow_unstructured = allow_unstructured
+
+        self._in_process = (
+            self.max_workers <= 1 or expected_file_count < min_files_for_workers
+        )
+        # Unstructured parses files through its API with a key from the KV store,
+        # which workers have no connection to, they only parse files locally
+        if not self._in_process and allow_unstructured and get_unstructured_api_key():
+            self._in_process = True
+
+        self._executor: ThreadPoolExecutor | None = None
+        self._idle_workers: SimpleQueue[_ExtractionWorker] = SimpleQueue()
+        self._workers: list[_ExtractionWorker] = []
+        self._workers_lock = threading.Lock()
+        self._closed = False
+
+    def __enter__(self) -> "FileExtractionPool":
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        self.close()
+
+    def close(self) -> None:
+        with self._workers_lock:
+            self._closed = True
+            workers = self._workers
+            self._workers = []
+
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+        # also ends the extractions in progress
+        for worker in workers:
+            worker.close()
+
+    def extract_text_and_images(
+        self, tasks: Iterable[FileExtractionTask]
+    ) -> Iterator[tuple[FileExtractionTask, ExtractionResult]]:
+        """Same as extract_text_and_images for each file: files that can't be parsed
+        get an empty result"""
+
+        def _on_failure(
+            task: FileExtractionTask, error: _WorkerFailure
+        ) -> ExtractionResult:
+            logger.warning(
+                f"Failed to extract text/images: file={task.file_name} error={error}"
+            )
+            return ExtractionResult(text_content="", embedded_images=[], metadata={})
+
+        yield from self._map(_TEXT_AND_IMAGES, tasks, _on_failure)
+
+    def extract_file_text(
+        self, tasks: Iterable[FileExtractionTask]
+    ) -> Iterator[tuple[FileExtractionTask, str]]:
+        """Same as extract_file_text for each file: raises a RuntimeError for the first
+        file that can't be parsed"""
+
+        def _on_failure(task: FileExtractionTask, error: _WorkerFailure) -> str:
+            raise RuntimeError(
+                f"Failed to process file {task.file_name or 'Unknown'}: {error}"
+            ) from error
+
+        yield from self._map(_TEXT, tasks, _on_failure)
+
+    def _map(
+        self,
+        mode: str,
+        tasks: Iterable[FileExtractionTask],
+        on_failure: Callable[[FileExtractionTask, _WorkerFailure], R],
+    ) -> Iterator[tuple[FileExtractionTask, R]]:
+        if self._in_process:
+            for task in tasks:
+                yield task, cast(R, _extract(mode, task, self.allow_unstructured))
+            return
+
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.max_workers, thread_name_prefix="file_extraction"
+            )
+
+        # a few files per worker are read ahead, so that workers don't wait on the
+        # caller reading the next file
+        max_pending = self.max_workers * 2
+        pending: deque[tuple[FileExtractionTask, Future[R]]] = deque()
+
+        def _extract_task(task: FileExtractionTask) -> R:
+            try:
+                return self._extract_in_worker(mode, task)
+            except _WorkerFailure as e:
+                return on_failure(task, e)
+
+        for task in tasks:
+            if get_file_ext(task.file_name) in ACCEPTED_IMAGE_FILE_EXTENSIONS:
+                # nothing to parse, not worth sending to a worker
+                immediate: Future[R] = Future()
+                immediate.set_result(
+                    cast(R, _extract(mode, task, allow_unstructured=False))
+                )
+                pending.append((task, immediate))
+            else:
+                pending.append((task, self._executor.submit(_extract_task, task)))
+
+            while len(pending) >= max_pending:
+                done_task, future = pending.popleft()
+                yield done_task, future.result()
+
+        while pending:
+            done_task, future = pending.popleft()
+            yield done_task, future.result()
+
+    def _extract_in_worker(self, mode: str, task: FileExtractionTask) -> Any:
+        try:
+            worker = self._idle_workers.get_nowait()
+        except Empty:
+            worker = _ExtractionWorker(self.memory_limit_mb)
+            with self._workers_lock:
+                if self._closed:
+                    worker.close()
+                    raise _WorkerFailure("extraction pool is closed")
+                self._workers.append(worker)
+
+        try:
+            result = worker.extract(mode, task, self.timeout_seconds)
+        except _WorkerFailure:
+            # the worker may be stuck mid parse, replace it
+            with self._workers_lock:
+                if worker in self._workers:
+                    self._workers.remove(worker)
+            worker.close()
+            raise
+        except BaseException:
+            self._idle_workers.put(worker)
+            raise
+
+        self._idle_workers.put(worker)
+        return result
+
+
+def _run_worker(read_fd: int, write_fd: int, memory_limit_mb: int) -> None:
+    if memory_limit_mb > 0:
+        memory_limit = memory_limit_mb * 1024 * 1024
+        try:
+            resource.setrlimit(resource.RLIMIT_AS, (memory_limit, memory_limit))
+        except (ValueError, OSError) as e:
+            logger.warning(f"Failed to limit file extraction worker memory: {e}")
+
+    requests = Connection(read_fd, writable=False)
+    responses = Connection(write_fd, readable=False)
+    while True:
+        try:
+            mode, task = requests.recv()
+        except EOFError:
+            # the pool was closed
+            return
+
+        try:
+            response: tuple[bool, Any] = (
+                True,
+                _extract(mode, task, allow_unstructured=False),
+            )
+        except Exception as e:
+            # exceptions are sent as plain RuntimeErrors, their causes may not pickle
+            response = (False, RuntimeError(str(e)))
+        del task
+        responses.send(response)
+
+
+if __name__ == "__main__":
+    _run_worker(int(sys.argv[1]), int(sys.argv[2]), int(sys.argv[3]))
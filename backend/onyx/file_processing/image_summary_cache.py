@@ -0,0 +1,88 @@
+import hashlib
+import json
+from typing import cast
+
+from onyx.configs.app_configs import IMAGE_SUMMARIZATION_SYSTEM_PROMPT
+from onyx.configs.app_configs import IMAGE_SUMMARIZATION_USER_PROMPT
+from onyx.configs.app_configs import IMAGE_SUMMARY_CACHE_TTL_SECONDS
+from onyx.llm.interfaces import LLM
+from onyx.redis.redis_pool import get_redis_client
+from onyx.utils.logger import setup_logger
+from onyx.utils.ttl_cache import TTLCache
+
+logger = setup_logger()
+
+_REDIS_KEY_PREFIX = "image_summary"
+
+# summaries are small, this mostly guards against unbounded growth in long runs
+IMAGE_SUMMARY_LOCAL_CACHE_SIZE = 4096
+
+
+def hash_image_data(image_data: bytes) -> str:
+    return hashlib.sha256(image_data).hexdigest()
+
+
+def build_image_summary_cache_key(image_hash: str, llm: LLM) -> str:
+    """The summary depends on the image, the vision model and the prompts. The image's
+    file name (which is also part of the prompt) is deliberately left out so the same
+    image is only summarized once no matter where it shows up."""
+    key_parts = [
+        llm.config.model_provider,
+        llm.config.model_name,
+        IMAGE_SUMMARIZATION_SYSTEM_PROMPT,
+        IMAGE_SUMMARIZATION_USER_PROMPT,
+        image_hash,
+    ]
+    return hashlib.sha256(json.dumps(key_parts).encode()).hexdigest()
+
+
+class ImageSummaryCache:
+    """Two tier cache for image summaries, a bounded in-process tier in front of a
+    tenant scoped Redis tier that is shared between indexing runs. Redis failures are
+    logged and treated as misses."""
+
+    def __init__(
+        self,
+        maxsize: int = IMAGE_SUMMARY_LOCAL_CACHE_SIZE,
+        ttl_seconds: int = IMAGE_SUMMARY_CACHE_TTL_SECONDS,
+    ) -> None:
+        self._local: TTLCache[str, str] = TTLCache(maxsize, ttl_seconds)
+        self._ttl_seconds = ttl_seconds
+
+    def get(self, key: str) -> str | None:
+        summary = self._local.get(key)
+        if summary is not None:
+            return summary
+
+        try:
+            raw = get_redis_client().get(f"{_REDIS_KEY_PREFIX}:{key}")
+        except Exception:
+            logger.exception("Failed to read image summary from Redis")
+            return None
+
+        if raw is None:
+            return None
+
+        summary = cast(bytes, raw).decode()
+        self._local.set(key, summary)
+        return summary
+
+    def set(self, key: str, summary: str) -> None:
+        self._local.set(key, summary)
+
+        try:
+            get_redis_client().set(
+                f"{_REDIS_KEY_PREFIX}:{key}", summary, ex=self._ttl_seconds
+            )
+        except Exception:
+            logger.exception("Failed to write image summary to Redis")
+
+    def clear(self) -> None:
+        self._local.clear()
+
+
+_IMAGE_SUMMARY_CACHE = ImageSummaryCache()
+
+
+def get_image_summary_cache() -> ImageSummaryCache:
+    return _IMAGE_SUMMARY_CACHE
@@ -1,10 +1,11 @@
+from io import BytesIO
 from typing import Tuple
 
 from sqlalchemy.orm import Session
 
 from onyx.configs.constants import FileOrigin
 from onyx.connectors.models import ImageSection
-from onyx.db.pg_file_store import save_bytes_to_pgfilestore
+from onyx.file_store.file_store import get_default_file_store
 from onyx.utils.logger import setup_logger
 
 logger = setup_logger()
@@ -20,7 +21,7 @@ def store_image_and_create_section(
     file_origin: FileOrigin = FileOrigin.OTHER,
 ) -> Tuple[ImageSection, str | None]:
     """
-    Stores an image in PGFileStore and creates an ImageSection object without summarization.
+    Stores an image in the file store and creates an ImageSection object without summarization.
 
     Args:
         db_session: Database session
@@ -33,20 +34,19 @@ def store_image_and_create_section(
     Returns:
         Tuple containing:
         - ImageSection object with image reference
-        - The file_name in PGFileStore or None if storage failed
+        - The file_name in the file store or None if storage failed
     """
     # Storage logic
     stored_file_name = None
     try:
-        pgfilestore = save_bytes_to_pgfilestore(
-            db_session=db_session,
-            raw_bytes=image_data,
-            media_type=media_type,
-            identifier=file_name,
+        stored_file_name = f"{file_origin.name.lower()}_{file_name}"
+        get_default_file_store(db_session).save_file(
+            file_name=stored_file_name,
+            content=BytesIO(image_data),
             display_name=display_name,
             file_origin=file_origin,
+            file_type=media_type,
         )
-        stored_file_name = pgfilestore.file_name
     except Exception as e:
         logger.error(f"Failed to store image: {e}")
         raise e
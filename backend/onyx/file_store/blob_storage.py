@@ -0,0 +1,191 @@
+import io
+import os
+import shutil
+import tempfile
+from abc import ABC
+from abc import abstractmethod
+from functools import lru_cache
+from typing import Any
+from typing import cast
+from typing import IO
+
+from onyx.configs.app_configs import FILE_STORE_BACKEND
+from onyx.configs.app_configs import FILE_STORE_LOCAL_DIR
+from onyx.configs.app_configs import FILE_STORE_S3_ACCESS_KEY_ID
+from onyx.configs.app_configs import FILE_STORE_S3_BUCKET
+from onyx.configs.app_configs import FILE_STORE_S3_ENDPOINT_URL
+from onyx.configs.app_configs import FILE_STORE_S3_REGION
+from onyx.configs.app_configs import FILE_STORE_S3_SECRET_ACCESS_KEY
+from onyx.file_store.constants import STANDARD_CHUNK_SIZE
+
+
+class BlobNotFoundError(Exception):
+    pass
+
+
+class BlobStorage(ABC):
+    """Stores immutable blobs of bytes under string keys. Keys are '/' separated."""
+
+    @abstractmethod
+    def put(self, key: str, content: IO[bytes]) -> None:
+        """Stores the content (read until EOF) under the key, replacing any blob with
+        the same key."""
+
+    @abstractmethod
+    def exists(self, key: str) -> bool:
+        raise NotImplementedError
+
+    @abstractmethod
+    def open(self, key: str, start: int = 0, end: int | None = None) -> IO[bytes]:
+        """Returns a stream over the bytes [start, end) of the blob, the end is
+        exclusive and defaults to the end of the blob. The caller closes the stream."""
+
+    @abstractmethod
+    def delete(self, key: str) -> None:
+        """Deleting a blob that does not exist is not an error."""
+
+
+class _LimitedReader:
+    """Reads at most `limit` bytes from a file object, used for ranged reads of local
+    files."""
+
+    def __init__(self, file: IO[bytes], limit: int) -> None:
+        self._file = file
+        self._remaining = limit
+
+    def read(self, size: int = -1) -> bytes:
+        if self._remaining <= 0:
+            return b""
+        if size < 0 or size > self._remaining:
+            size = self._remaining
+        data = self._file.read(size)
+        self._remaining -= len(data)
+        return data
+
+    def close(self) -> None:
+        self._file.close()
+
+    def __enter__(self) -> "_LimitedReader":
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        self.close()
+
+
+class LocalDirectoryBlobStorage(BlobStorage):
+    """Blobs are files below a root directory. Writes go to a temporary file that is
+    renamed into place, so readers never see partial blobs."""
+
+    def __init__(self, root_dir: str) -> None:
+        self._root_dir = os.path.abspath(root_dir)
+
+    def _path(self, key: str) -> str:
+        path = os.path.abspath(os.path.join(self._root_dir, key))
+        if not path.startswith(self._root_dir + os.sep):
+            raise ValueError(f"Invalid blob key: {key}")
+        return path
+
+    def put(self, key: str, content: IO[bytes]) -> None:
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as tmp_file:
+                shutil.copyfileobj(content, tmp_file, STANDARD_CHUNK_SIZE)
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+    def exists(self, key: str) -> bool:
+        return os.path.isfile(self._path(key))
+
+    def open(self, key: str, start: int = 0, end: int | None = None) -> IO[bytes]:
+        try:
+            file = open(self._path(key), "rb")
+        except FileNotFoundError:
+            raise BlobNotFoundError(key)
+
+        if start:
+            file.seek(start)
+        if end is None:
+            return file
+        return cast(IO[bytes], _LimitedReader(file, max(0, end - start)))
+
+    def delete(self, key: str) -> None:
+        try:
+            os.unlink(self._path(key))
+        except FileNotFoundError:
+            pass
+
+
+class S3BlobStorage(BlobStorage):
+    """Blobs are objects in an S3 (compatible) bucket. Uploads use multipart uploads for
+    large content and reads stream the object body, using range requests for partial
+    reads."""
+
+    def __init__(self, bucket: str, s3_client: Any, key_prefix: str = "") -> None:
+        self._bucket = bucket
+        self._s3_client = s3_client
+        self._key_prefix = key_prefix
+
+    def _key(self, key: str) -> str:
+        return f"{self._key_prefix}{key}"
+
+    def put(self, key: str, content: IO[bytes]) -> None:
+        self._s3_client.upload_fileobj(content, self._bucket, self._key(key))
+
+    def exists(self, key: str) -> bool:
+        try:
+            self._s3_client.head_object(Bucket=self._bucket, Key=self._key(key))
+        except self._s3_client.exceptions.ClientError as e:
+            if e.response.get("Error", {}).get("Code") in ("404", "NoSuchKey"):
+                return False
+            raise
+        return True
+
+    def open(self, key: str, start: int = 0, end: int | None = None) -> IO[bytes]:
+        kwargs: dict[str, Any] = {"Bucket": self._bucket, "Key": self._key(key)}
+        if start or end is not None:
+            if end is not None and end <= start:
+                return io.BytesIO(b"")
+            # the HTTP range end is inclusive
+            kwargs["Range"] = f"bytes={start}-{'' if end is None else end - 1}"
+
+        try:
+            response = self._s3_client.get_object(**kwargs)
+        except self._s3_client.exceptions.NoSuchKey:
+            raise BlobNotFoundError(key)
+        return cast(IO[bytes], response["Body"])
+
+    def delete(self, key: str) -> None:
+        self._s3_client.delete_object(Bucket=self._bucket, Key=self._key(key))
+
+
+@lru_cache(maxsize=1)
+def get_blob_storage() -> BlobStorage | None:
+    """The configured blob storage, None if file contents are kept in Postgres. Cached,
+    the S3 client is thread safe and expensive to create."""
+    if FILE_STORE_BACKEND == "postgres":
+        return None
+
+    if FILE_STORE_BACKEND == "local":
+        return LocalDirectoryBlobStorage(FILE_STORE_LOCAL_DIR)
+
+    if FILE_STORE_BACKEND == "s3":
+        import boto3
+
+        if not FILE_STORE_S3_BUCKET:
+            raise ValueError("FILE_STORE_S3_BUCKET must be set for the s3 file store")
+
+        s3_client = boto3.client(
+            "s3",
+            endpoint_url=FILE_STORE_S3_ENDPOINT_URL,
+            region_name=FILE_STORE_S3_REGION,
+            aws_access_key_id=FILE_STORE_S3_ACCESS_KEY_ID,
+            aws_secret_access_key=FILE_STORE_S3_SECRET_ACCESS_KEY,
+        )
+        return S3BlobStorage(FILE_STORE_S3_BUCKET, s3_client)
+
+    raise ValueError(f"Unknown FILE_STORE_BACKEND: {FILE_STORE_BACKEND}")
@@ -1,21 +1,52 @@
+import hashlib
+import itertools
+import tempfile
 from abc import ABC
 from abc import abstractmethod
+from collections.abc import Iterator
+from io import BytesIO
 from typing import cast
 from typing import IO
 
 import puremagic
+from sqlalchemy import event
 from sqlalchemy.orm import Session
 
 from onyx.configs.constants import FileOrigin
+from onyx.db.engine import get_session_with_tenant
 from onyx.db.models import PGFileStore
+from onyx.db.pg_file_store import count_pgfilestores_by_object_key
 from onyx.db.pg_file_store import create_populate_lobj
 from onyx.db.pg_file_store import delete_lobj_by_id
 from onyx.db.pg_file_store import delete_pgfilestore_by_file_name
 from onyx.db.pg_file_store import get_pgfilestore_by_file_name
 from onyx.db.pg_file_store import get_pgfilestore_by_file_name_optional
+from onyx.db.pg_file_store import get_pgfilestores_with_lobj
+from onyx.db.pg_file_store import lock_object_key__no_commit
 from onyx.db.pg_file_store import read_lobj
+from onyx.db.pg_file_store import read_lobj_range
 from onyx.db.pg_file_store import upsert_pgfilestore
+from onyx.file_store.blob_storage import BlobStorage
+from onyx.file_store.blob_storage import get_blob_storage
+from onyx.file_store.constants import MAX_IN_MEMORY_SIZE
+from onyx.file_store.constants import STANDARD_CHUNK_SIZE
+from onyx.file_store.models import LargeObjectMigrationBatch
 from onyx.utils.file import FileWithMimeType
+from onyx.utils.logger import setup_logger
+from shared_configs.contextvars import get_current_tenant_id
+
+logger = setup_logger()
+
+
+def _iter_chunks(file_io: IO[bytes], chunk_size: int) -> Iterator[bytes]:
+    try:
+        while True:
+            chunk = file_io.read(chunk_size)
+            if not chunk:
+                break
+            yield chunk
+    finally:
+        file_io.close()
 
 
 class FileStore(ABC):
@@ -85,6 +116,18 @@ class FileStore(ABC):
             Contents of the file and metadata dict
         """
 
+    @abstractmethod
+    def read_file_from_record(
+        self,
+        file_record: PGFileStore,
+        mode: str | None = None,
+        use_tempfile: bool = False,
+    ) -> IO:
+        """
+        Same as read_file, for a file record that was already loaded (e.g. with many
+        others in one query)
+        """
+
     @abstractmethod
     def read_file_record(self, file_name: str) -> PGFileStore:
         """
@@ -100,6 +143,58 @@ class FileStore(ABC):
         - file_name: Name of file to delete
         """
 
+    def stream_file(
+        self,
+        file_name: str,
+        start: int = 0,
+        end: int | None = None,
+        chunk_size: int = STANDARD_CHUNK_SIZE,
+    ) -> Iterator[bytes]:
+        """
+        Stream the bytes [start, end) of a file in chunks, end defaults to the end of
+        the file. Everything that needs the DB session happens before this returns, so
+        the iterator can be consumed after the session is closed (e.g. by a
+        StreamingResponse).
+        """
+        file_io = self.read_file(file_name, mode="b", use_tempfile=True)
+        file_io.seek(start)
+        if end is None:
+            return _iter_chunks(file_io, chunk_size)
+        return _iter_chunks(BytesIO(file_io.read(max(0, end - start))), chunk_size)
+
+    def stream_file_with_mime_type(
+        self, file_name: str, chunk_size: int = STANDARD_CHUNK_SIZE
+    ) -> tuple[Iterator[bytes], str] | None:
+        """
+        Stream a file in chunks along with its mime type, which is detected from the
+        first chunk. Returns None if the file can't be read.
+        """
+        try:
+            chunks = self.stream_file(file_name, chunk_size=chunk_size)
+            first_chunk = next(chunks, b"")
+        except Exception:
+            return None
+
+        mime_type: str = "application/octet-stream"
+        # the magic numbers are at the start of the file
+        matches = puremagic.magic_string(first_chunk) if first_chunk else None
+        if matches:
+            mime_type = cast(str, matches[0].mime_type)
+        return itertools.chain([first_chunk], chunks), mime_type
+
+    def get_file_with_mime_type(self, filename: str) -> FileWithMimeType | None:
+        """Reads the whole file into memory, prefer `stream_file_with_mime_type` unless
+        the content is needed at once (e.g. to decode an image)."""
+        streamed_file = self.stream_file_with_mime_type(filename)
+        if streamed_file is None:
+            return None
+
+        chunks, mime_type = streamed_file
+        try:
+            return FileWithMimeType(data=b"".join(chunks), mime_type=mime_type)
+        except Exception:
+            return None
+
 
 class PostgresBackedFileStore(FileStore):
     def __init__(self, db_session: Session):
@@ -156,13 +251,50 @@ class PostgresBackedFileStore(FileStore):
         file_record = get_pgfilestore_by_file_name(
             file_name=file_name, db_session=self.db_session
         )
+        return self.read_file_from_record(
+            file_record, mode=mode, use_tempfile=use_tempfile
+        )
+
+    def read_file_from_record(
+        self,
+        file_record: PGFileStore,
+        mode: str | None = None,
+        use_tempfile: bool = False,
+    ) -> IO:
         return read_lobj(
-            lobj_oid=file_record.lobj_oid,
+            lobj_oid=self._get_lobj_oid(file_record),
             db_session=self.db_session,
             mode=mode,
             use_tempfile=use_tempfile,
         )
 
+    def stream_file(
+        self,
+        file_name: str,
+        start: int = 0,
+        end: int | None = None,
+        chunk_size: int = STANDARD_CHUNK_SIZE,
+    ) -> Iterator[bytes]:
+        file_record = get_pgfilestore_by_file_name(
+            file_name=file_name, db_session=self.db_session
+        )
+        file_io = read_lobj_range(
+            lobj_oid=self._get_lobj_oid(file_record),
+            db_session=self.db_session,
+            start=start,
+            end=end,
+        )
+        return _iter_chunks(file_io, chunk_size)
+
+    @staticmethod
+    def _get_lobj_oid(file_record: PGFileStore) -> int:
+        if file_record.lobj_oid is None:
+            raise RuntimeError(
+                f"File {file_record.file_name} is kept in object storage, "
+                "but no object storage is configured"
+            )
+        return file_record.lobj_oid
+
     def read_file_record(self, file_name: str) -> PGFileStore:
         file_record = get_pgfilestore_by_file_name(
             file_name=file_name, db_session=self.db_session
@@ -175,7 +307,8 @@ class PostgresBackedFileStore(FileStore):
             file_record = get_pgfilestore_by_file_name(
                 file_name=file_name, db_session=self.db_session
             )
-            delete_lobj_by_id(file_record.lobj_oid, db_session=self.db_session)
+            if file_record.lobj_oid is not None:
+                delete_lobj_by_id(file_record.lobj_oid, db_session=self.db_session)
             delete_pgfilestore_by_file_name(
                 file_name=file_name, db_session=self.db_session
             )
@@ -184,19 +317,231 @@ class PostgresBackedFileStore(FileStore):
             self.db_session.rollback()
             raise
 
-    def get_file_with_mime_type(self, filename: str) -> FileWithMimeType | None:
-        mime_type: str = "application/octet-stream"
+
+class ObjectStoreBackedFileStore(PostgresBackedFileStore):
+    """
+    Keeps the file records in Postgres and the contents in a blob storage (a local
+    directory or an S3 compatible bucket).
+
+    Blobs are content addressed, files with the same content share one blob. A blob is
+    deleted once the last file referencing it is deleted. Files saved before the blob
+    storage was configured stay in Postgres large objects and are read from there until
+    `migrate_large_objects` moves them over.
+    """
+
+    def __init__(
+        self,
+        db_session: Session,
+        blob_storage: BlobStorage,
+        tenant_id: str | None = None,
+    ):
+        super().__init__(db_session)
+        self.blob_storage = blob_storage
+        self.tenant_id = tenant_id or get_current_tenant_id()
+
+    def _build_object_key(self, content_hash: str) -> str:
+        return f"{self.tenant_id}/{content_hash[:2]}/{content_hash}"
+
+    def _put_blob(self, content: IO) -> tuple[str, str]:
+        """Stores the content unless a blob with the same content exists. Returns the
+        object key and the content hash. Locks the object key until the transaction
+        ends, so the blob can't be deleted before the reference to it is committed."""
+        spooled = tempfile.SpooledTemporaryFile(max_size=MAX_IN_MEMORY_SIZE)
+        hasher = hashlib.sha256()
+        while True:
+            chunk = content.read(STANDARD_CHUNK_SIZE)
+            if not chunk:
+                break
+            if isinstance(chunk, str):
+                chunk = chunk.encode()
+            hasher.update(chunk)
+            spooled.write(chunk)
+
+        content_hash = hasher.hexdigest()
+        object_key = self._build_object_key(content_hash)
+        with spooled:
+            lock_object_key__no_commit(object_key, self.db_session)
+            if not self.blob_storage.exists(object_key):
+                spooled.seek(0)
+                self.blob_storage.put(object_key, cast(IO[bytes], spooled))
+        return object_key, content_hash
+
+    def _delete_blob_if_unreferenced(
+        self, object_key: str, db_session: Session
+    ) -> None:
+        """Must only be called after the commit that dropped the reference. Ends the
+        transaction of `db_session`."""
         try:
-            file_io = self.read_file(filename, mode="b")
-            file_content = file_io.read()
-            matches = puremagic.magic_string(file_content)
-            if matches:
-                mime_type = cast(str, matches[0].mime_type)
-            return FileWithMimeType(data=file_content, mime_type=mime_type)
+            lock_object_key__no_commit(object_key, db_session)
+            if count_pgfilestores_by_object_key(object_key, db_session) == 0:
+                self.blob_storage.delete(object_key)
+            db_session.commit()
         except Exception:
-            return None
+            db_session.rollback()
+            # a leftover blob only costs storage
+            logger.exception(f"Failed to delete blob: object_key={object_key}")
+
+    def _delete_blob_after_commit(self, object_key: str) -> None:
+        """Deletes the blob once the next commit of the session dropped the last
+        reference to it. After a rollback the reference is still there and the check
+        leaves the blob alone."""
+
+        def _on_commit(_: Session) -> None:
+            # the committed session can't run queries from within this hook
+            with get_session_with_tenant(tenant_id=self.tenant_id) as db_session:
+                self._delete_blob_if_unreferenced(object_key, db_session)
+
+        event.listen(self.db_session, "after_commit", _on_commit, once=True)
+
+    def save_file(
+        self,
+        file_name: str,
+        content: IO,
+        display_name: str | None,
+        file_origin: FileOrigin,
+        file_type: str,
+        file_metadata: dict | None = None,
+        commit: bool = True,
+    ) -> None:
+        try:
+            existing_record = get_pgfilestore_by_file_name_optional(
+                file_name=file_name, db_session=self.db_session
+            )
+            previous_object_key = (
+                existing_record.object_key if existing_record else None
+            )
+
+            object_key, content_hash = self._put_blob(content)
+            upsert_pgfilestore(
+                file_name=file_name,
+                display_name=display_name or file_name,
+                file_origin=file_origin,
+                file_type=file_type,
+                lobj_oid=None,
+                db_session=self.db_session,
+                file_metadata=file_metadata,
+                object_key=object_key,
+                content_hash=content_hash,
+            )
+            if previous_object_key and previous_object_key != object_key:
+                self._delete_blob_after_commit(previous_object_key)
+            if commit:
+                self.db_session.commit()
+        except Exception:
+            self.db_session.rollback()
+            raise
+
+    def read_file_from_record(
+        self,
+        file_record: PGFileStore,
+        mode: str | None = None,
+        use_tempfile: bool = False,
+    ) -> IO:
+        if file_record.object_key is None:
+            return super().read_file_from_record(
+                file_record, mode=mode, use_tempfile=use_tempfile
+            )
+
+        with self.blob_storage.open(file_record.object_key) as blob:
+            if not use_tempfile:
+                return BytesIO(blob.read())
+
+            temp_file = tempfile.SpooledTemporaryFile(max_size=MAX_IN_MEMORY_SIZE)
+            while True:
+                chunk = blob.read(STANDARD_CHUNK_SIZE)
+                if not chunk:
+                    break
+                temp_file.write(chunk)
+            temp_file.seek(0)
+            return temp_file
+
+    def stream_file(
+        self,
+        file_name: str,
+        start: int = 0,
+        end: int | None = None,
+        chunk_size: int = STANDARD_CHUNK_SIZE,
+    ) -> Iterator[bytes]:
+        file_record = get_pgfilestore_by_file_name(
+            file_name=file_name, db_session=self.db_session
+        )
+        if file_record.object_key is None:
+            return super().stream_file(file_name, start, end, chunk_size)
+
+        blob = self.blob_storage.open(file_record.object_key, start=start, end=end)
+        return _iter_chunks(blob, chunk_size)
+
+    def delete_file(self, file_name: str) -> None:
+        try:
+            file_record = get_pgfilestore_by_file_name(
+                file_name=file_name, db_session=self.db_session
+            )
+            object_key = file_record.object_key
+            if file_record.lobj_oid is not None:
+                delete_lobj_by_id(file_record.lobj_oid, db_session=self.db_session)
+            delete_pgfilestore_by_file_name(
+                file_name=file_name, db_session=self.db_session
+            )
+            self.db_session.commit()
+        except Exception:
+            self.db_session.rollback()
+            raise
+
+        if object_key:
+            self._delete_blob_if_unreferenced(object_key, self.db_session)
+
+    def migrate_large_objects(
+        self, batch_size: int, after_file_name: str | None = None
+    ) -> LargeObjectMigrationBatch:
+        """Moves the content of up to `batch_size` files, ordered by name and starting
+        after `after_file_name`, from Postgres large objects into the blob storage.
+        Every file is committed on its own, so an interrupted migration loses no work.
+        A file that fails is logged and stays in its large object, the next batch
+        continues after it."""
+        file_records = get_pgfilestores_with_lobj(
+            limit=batch_size,
+            db_session=self.db_session,
+            after_file_name=after_file_name,
+        )
+        # the records expire on every commit and rollback
+        file_names_and_oids = [
+            (file_record.file_name, cast(int, file_record.lobj_oid))
+            for file_record in file_records
+        ]
+
+        num_failed = 0
+        for file_record, (file_name, lobj_oid) in zip(
+            file_records, file_names_and_oids
+        ):
+            try:
+                lobj_io = read_lobj(
+                    lobj_oid, db_session=self.db_session, use_tempfile=True
+                )
+                with lobj_io:
+                    object_key, content_hash = self._put_blob(lobj_io)
+
+                file_record.object_key = object_key
+                file_record.content_hash = content_hash
+                file_record.lobj_oid = None
+                delete_lobj_by_id(lobj_oid, db_session=self.db_session)
+                self.db_session.commit()
+            except Exception:
+                self.db_session.rollback()
+                num_failed += 1
+                logger.exception(
+                    f"Failed to migrate file to the blob storage: "
+                    f"file_name={file_name} lobj_oid={lobj_oid}"
+                )
+
+        return LargeObjectMigrationBatch(
+            num_migrated=len(file_records) - num_failed,
+            num_failed=num_failed,
+            last_file_name=file_names_and_oids[-1][0] if file_records else None,
+        )
 
 
 def get_default_file_store(db_session: Session) -> FileStore:
-    # The only supported file store now is the Postgres File Store
-    return PostgresBackedFileStore(db_session=db_session)
+    blob_storage = get_blob_storage()
+    if blob_storage is None:
+        return PostgresBackedFileStore(db_session=db_session)
+    return ObjectStoreBackedFileStore(db_session=db_session, blob_storage=blob_storage)
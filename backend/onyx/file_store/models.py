@@ -49,3 +49,10 @@ class InMemoryChatFile(BaseModel):
             "type": self.file_type,
             "name": self.filename,
         }
+
+
+class LargeObjectMigrationBatch(BaseModel):
+    num_migrated: int
+    num_failed: int
+    # the name of the last file of the batch, the next batch starts after it
+    last_file_name: str | None
@@ -22,7 +22,12 @@ class HttpxPool:
     @classmethod
     def _init_client(cls, **kwargs: Any) -> httpx.Client:
         """Private helper method to create and return an httpx.Client."""
-        merged_kwargs = {**cls.DEFAULT_KWARGS, **kwargs}
+        # callable defaults are factories, e.g. for objects that can't be shared
+        merged_kwargs: dict[str, Any] = {
+            key: value() if callable(value) else value
+            for key, value in cls.DEFAULT_KWARGS.items()
+        }
+        merged_kwargs.update(kwargs)
         return httpx.Client(**merged_kwargs)
 
     @classmethod
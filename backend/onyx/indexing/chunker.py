@@ -1,3 +1,6 @@
+from collections.abc import Iterator
+from functools import lru_cache
+
 from onyx.configs.app_configs import AVERAGE_SUMMARY_EMBEDDINGS
 from onyx.configs.app_configs import BLURB_SIZE
 from onyx.configs.app_configs import LARGE_CHUNK_RATIO
@@ -30,6 +33,8 @@ CHUNK_OVERLAP = 0
 # overwhelm the actual contents of the chunk
 MAX_METADATA_PERCENTAGE = 0.25
 CHUNK_MIN_CONTENT = 256
+# Number of distinct texts whose tokenization is kept while chunking a document
+TOKENIZATION_CACHE_SIZE = 4096
 
 logger = setup_logger()
 
@@ -117,6 +122,39 @@ def generate_large_chunks(chunks: list[DocAwareChunk]) -> list[DocAwareChunk]:
     return large_chunks
 
 
+class _CachedTokenizer(BaseTokenizer):
+    """
+    Memoizes a tokenizer. While chunking a document the same text gets tokenized many
+    times: the sentence splitters tokenize a section to split it and then every
+    resulting chunk again for its blurb and its mini-chunks. With the cache every
+    distinct text is tokenized once, the results are exactly the same.
+    """
+
+    def __init__(self, tokenizer: BaseTokenizer, maxsize: int) -> None:
+        self.tokenizer = tokenizer
+        self._encode = lru_cache(maxsize=maxsize)(self._encode_uncached)
+        self._tokenize = lru_cache(maxsize=maxsize)(self._tokenize_uncached)
+
+    def _encode_uncached(self, string: str) -> tuple[int, ...]:
+        return tuple(self.tokenizer.encode(string))
+
+    def _tokenize_uncached(self, string: str) -> tuple[str, ...]:
+        return tuple(self.tokenizer.tokenize(string))
+
+    def encode(self, string: str) -> list[int]:
+        return list(self._encode(string))
+
+    def tokenize(self, string: str) -> list[str]:
+        return list(self._tokenize(string))
+
+    def decode(self, tokens: list[int]) -> str:
+        return self.tokenizer.decode(tokens)
+
+    def clear(self) -> None:
+        self._encode.cache_clear()
+        self._tokenize.cache_clear()
+
+
 class Chunker:
     """
     Chunks documents into smaller chunks for indexing.
@@ -137,6 +175,9 @@ class Chunker:
     ) -> None:
         # importing llama_index uses a lot of RAM, so we only import it when needed.
         from llama_index.core.node_parser import SentenceSplitter
+        from llama_index.core.node_parser.text.utils import (
+            split_by_sentence_tokenizer,
+        )
 
         self.include_metadata = include_metadata
         self.chunk_token_limit = chunk_token_limit
@@ -150,27 +191,40 @@ class Chunker:
         self.default_contextual_rag_reserved_tokens = MAX_CONTEXT_TOKENS * (
             int(USE_CHUNK_SUMMARY) + int(USE_DOCUMENT_SUMMARY)
         )
-        self.tokenizer = tokenizer
+        self.tokenizer = (
+            tokenizer
+            if isinstance(tokenizer, _CachedTokenizer)
+            else _CachedTokenizer(tokenizer, TOKENIZATION_CACHE_SIZE)
+        )
         self.callback = callback
 
+        # the splitters below sentence split the same texts again and again as well
+        split_sentences = split_by_sentence_tokenizer()
+        self._split_sentences_cached = lru_cache(maxsize=TOKENIZATION_CACHE_SIZE)(
+            lambda text: tuple(split_sentences(text))
+        )
+
         self.max_context = 0
         self.prompt_tokens = 0
 
         self.blurb_splitter = SentenceSplitter(
-            tokenizer=tokenizer.tokenize,
+            tokenizer=self.tokenizer.tokenize,
+            chunking_tokenizer_fn=self._split_sentences,
             chunk_size=blurb_size,
             chunk_overlap=0,
         )
 
         self.chunk_splitter = SentenceSplitter(
-            tokenizer=tokenizer.tokenize,
+            tokenizer=self.tokenizer.tokenize,
+            chunking_tokenizer_fn=self._split_sentences,
             chunk_size=chunk_token_limit,
             chunk_overlap=chunk_overlap,
         )
 
         self.mini_chunk_splitter = (
             SentenceSplitter(
-                tokenizer=tokenizer.tokenize,
+                tokenizer=self.tokenizer.tokenize,
+                chunking_tokenizer_fn=self._split_sentences,
                 chunk_size=mini_chunk_size,
                 chunk_overlap=0,
             )
@@ -178,6 +232,13 @@ class Chunker:
             else None
         )
 
+    def _split_sentences(self, text: str) -> list[str]:
+        return list(self._split_sentences_cached(text))
+
+    def _clear_caches(self) -> None:
+        self.tokenizer.clear()
+        self._split_sentences_cached.cache_clear()
+
     def _split_oversized_chunk(self, text: str, content_token_limit: int) -> list[str]:
         """
         Splits the text into smaller chunks based on token count to ensure
@@ -500,22 +561,35 @@ class Chunker:
 
         return normal_chunks
 
-    def chunk(self, documents: list[IndexingDocument]) -> list[DocAwareChunk]:
+    def chunk_iter(
+        self, documents: list[IndexingDocument]
+    ) -> Iterator[list[DocAwareChunk]]:
         """
-        Takes in a list of documents and chunks them into smaller chunks for indexing
-        while persisting the document metadata.
-
-        Works with both standard Document objects and IndexingDocument objects with processed_sections.
+        Same as `chunk`, but yields the chunks of each document as soon as that document
+        is chunked, so callers can start working on them before the whole batch is done.
         """
-        final_chunks: list[DocAwareChunk] = []
         for document in documents:
             if self.callback and self.callback.should_stop():
                 raise RuntimeError("Chunker.chunk: Stop signal detected")
 
             chunks = self._handle_single_document(document)
-            final_chunks.extend(chunks)
+            # texts are rarely shared between documents, don't hold on to them
+            self._clear_caches()
 
             if self.callback:
                 self.callback.progress("Chunker.chunk", len(chunks))
 
+            yield chunks
+
+    def chunk(self, documents: list[IndexingDocument]) -> list[DocAwareChunk]:
+        """
+        Takes in a list of documents and chunks them into smaller chunks for indexing
+        while persisting the document metadata.
+
+        Works with both standard Document objects and IndexingDocument objects with processed_sections.
+        """
+        final_chunks: list[DocAwareChunk] = []
+        for chunks in self.chunk_iter(documents):
+            final_chunks.extend(chunks)
+
         return final_chunks
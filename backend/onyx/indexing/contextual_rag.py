@@ -0,0 +1,173 @@
+import concurrent.futures
+import contextvars
+import hashlib
+import json
+import threading
+import time
+from collections.abc import Callable
+from typing import Any
+from typing import cast
+
+from pydantic import BaseModel
+
+from onyx.configs.app_configs import CONTEXTUAL_RAG_CACHE_TTL_SECONDS
+from onyx.configs.app_configs import CONTEXTUAL_RAG_MAX_CALLS_PER_MINUTE
+from onyx.configs.app_configs import CONTEXTUAL_RAG_MAX_CONCURRENT_CALLS
+from onyx.llm.interfaces import LLM
+from onyx.prompts.chat_prompts import CONTEXTUAL_RAG_PROMPT1
+from onyx.prompts.chat_prompts import CONTEXTUAL_RAG_PROMPT2
+from onyx.prompts.chat_prompts import DOCUMENT_SUMMARY_PROMPT
+from onyx.redis.redis_pool import get_redis_client
+from onyx.utils.logger import setup_logger
+from shared_configs.contextvars import get_current_tenant_id
+
+logger = setup_logger()
+
+_REDIS_KEY_PREFIX = "contextual_rag"
+
+
+class ContextualRagScheduler:
+    """Runs the contextual RAG work of a whole indexing batch on one thread pool, so the
+    number of LLM calls in flight is bounded for the batch instead of per document.
+    Tasks may submit further tasks. If a calls per minute budget is set, every LLM call
+    has to go through `wait_for_rate_limit` first.
+
+    `wait` returns once every task (including the ones submitted by other tasks) has
+    finished and re-raises the first exception raised by a task."""
+
+    def __init__(
+        self,
+        max_concurrent_calls: int = CONTEXTUAL_RAG_MAX_CONCURRENT_CALLS,
+        max_calls_per_minute: int = CONTEXTUAL_RAG_MAX_CALLS_PER_MINUTE,
+    ) -> None:
+        self._executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=max(1, max_concurrent_calls)
+        )
+        self._futures: list[concurrent.futures.Future[None]] = []
+        self._futures_lock = threading.Lock()
+
+        self._min_call_interval = (
+            60.0 / max_calls_per_minute if max_calls_per_minute > 0 else 0.0
+        )
+        self._next_call_time = 0.0
+        self._rate_lock = threading.Lock()
+
+    def __enter__(self) -> "ContextualRagScheduler":
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        self._executor.shutdown(wait=True, cancel_futures=True)
+
+    def submit(self, func: Callable[..., None], *args: Any) -> None:
+        # tasks run in a copy of the submitter's context so they see the current tenant
+        future = self._executor.submit(contextvars.copy_context().run, func, *args)
+        with self._futures_lock:
+            self._futures.append(future)
+
+    def wait(self) -> None:
+        while True:
+            with self._futures_lock:
+                pending = [future for future in self._futures if not future.done()]
+            if not pending:
+                break
+            concurrent.futures.wait(pending)
+
+        with self._futures_lock:
+            futures = list(self._futures)
+        for future in futures:
+            # raises the task's exception, if any
+            future.result()
+
+    def wait_for_rate_limit(self) -> None:
+        if not self._min_call_interval:
+            return
+
+        with self._rate_lock:
+            now = time.monotonic()
+            call_time = max(now, self._next_call_time)
+            self._next_call_time = call_time + self._min_call_interval
+
+        if call_time > now:
+            time.sleep(call_time - now)
+
+
+class DocumentContextualRagResult(BaseModel):
+    """What the LLM produced for one document, chunk contexts are keyed by a hash of
+    the chunk content."""
+
+    doc_summary: str | None = None
+    chunk_contexts: dict[str, str] = {}
+
+
+def _build_redis_key(key: str) -> str:
+    # mget and pipelines bypass the tenant prefixing of the Redis client
+    return f"{get_current_tenant_id()}:{_REDIS_KEY_PREFIX}:{key}"
+
+
+def hash_chunk_content(content: str) -> str:
+    return hashlib.sha256(content.encode()).hexdigest()
+
+
+def build_contextual_rag_cache_key(
+    document_text: str, llm: LLM, chunk_token_limit: int
+) -> str:
+    """Everything that goes into the prompts is part of the key. The document id is
+    not, documents with the same content get the same summaries."""
+    key_parts = [
+        llm.config.model_provider,
+        llm.config.model_name,
+        llm.config.max_input_tokens,
+        chunk_token_limit,
+        DOCUMENT_SUMMARY_PROMPT,
+        CONTEXTUAL_RAG_PROMPT1,
+        CONTEXTUAL_RAG_PROMPT2,
+        document_text,
+    ]
+    return hashlib.sha256(json.dumps(key_parts).encode()).hexdigest()
+
+
+class ContextualRagCache:
+    """Tenant scoped Redis store for the contextual RAG results of documents. Redis
+    failures are logged and treated as misses, the cache must never fail indexing."""
+
+    def __init__(self, ttl_seconds: int = CONTEXTUAL_RAG_CACHE_TTL_SECONDS) -> None:
+        self._ttl_seconds = ttl_seconds
+
+    def get_many(self, keys: list[str]) -> dict[str, DocumentContextualRagResult]:
+        if not keys:
+            return {}
+
+        try:
+            raw_values = cast(
+                list[bytes | None],
+                get_redis_client().mget([_build_redis_key(key) for key in keys]),
+            )
+        except Exception:
+            logger.exception("Failed to read contextual RAG results from Redis")
+            return {}
+
+        results: dict[str, DocumentContextualRagResult] = {}
+        for key, raw in zip(keys, raw_values):
+            if raw is None:
+                continue
+            try:
+                results[key] = DocumentContextualRagResult.model_validate_json(raw)
+            except ValueError:
+                logger.warning(f"Ignoring malformed contextual RAG result: key={key}")
+        return results
+
+    def set_many(self, results: dict[str, DocumentContextualRagResult]) -> None:
+        if not results:
+            return
+
+        try:
+            pipe = get_redis_client().pipeline(transaction=False)
+            for key, result in results.items():
+                pipe.set(
+                    _build_redis_key(key),
+                    result.model_dump_json(),
+                    ex=self._ttl_seconds,
+                )
+            pipe.execute()
+        except Exception:
+            logger.exception("Failed to write contextual RAG results to Redis")
@@ -1,10 +1,17 @@
+import hashlib
+import json
 import time
 from abc import ABC
 from abc import abstractmethod
 from collections import defaultdict
 
+from onyx.configs.app_configs import ENABLE_CHUNK_EMBEDDING_CACHE
 from onyx.connectors.models import ConnectorFailure
 from onyx.connectors.models import DocumentFailure
+from onyx.db.chunk import get_cached_chunk_embeddings
+from onyx.db.chunk import mark_cached_chunk_embeddings_used__no_commit
+from onyx.db.chunk import upsert_cached_chunk_embeddings__no_commit
+from onyx.db.engine import get_session_with_current_tenant
 from onyx.db.models import SearchSettings
 from onyx.indexing.indexing_heartbeat import IndexingHeartbeatInterface
 from onyx.indexing.models import ChunkEmbedding
@@ -50,6 +57,7 @@ class IndexingEmbedder(ABC):
         self.api_url = api_url
         self.api_version = api_version
         self.deployment_name = deployment_name
+        self.reduced_dimension = reduced_dimension
 
         self.embedding_model = EmbeddingModel(
             model_name=model_name,
@@ -93,6 +101,7 @@ class DefaultIndexingEmbedder(IndexingEmbedder):
         deployment_name: str | None = None,
         reduced_dimension: int | None = None,
         callback: IndexingHeartbeatInterface | None = None,
+        use_embedding_cache: bool = ENABLE_CHUNK_EMBEDDING_CACHE,
     ):
         super().__init__(
             model_name,
@@ -107,6 +116,81 @@ class DefaultIndexingEmbedder(IndexingEmbedder):
             reduced_dimension,
             callback,
         )
+        self.use_embedding_cache = use_embedding_cache
+
+    def _embedding_cache_key(self, text: str, large_chunks_present: bool) -> str:
+        # Anything that changes the vector produced for a text has to be part of the key
+        key_parts = [
+            self.model_name,
+            self.provider_type,
+            self.passage_prefix,
+            self.normalize,
+            self.reduced_dimension,
+            self.api_url,
+            self.deployment_name,
+            # determines the length the text is trimmed to before embedding
+            large_chunks_present,
+            text,
+        ]
+        return hashlib.sha256(json.dumps(key_parts).encode()).hexdigest()
+
+    def _encode_passages(
+        self,
+        texts: list[str],
+        large_chunks_present: bool = False,
+        tenant_id: str | None = None,
+        request_id: str | None = None,
+    ) -> list[Embedding]:
+        """Embeds the texts, reusing embeddings of identical texts from previous indexing
+        runs if the embedding cache is enabled. Only cache misses go to the model."""
+        if not self.use_embedding_cache:
+            return self.embedding_model.encode(
+                texts=texts,
+                text_type=EmbedTextType.PASSAGE,
+                large_chunks_present=large_chunks_present,
+                tenant_id=tenant_id,
+                request_id=request_id,
+            )
+
+        content_hashes = [
+            self._embedding_cache_key(text, large_chunks_present) for text in texts
+        ]
+        with get_session_with_current_tenant() as db_session:
+            hash_to_embedding = get_cached_chunk_embeddings(
+                list(set(content_hashes)), db_session
+            )
+            mark_cached_chunk_embeddings_used__no_commit(
+                list(hash_to_embedding), db_session
+            )
+            db_session.commit()
+
+        hash_to_text = {
+            content_hash: text
+            for content_hash, text in zip(content_hashes, texts)
+            if content_hash not in hash_to_embedding
+        }
+        logger.debug(
+            f"Chunk embedding cache: hits={len(texts) - len(hash_to_text)} "
+            f"misses={len(hash_to_text)}"
+        )
+
+        if hash_to_text:
+            new_embeddings = self.embedding_model.encode(
+                texts=list(hash_to_text.values()),
+                text_type=EmbedTextType.PASSAGE,
+                large_chunks_present=large_chunks_present,
+                tenant_id=tenant_id,
+                request_id=request_id,
+            )
+            new_hash_to_embedding = dict(zip(hash_to_text.keys(), new_embeddings))
+            with get_session_with_current_tenant() as db_session:
+                upsert_cached_chunk_embeddings__no_commit(
+                    new_hash_to_embedding, db_session
+                )
+                db_session.commit()
+            hash_to_embedding.update(new_hash_to_embedding)
+
+        return [hash_to_embedding[content_hash] for content_hash in content_hashes]
 
     @log_function_time()
     def embed_chunks(
@@ -143,9 +227,8 @@ class DefaultIndexingEmbedder(IndexingEmbedder):
                     raise RuntimeError("Large chunk contains mini chunks")
                 flat_chunk_texts.extend(chunk.mini_chunk_texts)
 
-        embeddings = self.embedding_model.encode(
+        embeddings = self._encode_passages(
             texts=flat_chunk_texts,
-            text_type=EmbedTextType.PASSAGE,
             large_chunks_present=large_chunks_present,
             tenant_id=tenant_id,
             request_id=request_id,
@@ -163,9 +246,8 @@ class DefaultIndexingEmbedder(IndexingEmbedder):
         # Cache the Title embeddings to only have to do it once
         title_embed_dict: dict[str, Embedding] = {}
         if chunk_titles_list:
-            title_embeddings = self.embedding_model.encode(
+            title_embeddings = self._encode_passages(
                 chunk_titles_list,
-                text_type=EmbedTextType.PASSAGE,
                 tenant_id=tenant_id,
                 request_id=request_id,
             )
@@ -1,5 +1,7 @@
 from collections import defaultdict
 from collections.abc import Callable
+from collections.abc import Iterator
+from dataclasses import dataclass
 from functools import partial
 from typing import Protocol
 
@@ -12,8 +14,13 @@ from onyx.access.models import DocumentAccess
 from onyx.configs.app_configs import DEFAULT_CONTEXTUAL_RAG_LLM_NAME
 from onyx.configs.app_configs import DEFAULT_CONTEXTUAL_RAG_LLM_PROVIDER
 from onyx.configs.app_configs import ENABLE_CONTEXTUAL_RAG
+from onyx.configs.app_configs import IMAGE_SUMMARIZATION_MAX_WORKERS
 from onyx.configs.app_configs import MAX_DOCUMENT_CHARS
 from onyx.configs.app_configs import MAX_TOKENS_FOR_FULL_INCLUSION
+from onyx.configs.app_configs import PIPELINED_INDEXING_CHUNK_WORKERS
+from onyx.configs.app_configs import PIPELINED_INDEXING_EMBED_WORKERS
+from onyx.configs.app_configs import PIPELINED_INDEXING_MAX_QUEUED_BATCHES
+from onyx.configs.app_configs import PIPELINED_INDEXING_WRITE_WORKERS
 from onyx.configs.app_configs import USE_CHUNK_SUMMARY
 from onyx.configs.app_configs import USE_DOCUMENT_SUMMARY
 from onyx.configs.constants import DEFAULT_BOOST
@@ -44,8 +51,7 @@ from onyx.db.document_set import fetch_document_sets_for_documents
 from onyx.db.engine import get_session_with_current_tenant
 from onyx.db.models import Document as DBDocument
 from onyx.db.models import IndexModelStatus
-from onyx.db.pg_file_store import get_pgfilestore_by_file_name
-from onyx.db.pg_file_store import read_lobj
+from onyx.db.pg_file_store import get_pgfilestores_by_file_names
 from onyx.db.search_settings import get_active_search_settings
 from onyx.db.tag import create_or_add_document_tag
 from onyx.db.tag import create_or_add_document_tag_list
@@ -59,8 +65,17 @@ from onyx.document_index.interfaces import DocumentIndex
 from onyx.document_index.interfaces import DocumentMetadata
 from onyx.document_index.interfaces import IndexBatchParams
 from onyx.file_processing.image_summarization import summarize_image_with_error_handling
+from onyx.file_processing.image_summary_cache import build_image_summary_cache_key
+from onyx.file_processing.image_summary_cache import get_image_summary_cache
+from onyx.file_processing.image_summary_cache import hash_image_data
+from onyx.file_store.file_store import get_default_file_store
 from onyx.file_store.utils import store_user_file_plaintext
 from onyx.indexing.chunker import Chunker
+from onyx.indexing.contextual_rag import build_contextual_rag_cache_key
+from onyx.indexing.contextual_rag import ContextualRagCache
+from onyx.indexing.contextual_rag import ContextualRagScheduler
+from onyx.indexing.contextual_rag import DocumentContextualRagResult
+from onyx.indexing.contextual_rag import hash_chunk_content
 from onyx.indexing.embedder import embed_chunks_with_failure_handling
 from onyx.indexing.embedder import IndexingEmbedder
 from onyx.indexing.indexing_heartbeat import IndexingHeartbeatInterface
@@ -86,6 +101,8 @@ from onyx.prompts.chat_prompts import CONTEXTUAL_RAG_PROMPT1
 from onyx.prompts.chat_prompts import CONTEXTUAL_RAG_PROMPT2
 from onyx.prompts.chat_prompts import DOCUMENT_SUMMARY_PROMPT
 from onyx.utils.logger import setup_logger
+from onyx.utils.staged_pipeline import PipelineStage
+from onyx.utils.staged_pipeline import StagedPipeline
 from onyx.utils.threadpool_concurrency import run_functions_tuples_in_parallel
 from onyx.utils.timing import log_function_time
 from shared_configs.configs import (
@@ -95,6 +112,9 @@ from shared_configs.configs import (
 
 logger = setup_logger()
 
+_IMAGE_ERROR_TEXT = "[Error processing image]"
+_IMAGE_NOT_SUMMARIZED_TEXT = "[Image could not be summarized]"
+
 
 class DocumentBatchPrepareContext(BaseModel):
     updatable_docs: list[Document]
@@ -291,32 +311,38 @@ def index_doc_batch_with_handler(
             llm=llm,
         )
     except Exception as e:
-        # don't log the batch directly, it's too much text
-        document_ids = [doc.id for doc in document_batch]
-        logger.exception(f"Failed to index document batch: {document_ids}")
-
-        index_pipeline_result = IndexingPipelineResult(
-            new_docs=0,
-            total_docs=len(document_batch),
-            total_chunks=0,
-            failures=[
-                ConnectorFailure(
-                    failed_document=DocumentFailure(
-                        document_id=document.id,
-                        document_link=(
-                            document.sections[0].link if document.sections else None
-                        ),
-                    ),
-                    failure_message=str(e),
-                    exception=e,
-                )
-                for document in document_batch
-            ],
-        )
+        index_pipeline_result = _build_failed_batch_result(document_batch, e)
 
     return index_pipeline_result
 
 
+def _build_failed_batch_result(
+    document_batch: list[Document], e: Exception
+) -> IndexingPipelineResult:
+    # don't log the batch directly, it's too much text
+    document_ids = [doc.id for doc in document_batch]
+    logger.exception(f"Failed to index document batch: {document_ids}")
+
+    return IndexingPipelineResult(
+        new_docs=0,
+        total_docs=len(document_batch),
+        total_chunks=0,
+        failures=[
+            ConnectorFailure(
+                failed_document=DocumentFailure(
+                    document_id=document.id,
+                    document_link=(
+                        document.sections[0].link if document.sections else None
+                    ),
+                ),
+                failure_message=str(e),
+                exception=e,
+            )
+            for document in document_batch
+        ],
+    )
+
+
 def index_doc_batch_prepare(
     documents: list[Document],
     index_attempt_metadata: IndexAttemptMetadata,
@@ -438,6 +464,109 @@ def filter_documents(document_batch: list[Document]) -> list[Document]:
     return documents
 
 
+def _summarize_image(llm: LLM, image_data: bytes, context_name: str) -> str:
+    try:
+        summary = summarize_image_with_error_handling(
+            llm=llm,
+            image_data=image_data,
+            context_name=context_name,
+        )
+    except Exception as e:
+        logger.error(f"Error processing image section: {e}")
+        return _IMAGE_ERROR_TEXT
+
+    return summary or _IMAGE_NOT_SUMMARIZED_TEXT
+
+
+def _summarize_image_files(file_names: list[str], llm: LLM) -> dict[str, str]:
+    """Returns the section text for each of the image files.
+
+    The files are loaded with a single query and images with identical content are
+    only summarized once. Summaries are cached across batches by image content, the
+    remaining images are summarized concurrently."""
+    unique_file_names = list(dict.fromkeys(file_names))
+    if not unique_file_names:
+        return {}
+
+    file_name_to_text: dict[str, str] = {}
+    file_name_to_image_hash: dict[str, str] = {}
+    # the first file found for each image content is the one that gets summarized
+    image_hash_to_file: dict[str, tuple[bytes, str]] = {}
+
+    try:
+        with get_session_with_current_tenant() as db_session:
+            file_store = get_default_file_store(db_session)
+            file_name_to_pgfilestore = {
+                pgfilestore.file_name: pgfilestore
+                for pgfilestore in get_pgfilestores_by_file_names(
+                    unique_file_names, db_session
+                )
+            }
+
+            for file_name in unique_file_names:
+                pgfilestore = file_name_to_pgfilestore.get(file_name)
+                if not pgfilestore:
+                    logger.warning(f"Image file {file_name} not found in PGFileStore")
+                    file_name_to_text[file_name] = "[Image could not be processed]"
+                    continue
+
+                try:
+                    image_data = file_store.read_file_from_record(
+                        pgfilestore, mode="b"
+                    ).read()
+                except Exception as e:
+                    logger.error(f"Error processing image section: {e}")
+                    file_name_to_text[file_name] = _IMAGE_ERROR_TEXT
+                    continue
+
+                image_hash = hash_image_data(image_data)
+                file_name_to_image_hash[file_name] = image_hash
+                image_hash_to_file.setdefault(
+                    image_hash, (image_data, pgfilestore.display_name or "Image")
+                )
+    except Exception as e:
+        logger.error(f"Error loading image files: {e}")
+        for file_name in unique_file_names:
+            if file_name not in file_name_to_image_hash:
+                file_name_to_text.setdefault(file_name, _IMAGE_ERROR_TEXT)
+
+    summary_cache = get_image_summary_cache()
+    image_hash_to_text: dict[str, str] = {}
+    to_summarize: list[tuple[str, bytes, str]] = []
+    for image_hash, (image_data, context_name) in image_hash_to_file.items():
+        cached_summary = summary_cache.get(
+            build_image_summary_cache_key(image_hash, llm)
+        )
+        if cached_summary is not None:
+            image_hash_to_text[image_hash] = cached_summary
+        else:
+            to_summarize.append((image_hash, image_data, context_name))
+
+    summaries = run_functions_tuples_in_parallel(
+        [
+            (_summarize_image, (llm, image_data, context_name))
+            for _, image_data, context_name in to_summarize
+        ],
+        max_workers=IMAGE_SUMMARIZATION_MAX_WORKERS,
+    )
+    for (image_hash, _, _), text in zip(to_summarize, summaries):
+        image_hash_to_text[image_hash] = text
+        if text not in (_IMAGE_ERROR_TEXT, _IMAGE_NOT_SUMMARIZED_TEXT):
+            summary_cache.set(build_image_summary_cache_key(image_hash, llm), text)
+
+    logger.info(
+        f"Summarized images: "
+        f"files={len(unique_file_names)} "
+        f"unique_images={len(image_hash_to_file)} "
+        f"summarized={len(to_summarize)}"
+    )
+
+    for file_name, image_hash in file_name_to_image_hash.items():
+        file_name_to_text[file_name] = image_hash_to_text[image_hash]
+
+    return file_name_to_text
+
+
 def process_image_sections(documents: list[Document]) -> list[IndexingDocument]:
     """
     Process all sections in documents by:
@@ -479,56 +608,29 @@ def process_image_sections(documents: list[Document]) -> list[IndexingDocument]:
             for document in documents
         ]
 
+    image_file_name_to_text = _summarize_image_files(
+        file_names=[
+            section.image_file_name
+            for document in documents
+            for section in document.sections
+            if isinstance(section, ImageSection)
+        ],
+        llm=llm,
+    )
+
     indexed_documents: list[IndexingDocument] = []
 
     for document in documents:
         processed_sections: list[Section] = []
 
         for section in document.sections:
-            # For ImageSection, process and create base Section with both text and image_file_name
+            # For ImageSection, create base Section with both the summary and image_file_name
             if isinstance(section, ImageSection):
-                # Default section with image path preserved - ensure text is always a string
                 processed_section = Section(
                     link=section.link,
                     image_file_name=section.image_file_name,
-                    text="",  # Initialize with empty string
+                    text=image_file_name_to_text[section.image_file_name],
                 )
-
-                # Try to get image summary
-                try:
-                    with get_session_with_current_tenant() as db_session:
-                        pgfilestore = get_pgfilestore_by_file_name(
-                            file_name=section.image_file_name, db_session=db_session
-                        )
-
-                        if not pgfilestore:
-                            logger.warning(
-                                f"Image file {section.image_file_name} not found in PGFileStore"
-                            )
-
-                            processed_section.text = "[Image could not be processed]"
-                        else:
-                            # Get the image data
-                            image_data_io = read_lobj(
-                                pgfilestore.lobj_oid, db_session, mode="rb"
-                            )
-                            pgfilestore_data = image_data_io.read()
-                            summary = summarize_image_with_error_handling(
-                                llm=llm,
-                                image_data=pgfilestore_data,
-                                context_name=pgfilestore.display_name or "Image",
-                            )
-
-                            if summary:
-                                processed_section.text = summary
-                            else:
-                                processed_section.text = (
-                                    "[Image could not be summarized]"
-                                )
-                except Exception as e:
-                    logger.error(f"Error processing image section: {e}")
-                    processed_section.text = "[Error processing image]"
-
                 processed_sections.append(processed_section)
 
             # For TextSection, create a base Section with text and link
@@ -559,11 +661,20 @@ def process_image_sections(documents: list[Document]) -> list[IndexingDocument]:
     return indexed_documents
 
 
+def _invoke_contextual_rag_llm(
+    llm: LLM, prompt: str, scheduler: ContextualRagScheduler
+) -> str:
+    scheduler.wait_for_rate_limit()
+    return message_to_string(llm.invoke(prompt, max_tokens=MAX_CONTEXT_TOKENS))
+
+
 def add_document_summaries(
     chunks_by_doc: list[DocAwareChunk],
     llm: LLM,
     tokenizer: BaseTokenizer,
     trunc_doc_tokens: int,
+    scheduler: ContextualRagScheduler,
+    cached_result: DocumentContextualRagResult | None = None,
 ) -> list[int] | None:
     """
     Adds a document summary to a list of chunks from the same document.
@@ -578,11 +689,12 @@ def add_document_summaries(
         return None
 
     doc_tokens = tokenizer.encode(chunks_by_doc[0].source_document.get_text_content())
-    doc_content = tokenizer_trim_middle(doc_tokens, trunc_doc_tokens, tokenizer)
-    summary_prompt = DOCUMENT_SUMMARY_PROMPT.format(document=doc_content)
-    doc_summary = message_to_string(
-        llm.invoke(summary_prompt, max_tokens=MAX_CONTEXT_TOKENS)
-    )
+    if cached_result and cached_result.doc_summary is not None:
+        doc_summary = cached_result.doc_summary
+    else:
+        doc_content = tokenizer_trim_middle(doc_tokens, trunc_doc_tokens, tokenizer)
+        summary_prompt = DOCUMENT_SUMMARY_PROMPT.format(document=doc_content)
+        doc_summary = _invoke_contextual_rag_llm(llm, summary_prompt, scheduler)
 
     for chunk in chunks_by_doc:
         chunk.doc_summary = doc_summary
@@ -596,16 +708,37 @@ def add_chunk_summaries(
     tokenizer: BaseTokenizer,
     trunc_doc_chunk_tokens: int,
     doc_tokens: list[int] | None,
+    scheduler: ContextualRagScheduler,
+    cached_result: DocumentContextualRagResult | None = None,
 ) -> None:
     """
     Adds chunk summaries to the chunks grouped by document id.
     Chunk summaries look at the chunk as well as the entire document (or a summary,
     if the document is too long) and describe how the chunk relates to the document.
+
+    All prompts of a document start with the same document prefix. The first chunk is
+    contextualized right away and the rest are handed to the scheduler afterwards, so
+    the prefix is sent back to back and provider side prompt caching can kick in.
     """
     # all chunks within a document have the same contextual_rag_reserved_tokens
     if chunks_by_doc[0].contextual_rag_reserved_tokens == 0:
         return
 
+    chunks_to_contextualize: list[DocAwareChunk] = []
+    for chunk in chunks_by_doc:
+        cached_context = (
+            cached_result.chunk_contexts.get(hash_chunk_content(chunk.content))
+            if cached_result
+            else None
+        )
+        if cached_context is not None:
+            chunk.chunk_context = cached_context
+        else:
+            chunks_to_contextualize.append(chunk)
+
+    if not chunks_to_contextualize:
+        return
+
     # use values computed in above doc summary section if available
     doc_tokens = doc_tokens or tokenizer.encode(
         chunks_by_doc[0].source_document.get_text_content()
@@ -621,11 +754,8 @@ def add_chunk_summaries(
     if not doc_info:
         # This happens if the document is too long AND document summaries are turned off
         # In this case we compute a doc summary using the LLM
-        doc_info = message_to_string(
-            llm.invoke(
-                DOCUMENT_SUMMARY_PROMPT.format(document=doc_content),
-                max_tokens=MAX_CONTEXT_TOKENS,
-            )
+        doc_info = _invoke_contextual_rag_llm(
+            llm, DOCUMENT_SUMMARY_PROMPT.format(document=doc_content), scheduler
         )
 
     context_prompt1 = CONTEXTUAL_RAG_PROMPT1.format(document=doc_info)
@@ -633,11 +763,8 @@ def add_chunk_summaries(
     def assign_context(chunk: DocAwareChunk) -> None:
         context_prompt2 = CONTEXTUAL_RAG_PROMPT2.format(chunk=chunk.content)
         try:
-            chunk.chunk_context = message_to_string(
-                llm.invoke(
-                    context_prompt1 + context_prompt2,
-                    max_tokens=MAX_CONTEXT_TOKENS,
-                )
+            chunk.chunk_context = _invoke_contextual_rag_llm(
+                llm, context_prompt1 + context_prompt2, scheduler
             )
         except LLMRateLimitError as e:
             # Erroring during chunker is undesirable, so we log the error and continue
@@ -648,8 +775,22 @@ def add_chunk_summaries(
             logger.exception(f"Error adding chunk summary: {e}", exc_info=e)
             chunk.chunk_context = ""
 
-    run_functions_tuples_in_parallel(
-        [(assign_context, (chunk,)) for chunk in chunks_by_doc]
+    assign_context(chunks_to_contextualize[0])
+    for chunk in chunks_to_contextualize[1:]:
+        scheduler.submit(assign_context, chunk)
+
+
+def _build_contextual_rag_result(
+    chunks_by_doc: list[DocAwareChunk],
+) -> DocumentContextualRagResult:
+    return DocumentContextualRagResult(
+        doc_summary=chunks_by_doc[0].doc_summary if USE_DOCUMENT_SUMMARY else None,
+        # failed chunk contexts are left empty, those should be retried next time
+        chunk_contexts={
+            hash_chunk_content(chunk.content): chunk.chunk_context
+            for chunk in chunks_by_doc
+            if USE_CHUNK_SUMMARY and chunk.chunk_context
+        },
     )
 
 
@@ -662,6 +803,9 @@ def add_contextual_summaries(
     """
     Adds Document summary and chunk-within-document context to the chunks
     based on which environment variables are set.
+
+    The LLM calls of all documents in the batch share one concurrency and rate budget.
+    Results are stored per document, a retried batch only pays for what is missing.
     """
     doc2chunks = defaultdict(list)
     for chunk in chunks:
@@ -680,52 +824,109 @@ def add_contextual_summaries(
     trunc_doc_chunk_tokens = (
         llm.config.max_input_tokens - prompt_tokens - chunk_token_limit
     )
-    for chunks_by_doc in doc2chunks.values():
+
+    doc_id_to_cache_key = {
+        doc_id: build_contextual_rag_cache_key(
+            chunks_by_doc[0].source_document.get_text_content(),
+            llm,
+            chunk_token_limit,
+        )
+        for doc_id, chunks_by_doc in doc2chunks.items()
+        if chunks_by_doc[0].contextual_rag_reserved_tokens != 0
+    }
+    cache = ContextualRagCache()
+    cached_results = cache.get_many(list(set(doc_id_to_cache_key.values())))
+
+    def add_summaries_for_doc(
+        chunks_by_doc: list[DocAwareChunk],
+        cached_result: DocumentContextualRagResult | None,
+        scheduler: ContextualRagScheduler,
+    ) -> None:
         doc_tokens = None
         if USE_DOCUMENT_SUMMARY:
             doc_tokens = add_document_summaries(
-                chunks_by_doc, llm, tokenizer, trunc_doc_summary_tokens
+                chunks_by_doc,
+                llm,
+                tokenizer,
+                trunc_doc_summary_tokens,
+                scheduler,
+                cached_result,
             )
 
         if USE_CHUNK_SUMMARY:
             add_chunk_summaries(
-                chunks_by_doc, llm, tokenizer, trunc_doc_chunk_tokens, doc_tokens
+                chunks_by_doc,
+                llm,
+                tokenizer,
+                trunc_doc_chunk_tokens,
+                doc_tokens,
+                scheduler,
+                cached_result,
+            )
+
+    with ContextualRagScheduler() as scheduler:
+        for doc_id, chunks_by_doc in doc2chunks.items():
+            cache_key = doc_id_to_cache_key.get(doc_id)
+            scheduler.submit(
+                add_summaries_for_doc,
+                chunks_by_doc,
+                cached_results.get(cache_key) if cache_key else None,
+                scheduler,
             )
+        scheduler.wait()
+
+    new_results: dict[str, DocumentContextualRagResult] = {}
+    for doc_id, cache_key in doc_id_to_cache_key.items():
+        result = _build_contextual_rag_result(doc2chunks[doc_id])
+        if result != cached_results.get(cache_key):
+            new_results[cache_key] = result
+    cache.set_many(new_results)
+
+    logger.debug(
+        f"Added contextual summaries: "
+        f"docs={len(doc2chunks)} "
+        f"cached_docs={len(cached_results)} "
+        f"updated_docs={len(new_results)}"
+    )
 
     return chunks
 
 
-@log_function_time(debug_only=True)
-def index_doc_batch(
+class ChunkedDocumentBatch(BaseModel):
+    """A batch whose documents have been upserted into Postgres and chunked"""
+
+    filtered_documents: list[Document]
+    updatable_docs: list[Document]
+    # read while the batch is prepared so later steps don't need the DB objects
+    doc_id_to_boost: dict[str, int]
+    chunks: list[DocAwareChunk]
+
+
+class EmbeddedDocumentBatch(BaseModel):
+    """A chunked batch whose chunks have been embedded, ready to be written"""
+
+    filtered_documents: list[Document]
+    updatable_docs: list[Document]
+    doc_id_to_boost: dict[str, int]
+    chunks_with_embeddings: list[IndexChunk]
+    chunk_content_scores: list[float]
+    embedding_failures: list[ConnectorFailure]
+
+
+def chunk_doc_batch(
     *,
     document_batch: list[Document],
     chunker: Chunker,
-    embedder: IndexingEmbedder,
-    information_content_classification_model: InformationContentClassificationModel,
-    document_index: DocumentIndex,
     index_attempt_metadata: IndexAttemptMetadata,
     db_session: Session,
-    tenant_id: str,
     enable_contextual_rag: bool = False,
     llm: LLM | None = None,
     ignore_time_skip: bool = False,
     filter_fnc: Callable[[list[Document]], list[Document]] = filter_documents,
-) -> IndexingPipelineResult:
-    """Takes different pieces of the indexing pipeline and applies it to a batch of documents
-    Note that the documents should already be batched at this point so that it does not inflate the
-    memory requirements
-
-    Returns a tuple where the first element is the number of new docs and the
-    second element is the number of chunks."""
-
-    no_access = DocumentAccess.build(
-        user_emails=[],
-        user_groups=[],
-        external_user_emails=[],
-        external_user_group_ids=[],
-        is_public=False,
-    )
-
+) -> ChunkedDocumentBatch | IndexingPipelineResult:
+    """First step of `index_doc_batch`. Upserts the documents into Postgres and chunks
+    the ones that need to be (re)indexed. If nothing needs to be indexed, the batch is
+    marked as indexed and the final result is returned directly."""
     filtered_documents = filter_fnc(document_batch)
 
     ctx = index_doc_batch_prepare(
@@ -769,7 +970,6 @@ def index_doc_batch(
     # NOTE: no special handling for failures here, since the chunker is not
     # a common source of failure for the indexing pipeline
     chunks: list[DocAwareChunk] = chunker.chunk(ctx.indexable_docs)
-    llm_tokenizer: BaseTokenizer | None = None
 
     # contextual RAG
     if enable_contextual_rag:
@@ -788,15 +988,35 @@ def index_doc_batch(
             chunk_token_limit=chunker.chunk_token_limit * 2,
         )
 
+    return ChunkedDocumentBatch(
+        filtered_documents=filtered_documents,
+        updatable_docs=ctx.updatable_docs,
+        doc_id_to_boost={
+            doc_id: db_doc.boost for doc_id, db_doc in ctx.id_to_db_doc_map.items()
+        },
+        chunks=chunks,
+    )
+
+
+def embed_doc_batch(
+    *,
+    chunked_batch: ChunkedDocumentBatch,
+    embedder: IndexingEmbedder,
+    information_content_classification_model: InformationContentClassificationModel,
+    tenant_id: str,
+    request_id: str | None,
+) -> EmbeddedDocumentBatch:
+    """Second step of `index_doc_batch`. Embeds the chunks and scores their
+    information content. Does not touch Postgres."""
     logger.debug("Starting embedding")
     chunks_with_embeddings, embedding_failures = (
         embed_chunks_with_failure_handling(
-            chunks=chunks,
+            chunks=chunked_batch.chunks,
             embedder=embedder,
             tenant_id=tenant_id,
-            request_id=index_attempt_metadata.request_id,
+            request_id=request_id,
         )
-        if chunks
+        if chunked_batch.chunks
         else ([], [])
     )
 
@@ -808,7 +1028,41 @@ def index_doc_batch(
         else [1.0] * len(chunks_with_embeddings)
     )
 
-    updatable_ids = [doc.id for doc in ctx.updatable_docs]
+    return EmbeddedDocumentBatch(
+        filtered_documents=chunked_batch.filtered_documents,
+        updatable_docs=chunked_batch.updatable_docs,
+        doc_id_to_boost=chunked_batch.doc_id_to_boost,
+        chunks_with_embeddings=chunks_with_embeddings,
+        chunk_content_scores=chunk_content_scores,
+        embedding_failures=embedding_failures,
+    )
+
+
+def write_doc_batch(
+    *,
+    embedded_batch: EmbeddedDocumentBatch,
+    document_index: DocumentIndex,
+    index_attempt_metadata: IndexAttemptMetadata,
+    db_session: Session,
+    tenant_id: str,
+    enable_large_chunks: bool,
+) -> IndexingPipelineResult:
+    """Last step of `index_doc_batch`. Writes the embedded chunks to the document index
+    and records the outcome in Postgres."""
+    no_access = DocumentAccess.build(
+        user_emails=[],
+        user_groups=[],
+        external_user_emails=[],
+        external_user_group_ids=[],
+        is_public=False,
+    )
+
+    filtered_documents = embedded_batch.filtered_documents
+    chunks_with_embeddings = embedded_batch.chunks_with_embeddings
+    chunk_content_scores = embedded_batch.chunk_content_scores
+    embedding_failures = embedded_batch.embedding_failures
+
+    updatable_ids = [doc.id for doc in embedded_batch.updatable_docs]
     updatable_chunk_data = [
         UpdatableChunkData(
             chunk_id=chunk.chunk_id,
@@ -860,6 +1114,7 @@ def index_doc_batch(
             for document_id in updatable_ids
         }
 
+        llm_tokenizer: BaseTokenizer | None = None
         try:
             llm, _ = get_default_llms()
 
@@ -918,10 +1173,8 @@ def index_doc_batch(
                 user_folder=doc_id_to_user_folder_id.get(
                     chunk.source_document.id, None
                 ),
-                boost=(
-                    ctx.id_to_db_doc_map[chunk.source_document.id].boost
-                    if chunk.source_document.id in ctx.id_to_db_doc_map
-                    else DEFAULT_BOOST
+                boost=embedded_batch.doc_id_to_boost.get(
+                    chunk.source_document.id, DEFAULT_BOOST
                 ),
                 tenant_id=tenant_id,
                 aggregated_chunk_boost_factor=chunk_content_scores[chunk_num],
@@ -948,7 +1201,7 @@ def index_doc_batch(
                 doc_id_to_previous_chunk_cnt=doc_id_to_previous_chunk_cnt,
                 doc_id_to_new_chunk_cnt=doc_id_to_new_chunk_cnt,
                 tenant_id=tenant_id,
-                large_chunks_enabled=chunker.enable_large_chunks,
+                large_chunks_enabled=enable_large_chunks,
             ),
         )
 
@@ -979,7 +1232,7 @@ def index_doc_batch(
 
         last_modified_ids = []
         ids_to_new_updated_at = {}
-        for doc in ctx.updatable_docs:
+        for doc in embedded_batch.updatable_docs:
             last_modified_ids.append(doc.id)
             # doc_updated_at is the source's idea (on the other end of the connector)
             # of when the doc was last modified
@@ -1045,18 +1298,65 @@ def index_doc_batch(
     return result
 
 
-def build_indexing_pipeline(
+@log_function_time(debug_only=True)
+def index_doc_batch(
     *,
+    document_batch: list[Document],
+    chunker: Chunker,
     embedder: IndexingEmbedder,
     information_content_classification_model: InformationContentClassificationModel,
     document_index: DocumentIndex,
+    index_attempt_metadata: IndexAttemptMetadata,
     db_session: Session,
     tenant_id: str,
-    chunker: Chunker | None = None,
+    enable_contextual_rag: bool = False,
+    llm: LLM | None = None,
     ignore_time_skip: bool = False,
-    callback: IndexingHeartbeatInterface | None = None,
-) -> IndexingPipelineProtocol:
-    """Builds a pipeline which takes in a list (batch) of docs and indexes them."""
+    filter_fnc: Callable[[list[Document]], list[Document]] = filter_documents,
+) -> IndexingPipelineResult:
+    """Takes different pieces of the indexing pipeline and applies it to a batch of documents
+    Note that the documents should already be batched at this point so that it does not inflate the
+    memory requirements
+
+    Returns a tuple where the first element is the number of new docs and the
+    second element is the number of chunks."""
+    chunked_batch = chunk_doc_batch(
+        document_batch=document_batch,
+        chunker=chunker,
+        index_attempt_metadata=index_attempt_metadata,
+        db_session=db_session,
+        enable_contextual_rag=enable_contextual_rag,
+        llm=llm,
+        ignore_time_skip=ignore_time_skip,
+        filter_fnc=filter_fnc,
+    )
+    if isinstance(chunked_batch, IndexingPipelineResult):
+        return chunked_batch
+
+    embedded_batch = embed_doc_batch(
+        chunked_batch=chunked_batch,
+        embedder=embedder,
+        information_content_classification_model=information_content_classification_model,
+        tenant_id=tenant_id,
+        request_id=index_attempt_metadata.request_id,
+    )
+
+    return write_doc_batch(
+        embedded_batch=embedded_batch,
+        document_index=document_index,
+        index_attempt_metadata=index_attempt_metadata,
+        db_session=db_session,
+        tenant_id=tenant_id,
+        enable_large_chunks=chunker.enable_large_chunks,
+    )
+
+
+def _get_chunker_and_contextual_rag_llm(
+    embedder: IndexingEmbedder,
+    db_session: Session,
+    chunker: Chunker | None,
+    callback: IndexingHeartbeatInterface | None,
+) -> tuple[Chunker, bool, LLM | None]:
     all_search_settings = get_active_search_settings(db_session)
     if (
         all_search_settings.secondary
@@ -1087,6 +1387,27 @@ def build_indexing_pipeline(
         # after every doc, update status in case there are a bunch of really long docs
         callback=callback,
     )
+    return chunker, enable_contextual_rag, llm
+
+
+def build_indexing_pipeline(
+    *,
+    embedder: IndexingEmbedder,
+    information_content_classification_model: InformationContentClassificationModel,
+    document_index: DocumentIndex,
+    db_session: Session,
+    tenant_id: str,
+    chunker: Chunker | None = None,
+    ignore_time_skip: bool = False,
+    callback: IndexingHeartbeatInterface | None = None,
+) -> IndexingPipelineProtocol:
+    """Builds a pipeline which takes in a list (batch) of docs and indexes them."""
+    chunker, enable_contextual_rag, llm = _get_chunker_and_contextual_rag_llm(
+        embedder=embedder,
+        db_session=db_session,
+        chunker=chunker,
+        callback=callback,
+    )
 
     return partial(
         index_doc_batch_with_handler,
@@ -1100,3 +1421,183 @@ def build_indexing_pipeline(
         enable_contextual_rag=enable_contextual_rag,
         llm=llm,
     )
+
+
+@dataclass
+class _PipelinedBatch:
+    document_batch: list[Document]
+    index_attempt_metadata: IndexAttemptMetadata
+    state: (
+        ChunkedDocumentBatch | EmbeddedDocumentBatch | IndexingPipelineResult | None
+    ) = None
+
+
+def _get_final_result(batch: _PipelinedBatch) -> IndexingPipelineResult:
+    if not isinstance(batch.state, IndexingPipelineResult):
+        raise RuntimeError("Batch left the indexing pipeline without a result")
+    return batch.state
+
+
+class PipelinedIndexer:
+    """Runs the steps of `index_doc_batch` as separate pipeline stages so that chunking,
+    embedding and writing of different batches overlap with each other and with
+    fetching from the connector.
+
+    Batches are handed back in submission order. `completed_through` is the sequence
+    number up to which every batch has been fully written, which is what checkpointing
+    needs to know. Failures are handled per batch in the same way as
+    `index_doc_batch_with_handler`. Every stage works with its own DB session."""
+
+    def __init__(
+        self,
+        *,
+        chunker: Chunker,
+        embedder: IndexingEmbedder,
+        information_content_classification_model: InformationContentClassificationModel,
+        document_index: DocumentIndex,
+        tenant_id: str,
+        ignore_time_skip: bool = False,
+        enable_contextual_rag: bool = False,
+        llm: LLM | None = None,
+        chunk_workers: int = PIPELINED_INDEXING_CHUNK_WORKERS,
+        embed_workers: int = PIPELINED_INDEXING_EMBED_WORKERS,
+        write_workers: int = PIPELINED_INDEXING_WRITE_WORKERS,
+        max_queued_batches: int = PIPELINED_INDEXING_MAX_QUEUED_BATCHES,
+    ) -> None:
+        self.chunker = chunker
+        self.embedder = embedder
+        self.information_content_classification_model = (
+            information_content_classification_model
+        )
+        self.document_index = document_index
+        self.tenant_id = tenant_id
+        self.ignore_time_skip = ignore_time_skip
+        self.enable_contextual_rag = enable_contextual_rag
+        self.llm = llm
+
+        self._pipeline = StagedPipeline(
+            stages=[
+                PipelineStage("chunk", self._chunk, chunk_workers),
+                PipelineStage("embed", self._embed, embed_workers),
+                PipelineStage("write", self._write, write_workers),
+            ],
+            max_queued_items=max_queued_batches,
+        )
+
+    @property
+    def completed_through(self) -> int:
+        return self._pipeline.completed_through
+
+    @property
+    def last_submitted(self) -> int:
+        return self._pipeline.last_submitted
+
+    def submit(
+        self,
+        document_batch: list[Document],
+        index_attempt_metadata: IndexAttemptMetadata,
+    ) -> int:
+        return self._pipeline.submit(
+            _PipelinedBatch(
+                document_batch=document_batch,
+                index_attempt_metadata=index_attempt_metadata,
+            )
+        )
+
+    def pop_completed(
+        self, block: bool = False
+    ) -> Iterator[tuple[list[Document], IndexingPipelineResult]]:
+        for _, batch in self._pipeline.pop_completed(block=block):
+            yield batch.document_batch, _get_final_result(batch)
+
+    def drain(self) -> Iterator[tuple[list[Document], IndexingPipelineResult]]:
+        for _, batch in self._pipeline.drain():
+            yield batch.document_batch, _get_final_result(batch)
+
+    def shutdown(self) -> None:
+        self._pipeline.shutdown()
+
+    def log_utilization(self) -> None:
+        self._pipeline.log_utilization()
+
+    def _chunk(self, batch: _PipelinedBatch) -> _PipelinedBatch:
+        try:
+            with get_session_with_current_tenant() as db_session:
+                batch.state = chunk_doc_batch(
+                    document_batch=batch.document_batch,
+                    chunker=self.chunker,
+                    index_attempt_metadata=batch.index_attempt_metadata,
+                    db_session=db_session,
+                    enable_contextual_rag=self.enable_contextual_rag,
+                    llm=self.llm,
+                    ignore_time_skip=self.ignore_time_skip,
+                )
+        except Exception as e:
+            batch.state = _build_failed_batch_result(batch.document_batch, e)
+        return batch
+
+    def _embed(self, batch: _PipelinedBatch) -> _PipelinedBatch:
+        if not isinstance(batch.state, ChunkedDocumentBatch):
+            return batch
+
+        try:
+            batch.state = embed_doc_batch(
+                chunked_batch=batch.state,
+                embedder=self.embedder,
+                information_content_classification_model=self.information_content_classification_model,
+                tenant_id=self.tenant_id,
+                request_id=batch.index_attempt_metadata.request_id,
+            )
+        except Exception as e:
+            batch.state = _build_failed_batch_result(batch.document_batch, e)
+        return batch
+
+    def _write(self, batch: _PipelinedBatch) -> _PipelinedBatch:
+        if not isinstance(batch.state, EmbeddedDocumentBatch):
+            return batch
+
+        try:
+            with get_session_with_current_tenant() as db_session:
+                batch.state = write_doc_batch(
+                    embedded_batch=batch.state,
+                    document_index=self.document_index,
+                    index_attempt_metadata=batch.index_attempt_metadata,
+                    db_session=db_session,
+                    tenant_id=self.tenant_id,
+                    enable_large_chunks=self.chunker.enable_large_chunks,
+                )
+        except Exception as e:
+            batch.state = _build_failed_batch_result(batch.document_batch, e)
+        return batch
+
+
+def build_pipelined_indexer(
+    *,
+    embedder: IndexingEmbedder,
+    information_content_classification_model: InformationContentClassificationModel,
+    document_index: DocumentIndex,
+    db_session: Session,
+    tenant_id: str,
+    chunker: Chunker | None = None,
+    ignore_time_skip: bool = False,
+    callback: IndexingHeartbeatInterface | None = None,
+) -> PipelinedIndexer:
+    """Same as `build_indexing_pipeline`, but the returned indexer overlaps the work on
+    consecutive batches. `db_session` is only used to look up the search settings."""
+    chunker, enable_contextual_rag, llm = _get_chunker_and_contextual_rag_llm(
+        embedder=embedder,
+        db_session=db_session,
+        chunker=chunker,
+        callback=callback,
+    )
+
+    return PipelinedIndexer(
+        chunker=chunker,
+        embedder=embedder,
+        information_content_classification_model=information_content_classification_model,
+        document_index=document_index,
+        tenant_id=tenant_id,
+        ignore_time_skip=ignore_time_skip,
+        enable_contextual_rag=enable_contextual_rag,
+        llm=llm,
+    )
@@ -0,0 +1,150 @@
+import json
+import os
+import threading
+import time
+from collections.abc import Callable
+from typing import Any
+
+from redis.client import Redis
+
+from onyx.configs.app_configs import KV_STORE_NEAR_CACHE_SIZE
+from onyx.configs.app_configs import KV_STORE_NEAR_CACHE_TTL_SECONDS
+from onyx.redis.redis_pool import get_raw_redis_client
+from onyx.utils.logger import setup_logger
+from onyx.utils.ttl_cache import TTLCache
+
+logger = setup_logger()
+
+# not tenant prefixed, the tenant is part of the message
+KV_STORE_INVALIDATION_CHANNEL = "onyx_kv_store_invalidations"
+
+_RESUBSCRIBE_INITIAL_DELAY = 1.0
+_RESUBSCRIBE_MAX_DELAY = 30.0
+
+
+class KVStoreNearCache:
+    """Per process cache of the raw (JSON encoded) values of the key value store,
+    keyed by tenant and key.
+
+    Every process listens on a Redis pub/sub channel on which writers announce the
+    keys they changed. Entries are only served while the listener is subscribed, if
+    the subscription drops the cache is cleared and bypassed until it is back.
+
+    A read that raced with an invalidation must not put its (possibly stale) value into
+    the cache, so readers take the current `generation` before reading and pass it to
+    `set`, which ignores the value if any invalidation happened in between."""
+
+    def __init__(
+        self,
+        maxsize: int = KV_STORE_NEAR_CACHE_SIZE,
+        ttl_seconds: int = KV_STORE_NEAR_CACHE_TTL_SECONDS,
+        redis_client_factory: Callable[[], Redis] = get_raw_redis_client,
+    ) -> None:
+        self._cache: TTLCache[tuple[str, str], str] = TTLCache(maxsize, ttl_seconds)
+        self._redis_client_factory = redis_client_factory
+
+        self._lock = threading.Lock()
+        self._generation = 0
+        self._subscribed = threading.Event()
+        # the listener thread does not survive a fork, it is started per process
+        self._listener_pid: int | None = None
+
+    @property
+    def generation(self) -> int:
+        with self._lock:
+            return self._generation
+
+    def get(self, tenant_id: str, key: str) -> str | None:
+        if not self._ensure_listening():
+            return None
+        return self._cache.get((tenant_id, key))
+
+    def set(self, tenant_id: str, key: str, value: str, generation: int) -> None:
+        with self._lock:
+            if generation != self._generation or not self._subscribed.is_set():
+                return
+            self._cache.set((tenant_id, key), value)
+
+    def invalidate(self, tenant_id: str, key: str) -> None:
+        with self._lock:
+            self._generation += 1
+            self._cache.delete((tenant_id, key))
+
+    def publish_invalidation(
+        self, redis_client: Redis, tenant_id: str, key: str
+    ) -> None:
+        """Drops the key here right away and tells all other processes to do the same."""
+        self.invalidate(tenant_id, key)
+        redis_client.publish(
+            KV_STORE_INVALIDATION_CHANNEL,
+            json.dumps({"tenant_id": tenant_id, "key": key}),
+        )
+
+    def clear(self) -> None:
+        with self._lock:
+            self._generation += 1
+            self._cache.clear()
+
+    def _ensure_listening(self) -> bool:
+        pid = os.getpid()
+        if self._listener_pid != pid:
+            with self._lock:
+                if self._listener_pid != pid:
+                    # anything inherited from the parent process can't be trusted
+                    self._generation += 1
+                    self._cache.clear()
+                    self._subscribed = threading.Event()
+                    self._listener_pid = pid
+                    threading.Thread(
+                        target=self._listen,
+                        args=(self._subscribed,),
+                        name="kv-store-near-cache-listener",
+                        daemon=True,
+                    ).start()
+
+        return self._subscribed.is_set()
+
+    def _handle_message(self, message: dict[str, Any]) -> None:
+        try:
+            data = json.loads(message["data"])
+            self.invalidate(data["tenant_id"], data["key"])
+        except Exception:
+            # we can't tell which key changed, so drop everything
+            logger.exception(f"Malformed KV store invalidation: {message}")
+            self.clear()
+
+    def _listen(self, subscribed: threading.Event) -> None:
+        delay = _RESUBSCRIBE_INITIAL_DELAY
+        while True:
+            try:
+                pubsub = self._redis_client_factory().pubsub()
+                try:
+                    pubsub.subscribe(KV_STORE_INVALIDATION_CHANNEL)
+                    for message in pubsub.listen():
+                        if message.get("type") == "subscribe":
+                            # invalidations are only guaranteed to reach us from
+                            # here on, nothing read before can go into the cache
+                            self.clear()
+                            subscribed.set()
+                            delay = _RESUBSCRIBE_INITIAL_DELAY
+                        elif message.get("type") == "message":
+                            self._handle_message(message)
+                finally:
+                    subscribed.clear()
+                    self.clear()
+                    pubsub.close()
+            except Exception as e:
+                logger.warning(
+                    f"KV store near cache lost its subscription, bypassing it: "
+                    f"retry_in={delay:.0f}s error={e}"
+                )
+
+            time.sleep(delay)
+            delay = min(delay * 2, _RESUBSCRIBE_MAX_DELAY)
+
+
+_KV_STORE_NEAR_CACHE = KVStoreNearCache()
+
+
+def get_kv_store_near_cache() -> KVStoreNearCache:
+    return _KV_STORE_NEAR_CACHE
@@ -3,11 +3,15 @@ from typing import cast
 
 from redis.client import Redis
 
+from onyx.configs.app_configs import KV_STORE_NEAR_CACHE_ENABLED
 from onyx.db.engine import get_session_context_manager
 from onyx.db.models import KVStore
 from onyx.key_value_store.interface import KeyValueStore
 from onyx.key_value_store.interface import KvKeyNotFoundError
+from onyx.key_value_store.near_cache import get_kv_store_near_cache
+from onyx.key_value_store.near_cache import KVStoreNearCache
 from onyx.redis.redis_pool import get_redis_client
+from onyx.redis.redis_pool import TenantRedis
 from onyx.utils.logger import setup_logger
 from onyx.utils.special_types import JSON_ro
 
@@ -27,6 +31,24 @@ class PgRedisKVStore(KeyValueStore):
         else:
             self.redis_client = get_redis_client()
 
+        # the near cache is keyed by tenant, which is only known for tenant clients
+        self._tenant_id: str | None = None
+        self._near_cache: KVStoreNearCache | None = None
+        if KV_STORE_NEAR_CACHE_ENABLED and isinstance(self.redis_client, TenantRedis):
+            self._tenant_id = self.redis_client.tenant_id
+            self._near_cache = get_kv_store_near_cache()
+
+    def _publish_invalidation(self, key: str) -> None:
+        if self._near_cache is None or self._tenant_id is None:
+            return
+
+        try:
+            self._near_cache.publish_invalidation(
+                self.redis_client, self._tenant_id, key
+            )
+        except Exception as e:
+            logger.error(f"Failed to publish invalidation for key '{key}': {str(e)}")
+
     def store(self, key: str, val: JSON_ro, encrypt: bool = False) -> None:
         # Not encrypted in Redis, but encrypted in Postgres
         try:
@@ -52,12 +74,24 @@ class PgRedisKVStore(KeyValueStore):
                 db_session.add(obj)
             db_session.commit()
 
+        # only after the new value is in place, otherwise it could be re-read stale
+        self._publish_invalidation(key)
+
     def load(self, key: str) -> JSON_ro:
+        generation = 0
+        if self._near_cache is not None and self._tenant_id is not None:
+            cached_value = self._near_cache.get(self._tenant_id, key)
+            if cached_value is not None:
+                return json.loads(cached_value)
+            generation = self._near_cache.generation
+
         try:
             redis_value = self.redis_client.get(REDIS_KEY_PREFIX + key)
             if redis_value:
                 assert isinstance(redis_value, bytes)
-                return json.loads(redis_value.decode("utf-8"))
+                decoded_value = redis_value.decode("utf-8")
+                self._cache_locally(key, decoded_value, generation)
+                return json.loads(decoded_value)
         except Exception as e:
             logger.error(f"Failed to get value from Redis for key '{key}': {str(e)}")
 
@@ -73,21 +107,30 @@ class PgRedisKVStore(KeyValueStore):
             else:
                 value = None
 
+            encoded_value = json.dumps(value)
             try:
-                self.redis_client.set(REDIS_KEY_PREFIX + key, json.dumps(value))
+                self.redis_client.set(REDIS_KEY_PREFIX + key, encoded_value)
             except Exception as e:
                 logger.error(f"Failed to set value in Redis for key '{key}': {str(e)}")
 
+            self._cache_locally(key, encoded_value, generation)
             return cast(JSON_ro, value)
 
+    def _cache_locally(self, key: str, encoded_value: str, generation: int) -> None:
+        if self._near_cache is not None and self._tenant_id is not None:
+            self._near_cache.set(self._tenant_id, key, encoded_value, generation)
+
     def delete(self, key: str) -> None:
         try:
             self.redis_client.delete(REDIS_KEY_PREFIX + key)
         except Exception as e:
             logger.error(f"Failed to delete value from Redis for key '{key}': {str(e)}")
 
-        with get_session_context_manager() as db_session:
-            result = db_session.query(KVStore).filter_by(key=key).delete()  # type: ignore
-            if result == 0:
-                raise KvKeyNotFoundError
-            db_session.commit()
+        try:
+            with get_session_context_manager() as db_session:
+                result = db_session.query(KVStore).filter_by(key=key).delete()  # type: ignore
+                if result == 0:
+                    raise KvKeyNotFoundError
+                db_session.commit()
+        finally:
+            self._publish_invalidation(key)
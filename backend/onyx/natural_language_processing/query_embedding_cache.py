@@ -0,0 +1,127 @@
+import hashlib
+import json
+import re
+from typing import cast
+
+from prometheus_client import Counter
+
+from onyx.configs.model_configs import QUERY_EMBEDDING_CACHE_REDIS_ENABLED
+from onyx.configs.model_configs import QUERY_EMBEDDING_CACHE_SIZE
+from onyx.configs.model_configs import QUERY_EMBEDDING_CACHE_TTL_SECONDS
+from onyx.redis.redis_pool import get_redis_client
+from onyx.utils.logger import setup_logger
+from onyx.utils.ttl_cache import TTLCache
+from shared_configs.model_server_models import Embedding
+
+logger = setup_logger()
+
+_REDIS_KEY_PREFIX = "query_embedding"
+
+_WHITESPACE_PATTERN = re.compile(r"\s+")
+
+_CACHE_HITS = Counter(
+    "onyx_query_embedding_cache_hits_total",
+    "Query embeddings served from the cache",
+    ["tier"],
+)
+_CACHE_MISSES = Counter(
+    "onyx_query_embedding_cache_misses_total",
+    "Query embeddings that had to be computed",
+)
+
+
+def normalize_query_text(text: str) -> str:
+    return _WHITESPACE_PATTERN.sub(" ", text).strip()
+
+
+def build_query_embedding_cache_key(
+    text: str,
+    *,
+    model_name: str | None,
+    provider_type: str | None,
+    query_prefix: str | None,
+    normalize: bool,
+    reduced_dimension: int | None,
+    api_url: str | None = None,
+    deployment_name: str | None = None,
+    api_key: str | None = None,
+) -> str:
+    """Everything that can change the embedding of a query is part of the key. The API
+    key is included (hashed with the rest) so a new key is actually exercised."""
+    key_parts = [
+        model_name,
+        provider_type,
+        query_prefix,
+        normalize,
+        reduced_dimension,
+        api_url,
+        deployment_name,
+        api_key,
+        normalize_query_text(text),
+    ]
+    return hashlib.sha256(json.dumps(key_parts).encode()).hexdigest()
+
+
+class QueryEmbeddingCache:
+    """Two tier cache for query embeddings.
+
+    The in-process tier is a bounded LRU with a TTL. If enabled, misses fall through
+    to a tenant scoped Redis tier so API server replicas share their hits. Redis
+    failures are logged and treated as misses, the cache must never fail a search."""
+
+    def __init__(
+        self,
+        maxsize: int = QUERY_EMBEDDING_CACHE_SIZE,
+        ttl_seconds: int = QUERY_EMBEDDING_CACHE_TTL_SECONDS,
+        redis_enabled: bool = QUERY_EMBEDDING_CACHE_REDIS_ENABLED,
+    ) -> None:
+        self._local: TTLCache[str, Embedding] = TTLCache(maxsize, ttl_seconds)
+        self._ttl_seconds = ttl_seconds
+        self._redis_enabled = redis_enabled
+
+    def get(self, key: str, tenant_id: str | None = None) -> Embedding | None:
+        embedding = self._local.get(key)
+        if embedding is not None:
+            _CACHE_HITS.labels("memory").inc()
+            return embedding
+
+        if self._redis_enabled:
+            try:
+                raw = get_redis_client(tenant_id=tenant_id).get(
+                    f"{_REDIS_KEY_PREFIX}:{key}"
+                )
+            except Exception:
+                logger.exception("Failed to read query embedding from Redis")
+                raw = None
+
+            if raw is not None:
+                embedding = json.loads(cast(bytes, raw))
+                self._local.set(key, embedding)
+                _CACHE_HITS.labels("redis").inc()
+                return embedding
+
+        _CACHE_MISSES.inc()
+        return None
+
+    def set(self, key: str, embedding: Embedding, tenant_id: str | None = None) -> None:
+        self._local.set(key, embedding)
+
+        if self._redis_enabled:
+            try:
+                get_redis_client(tenant_id=tenant_id).set(
+                    f"{_REDIS_KEY_PREFIX}:{key}",
+                    json.dumps(embedding),
+                    ex=self._ttl_seconds,
+                )
+            except Exception:
+                logger.exception("Failed to write query embedding to Redis")
+
+    def clear(self) -> None:
+        self._local.clear()
+
+
+_QUERY_EMBEDDING_CACHE = QueryEmbeddingCache()
+
+
+def get_query_embedding_cache() -> QueryEmbeddingCache:
+    return _QUERY_EMBEDDING_CACHE
@@ -6,6 +6,7 @@ from concurrent.futures import ThreadPoolExecutor
 from functools import partial
 from functools import wraps
 from typing import Any
+from typing import cast
 
 import requests
 from httpx import HTTPError
@@ -22,11 +23,18 @@ from onyx.configs.model_configs import (
     BATCH_SIZE_ENCODE_CHUNKS_FOR_API_EMBEDDING_SERVICES,
 )
 from onyx.configs.model_configs import DOC_EMBEDDING_CONTEXT_SIZE
+from onyx.configs.model_configs import QUERY_EMBEDDING_CACHE_ENABLED
 from onyx.db.models import SearchSettings
 from onyx.indexing.indexing_heartbeat import IndexingHeartbeatInterface
 from onyx.natural_language_processing.exceptions import (
     ModelServerRateLimitError,
 )
+from onyx.natural_language_processing.query_embedding_cache import (
+    build_query_embedding_cache_key,
+)
+from onyx.natural_language_processing.query_embedding_cache import (
+    get_query_embedding_cache,
+)
 from onyx.natural_language_processing.utils import get_tokenizer
 from onyx.natural_language_processing.utils import tokenizer_trim_content
 from onyx.utils.logger import setup_logger
@@ -293,10 +301,26 @@ class EmbeddingModel:
         max_seq_length: int = DOC_EMBEDDING_CONTEXT_SIZE,
         tenant_id: str | None = None,
         request_id: str | None = None,
+        use_query_cache: bool = True,
     ) -> list[Embedding]:
         if not texts or not all(texts):
             raise ValueError(f"Empty or missing text for embedding: {texts}")
 
+        if (
+            use_query_cache
+            and QUERY_EMBEDDING_CACHE_ENABLED
+            and text_type == EmbedTextType.QUERY
+        ):
+            return self._encode_queries_with_cache(
+                texts=texts,
+                large_chunks_present=large_chunks_present,
+                local_embedding_batch_size=local_embedding_batch_size,
+                api_embedding_batch_size=api_embedding_batch_size,
+                max_seq_length=max_seq_length,
+                tenant_id=tenant_id,
+                request_id=request_id,
+            )
+
         if large_chunks_present:
             max_seq_length *= LARGE_CHUNK_RATIO
 
@@ -328,6 +352,64 @@ class EmbeddingModel:
             request_id=request_id,
         )
 
+    def _query_cache_key(self, text: str) -> str:
+        return build_query_embedding_cache_key(
+            text,
+            model_name=self.model_name,
+            provider_type=self.provider_type,
+            query_prefix=self.query_prefix,
+            normalize=self.normalize,
+            reduced_dimension=self.reduced_dimension,
+            api_url=self.api_url,
+            deployment_name=self.deployment_name,
+            api_key=self.api_key,
+        )
+
+    def _encode_queries_with_cache(
+        self,
+        texts: list[str],
+        large_chunks_present: bool,
+        local_embedding_batch_size: int,
+        api_embedding_batch_size: int,
+        max_seq_length: int,
+        tenant_id: str | None,
+        request_id: str | None,
+    ) -> list[Embedding]:
+        cache = get_query_embedding_cache()
+        cache_keys = [self._query_cache_key(text) for text in texts]
+
+        embeddings: list[Embedding | None] = [
+            cache.get(cache_key, tenant_id=tenant_id) for cache_key in cache_keys
+        ]
+        miss_indices = [
+            i for i, embedding in enumerate(embeddings) if embedding is None
+        ]
+
+        if miss_indices:
+            # duplicates within the request only need to be embedded once
+            unique_miss_keys = list(dict.fromkeys(cache_keys[i] for i in miss_indices))
+            key_to_text = {cache_keys[i]: texts[i] for i in miss_indices}
+
+            computed = self.encode(
+                texts=[key_to_text[cache_key] for cache_key in unique_miss_keys],
+                text_type=EmbedTextType.QUERY,
+                large_chunks_present=large_chunks_present,
+                local_embedding_batch_size=local_embedding_batch_size,
+                api_embedding_batch_size=api_embedding_batch_size,
+                max_seq_length=max_seq_length,
+                tenant_id=tenant_id,
+                request_id=request_id,
+                use_query_cache=False,
+            )
+
+            key_to_embedding = dict(zip(unique_miss_keys, computed))
+            for cache_key, embedding in key_to_embedding.items():
+                cache.set(cache_key, embedding, tenant_id=tenant_id)
+            for i in miss_indices:
+                embeddings[i] = key_to_embedding[cache_keys[i]]
+
+        return cast(list[Embedding], embeddings)
+
     @classmethod
     def from_db_model(
         cls,
@@ -520,7 +602,11 @@ def warm_up_bi_encoder(
 
     def _warm_up() -> None:
         try:
-            embedding_model.encode(texts=[warm_up_str], text_type=EmbedTextType.QUERY)
+            embedding_model.encode(
+                texts=[warm_up_str],
+                text_type=EmbedTextType.QUERY,
+                use_query_cache=False,
+            )
             logger.debug(
                 f"Warm-up complete for encoder model: {embedding_model.model_name}"
             )
@@ -496,6 +496,41 @@ Answer:
 """.strip()
 
 
+BATCH_DOCUMENT_VERIFICATION_PROMPT = f"""
+Determine for each of the following numbered documents whether its text contains data or information \
+that is potentially relevant for a question. A document does not have to be fully relevant, but check \
+whether it has some information that would help - possibly in conjunction with other documents - to \
+address the question.
+
+Be careful that you do not use a document where you are not sure whether the text applies to the objects \
+or entities that are relevant for the question. For example, a book about chess could have long passage \
+discussing the psychology of chess without - within the passage - mentioning chess. If now a question \
+is asked about the psychology of football, one could be tempted to use the document as it does discuss \
+psychology in sports. However, it is NOT about football and should not be deemed relevant. Please \
+consider this logic. Judge each document on its own.
+
+DOCUMENTS:
+{SEPARATOR_LINE}
+{{documents}}
+{SEPARATOR_LINE}
+
+QUESTION:
+{SEPARATOR_LINE}
+{{question}}
+{SEPARATOR_LINE}
+
+Please answer with a json object containing one verdict for EVERY document, in this format:
+{{{{"verdicts": [{{{{"document_number": 1, "relevant": true}}}}, {{{{"document_number": 2, "relevant": false}}}}]}}}}
+
+Do NOT include any other text in your response:
+""".strip()
+
+BATCH_DOCUMENT_VERIFICATION_DOCUMENT_TEMPLATE = """
+DOCUMENT {document_number}:
+{document_content}
+""".strip()
+
+
 # Sub-Question Answer Generation
 SUB_QUESTION_RAG_PROMPT = f"""
 Use the context provided below - and only the provided context - to answer the given question. \
@@ -74,6 +74,30 @@ class RedisConnector:
 
         return finished
 
+    @staticmethod
+    def get_indexing_fenced_ids(
+        tenant_id: str, cc_pair_ids: list[int], search_settings_id: int
+    ) -> set[int]:
+        """Returns the ids of the cc pairs that are fenced for indexing with the search
+        settings. Checks all of them in a single round trip."""
+        if not cc_pair_ids:
+            return set()
+
+        r = get_redis_client(tenant_id=tenant_id)
+        pipe = r.pipeline(transaction=False)
+        for cc_pair_id in cc_pair_ids:
+            fence_key = RedisConnectorIndex.fence_key_with_ids(
+                cc_pair_id, search_settings_id
+            )
+            # pipelined commands bypass the tenant prefixing of the client
+            pipe.exists(f"{tenant_id}:{fence_key}")
+
+        return {
+            cc_pair_id
+            for cc_pair_id, fenced in zip(cc_pair_ids, pipe.execute())
+            if fenced
+        }
+
     @staticmethod
     def get_id_from_fence_key(key: str) -> str | None:
         """
@@ -775,6 +775,13 @@ def get_connector_indexing_status(
         else get_current_search_settings
     )
     search_settings = get_search_settings(db_session)
+    fenced_cc_pair_ids = (
+        RedisConnector.get_indexing_fenced_ids(
+            tenant_id, [cc_pair.id for cc_pair in cc_pairs], search_settings.id
+        )
+        if search_settings
+        else set()
+    )
     for cc_pair in cc_pairs:
         # TODO remove this to enable ingestion API
         if cc_pair.name == "DefaultCCPair":
@@ -786,12 +793,7 @@ def get_connector_indexing_status(
             # This may happen if background deletion is happening
             continue
 
-        in_progress = False
-        if search_settings:
-            redis_connector = RedisConnector(tenant_id, cc_pair.id)
-            redis_connector_index = redis_connector.new_index(search_settings.id)
-            if redis_connector_index.fenced:
-                in_progress = True
+        in_progress = cc_pair.id in fenced_cc_pair_ids
 
         latest_index_attempt = cc_pair_to_latest_index_attempt.get(
             (connector.id, credential.id)
@@ -49,7 +49,10 @@ def test_embedding_configuration(
             query_prefix=None,
             passage_prefix=None,
         )
-        test_model.encode(["Testing Embedding"], text_type=EmbedTextType.QUERY)
+        # the point is to actually reach the provider, so skip the query cache
+        test_model.encode(
+            ["Testing Embedding"], text_type=EmbedTextType.QUERY, use_query_cache=False
+        )
 
     except ValueError as e:
         error_msg = f"Not a valid embedding model. Exception thrown: {e}"
@@ -7,6 +7,7 @@ import time
 import uuid
 from collections.abc import Callable
 from collections.abc import Generator
+from collections.abc import Iterator
 from datetime import timedelta
 from uuid import UUID
 
@@ -63,7 +64,8 @@ from onyx.db.models import User
 from onyx.db.persona import get_persona_by_id
 from onyx.db.user_documents import create_user_files
 from onyx.file_processing.extract_file_text import docx_to_txt_filename
-from onyx.file_processing.extract_file_text import extract_file_text
+from onyx.file_processing.extraction_pool import FileExtractionPool
+from onyx.file_processing.extraction_pool import FileExtractionTask
 from onyx.file_store.file_store import get_default_file_store
 from onyx.file_store.models import ChatFileType
 from onyx.file_store.models import FileDescriptor
@@ -712,99 +714,114 @@ def upload_files_for_chat(
 
     file_store = get_default_file_store(db_session)
 
+    doc_files = [
+        file
+        for file in files
+        if mime_type_to_chat_file_type(file.content_type) == ChatFileType.DOC
+    ]
+
+    def _doc_extraction_tasks() -> Iterator[FileExtractionTask]:
+        for doc_file in doc_files:
+            doc_file.file.seek(0)
+            yield FileExtractionTask(
+                file_name=doc_file.filename or "", content=doc_file.file.read()
+            )
+
     file_info: list[tuple[str, str | None, ChatFileType]] = []
-    for file in files:
-        file_type = mime_type_to_chat_file_type(file.content_type)
-
-        file_content = file.file.read()  # Read the file content
-
-        # NOTE: Image conversion to JPEG used to be enforced here.
-        # This was removed to:
-        # 1. Preserve original file content for downloads
-        # 2. Maintain transparency in formats like PNG
-        # 3. Ameliorate issue with file conversion
-        file_content_io = io.BytesIO(file_content)
-
-        new_content_type = file.content_type
-
-        # Store the file normally
-        file_id = str(uuid.uuid4())
-        file_store.save_file(
-            file_name=file_id,
-            content=file_content_io,
-            display_name=file.filename,
-            file_origin=FileOrigin.CHAT_UPLOAD,
-            file_type=new_content_type or file_type.value,
-        )
+    with FileExtractionPool(expected_file_count=len(doc_files)) as extraction_pool:
+        # the text of docs is extracted in parallel, a few files ahead of this loop
+        extracted_doc_texts = extraction_pool.extract_file_text(_doc_extraction_tasks())
 
-        # 4) If the file is a doc, extract text and store that separately
-        if file_type == ChatFileType.DOC:
-            # Re-wrap bytes in a fresh BytesIO so we start at position 0
-            extracted_text_io = io.BytesIO(file_content)
-            extracted_text = extract_file_text(
-                file=extracted_text_io,  # use the bytes we already read
-                file_name=file.filename or "",
-            )
-            text_file_id = str(uuid.uuid4())
+        for file in files:
+            file_type = mime_type_to_chat_file_type(file.content_type)
 
+            file.file.seek(0)
+            file_content = file.file.read()  # Read the file content
+
+            # NOTE: Image conversion to JPEG used to be enforced here.
+            # This was removed to:
+            # 1. Preserve original file content for downloads
+            # 2. Maintain transparency in formats like PNG
+            # 3. Ameliorate issue with file conversion
+            file_content_io = io.BytesIO(file_content)
+
+            new_content_type = file.content_type
+
+            # Store the file normally
+            file_id = str(uuid.uuid4())
             file_store.save_file(
-                file_name=text_file_id,
-                content=io.BytesIO(extracted_text.encode()),
+                file_name=file_id,
+                content=file_content_io,
                 display_name=file.filename,
                 file_origin=FileOrigin.CHAT_UPLOAD,
-                file_type="text/plain",
-            )
-            # Return the text file as the "main" file descriptor for doc types
-            file_info.append((text_file_id, file.filename, ChatFileType.PLAIN_TEXT))
-        else:
-            file_info.append((file_id, file.filename, file_type))
-
-        # 5) Create a user file for each uploaded file
-        user_files = create_user_files([file], RECENT_DOCS_FOLDER_ID, user, db_session)
-        for user_file in user_files:
-            # 6) Create connector
-            connector_base = ConnectorBase(
-                name=f"UserFile-{int(time.time())}",
-                source=DocumentSource.FILE,
-                input_type=InputType.LOAD_STATE,
-                connector_specific_config={
-                    "file_locations": [user_file.file_id],
-                    "zip_metadata": {},
-                },
-                refresh_freq=None,
-                prune_freq=None,
-                indexing_start=None,
-            )
-            connector = create_connector(
-                db_session=db_session,
-                connector_data=connector_base,
+                file_type=new_content_type or file_type.value,
             )
 
-            # 7) Create credential
-            credential_info = CredentialBase(
-                credential_json={},
-                admin_public=True,
-                source=DocumentSource.FILE,
-                curator_public=True,
-                groups=[],
-                name=f"UserFileCredential-{int(time.time())}",
-                is_user_file=True,
+            # 4) If the file is a doc, extract text and store that separately
+            if file_type == ChatFileType.DOC:
+                _, extracted_text = next(extracted_doc_texts)
+                text_file_id = str(uuid.uuid4())
+
+                file_store.save_file(
+                    file_name=text_file_id,
+                    content=io.BytesIO(extracted_text.encode()),
+                    display_name=file.filename,
+                    file_origin=FileOrigin.CHAT_UPLOAD,
+                    file_type="text/plain",
+                )
+                # Return the text file as the "main" file descriptor for doc types
+                file_info.append((text_file_id, file.filename, ChatFileType.PLAIN_TEXT))
+            else:
+                file_info.append((file_id, file.filename, file_type))
+
+            # 5) Create a user file for each uploaded file
+            user_files = create_user_files(
+                [file], RECENT_DOCS_FOLDER_ID, user, db_session
             )
-            credential = create_credential(credential_info, user, db_session)
+            for user_file in user_files:
+                # 6) Create connector
+                connector_base = ConnectorBase(
+                    name=f"UserFile-{int(time.time())}",
+                    source=DocumentSource.FILE,
+                    input_type=InputType.LOAD_STATE,
+                    connector_specific_config={
+                        "file_locations": [user_file.file_id],
+                        "zip_metadata": {},
+                    },
+                    refresh_freq=None,
+                    prune_freq=None,
+                    indexing_start=None,
+                )
+                connector = create_connector(
+                    db_session=db_session,
+                    connector_data=connector_base,
+                )
 
-            # 8) Create connector credential pair
-            cc_pair = add_credential_to_connector(
-                db_session=db_session,
-                user=user,
-                connector_id=connector.id,
-                credential_id=credential.id,
-                cc_pair_name=f"UserFileCCPair-{int(time.time())}",
-                access_type=AccessType.PRIVATE,
-                auto_sync_options=None,
-                groups=[],
-            )
-            user_file.cc_pair_id = cc_pair.data
-            db_session.commit()
+                # 7) Create credential
+                credential_info = CredentialBase(
+                    credential_json={},
+                    admin_public=True,
+                    source=DocumentSource.FILE,
+                    curator_public=True,
+                    groups=[],
+                    name=f"UserFileCredential-{int(time.time())}",
+                    is_user_file=True,
+                )
+                credential = create_credential(credential_info, user, db_session)
+
+                # 8) Create connector credential pair
+                cc_pair = add_credential_to_connector(
+                    db_session=db_session,
+                    user=user,
+                    connector_id=connector.id,
+                    credential_id=credential.id,
+                    cc_pair_name=f"UserFileCCPair-{int(time.time())}",
+                    access_type=AccessType.PRIVATE,
+                    auto_sync_options=None,
+                    groups=[],
+                )
+                user_file.cc_pair_id = cc_pair.data
+                db_session.commit()
 
     return {
         "files": [
@@ -838,9 +855,7 @@ def fetch_chat_file(
             file_id = txt_file_id
 
     media_type = file_record.file_type
-    file_io = file_store.read_file(file_id, mode="b")
-
-    return StreamingResponse(file_io, media_type=media_type)
+    return StreamingResponse(file_store.stream_file(file_id), media_type=media_type)
 
 
 @router.get("/search")
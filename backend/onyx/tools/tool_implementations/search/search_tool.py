@@ -1,8 +1,10 @@
 import copy
 import json
+import threading
 import time
 from collections.abc import Callable
 from collections.abc import Generator
+from concurrent.futures import Future
 from typing import Any
 from typing import cast
 from typing import TypeVar
@@ -162,6 +164,14 @@ class SearchTool(Tool[SearchToolOverrideKwargs]):
             )
         )
 
+        # Results of retrieve_sections_for_queries by query, filters (as JSON), recency
+        # bias and search type, for as long as the tool lives (one chat message / agent
+        # run)
+        self._query_retrieval_cache: dict[
+            tuple[str, str, float, SearchType], Future[SearchResponseSummary]
+        ] = {}
+        self._query_retrieval_cache_lock = threading.Lock()
+
     @property
     def name(self) -> str:
         return self._NAME
@@ -286,6 +296,138 @@ class SearchTool(Tool[SearchToolOverrideKwargs]):
         self, override_kwargs: SearchToolOverrideKwargs | None = None, **llm_kwargs: Any
     ) -> Generator[ToolResponse, None, None]:
         query = cast(str, llm_kwargs[QUERY_FIELD])
+        user_file_ids = None
+        user_folder_ids = None
+        ordering_only = False
+        if override_kwargs:
+            user_file_ids = override_kwargs.user_file_ids
+            user_folder_ids = override_kwargs.user_folder_ids
+            ordering_only = use_alt_not_None(override_kwargs.ordering_only, False)
+
+        # Fast path for ordering-only search
+        if ordering_only:
+            yield from self._run_ordering_only_search(
+                query, user_file_ids, user_folder_ids
+            )
+            return
+
+        if self.selected_sections:
+            yield from self._build_response_for_specified_sections(query)
+            return
+
+        search_pipeline = self._build_search_pipeline(query, override_kwargs)
+
+        search_query_info = SearchQueryInfo(
+            predicted_search=search_pipeline.search_query.search_type,
+            final_filters=search_pipeline.search_query.filters,
+            recency_bias_multiplier=search_pipeline.search_query.recency_bias_multiplier,
+        )
+        yield from yield_search_responses(
+            query=query,
+            # give back the merged sections to prevent duplicate docs from appearing in the UI
+            get_retrieved_sections=lambda: search_pipeline.merged_retrieved_sections,
+            get_final_context_sections=lambda: search_pipeline.final_context_sections,
+            search_query_info=search_query_info,
+            get_section_relevance=lambda: search_pipeline.section_relevance,
+            search_tool=self,
+        )
+
+    def retrieve_sections_for_queries(
+        self, queries: list[str], question: str, db_session: Session
+    ) -> list[SearchResponseSummary]:
+        """Retrieval only (no query analysis, reranking or LLM relevance) for several
+        queries at once, e.g. the expansions of a question in agent search. The filters
+        are detected once, from the question, and apply to all of the queries.
+
+        The sections of each query are kept for the lifetime of the tool, a query that
+        was already searched for with the same filters, recency bias and search type
+        (or is being searched for by another thread) is not searched for again, even
+        if it came from another question."""
+        if self.selected_sections:
+            # same as the response summary for specified sections, no search is run
+            return [
+                SearchResponseSummary(
+                    rephrased_query=None,
+                    top_sections=[],
+                    predicted_flow=None,
+                    predicted_search=None,
+                    final_filters=IndexFilters(access_control_list=None),
+                    recency_bias_multiplier=1.0,
+                )
+                for _ in queries
+            ]
+
+        search_pipeline = self._build_search_pipeline(
+            question,
+            SearchToolOverrideKwargs(
+                force_no_rerank=True,
+                alternate_db_session=db_session,
+                skip_query_analysis=True,
+            ),
+        )
+        # any query may have to be searched for, they are embedded together while the
+        # filters are detected
+        search_pipeline.start_query_embeddings(list(dict.fromkeys(queries)))
+        search_query = search_pipeline.search_query
+        keys = {
+            query: (
+                query,
+                search_query.filters.model_dump_json(),
+                search_query.recency_bias_multiplier,
+                search_query.search_type,
+            )
+            for query in queries
+        }
+
+        futures: dict[str, Future[SearchResponseSummary]] = {}
+        queries_to_search: list[str] = []
+        with self._query_retrieval_cache_lock:
+            for query, key in keys.items():
+                if key not in self._query_retrieval_cache:
+                    self._query_retrieval_cache[key] = Future()
+                    queries_to_search.append(query)
+                futures[query] = self._query_retrieval_cache[key]
+
+        if queries_to_search:
+            try:
+                summaries = self._search_for_queries(search_pipeline, queries_to_search)
+            except Exception as e:
+                with self._query_retrieval_cache_lock:
+                    for query in queries_to_search:
+                        del self._query_retrieval_cache[keys[query]]
+                for query in queries_to_search:
+                    futures[query].set_exception(e)
+                raise
+
+            for query, summary in zip(queries_to_search, summaries):
+                futures[query].set_result(summary)
+        else:
+            logger.debug(f"All queries were already searched for: queries={queries}")
+
+        return [futures[query].result() for query in queries]
+
+    def _search_for_queries(
+        self, search_pipeline: SearchPipeline, queries: list[str]
+    ) -> list[SearchResponseSummary]:
+        sections_per_query = search_pipeline.retrieve_sections_for_queries(queries)
+        search_query = search_pipeline.search_query
+        return [
+            SearchResponseSummary(
+                rephrased_query=query,
+                # the merged retrieved sections, as in the summary of `run`. Pruning
+                # only applies to the final context sections
+                top_sections=sections,
+                predicted_flow=QueryFlow.QUESTION_ANSWER,
+                predicted_search=search_query.search_type,
+                final_filters=search_query.filters,
+                recency_bias_multiplier=search_query.recency_bias_multiplier,
+            )
+            for query, sections in zip(queries, sections_per_query)
+        ]
+
+    def _build_search_pipeline(
+        self, query: str, override_kwargs: SearchToolOverrideKwargs | None
+    ) -> SearchPipeline:
         precomputed_query_embedding = None
         precomputed_is_keyword = None
         precomputed_keywords = None
@@ -295,7 +437,6 @@ class SearchTool(Tool[SearchToolOverrideKwargs]):
         skip_query_analysis = False
         user_file_ids = None
         user_folder_ids = None
-        ordering_only = False
         document_sources = None
         time_cutoff = None
         expanded_queries = None
@@ -308,22 +449,10 @@ class SearchTool(Tool[SearchToolOverrideKwargs]):
             )
             user_file_ids = override_kwargs.user_file_ids
             user_folder_ids = override_kwargs.user_folder_ids
-            ordering_only = use_alt_not_None(override_kwargs.ordering_only, False)
             document_sources = override_kwargs.document_sources
             time_cutoff = override_kwargs.time_cutoff
             expanded_queries = override_kwargs.expanded_queries
 
-        # Fast path for ordering-only search
-        if ordering_only:
-            yield from self._run_ordering_only_search(
-                query, user_file_ids, user_folder_ids
-            )
-            return
-
-        if self.selected_sections:
-            yield from self._build_response_for_specified_sections(query)
-            return
-
         # Create a copy of the retrieval options with user_file_ids if provided
         retrieval_options = copy.deepcopy(self.retrieval_options)
         if (user_file_ids or user_folder_ids) and retrieval_options:
@@ -361,7 +490,7 @@ class SearchTool(Tool[SearchToolOverrideKwargs]):
                 # Overwrite time-cutoff should supercede existing time-cutoff, even if defined
                 retrieval_options.filters.time_cutoff = time_cutoff
 
-        search_pipeline = SearchPipeline(
+        return SearchPipeline(
             search_request=SearchRequest(
                 query=query,
                 evaluation_type=(
@@ -410,21 +539,6 @@ class SearchTool(Tool[SearchToolOverrideKwargs]):
             contextual_pruning_config=self.contextual_pruning_config,
         )
 
-        search_query_info = SearchQueryInfo(
-            predicted_search=search_pipeline.search_query.search_type,
-            final_filters=search_pipeline.search_query.filters,
-            recency_bias_multiplier=search_pipeline.search_query.recency_bias_multiplier,
-        )
-        yield from yield_search_responses(
-            query=query,
-            # give back the merged sections to prevent duplicate docs from appearing in the UI
-            get_retrieved_sections=lambda: search_pipeline.merged_retrieved_sections,
-            get_final_context_sections=lambda: search_pipeline.final_context_sections,
-            search_query_info=search_query_info,
-            get_section_relevance=lambda: search_pipeline.section_relevance,
-            search_tool=self,
-        )
-
     def final_result(self, *args: ToolResponse) -> JSON_ro:
         final_docs = cast(
             list[LlmDoc],
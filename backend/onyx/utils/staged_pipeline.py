@@ -0,0 +1,204 @@
+import contextvars
+import queue
+import threading
+import time
+from collections.abc import Callable
+from collections.abc import Iterator
+from dataclasses import dataclass
+from typing import Any
+
+from onyx.utils.logger import setup_logger
+
+logger = setup_logger()
+
+_QUEUE_POLL_INTERVAL = 0.1
+
+
+@dataclass
+class PipelineStage:
+    name: str
+    func: Callable[[Any], Any]
+    num_workers: int = 1
+
+
+class StagedPipeline:
+    """Runs items through a fixed sequence of stages. Each stage has its own worker
+    threads and is fed by a bounded queue, so a slow stage applies backpressure all the
+    way back to `submit`.
+
+    Items are numbered in submission order and results are handed back in that same
+    order, `completed_through` is the highest sequence number for which every item up to
+    and including it has made it through the last stage.
+
+    The first exception raised by a stage stops the pipeline and is re-raised to the
+    caller by the next call to `submit`, `pop_completed` or `drain`. Stage functions
+    are expected to turn per-item failures into results themselves."""
+
+    def __init__(self, stages: list[PipelineStage], max_queued_items: int) -> None:
+        if not stages:
+            raise ValueError("A pipeline needs at least one stage")
+
+        self._stages = stages
+        self._queues: list[queue.Queue[tuple[int, Any]]] = [
+            queue.Queue(maxsize=max(1, max_queued_items)) for _ in stages
+        ]
+
+        self._results: dict[int, Any] = {}
+        self._results_cond = threading.Condition()
+        self._next_submit_seq = 0
+        self._next_result_seq = 0
+
+        self._error: BaseException | None = None
+        self._stop = threading.Event()
+
+        self._stats_lock = threading.Lock()
+        self._busy_seconds: dict[str, float] = {stage.name: 0.0 for stage in stages}
+        self._submit_blocked_seconds = 0.0
+        self._start_time = time.monotonic()
+
+        self._threads: list[threading.Thread] = []
+        for stage_idx, stage in enumerate(stages):
+            for worker_idx in range(max(1, stage.num_workers)):
+                # every worker runs in a copy of the caller's context so that things
+                # like the current tenant are visible to the stage functions
+                context = contextvars.copy_context()
+                thread = threading.Thread(
+                    target=context.run,
+                    args=(self._run_worker, stage_idx),
+                    name=f"{stage.name}-{worker_idx}",
+                    daemon=True,
+                )
+                thread.start()
+                self._threads.append(thread)
+
+    @property
+    def completed_through(self) -> int:
+        with self._results_cond:
+            return self._next_result_seq - 1
+
+    @property
+    def last_submitted(self) -> int:
+        return self._next_submit_seq - 1
+
+    @property
+    def num_in_flight(self) -> int:
+        with self._results_cond:
+            return self._next_submit_seq - self._next_result_seq
+
+    def submit(self, item: Any) -> int:
+        """Queues an item for the first stage, blocking while that stage is full.
+        Returns the item's sequence number."""
+        self._raise_if_failed()
+
+        seq = self._next_submit_seq
+        start = time.monotonic()
+        if not self._put(self._queues[0], (seq, item)):
+            self._raise_if_failed()
+            raise RuntimeError("Pipeline was shut down")
+        with self._stats_lock:
+            self._submit_blocked_seconds += time.monotonic() - start
+
+        with self._results_cond:
+            self._next_submit_seq += 1
+        return seq
+
+    def pop_completed(self, block: bool = False) -> Iterator[tuple[int, Any]]:
+        """Yields (seq, result) for every item that can be handed back in order. If
+        `block` is set, waits until at least one item is available (or nothing is in
+        flight)."""
+        while True:
+            with self._results_cond:
+                while (
+                    block
+                    and self._next_result_seq not in self._results
+                    and self._next_result_seq < self._next_submit_seq
+                    and self._error is None
+                ):
+                    self._results_cond.wait(_QUEUE_POLL_INTERVAL)
+                self._raise_if_failed()
+
+                if self._next_result_seq not in self._results:
+                    return
+                seq = self._next_result_seq
+                result = self._results.pop(seq)
+                self._next_result_seq += 1
+
+            # only the first result needs to be waited for
+            block = False
+            yield seq, result
+
+    def drain(self) -> Iterator[tuple[int, Any]]:
+        """Yields the results of everything submitted so far, in order."""
+        while self.num_in_flight > 0:
+            yield from self.pop_completed(block=True)
+
+    def shutdown(self) -> None:
+        """Stops the workers. Items still in flight are dropped."""
+        self._stop.set()
+        for thread in self._threads:
+            thread.join()
+
+    def utilization(self) -> dict[str, float]:
+        """Fraction of the elapsed time each stage's workers spent doing work.
+        `submit` is the fraction of time the caller was blocked on a full pipeline."""
+        elapsed = max(time.monotonic() - self._start_time, 1e-9)
+        with self._stats_lock:
+            stage_utilization = {
+                stage.name: self._busy_seconds[stage.name]
+                / (elapsed * max(1, stage.num_workers))
+                for stage in self._stages
+            }
+            stage_utilization["submit"] = self._submit_blocked_seconds / elapsed
+        return stage_utilization
+
+    def log_utilization(self, prefix: str = "") -> None:
+        stats = " ".join(
+            f"{name}={value:.2f}" for name, value in self.utilization().items()
+        )
+        logger.info(f"{prefix}Pipeline utilization: {stats}")
+
+    def _raise_if_failed(self) -> None:
+        if self._error is not None:
+            raise self._error
+
+    def _put(self, target: queue.Queue[tuple[int, Any]], item: tuple[int, Any]) -> bool:
+        while not self._stop.is_set():
+            try:
+                target.put(item, timeout=_QUEUE_POLL_INTERVAL)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _run_worker(self, stage_idx: int) -> None:
+        stage = self._stages[stage_idx]
+        source = self._queues[stage_idx]
+        is_last_stage = stage_idx == len(self._stages) - 1
+
+        while not self._stop.is_set():
+            try:
+                seq, item = source.get(timeout=_QUEUE_POLL_INTERVAL)
+            except queue.Empty:
+                continue
+
+            start = time.monotonic()
+            try:
+                result = stage.func(item)
+            except BaseException as e:
+                logger.exception(f"Pipeline stage failed: stage={stage.name} seq={seq}")
+                with self._results_cond:
+                    if self._error is None:
+                        self._error = e
+                    self._results_cond.notify_all()
+                self._stop.set()
+                return
+            finally:
+                with self._stats_lock:
+                    self._busy_seconds[stage.name] += time.monotonic() - start
+
+            if is_last_stage:
+                with self._results_cond:
+                    self._results[seq] = result
+                    self._results_cond.notify_all()
+            elif not self._put(self._queues[stage_idx + 1], (seq, result)):
+                return
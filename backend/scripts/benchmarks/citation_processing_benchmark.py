@@ -0,0 +1,122 @@
+"""Measures the per-token cost of `CitationProcessor` on long streamed answers.
+
+Builds a synthetic answer of prose, citations and code blocks and streams it through
+the processor one token at a time. For a linear time processor the time spent on the
+last 1k tokens should be about the same as on the first 1k tokens.
+
+Basic Usage:
+
+python -m scripts.benchmarks.citation_processing_benchmark --tokens 10000 --runs 5
+"""
+
+import argparse
+import random
+import statistics
+import time
+from datetime import datetime
+
+from onyx.chat.models import LlmDoc
+from onyx.chat.stream_processing.citation_processing import CitationProcessor
+from onyx.chat.stream_processing.utils import DocumentIdOrderMapping
+from onyx.configs.constants import DocumentSource
+
+NUM_DOCS = 10
+WINDOW_TOKENS = 1000
+
+_WORDS = ["the", "index", "answer", "search", "document", "query", "model", "of"]
+
+
+def _build_docs() -> list[LlmDoc]:
+    return [
+        LlmDoc(
+            document_id=f"doc_{i}",
+            content="content",
+            blurb=f"Document #{i}",
+            semantic_identifier=f"Doc {i}",
+            source_type=DocumentSource.WEB,
+            metadata={},
+            updated_at=datetime.now(),
+            link=f"https://docs.example.com/{i}" if i % 2 == 0 else None,
+            source_links=None,
+            match_highlights=[],
+        )
+        for i in range(NUM_DOCS)
+    ]
+
+
+def _build_tokens(num_tokens: int, seed: int) -> list[str]:
+    rng = random.Random(seed)
+    tokens: list[str] = []
+    while len(tokens) < num_tokens:
+        roll = rng.random()
+        if roll < 0.05:
+            # citations are often split over several tokens
+            tokens.extend(["[", str(rng.randint(1, NUM_DOCS)), "]"])
+        elif roll < 0.06:
+            tokens.extend(["```", "\n", "x = arr[", "1", "]", "\n", "```", "\n"])
+        else:
+            tokens.append(f" {rng.choice(_WORDS)}")
+    return tokens[:num_tokens]
+
+
+def _run(tokens: list[str], docs: list[LlmDoc]) -> list[float]:
+    doc_order = DocumentIdOrderMapping(
+        order_mapping={doc.document_id: i + 1 for i, doc in enumerate(docs)}
+    )
+    processor = CitationProcessor(
+        context_docs=docs,
+        final_doc_id_to_rank_map=doc_order,
+        display_doc_id_to_rank_map=doc_order,
+        stop_stream=None,
+    )
+
+    token_times: list[float] = []
+    for token in tokens:
+        start = time.perf_counter()
+        for _ in processor.process_token(token):
+            pass
+        token_times.append(time.perf_counter() - start)
+    for _ in processor.process_token(None):
+        pass
+    return token_times
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--tokens", type=int, default=10_000)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    docs = _build_docs()
+    tokens = _build_tokens(args.tokens, args.seed)
+
+    totals: list[float] = []
+    first_window: list[float] = []
+    last_window: list[float] = []
+    all_token_times: list[float] = []
+    for _ in range(args.runs):
+        token_times = _run(tokens, docs)
+        totals.append(sum(token_times))
+        first_window.append(sum(token_times[:WINDOW_TOKENS]))
+        last_window.append(sum(token_times[-WINDOW_TOKENS:]))
+        all_token_times.extend(token_times)
+
+    all_token_times.sort()
+    p50 = all_token_times[len(all_token_times) // 2]
+    p99 = all_token_times[int(len(all_token_times) * 0.99)]
+    total = statistics.median(totals)
+
+    print(f"tokens={args.tokens} runs={args.runs}")
+    print(
+        f"total: elapsed={total * 1000:.1f}ms tokens_per_sec={args.tokens / total:.0f}"
+    )
+    print(f"per_token: p50={p50 * 1e6:.1f}us p99={p99 * 1e6:.1f}us")
+    print(
+        f"first_{WINDOW_TOKENS}_tokens={statistics.median(first_window) * 1000:.1f}ms "
+        f"last_{WINDOW_TOKENS}_tokens={statistics.median(last_window) * 1000:.1f}ms"
+    )
+
+
+if __name__ == "__main__":
+    main()
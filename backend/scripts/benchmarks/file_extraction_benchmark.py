@@ -0,0 +1,207 @@
+"""Measures files/sec of text extraction, serially and with a FileExtractionPool.
+
+The corpus is either a directory of sample files (e.g. an unzipped upload) or a
+generated mix of PDF, DOCX, PPTX, XLSX and plain text files. Unstructured is not
+used, files are always parsed locally.
+
+Basic Usage:
+
+python -m scripts.benchmarks.file_extraction_benchmark --files 200 --workers 4
+python -m scripts.benchmarks.file_extraction_benchmark --corpus-dir ~/sample_docs
+"""
+
+import argparse
+import random
+import time
+from io import BytesIO
+from pathlib import Path
+
+import docx  # type: ignore
+import openpyxl  # type: ignore
+import pptx  # type: ignore
+
+from onyx.file_processing.extract_file_text import extract_text_and_images
+from onyx.file_processing.extract_file_text import get_file_ext
+from onyx.file_processing.extract_file_text import is_accepted_file_ext
+from onyx.file_processing.extract_file_text import OnyxExtensionType
+from onyx.file_processing.extraction_pool import FileExtractionPool
+from onyx.file_processing.extraction_pool import FileExtractionTask
+
+_WORDS = (
+    "index connector document chunk embedding search answer query permission "
+    "drive page section table slide invoice customer report quarter revenue"
+).split()
+
+
+def _sentences(count: int) -> list[str]:
+    return [
+        " ".join(random.choices(_WORDS, k=random.randint(8, 20))).capitalize() + "."
+        for _ in range(count)
+    ]
+
+
+def _pdf_bytes(pages: int) -> bytes:
+    """A minimal PDF with one text line per sentence, no PDF writer library needed"""
+    objects: list[bytes] = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        b"",  # the page tree, filled in once the page object numbers are known
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    ]
+    page_numbers = []
+    for _ in range(pages):
+        lines = b" ".join(f"({sentence}) Tj T*".encode() for sentence in _sentences(40))
+        stream = b"BT /F1 10 Tf 12 TL 40 800 Td " + lines + b" ET"
+        objects.append(
+            b"<< /Length %d >>\nstream\n%s\nendstream" % (len(stream), stream)
+        )
+        objects.append(
+            b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 842] "
+            b"/Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>" % len(objects)
+        )
+        page_numbers.append(len(objects))
+    objects[1] = b"<< /Type /Pages /Kids [%s] /Count %d >>" % (
+        b" ".join(b"%d 0 R" % number for number in page_numbers),
+        len(page_numbers),
+    )
+
+    output = BytesIO()
+    output.write(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(output.tell())
+        output.write(b"%d 0 obj\n%s\nendobj\n" % (number, body))
+    xref_offset = output.tell()
+    output.write(b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1))
+    for offset in offsets:
+        output.write(b"%010d 00000 n \n" % offset)
+    output.write(
+        b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n"
+        % (len(objects) + 1, xref_offset)
+    )
+    return output.getvalue()
+
+
+def _docx_bytes(paragraphs: int) -> bytes:
+    document = docx.Document()
+    for sentence in _sentences(paragraphs):
+        document.add_paragraph(sentence)
+    output = BytesIO()
+    document.save(output)
+    return output.getvalue()
+
+
+def _pptx_bytes(slides: int) -> bytes:
+    presentation = pptx.Presentation()
+    for _ in range(slides):
+        slide = presentation.slides.add_slide(presentation.slide_layouts[1])
+        slide.shapes.title.text = _sentences(1)[0]
+        slide.placeholders[1].text = "\n".join(_sentences(6))
+    output = BytesIO()
+    presentation.save(output)
+    return output.getvalue()
+
+
+def _xlsx_bytes(rows: int) -> bytes:
+    workbook = openpyxl.Workbook()
+    sheet = workbook.active
+    for i in range(rows):
+        sheet.append([i, random.random(), *random.choices(_WORDS, k=6)])
+    output = BytesIO()
+    workbook.save(output)
+    return output.getvalue()
+
+
+def _generate_corpus(num_files: int, scale: int) -> list[FileExtractionTask]:
+    generators = {
+        ".pdf": lambda: _pdf_bytes(pages=5 * scale),
+        ".docx": lambda: _docx_bytes(paragraphs=200 * scale),
+        ".pptx": lambda: _pptx_bytes(slides=10 * scale),
+        ".xlsx": lambda: _xlsx_bytes(rows=500 * scale),
+        ".txt": lambda: "\n".join(_sentences(200 * scale)).encode(),
+    }
+    extensions = list(generators)
+    return [
+        FileExtractionTask(
+            file_name=f"file_{i}{extensions[i % len(extensions)]}",
+            content=generators[extensions[i % len(extensions)]](),
+        )
+        for i in range(num_files)
+    ]
+
+
+def _load_corpus(corpus_dir: Path) -> list[FileExtractionTask]:
+    return [
+        FileExtractionTask(file_name=path.name, content=path.read_bytes())
+        for path in sorted(corpus_dir.rglob("*"))
+        if path.is_file()
+        and is_accepted_file_ext(get_file_ext(path.name), OnyxExtensionType.All)
+    ]
+
+
+def _extract_serially(tasks: list[FileExtractionTask]) -> int:
+    total_chars = 0
+    for task in tasks:
+        result = extract_text_and_images(
+            file=BytesIO(task.content),
+            file_name=task.file_name,
+            allow_unstructured=False,
+        )
+        total_chars += len(result.text_content)
+    return total_chars
+
+
+def _extract_with_pool(tasks: list[FileExtractionTask], workers: int) -> int:
+    total_chars = 0
+    with FileExtractionPool(
+        expected_file_count=len(tasks),
+        max_workers=workers,
+        min_files_for_workers=1,
+        allow_unstructured=False,
+    ) as pool:
+        for _, result in pool.extract_text_and_images(tasks):
+            total_chars += len(result.text_content)
+    return total_chars
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--corpus-dir", type=Path, default=None)
+    parser.add_argument("--files", type=int, default=100)
+    parser.add_argument(
+        "--scale", type=int, default=1, help="multiplies the generated file sizes"
+    )
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    random.seed(args.seed)
+    tasks = (
+        _load_corpus(args.corpus_dir)
+        if args.corpus_dir
+        else _generate_corpus(args.files, args.scale)
+    )
+    corpus_mb = sum(len(task.content) for task in tasks) / (1024 * 1024)
+
+    start = time.monotonic()
+    serial_chars = _extract_serially(tasks)
+    serial_elapsed = time.monotonic() - start
+
+    start = time.monotonic()
+    pool_chars = _extract_with_pool(tasks, args.workers)
+    pool_elapsed = time.monotonic() - start
+
+    # worker startup is included in the pool's time
+    print(f"files={len(tasks)} corpus_mb={corpus_mb:.1f}")
+    print(
+        f"serial: elapsed={serial_elapsed:.2f}s "
+        f"files_per_sec={len(tasks) / serial_elapsed:.1f} chars={serial_chars}"
+    )
+    print(
+        f"pool:   elapsed={pool_elapsed:.2f}s "
+        f"files_per_sec={len(tasks) / pool_elapsed:.1f} chars={pool_chars} "
+        f"workers={args.workers}"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,155 @@
+"""Measures chunks/sec of the Vespa feed paths against a local stub server.
+
+Compares the batched thread pool path used by `batch_index_vespa_chunks` with the
+streaming `VespaFeedClient`. The stub server answers document/v1 requests after a
+random delay to simulate Vespa latency, so no Vespa instance is needed.
+
+Basic Usage:
+
+python -m scripts.benchmarks.vespa_feed_benchmark --chunks 5000 --latency-ms 5
+"""
+
+import argparse
+import concurrent.futures
+import random
+import threading
+import time
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler
+from http.server import ThreadingHTTPServer
+
+import httpx
+
+from onyx.document_index.vespa.feed_client import VespaFeedClient
+from onyx.document_index.vespa.feed_client import VespaFeedOperation
+from onyx.document_index.vespa_constants import BATCH_SIZE
+from onyx.document_index.vespa_constants import NUM_THREADS
+from onyx.utils.batching import batch_generator
+
+EMBEDDING_DIM = 768
+
+
+class _StubVespaHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    latency_ms: float = 0.0
+    jitter_ms: float = 0.0
+
+    def _respond(self) -> None:
+        content_length = int(self.headers.get("Content-Length") or 0)
+        if content_length:
+            self.rfile.read(content_length)
+
+        delay_ms = self.latency_ms + random.uniform(0, self.jitter_ms)
+        time.sleep(delay_ms / 1000)
+
+        body = b'{"pathId": "/document/v1/", "id": "stub"}'
+        self.send_response(HTTPStatus.OK)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    do_POST = _respond
+    do_PUT = _respond
+    do_DELETE = _respond
+    do_GET = _respond
+
+    def log_message(self, format: str, *args: object) -> None:
+        pass
+
+
+def _start_stub_server(latency_ms: float, jitter_ms: float) -> ThreadingHTTPServer:
+    _StubVespaHandler.latency_ms = latency_ms
+    _StubVespaHandler.jitter_ms = jitter_ms
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _StubVespaHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def _build_operations(base_url: str, num_chunks: int) -> list[VespaFeedOperation]:
+    embedding = [random.random() for _ in range(EMBEDDING_DIM)]
+    return [
+        VespaFeedOperation(
+            document_id=f"doc_{i // 10}",
+            url=f"{base_url}/document/v1/default/danswer_chunk/docid/{i}",
+            method="POST",
+            body={
+                "fields": {
+                    "document_id": f"doc_{i // 10}",
+                    "chunk_id": i % 10,
+                    "content": "lorem ipsum " * 100,
+                    "embeddings": {"full_chunk": embedding},
+                }
+            },
+        )
+        for i in range(num_chunks)
+    ]
+
+
+def _feed_batched(
+    http_client: httpx.Client, operations: list[VespaFeedOperation]
+) -> None:
+    """Mirrors batch_index_vespa_chunks: every batch waits for its slowest request."""
+
+    def _send(operation: VespaFeedOperation) -> None:
+        res = http_client.post(operation.url, json=operation.body)
+        res.raise_for_status()
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=NUM_THREADS) as executor:
+        for operation_batch in batch_generator(operations, BATCH_SIZE):
+            futures = [
+                executor.submit(_send, operation) for operation in operation_batch
+            ]
+            for future in concurrent.futures.as_completed(futures):
+                future.result()
+
+
+def _feed_streaming(
+    http_client: httpx.Client,
+    operations: list[VespaFeedOperation],
+    max_in_flight: int,
+) -> None:
+    VespaFeedClient(http_client, max_in_flight=max_in_flight).feed(operations)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--chunks", type=int, default=5000)
+    parser.add_argument("--latency-ms", type=float, default=5.0)
+    parser.add_argument("--jitter-ms", type=float, default=20.0)
+    parser.add_argument("--max-in-flight", type=int, default=64)
+    args = parser.parse_args()
+
+    server = _start_stub_server(args.latency_ms, args.jitter_ms)
+    base_url = f"http://127.0.0.1:{server.server_address[1]}"
+    operations = _build_operations(base_url, args.chunks)
+
+    try:
+        with httpx.Client(timeout=30) as http_client:
+            start = time.monotonic()
+            _feed_batched(http_client, operations)
+            batched_elapsed = time.monotonic() - start
+
+            start = time.monotonic()
+            _feed_streaming(http_client, operations, args.max_in_flight)
+            streaming_elapsed = time.monotonic() - start
+    finally:
+        server.shutdown()
+
+    print(
+        f"chunks={args.chunks} latency_ms={args.latency_ms} jitter_ms={args.jitter_ms}"
+    )
+    print(
+        f"batched:   elapsed={batched_elapsed:.2f}s "
+        f"chunks_per_sec={args.chunks / batched_elapsed:.1f}"
+    )
+    print(
+        f"streaming: elapsed={streaming_elapsed:.2f}s "
+        f"chunks_per_sec={args.chunks / streaming_elapsed:.1f} "
+        f"max_in_flight={args.max_in_flight}"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -56,6 +56,18 @@ MIN_THREADS_ML_MODELS = int(os.environ.get("MIN_THREADS_ML_MODELS") or 1)
 # or intent classification
 INDEXING_ONLY = os.environ.get("INDEXING_ONLY", "").lower() == "true"
 
+# If set, query embedding requests for the same local model that arrive within a short
+# window are run through the model as a single batch instead of one forward pass each
+QUERY_EMBEDDING_BATCHING_ENABLED = (
+    os.environ.get("QUERY_EMBEDDING_BATCHING_ENABLED", "").lower() == "true"
+)
+QUERY_EMBEDDING_BATCH_WINDOW_MS = float(
+    os.environ.get("QUERY_EMBEDDING_BATCH_WINDOW_MS") or 5
+)
+QUERY_EMBEDDING_MAX_BATCH_SIZE = int(
+    os.environ.get("QUERY_EMBEDDING_MAX_BATCH_SIZE") or 32
+)
+
 # The process needs to have this for the log file to write to
 # otherwise, it will not create additional log files
 # This should just be the filename base without extension or path.
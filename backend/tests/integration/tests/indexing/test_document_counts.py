@@ -0,0 +1,156 @@
+from uuid import uuid4
+
+from sqlalchemy import delete
+from sqlalchemy import update
+from sqlalchemy.orm import Session
+
+from onyx.db.document import delete_documents_by_connector_credential_pair__no_commit
+from onyx.db.document import delete_documents_complete__no_commit
+from onyx.db.document import get_document_counts_for_cc_pairs
+from onyx.db.document import mark_document_as_indexed_for_cc_pair__no_commit
+from onyx.db.document import reconcile_document_count_for_cc_pair
+from onyx.db.document import upsert_document_by_connector_credential_pair
+from onyx.db.document import upsert_documents
+from onyx.db.engine import get_session_context_manager
+from onyx.db.models import DocumentByConnectorCredentialPair
+from onyx.db.models import DocumentCountByConnectorCredentialPair
+from onyx.document_index.interfaces import DocumentMetadata
+from onyx.server.documents.models import ConnectorCredentialPairIdentifier
+from tests.integration.common_utils.managers.cc_pair import CCPairManager
+from tests.integration.common_utils.managers.user import UserManager
+from tests.integration.common_utils.test_models import DATestCCPair
+from tests.integration.common_utils.test_models import DATestUser
+
+
+def _index(db_session: Session, cc_pair: DATestCCPair, document_ids: list[str]) -> None:
+    """Does what the indexing pipeline does to Postgres for a batch of documents."""
+    upsert_documents(
+        db_session,
+        [
+            DocumentMetadata(
+                connector_id=cc_pair.connector_id,
+                credential_id=cc_pair.credential_id,
+                document_id=document_id,
+                semantic_identifier=document_id,
+                first_link="",
+            )
+            for document_id in document_ids
+        ],
+    )
+    upsert_document_by_connector_credential_pair(
+        db_session, cc_pair.connector_id, cc_pair.credential_id, document_ids
+    )
+    mark_document_as_indexed_for_cc_pair__no_commit(
+        db_session, cc_pair.connector_id, cc_pair.credential_id, document_ids
+    )
+    db_session.commit()
+
+
+def _counts(db_session: Session, *cc_pairs: DATestCCPair) -> list[int]:
+    counts = {
+        (connector_id, credential_id): count
+        for connector_id, credential_id, count in get_document_counts_for_cc_pairs(
+            db_session,
+            [
+                ConnectorCredentialPairIdentifier(
+                    connector_id=cc_pair.connector_id,
+                    credential_id=cc_pair.credential_id,
+                )
+                for cc_pair in cc_pairs
+            ],
+        )
+    }
+    return [
+        counts.get((cc_pair.connector_id, cc_pair.credential_id), 0)
+        for cc_pair in cc_pairs
+    ]
+
+
+def test_document_counts_follow_indexing_and_deletion(reset: None) -> None:
+    admin_user: DATestUser = UserManager.create(name="admin_user")
+    cc_pair_1 = CCPairManager.create_from_scratch(user_performing_action=admin_user)
+    cc_pair_2 = CCPairManager.create_from_scratch(user_performing_action=admin_user)
+
+    prefix = uuid4().hex
+    doc_1, doc_2, shared_doc = f"{prefix}_1", f"{prefix}_2", f"{prefix}_shared"
+
+    with get_session_context_manager() as db_session:
+        _index(db_session, cc_pair_1, [doc_1, doc_2, shared_doc])
+        _index(db_session, cc_pair_2, [shared_doc])
+        assert _counts(db_session, cc_pair_1, cc_pair_2) == [3, 1]
+
+        # re-indexing documents that are already indexed doesn't count them again
+        _index(db_session, cc_pair_1, [doc_1, shared_doc])
+        _index(db_session, cc_pair_2, [shared_doc])
+        assert _counts(db_session, cc_pair_1, cc_pair_2) == [3, 1]
+
+        # removing the shared document from one cc pair leaves the other one alone
+        delete_documents_by_connector_credential_pair__no_commit(
+            db_session,
+            [shared_doc],
+            ConnectorCredentialPairIdentifier(
+                connector_id=cc_pair_2.connector_id,
+                credential_id=cc_pair_2.credential_id,
+            ),
+        )
+        db_session.commit()
+        assert _counts(db_session, cc_pair_1, cc_pair_2) == [3, 0]
+
+        # indexed again by the second cc pair, then deleted from both
+        _index(db_session, cc_pair_2, [shared_doc])
+        assert _counts(db_session, cc_pair_1, cc_pair_2) == [3, 1]
+        delete_documents_complete__no_commit(db_session, [shared_doc])
+        db_session.commit()
+        assert _counts(db_session, cc_pair_1, cc_pair_2) == [2, 0]
+
+        # a document that was never marked as indexed was never counted
+        upsert_document_by_connector_credential_pair(
+            db_session,
+            cc_pair_2.connector_id,
+            cc_pair_2.credential_id,
+            [doc_1],
+        )
+        delete_documents_complete__no_commit(db_session, [doc_1])
+        db_session.commit()
+        assert _counts(db_session, cc_pair_1, cc_pair_2) == [1, 0]
+
+
+def test_reconcile_fixes_drifted_document_counts(reset: None) -> None:
+    admin_user: DATestUser = UserManager.create(name="admin_user")
+    cc_pair = CCPairManager.create_from_scratch(user_performing_action=admin_user)
+
+    prefix = uuid4().hex
+    document_ids = [f"{prefix}_{i}" for i in range(3)]
+
+    with get_session_context_manager() as db_session:
+        _index(db_session, cc_pair, document_ids)
+        assert reconcile_document_count_for_cc_pair(db_session, cc_pair.id) == (3, 3)
+
+        # writes that bypass the counter
+        db_session.execute(
+            delete(DocumentByConnectorCredentialPair).where(
+                DocumentByConnectorCredentialPair.id == document_ids[0]
+            )
+        )
+        db_session.execute(
+            update(DocumentCountByConnectorCredentialPair)
+            .where(DocumentCountByConnectorCredentialPair.cc_pair_id == cc_pair.id)
+            .values(document_count=10)
+        )
+        db_session.commit()
+        assert _counts(db_session, cc_pair) == [10]
+
+        assert reconcile_document_count_for_cc_pair(db_session, cc_pair.id) == (10, 2)
+        assert _counts(db_session, cc_pair) == [2]
+
+        # a counter row that is missing is created
+        db_session.execute(
+            delete(DocumentCountByConnectorCredentialPair).where(
+                DocumentCountByConnectorCredentialPair.cc_pair_id == cc_pair.id
+            )
+        )
+        db_session.commit()
+        assert reconcile_document_count_for_cc_pair(db_session, cc_pair.id) == (0, 2)
+        assert _counts(db_session, cc_pair) == [2]
+
+        assert reconcile_document_count_for_cc_pair(db_session, -1) is None
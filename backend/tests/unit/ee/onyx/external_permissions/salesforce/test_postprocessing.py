@@ -1,5 +1,7 @@
 from datetime import datetime
+from unittest.mock import patch
 
+from ee.onyx.external_permissions.salesforce import postprocessing
 from ee.onyx.external_permissions.salesforce.postprocessing import (
     censor_salesforce_chunks,
 )
@@ -7,6 +9,7 @@ from onyx.configs.app_configs import BLURB_SIZE
 from onyx.configs.constants import DocumentSource
 from onyx.connectors.salesforce.utils import BASE_DATA_PATH
 from onyx.context.search.models import InferenceChunk
+from shared_configs.contextvars import CURRENT_TENANT_ID_CONTEXTVAR
 
 SQLITE_DIR = BASE_DATA_PATH
 
@@ -201,3 +204,59 @@ def test_validate_salesforce_access_blurb_update() -> None:
     assert len(filtered_chunks) == 1
     assert len(filtered_chunks[0].blurb) <= BLURB_SIZE
     assert filtered_chunks[0].blurb.startswith(section)
+
+
+def test_object_access_is_cached_per_tenant_and_user() -> None:
+    """Only objects without a cached access for the user are looked up in Salesforce"""
+    test_chunk = create_test_chunk(
+        doc_id="doc1",
+        chunk_id=1,
+        content="Some content about object1 and object2",
+        source_links={0: "https://salesforce.com/object1"},
+    )
+    postprocessing._OBJECT_ACCESS_CACHE.clear()
+
+    with (
+        patch.object(postprocessing, "get_session_context_manager"),
+        patch.object(postprocessing, "get_any_salesforce_client_for_doc_id"),
+        patch.object(
+            postprocessing,
+            "get_salesforce_user_id_from_email",
+            return_value="user_id",
+        ),
+        patch.object(
+            postprocessing,
+            "get_objects_access_for_user_id",
+            side_effect=lambda _, __, record_ids: {
+                record_id: record_id == "object1" for record_id in record_ids
+            },
+        ) as mock_get_access,
+    ):
+        access_map = postprocessing._get_objects_access_for_user_email_from_salesforce(
+            {"object1"}, "test@example.com", [test_chunk]
+        )
+        assert access_map == {"object1": True}
+
+        access_map = postprocessing._get_objects_access_for_user_email_from_salesforce(
+            {"object1", "object2"}, "test@example.com", [test_chunk]
+        )
+        assert access_map == {"object1": True, "object2": False}
+        assert mock_get_access.call_args.args[2] == ["object2"]
+
+        # another user's access is looked up again
+        postprocessing._get_objects_access_for_user_email_from_salesforce(
+            {"object1"}, "other@example.com", [test_chunk]
+        )
+        assert mock_get_access.call_count == 3
+
+        # so is the access of the same user in another tenant
+        token = CURRENT_TENANT_ID_CONTEXTVAR.set("other_tenant")
+        try:
+            postprocessing._get_objects_access_for_user_email_from_salesforce(
+                {"object1"}, "test@example.com", [test_chunk]
+            )
+        finally:
+            CURRENT_TENANT_ID_CONTEXTVAR.reset(token)
+        assert mock_get_access.call_count == 4
+
+    postprocessing._OBJECT_ACCESS_CACHE.clear()
@@ -0,0 +1,75 @@
+from collections.abc import Iterator
+from unittest.mock import MagicMock
+from unittest.mock import patch
+
+import pytest
+
+from ee.onyx.external_permissions import post_query_censoring
+from onyx.configs.constants import DocumentSource
+
+
+class _FakeRedis:
+    def __init__(self) -> None:
+        self.values: dict[str, int] = {}
+
+    def get(self, key: str) -> bytes | None:
+        return str(self.values[key]).encode() if key in self.values else None
+
+    def incr(self, key: str) -> int:
+        self.values[key] = self.values.get(key, 0) + 1
+        return self.values[key]
+
+
+@pytest.fixture
+def fake_redis() -> Iterator[_FakeRedis]:
+    redis = _FakeRedis()
+    post_query_censoring._ENABLED_SOURCES_CACHE.clear()
+    with patch.object(post_query_censoring, "get_redis_client", return_value=redis):
+        yield redis
+    post_query_censoring._ENABLED_SOURCES_CACHE.clear()
+
+
+def test_enabled_sources_are_cached_until_invalidated(fake_redis: _FakeRedis) -> None:
+    with patch.object(
+        post_query_censoring,
+        "_load_censoring_enabled_sources",
+        return_value={DocumentSource.SALESFORCE},
+    ) as mock_load:
+        for _ in range(3):
+            assert post_query_censoring._get_all_censoring_enabled_sources() == {
+                DocumentSource.SALESFORCE
+            }
+        assert mock_load.call_count == 1
+
+        post_query_censoring.invalidate_censoring_enabled_sources()
+        post_query_censoring._get_all_censoring_enabled_sources()
+        assert mock_load.call_count == 2
+
+
+def test_invalidation_by_another_process_is_seen(fake_redis: _FakeRedis) -> None:
+    with patch.object(
+        post_query_censoring, "_load_censoring_enabled_sources", return_value=set()
+    ) as mock_load:
+        post_query_censoring._get_all_censoring_enabled_sources()
+
+        # only the generation in Redis changes, the local entry is still there
+        fake_redis.incr(post_query_censoring._ENABLED_SOURCES_GENERATION_KEY)
+        post_query_censoring._get_all_censoring_enabled_sources()
+        assert mock_load.call_count == 2
+
+
+def test_enabled_sources_are_not_cached_without_redis() -> None:
+    post_query_censoring._ENABLED_SOURCES_CACHE.clear()
+    with (
+        patch.object(
+            post_query_censoring,
+            "get_redis_client",
+            return_value=MagicMock(get=MagicMock(side_effect=ConnectionError)),
+        ),
+        patch.object(
+            post_query_censoring, "_load_censoring_enabled_sources", return_value=set()
+        ) as mock_load,
+    ):
+        post_query_censoring._get_all_censoring_enabled_sources()
+        post_query_censoring._get_all_censoring_enabled_sources()
+        assert mock_load.call_count == 2
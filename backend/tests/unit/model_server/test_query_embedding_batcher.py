@@ -0,0 +1,94 @@
+import asyncio
+from collections.abc import Callable
+
+import pytest
+
+from model_server.query_embedding_batcher import QueryEmbeddingBatcher
+from model_server.query_embedding_batcher import QueryEmbeddingBatchKey
+from shared_configs.model_server_models import Embedding
+
+KEY = QueryEmbeddingBatchKey(
+    model_name="test-model", max_context_length=512, normalize_embeddings=True
+)
+
+
+def _fake_encode(
+    calls: list[list[str]],
+) -> Callable[[QueryEmbeddingBatchKey, list[str]], list[Embedding]]:
+    def encode(key: QueryEmbeddingBatchKey, texts: list[str]) -> list[Embedding]:
+        calls.append(list(texts))
+        return [[float(len(text))] for text in texts]
+
+    return encode
+
+
+@pytest.mark.asyncio
+async def test_concurrent_requests_are_coalesced() -> None:
+    calls: list[list[str]] = []
+    batcher = QueryEmbeddingBatcher(
+        encode_fn=_fake_encode(calls), window_ms=20, max_batch_size=32
+    )
+
+    results = await asyncio.gather(
+        batcher.embed(KEY, ["a"]),
+        batcher.embed(KEY, ["bb", "ccc"]),
+        batcher.embed(KEY, ["dddd"]),
+    )
+
+    assert len(calls) == 1
+    assert calls[0] == ["a", "bb", "ccc", "dddd"]
+    assert list(results) == [[[1.0]], [[2.0], [3.0]], [[4.0]]]
+
+
+@pytest.mark.asyncio
+async def test_different_keys_are_not_mixed() -> None:
+    calls: list[list[str]] = []
+    batcher = QueryEmbeddingBatcher(
+        encode_fn=_fake_encode(calls), window_ms=20, max_batch_size=32
+    )
+    other_key = QueryEmbeddingBatchKey(
+        model_name="test-model", max_context_length=512, normalize_embeddings=False
+    )
+
+    await asyncio.gather(
+        batcher.embed(KEY, ["a"]),
+        batcher.embed(other_key, ["b"]),
+    )
+
+    assert sorted(calls) == [["a"], ["b"]]
+
+
+@pytest.mark.asyncio
+async def test_full_batch_flushes_before_window() -> None:
+    calls: list[list[str]] = []
+    batcher = QueryEmbeddingBatcher(
+        encode_fn=_fake_encode(calls), window_ms=10_000, max_batch_size=2
+    )
+
+    results = await asyncio.wait_for(
+        asyncio.gather(batcher.embed(KEY, ["a"]), batcher.embed(KEY, ["b"])),
+        timeout=5,
+    )
+
+    assert calls == [["a", "b"]]
+    assert list(results) == [[[1.0]], [[1.0]]]
+
+
+@pytest.mark.asyncio
+async def test_encode_failure_propagates_to_every_request() -> None:
+    def failing_encode(
+        key: QueryEmbeddingBatchKey, texts: list[str]
+    ) -> list[Embedding]:
+        raise RuntimeError("model exploded")
+
+    batcher = QueryEmbeddingBatcher(
+        encode_fn=failing_encode, window_ms=5, max_batch_size=32
+    )
+
+    results = await asyncio.gather(
+        batcher.embed(KEY, ["a"]),
+        batcher.embed(KEY, ["b"]),
+        return_exceptions=True,
+    )
+
+    assert all(isinstance(result, RuntimeError) for result in results)
@@ -0,0 +1,190 @@
+from datetime import datetime
+from unittest.mock import MagicMock
+
+import pytest
+from langchain_core.messages import AIMessage
+from langchain_core.runnables.config import RunnableConfig
+
+from onyx.agents.agent_search.deep_search.shared.expanded_retrieval.nodes import (
+    verify_documents as verify_documents_module,
+)
+from onyx.agents.agent_search.deep_search.shared.expanded_retrieval.nodes.verify_documents import (
+    verify_documents,
+)
+from onyx.agents.agent_search.deep_search.shared.expanded_retrieval.states import (
+    DocVerificationInput,
+)
+from onyx.configs.agent_configs import AGENT_MAX_TOKENS_BATCH_VALIDATION_OVERHEAD
+from onyx.configs.agent_configs import AGENT_MAX_TOKENS_BATCH_VALIDATION_PER_DOCUMENT
+from onyx.configs.constants import DocumentSource
+from onyx.context.search.models import InferenceChunk
+from onyx.context.search.models import InferenceSection
+from onyx.llm.interfaces import LLMConfig
+from onyx.natural_language_processing.utils import BaseTokenizer
+from onyx.prompts.agent_search import BATCH_DOCUMENT_VERIFICATION_PROMPT
+
+QUESTION = "What is the refund policy?"
+
+
+class _CharacterTokenizer(BaseTokenizer):
+    def encode(self, string: str) -> list[int]:
+        return [ord(character) for character in string]
+
+    def tokenize(self, string: str) -> list[str]:
+        return list(string)
+
+    def decode(self, tokens: list[int]) -> str:
+        return "".join(chr(token) for token in tokens)
+
+
+def _section(document_id: str, content: str | None = None) -> InferenceSection:
+    chunk = InferenceChunk(
+        chunk_id=0,
+        blurb=f"blurb of {document_id}",
+        content=content or f"content of {document_id}",
+        source_links=None,
+        section_continuation=False,
+        document_id=document_id,
+        source_type=DocumentSource.FILE,
+        image_file_name=None,
+        title=document_id,
+        semantic_identifier=document_id,
+        boost=1,
+        recency_bias=1.0,
+        score=1.0,
+        hidden=False,
+        primary_owners=None,
+        secondary_owners=None,
+        large_chunk_reference_ids=[],
+        metadata={},
+        doc_summary="",
+        chunk_context="",
+        match_highlights=[],
+        updated_at=datetime.now(),
+    )
+    return InferenceSection(
+        center_chunk=chunk, chunks=[chunk], combined_content=chunk.content
+    )
+
+
+def _run(
+    documents: list[InferenceSection],
+    responses: list[str],
+    cache: dict[tuple[str, str, int], bool] | None = None,
+    max_input_tokens: int = 100_000,
+) -> tuple[list[str], MagicMock]:
+    fast_llm = MagicMock()
+    fast_llm.config = LLMConfig(
+        model_provider="openai",
+        model_name="gpt-4o-mini",
+        temperature=0,
+        max_input_tokens=max_input_tokens,
+    )
+    fast_llm.invoke.side_effect = [AIMessage(content=r) for r in responses]
+
+    graph_config = MagicMock()
+    graph_config.tooling.fast_llm = fast_llm
+    graph_config.tooling.document_verification_cache = (
+        cache if cache is not None else {}
+    )
+
+    update = verify_documents(
+        DocVerificationInput(
+            question=QUESTION,
+            base_search=False,
+            retrieved_documents_to_verify=documents,
+        ),
+        RunnableConfig(metadata={"config": graph_config}),
+    )
+    return [
+        document.center_chunk.document_id for document in update.verified_documents
+    ], fast_llm
+
+
+def test_documents_are_verified_in_one_call() -> None:
+    documents = [_section("a"), _section("b"), _section("c")]
+    response = (
+        '```json\n{"verdicts": [{"document_number": 1, "relevant": true}, '
+        '{"document_number": 2, "relevant": false}, '
+        '{"document_number": 3, "relevant": true}]}\n```'
+    )
+
+    verified, fast_llm = _run(documents, [response])
+
+    assert verified == ["a", "c"]
+    assert fast_llm.invoke.call_count == 1
+
+
+def test_unparseable_batch_response_falls_back_to_single_documents() -> None:
+    documents = [_section("a"), _section("b")]
+
+    verified, fast_llm = _run(documents, ["a is relevant", "yes", "yes"])
+
+    # the per document answers don't depend on the call order, both are relevant
+    assert verified == ["a", "b"]
+    assert fast_llm.invoke.call_count == 3
+
+
+def test_truncated_batch_response_falls_back_to_single_documents() -> None:
+    documents = [_section("a"), _section("b")]
+    # cut off by the output token limit
+    truncated_response = (
+        '```json\n{\n  "verdicts": [\n    {\n      "document_number": 1,\n'
+        '      "relevant": true\n    },\n    {\n      "document_num'
+    )
+
+    verified, fast_llm = _run(documents, [truncated_response, "yes", "no"])
+
+    assert fast_llm.invoke.call_count == 3
+    assert len(verified) == 1
+    batch_call = fast_llm.invoke.call_args_list[0]
+    assert batch_call.kwargs["max_tokens"] == (
+        AGENT_MAX_TOKENS_BATCH_VALIDATION_OVERHEAD
+        + AGENT_MAX_TOKENS_BATCH_VALIDATION_PER_DOCUMENT * len(documents)
+    )
+
+
+def test_cached_verdicts_are_not_verified_again() -> None:
+    documents = [_section("a"), _section("b")]
+    cache = {(QUESTION, "a", 0): False, (QUESTION, "b", 0): True}
+
+    verified, fast_llm = _run(documents, [], cache=cache)
+
+    assert verified == ["b"]
+    fast_llm.invoke.assert_not_called()
+
+
+@pytest.mark.parametrize(
+    "context_tokens,expected_tokens_per_document",
+    # the prompt is reserved once, a context too small for it still keeps the minimum
+    [(3 * 300, 300), (0, 128)],
+)
+def test_batch_documents_share_the_context_left_by_the_prompt(
+    monkeypatch: pytest.MonkeyPatch,
+    context_tokens: int,
+    expected_tokens_per_document: int,
+) -> None:
+    monkeypatch.setattr(
+        verify_documents_module,
+        "get_tokenizer",
+        lambda **_: _CharacterTokenizer(),
+    )
+    documents = [_section(document_id, document_id * 1000) for document_id in "abc"]
+    response = (
+        '{"verdicts": [{"document_number": 1, "relevant": true}, '
+        '{"document_number": 2, "relevant": true}, '
+        '{"document_number": 3, "relevant": true}]}'
+    )
+
+    verified, fast_llm = _run(
+        documents,
+        [response],
+        max_input_tokens=len(BATCH_DOCUMENT_VERIFICATION_PROMPT + QUESTION)
+        + context_tokens,
+    )
+
+    assert verified == ["a", "b", "c"]
+    prompt = fast_llm.invoke.call_args.kwargs["prompt"][0].content
+    for document_id in "abc":
+        assert document_id * expected_tokens_per_document in prompt
+        assert document_id * (expected_tokens_per_document + 1) not in prompt
@@ -1,3 +1,4 @@
+import re
 from datetime import datetime
 
 import pytest
@@ -6,6 +7,11 @@ from onyx.chat.models import CitationInfo
 from onyx.chat.models import LlmDoc
 from onyx.chat.models import OnyxAnswerPiece
 from onyx.chat.stream_processing.citation_processing import CitationProcessor
+from onyx.chat.stream_processing.citation_processing import CodeFenceTracker
+from onyx.chat.stream_processing.citation_processing import (
+    ends_with_possible_citation,
+)
+from onyx.chat.stream_processing.citation_processing import in_code_block
 from onyx.chat.stream_processing.utils import DocumentIdOrderMapping
 from onyx.configs.constants import DocumentSource
 
@@ -418,6 +424,12 @@ def process_text(
             "... to receive access [[1]](https://0.com).",
             ["doc_0"],
         ),
+        (
+            "Code fences split across tokens",
+            ["``", "`\n", "x[1]", "\n``", "`", " after [", "1", "]"],
+            "```\nx[1]\n``` after [[1]](https://0.com)",
+            ["doc_0"],
+        ),
     ],
 )
 def test_citation_extraction(
@@ -436,3 +448,30 @@ def test_citation_extraction(
     ] == expected_citations, (
         f"Test '{test_name}' failed: Citations do not match expected output."
     )
+
+
+@pytest.mark.parametrize(
+    "tokens",
+    [
+        ["```python\n", "code", "\n```"],
+        ["``", "`", "\n", "code", "`", "``"],
+        ["````", "`", "``"],
+        ["`", "`", "`", "`", "`", "`", "`"],
+        ["text ", "`inline`", " ```"],
+    ],
+)
+def test_code_fence_tracker_matches_full_rescan(tokens: list[str]) -> None:
+    tracker = CodeFenceTracker()
+    text = ""
+    for token in tokens:
+        tracker.update(token)
+        text += token
+        assert tracker.in_code_block == in_code_block(text)
+
+
+@pytest.mark.parametrize(
+    "text",
+    ["", "[", "[[", "[1", "[[12", "a [1] b", "[1]", "[1\n", "[1\n\n", "1", "x[٣"],
+)
+def test_ends_with_possible_citation_matches_regex(text: str) -> None:
+    assert ends_with_possible_citation(text) == bool(re.search(r"(\[+\d*$)", text))
@@ -0,0 +1,135 @@
+from typing import Any
+from typing import NamedTuple
+from unittest.mock import MagicMock
+from uuid import uuid4
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from onyx.chat import chat_utils
+from onyx.chat.chat_utils import create_chat_chain
+from onyx.configs.constants import MessageType
+from onyx.db.chat import get_mainline_chat_message_chain
+
+
+class _Link(NamedTuple):
+    id: int
+    latest_child_message: int | None
+    message_type: MessageType
+    token_count: int
+    refined_answer_improvement: bool | None
+    depth: int
+
+
+def _chain(*links: tuple[MessageType, int, bool | None]) -> list[_Link]:
+    """A root message followed by the given (type, token count, refined) messages"""
+    all_links = [(MessageType.SYSTEM, 0, None), *links]
+    return [
+        _Link(
+            id=i,
+            latest_child_message=i + 1 if i + 1 < len(all_links) else None,
+            message_type=message_type,
+            token_count=token_count,
+            refined_answer_improvement=refined,
+            depth=i,
+        )
+        for i, (message_type, token_count, refined) in enumerate(all_links)
+    ]
+
+
+@pytest.fixture
+def loaded_ids(monkeypatch: pytest.MonkeyPatch) -> list[list[int]]:
+    """Records the ids of the full messages loaded by create_chat_chain"""
+    loaded: list[list[int]] = []
+
+    def _get_chat_messages_by_ids(
+        chat_message_ids: list[int], **kwargs: Any
+    ) -> list[MagicMock]:
+        loaded.append(chat_message_ids)
+        return [MagicMock(id=chat_message_id) for chat_message_id in chat_message_ids]
+
+    monkeypatch.setattr(
+        chat_utils, "get_chat_messages_by_ids", _get_chat_messages_by_ids
+    )
+    return loaded
+
+
+def _use_chain(monkeypatch: pytest.MonkeyPatch, chain: list[_Link]) -> None:
+    monkeypatch.setattr(
+        chat_utils, "get_mainline_chat_message_chain", lambda **kwargs: chain
+    )
+
+
+def test_only_history_within_token_budget_is_loaded(
+    monkeypatch: pytest.MonkeyPatch, loaded_ids: list[list[int]]
+) -> None:
+    _use_chain(
+        monkeypatch,
+        _chain(
+            (MessageType.USER, 50, None),
+            (MessageType.ASSISTANT, 300, None),
+            (MessageType.USER, 40, None),
+            (MessageType.ASSISTANT, 100, None),
+            (MessageType.USER, 500, None),
+        ),
+    )
+
+    final_msg, history = create_chat_chain(
+        chat_session_id=uuid4(), db_session=MagicMock(), max_history_tokens=150
+    )
+
+    # the final message is always kept, even when over the budget
+    assert final_msg.id == 5
+    assert [msg.id for msg in history] == [3, 4]
+    assert loaded_ids == [[3, 4, 5]]
+
+
+def test_refined_answer_replaces_initial_answer(
+    monkeypatch: pytest.MonkeyPatch, loaded_ids: list[list[int]]
+) -> None:
+    _use_chain(
+        monkeypatch,
+        _chain(
+            (MessageType.USER, 10, None),
+            (MessageType.ASSISTANT, 10, None),
+            (MessageType.ASSISTANT, 10, True),
+            (MessageType.USER, 10, None),
+        ),
+    )
+
+    final_msg, history = create_chat_chain(
+        chat_session_id=uuid4(), db_session=MagicMock()
+    )
+
+    assert final_msg.id == 4
+    assert [msg.id for msg in history] == [1, 3]
+
+
+def test_chain_leaving_the_session_is_invalid(
+    monkeypatch: pytest.MonkeyPatch, loaded_ids: list[list[int]]
+) -> None:
+    chain = _chain((MessageType.USER, 10, None))
+    # the child is in another session, so the recursive query stopped before it
+    chain[-1] = chain[-1]._replace(latest_child_message=99)
+    _use_chain(monkeypatch, chain)
+
+    with pytest.raises(RuntimeError, match="Invalid message chain"):
+        create_chat_chain(chat_session_id=uuid4(), db_session=MagicMock())
+
+    # but not when it was asked to stop there
+    final_msg, _ = create_chat_chain(
+        chat_session_id=uuid4(), db_session=MagicMock(), stop_at_message_id=1
+    )
+    assert final_msg.id == 1
+
+
+def test_mainline_is_loaded_with_a_recursive_query() -> None:
+    db_session = MagicMock()
+    get_mainline_chat_message_chain(
+        chat_session_id=uuid4(), db_session=db_session, stop_at_message_id=7
+    )
+
+    statement = db_session.execute.call_args.args[0]
+    sql = str(statement.compile(dialect=postgresql.dialect()))
+    assert "WITH RECURSIVE mainline_chain" in sql
+    assert "UNION ALL" in sql
@@ -1,3 +1,4 @@
+import threading
 import time
 from collections.abc import Callable
 from collections.abc import Generator
@@ -15,6 +16,7 @@ from onyx.configs.constants import DocumentSource
 from onyx.connectors.confluence.connector import ConfluenceCheckpoint
 from onyx.connectors.confluence.connector import ConfluenceConnector
 from onyx.connectors.confluence.onyx_confluence import OnyxConfluence
+from onyx.connectors.confluence.utils import CachedAttachmentContent
 from onyx.connectors.exceptions import CredentialExpiredError
 from onyx.connectors.exceptions import InsufficientPermissionsError
 from onyx.connectors.exceptions import UnexpectedValidationError
@@ -465,3 +467,107 @@ def test_checkpoint_progress(
     assert isinstance(outputs_with_checkpoint[0].items[0], Document)
     assert outputs_with_checkpoint[0].items[0].semantic_identifier == "Page 3"
     assert not outputs_with_checkpoint[-1].next_checkpoint.has_more
+
+
+def test_attachments_fetched_concurrently_and_skipped_when_unchanged(
+    confluence_connector: ConfluenceConnector,
+    create_mock_page: Callable[..., dict[str, Any]],
+) -> None:
+    """Attachments of the pages of a batch are converted in parallel, but documents
+    keep their page and attachment order. Unchanged attachments aren't downloaded
+    again on the next run."""
+    pages = [create_mock_page(id="1"), create_mock_page(id="2")]
+    attachment_versions = {"11": 1, "12": 1, "21": 1}
+
+    def _attachment(attachment_id: str) -> dict[str, Any]:
+        return {
+            "id": attachment_id,
+            "title": f"attachment {attachment_id}.txt",
+            "version": {"number": attachment_versions[attachment_id]},
+            "metadata": {"mediaType": "text/plain"},
+            "_links": {"webui": f"/attachments/{attachment_id}"},
+        }
+
+    def _get(path: str, **kwargs: Any) -> MagicMock:
+        if "attachment" in path:
+            page_id = "1" if "container%3D%271%27" in path else "2"
+            results = [
+                _attachment(attachment_id)
+                for attachment_id in attachment_versions
+                if attachment_id.startswith(page_id)
+            ]
+        elif "comment" in path:
+            results = []
+        else:
+            results = pages
+        return MagicMock(json=lambda: {"results": results})
+
+    confluence_client = confluence_connector._confluence_client
+    assert confluence_client is not None, "bad test setup"
+    confluence_client.get = MagicMock(side_effect=_get)  # type: ignore
+
+    lock = threading.Lock()
+    in_flight = 0
+    max_in_flight = 0
+    converted: list[str] = []
+
+    def _convert(
+        attachment: dict[str, Any], **kwargs: Any
+    ) -> tuple[str | None, str | None]:
+        nonlocal in_flight, max_in_flight
+        with lock:
+            in_flight += 1
+            max_in_flight = max(max_in_flight, in_flight)
+            converted.append(attachment["id"])
+        # the first attachment finishes last
+        time.sleep(0.3 if attachment["id"] == "11" else 0.05)
+        with lock:
+            in_flight -= 1
+        return f"text of {attachment['id']}", None
+
+    cache: dict[str, CachedAttachmentContent] = {}
+
+    def _load_cached(
+        wiki_base: str, attachment_id: str, version: int
+    ) -> CachedAttachmentContent | None:
+        cached = cache.get(attachment_id)
+        return cached if cached and cached.version == version else None
+
+    module = "onyx.connectors.confluence.connector"
+    with (
+        patch(f"{module}.convert_attachment_to_content", side_effect=_convert),
+        patch(f"{module}.load_cached_attachment_content", side_effect=_load_cached),
+        patch(
+            f"{module}.save_cached_attachment_content",
+            side_effect=lambda _, attachment_id, content: cache.__setitem__(
+                attachment_id, content
+            ),
+        ),
+    ):
+        outputs = load_everything_from_checkpoint_connector(
+            confluence_connector, 0, time.time()
+        )
+        docs = [item for output in outputs for item in output.items]
+        assert [
+            [section.text for section in doc.sections[1:]]
+            for doc in docs
+            if isinstance(doc, Document)
+        ] == [
+            ["text of 11", "text of 12"],
+            ["text of 21"],
+        ]
+        assert max_in_flight == 3
+
+        attachment_versions["12"] = 2
+        converted.clear()
+        outputs = load_everything_from_checkpoint_connector(
+            confluence_connector, 0, time.time()
+        )
+        docs = [item for output in outputs for item in output.items]
+        assert len(docs) == 2
+        assert isinstance(docs[0], Document)
+        assert converted == ["12"]
+        assert [section.text for section in docs[0].sections[1:]] == [
+            "text of 11",
+            "text of 12",
+        ]
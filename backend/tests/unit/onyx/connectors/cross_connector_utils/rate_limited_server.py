@@ -0,0 +1,102 @@
+import threading
+import time
+from http.server import BaseHTTPRequestHandler
+from http.server import ThreadingHTTPServer
+from types import TracebackType
+
+
+class FakeRateLimitedServer:
+    """Local HTTP server that rate limits all of its clients together with a token
+    bucket, answering requests over the limit with a 429 and a Retry-After header,
+    like the APIs connectors talk to.
+
+    Usage:
+        with FakeRateLimitedServer(max_requests=10, period_seconds=1) as server:
+            requests.get(server.url)
+    """
+
+    def __init__(
+        self,
+        max_requests: int,
+        period_seconds: float,
+        retry_after: str = "1",
+    ) -> None:
+        self.max_requests = max_requests
+        self.period_seconds = period_seconds
+        self.retry_after = retry_after
+
+        self._lock = threading.Lock()
+        self._tokens = float(max_requests)
+        self._last_refill = time.monotonic()
+        self._forced_rate_limits = 0
+
+        # (monotonic time, status code) of every request handled
+        self.responses: list[tuple[float, int]] = []
+
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self) -> None:
+                status = server._handle()
+                self.send_response(status)
+                if status == 429:
+                    self.send_header("Retry-After", server.retry_after)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+
+            def log_message(self, *args: object) -> None:
+                pass
+
+        self._http_server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self._thread = threading.Thread(
+            target=self._http_server.serve_forever, daemon=True
+        )
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self._http_server.server_port}"
+
+    @property
+    def rate_limited_count(self) -> int:
+        with self._lock:
+            return sum(status == 429 for _, status in self.responses)
+
+    def force_rate_limit(self, count: int = 1) -> None:
+        """The next `count` requests are rate limited regardless of the bucket"""
+        with self._lock:
+            self._forced_rate_limits += count
+
+    def _handle(self) -> int:
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(
+                self.max_requests,
+                self._tokens
+                + (now - self._last_refill) * self.max_requests / self.period_seconds,
+            )
+            self._last_refill = now
+
+            if self._forced_rate_limits > 0:
+                self._forced_rate_limits -= 1
+                status = 429
+            elif self._tokens >= 1:
+                self._tokens -= 1
+                status = 200
+            else:
+                status = 429
+
+            self.responses.append((now, status))
+            return status
+
+    def __enter__(self) -> "FakeRateLimitedServer":
+        self._thread.start()
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        self._http_server.shutdown()
+        self._http_server.server_close()
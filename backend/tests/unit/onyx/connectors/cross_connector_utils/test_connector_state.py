@@ -0,0 +1,23 @@
+from onyx.configs.app_configs import POLL_CONNECTOR_OFFSET
+from onyx.connectors.cross_connector_utils.connector_state import (
+    build_connector_state_file_name,
+)
+from onyx.connectors.cross_connector_utils.connector_state import is_window_indexed
+
+
+def test_build_connector_state_file_name() -> None:
+    file_name = build_connector_state_file_name("test_state", "a", "b")
+    assert file_name.startswith("test_state__")
+    assert file_name == build_connector_state_file_name("test_state", "a", "b")
+    assert file_name != build_connector_state_file_name("other_state", "a", "b")
+
+
+def test_is_window_indexed() -> None:
+    window_end = 1_000_000.0
+    # the next run starts at the end of the window minus the poll overlap
+    start = window_end - POLL_CONNECTOR_OFFSET * 60
+    assert is_window_indexed(window_end, start)
+    assert is_window_indexed(window_end, start - 0.5)
+    assert is_window_indexed(window_end - 3600, start)
+    # the run over the window may have failed
+    assert not is_window_indexed(window_end, start - 3600)
@@ -0,0 +1,150 @@
+import threading
+import time
+import uuid
+from collections.abc import Iterator
+from datetime import datetime
+from datetime import timedelta
+from datetime import timezone
+from email.utils import format_datetime
+
+import pytest
+import requests
+from redis import Redis
+from redis.exceptions import RedisError
+
+from onyx.connectors.cross_connector_utils.rate_limit_wrapper import (
+    DistributedRateLimiter,
+)
+from onyx.connectors.cross_connector_utils.rate_limit_wrapper import (
+    get_retry_after_seconds,
+)
+from onyx.connectors.cross_connector_utils.rate_limit_wrapper import (
+    mount_rate_limiter,
+)
+from onyx.connectors.cross_connector_utils.rate_limit_wrapper import RequestBudget
+from onyx.connectors.cross_connector_utils.rate_limit_wrapper import (
+    wrap_request_to_handle_ratelimiting,
+)
+from onyx.redis.redis_pool import get_raw_redis_client
+from tests.unit.onyx.connectors.cross_connector_utils.rate_limited_server import (
+    FakeRateLimitedServer,
+)
+
+
+@pytest.fixture
+def redis_client() -> Redis:
+    client = get_raw_redis_client()
+    try:
+        client.ping()
+    except RedisError:
+        pytest.skip("Redis is not available")
+    return client
+
+
+@pytest.fixture
+def tenant_id(redis_client: Redis) -> Iterator[str]:
+    tenant_id = f"test_rate_limit_{uuid.uuid4().hex}"
+    yield tenant_id
+    for key in redis_client.scan_iter(f"{tenant_id}:*"):
+        redis_client.delete(key)
+
+
+def _worker_session(
+    tenant_id: str, budget: RequestBudget, redis_client: Redis
+) -> requests.Session:
+    """Each worker process builds its own limiter, they only share the key"""
+    session = requests.Session()
+    mount_rate_limiter(
+        session,
+        DistributedRateLimiter(
+            key="fake_source:credential_1",
+            budget=budget,
+            tenant_id=tenant_id,
+            redis_client=redis_client,
+        ),
+    )
+    return session
+
+
+def test_workers_share_one_budget(redis_client: Redis, tenant_id: str) -> None:
+    budget = RequestBudget(max_requests=10, period_seconds=1)
+    # each worker alone stays below the server's limit, together they would not
+    with FakeRateLimitedServer(max_requests=12, period_seconds=1) as server:
+
+        def _work() -> None:
+            session = _worker_session(tenant_id, budget, redis_client)
+            for _ in range(8):
+                session.get(server.url)
+
+        workers = [threading.Thread(target=_work) for _ in range(4)]
+        start = time.monotonic()
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+
+        assert len(server.responses) == 32
+        assert server.rate_limited_count == 0
+        # a burst of 10, the remaining 22 at 10 per second
+        assert time.monotonic() - start > 2
+
+
+def test_retry_after_pauses_all_workers(redis_client: Redis, tenant_id: str) -> None:
+    budget = RequestBudget(max_requests=100, period_seconds=1)
+    with FakeRateLimitedServer(
+        max_requests=100, period_seconds=1, retry_after="1"
+    ) as server:
+        first_worker = _worker_session(tenant_id, budget, redis_client)
+        second_worker = _worker_session(tenant_id, budget, redis_client)
+
+        server.force_rate_limit()
+        assert first_worker.get(server.url).status_code == 429
+        rate_limited_at = server.responses[-1][0]
+
+        assert second_worker.get(server.url).status_code == 200
+        assert server.responses[-1][0] - rate_limited_at >= 0.9
+
+
+def test_limiter_lets_requests_through_without_redis() -> None:
+    # nothing listens on port 1
+    limiter = DistributedRateLimiter(
+        key="fake_source:credential_1",
+        budget=RequestBudget(max_requests=1, period_seconds=60),
+        tenant_id="test_tenant",
+        redis_client=Redis(host="127.0.0.1", port=1, socket_connect_timeout=1),
+    )
+
+    start = time.monotonic()
+    for _ in range(3):
+        limiter.acquire()
+    assert time.monotonic() - start < 5
+
+
+def test_wrapped_request_retries_after_rate_limit() -> None:
+    with FakeRateLimitedServer(
+        max_requests=10, period_seconds=1, retry_after="0"
+    ) as server:
+        server.force_rate_limit(2)
+        response = wrap_request_to_handle_ratelimiting(requests.get)(server.url)
+
+        assert response.status_code == 200
+        assert [status for _, status in server.responses] == [429, 429, 200]
+
+
+def test_get_retry_after_seconds() -> None:
+    def _response(retry_after: str | None) -> requests.Response:
+        response = requests.Response()
+        if retry_after is not None:
+            response.headers["Retry-After"] = retry_after
+        return response
+
+    assert get_retry_after_seconds(_response("7"), 30) == 7
+    assert get_retry_after_seconds(_response("1.5"), 30) == 1.5
+    assert get_retry_after_seconds(_response(None), 30) == 30
+    assert get_retry_after_seconds(_response("soon"), 30) == 30
+
+    retry_at = datetime.now(timezone.utc) + timedelta(seconds=20)
+    seconds = get_retry_after_seconds(
+        _response(format_datetime(retry_at, usegmt=True)), 30
+    )
+    assert 15 < seconds <= 20
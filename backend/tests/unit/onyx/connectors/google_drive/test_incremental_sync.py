@@ -0,0 +1,173 @@
+from collections.abc import Generator
+from collections.abc import Iterator
+from typing import Any
+from unittest.mock import MagicMock
+
+import httplib2  # type: ignore
+import pytest
+from googleapiclient.errors import HttpError  # type: ignore
+
+from onyx.connectors.google_drive.connector import GoogleDriveConnector
+from onyx.connectors.google_drive.constants import DRIVE_FOLDER_TYPE
+from onyx.connectors.google_drive.file_retrieval import get_changed_files
+from onyx.connectors.google_utils.google_utils import execute_batched_requests
+
+
+def _http_error(status: int) -> HttpError:
+    return HttpError(httplib2.Response({"status": status}), b"")
+
+
+def _changes_service(pages: list[dict[str, Any]]) -> MagicMock:
+    service = MagicMock()
+    service.changes.return_value.list.return_value.execute.side_effect = pages
+    return service
+
+
+def _read_all(
+    generator: Iterator[dict[str, Any]],
+) -> tuple[list[dict[str, Any]], Any]:
+    files = []
+    while True:
+        try:
+            files.append(next(generator))
+        except StopIteration as e:
+            return files, e.value
+
+
+def _file(file_id: str, **kwargs: Any) -> dict[str, Any]:
+    return {"id": file_id, "mimeType": "text/plain", "ownedByMe": True, **kwargs}
+
+
+def test_get_changed_files_skips_removed_files_and_returns_new_token() -> None:
+    service = _changes_service(
+        [
+            {
+                "nextPageToken": "page_2",
+                "changes": [
+                    {"file": _file("kept")},
+                    {"removed": True, "file": _file("removed")},
+                    {"file": _file("trashed", trashed=True)},
+                    {"file": _file("folder", mimeType=DRIVE_FOLDER_TYPE)},
+                ],
+            },
+            {
+                "newStartPageToken": "token_2",
+                "changes": [
+                    {"file": _file("shared_with_me", ownedByMe=False)},
+                    {"file": _file("in_shared_drive", ownedByMe=False, driveId="d")},
+                ],
+            },
+        ]
+    )
+
+    files, new_page_token = _read_all(
+        get_changed_files(service, "token_1", include_shared_with_me=False)
+    )
+
+    assert [file["id"] for file in files] == ["kept", "in_shared_drive"]
+    assert new_page_token == "token_2"
+    first_call, second_call = (
+        call.kwargs for call in service.changes.return_value.list.call_args_list
+    )
+    assert first_call["pageToken"] == "token_1"
+    assert second_call["pageToken"] == "page_2"
+
+
+@pytest.fixture
+def connector() -> GoogleDriveConnector:
+    return GoogleDriveConnector(include_my_drives=True, incremental_sync=True)
+
+
+def test_change_feed_is_read_instead_of_crawling(
+    connector: GoogleDriveConnector,
+) -> None:
+    def _read_changes(page_token: str) -> Generator[dict[str, Any], None, str]:
+        assert page_token == "old_token"
+        yield _file("changed")
+        return "new_token"
+
+    crawl = MagicMock()
+    page_tokens: dict[str, str] = {}
+    files = list(
+        connector._get_changed_or_crawled_files(
+            feed_id="user@example.com",
+            previous_page_token="old_token",
+            page_tokens=page_tokens,
+            read_changes=_read_changes,
+            get_new_page_token=MagicMock(),
+            crawl=crawl,
+        )
+    )
+
+    assert [file["id"] for file in files] == ["changed"]
+    assert page_tokens == {"user@example.com": "new_token"}
+    crawl.assert_not_called()
+
+
+@pytest.mark.parametrize("previous_page_token", ["expired_token", None])
+def test_crawls_when_page_token_expired_or_missing(
+    connector: GoogleDriveConnector, previous_page_token: str | None
+) -> None:
+    def _read_changes(page_token: str) -> Generator[dict[str, Any], None, str]:
+        raise _http_error(410)
+        yield
+
+    page_tokens: dict[str, str] = {}
+    files = list(
+        connector._get_changed_or_crawled_files(
+            feed_id="drive_1",
+            previous_page_token=previous_page_token,
+            page_tokens=page_tokens,
+            read_changes=_read_changes,
+            get_new_page_token=lambda: "fresh_token",
+            crawl=lambda: iter([_file("crawled")]),
+        )
+    )
+
+    assert [file["id"] for file in files] == ["crawled"]
+    # the position is taken before crawling, so no change is missed next time
+    assert page_tokens == {"drive_1": "fresh_token"}
+
+
+def test_batched_requests_retry_rate_limited_calls(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    monkeypatch.setattr(
+        "onyx.connectors.google_utils.google_utils.time.sleep", lambda _: None
+    )
+    outcomes: dict[str, list[Any]] = {
+        "ok": [{"id": "ok"}],
+        "throttled": [_http_error(429), {"id": "throttled"}],
+        "missing": [_http_error(404)],
+    }
+    batch_sizes: list[int] = []
+
+    def _new_batch_http_request(callback: Any) -> MagicMock:
+        added: list[str] = []
+        batch = MagicMock()
+        batch.add.side_effect = lambda _request, request_id: added.append(request_id)
+
+        def _execute() -> None:
+            batch_sizes.append(len(added))
+            for request_id in added:
+                outcome = outcomes[request_id].pop(0)
+                if isinstance(outcome, Exception):
+                    callback(request_id, None, outcome)
+                else:
+                    callback(request_id, outcome, None)
+
+        batch.execute.side_effect = _execute
+        return batch
+
+    service = MagicMock()
+    service.new_batch_http_request.side_effect = _new_batch_http_request
+
+    results = execute_batched_requests(
+        service, {request_id: MagicMock() for request_id in outcomes}
+    )
+
+    assert results["ok"] == {"id": "ok"}
+    assert results["throttled"] == {"id": "throttled"}
+    missing = results["missing"]
+    assert isinstance(missing, HttpError) and missing.resp.status == 404
+    assert batch_sizes == [3, 1]
@@ -0,0 +1,189 @@
+import threading
+import time
+from collections.abc import Iterator
+from http.server import BaseHTTPRequestHandler
+from http.server import ThreadingHTTPServer
+from unittest.mock import patch
+
+import pytest
+
+from onyx.configs.app_configs import POLL_CONNECTOR_OFFSET
+from onyx.connectors.models import Document
+from onyx.connectors.web.connector import WebConnector
+from onyx.connectors.web.crawler import HostPolitenessLimiter
+from onyx.connectors.web.crawler import WebCrawlState
+from tests.unit.onyx.connectors.utils import load_everything_from_checkpoint_connector
+
+
+class FakeSite:
+    """Serves HTML pages with ETags and answers conditional requests"""
+
+    def __init__(self) -> None:
+        self.pages: dict[str, tuple[str, list[str]]] = {}
+        self.versions: dict[str, int] = {}
+        self.responses: list[tuple[str, int]] = []
+
+    def set_page(self, path: str, text: str, links: list[str]) -> None:
+        self.pages[path] = (text, links)
+        self.versions[path] = self.versions.get(path, 0) + 1
+
+    def handle(self, handler: BaseHTTPRequestHandler) -> None:
+        path = handler.path
+        if path not in self.pages:
+            self._respond(handler, path, 404)
+            return
+
+        etag = f'"{self.versions[path]}"'
+        if handler.headers.get("If-None-Match") == etag:
+            self._respond(handler, path, 304, {"ETag": etag})
+            return
+
+        text, links = self.pages[path]
+        anchors = "".join(f'<a href="{link}">{link}</a>' for link in links)
+        body = (
+            f"<html><head><title>{path}</title></head>"
+            f"<body><p>{text}</p>{anchors}</body></html>"
+        ).encode()
+        self._respond(
+            handler, path, 200, {"ETag": etag, "Content-Type": "text/html"}, body
+        )
+
+    def _respond(
+        self,
+        handler: BaseHTTPRequestHandler,
+        path: str,
+        status: int,
+        headers: dict[str, str] | None = None,
+        body: bytes = b"",
+    ) -> None:
+        self.responses.append((path, status))
+        handler.send_response(status)
+        for name, value in (headers or {}).items():
+            handler.send_header(name, value)
+        handler.send_header("Content-Length", str(len(body)))
+        handler.end_headers()
+        handler.wfile.write(body)
+
+
+@pytest.fixture
+def site() -> Iterator[tuple[FakeSite, str]]:
+    fake_site = FakeSite()
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self) -> None:
+            fake_site.handle(self)
+
+        def log_message(self, *args: object) -> None:
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield fake_site, f"http://127.0.0.1:{server.server_port}"
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+@pytest.fixture
+def crawl_states() -> Iterator[dict[str, WebCrawlState]]:
+    states: dict[str, WebCrawlState] = {}
+    module = "onyx.connectors.web.connector"
+    with (
+        patch(
+            f"{module}.load_connector_state",
+            side_effect=lambda file_name, _: states.get(file_name),
+        ),
+        patch(f"{module}.save_connector_state", side_effect=states.__setitem__),
+    ):
+        yield states
+
+
+def _crawl(
+    connector: WebConnector, start: float, end: float
+) -> tuple[list[Document], int]:
+    outputs = load_everything_from_checkpoint_connector(connector, start, end)
+    docs = [item for output in outputs for item in output.items]
+    assert all(isinstance(doc, Document) for doc in docs)
+    return [doc for doc in docs if isinstance(doc, Document)], len(outputs)
+
+
+def test_crawler_skips_unchanged_pages(
+    site: tuple[FakeSite, str], crawl_states: dict[str, WebCrawlState]
+) -> None:
+    fake_site, base_url = site
+    fake_site.set_page("/", "home page", ["/a", "/b"])
+    fake_site.set_page("/a", "page a", [])
+    fake_site.set_page("/b", "page b", ["/b/c"])
+    fake_site.set_page("/b/c", "page c", ["/"])
+
+    connector = WebConnector(base_url=f"{base_url}/", crawler_mode=True)
+    connector.PAGES_PER_CHECKPOINT = 2
+
+    first_end = 1_000_000.0
+    docs, num_checkpoints = _crawl(connector, start=0, end=first_end)
+    assert {doc.id for doc in docs} == {
+        f"{base_url}{path}" for path in ["/", "/a", "/b", "/b/c"]
+    }
+    assert num_checkpoints > 1
+
+    # the pages linking to /b/c are unchanged, it is still revisited
+    fake_site.set_page("/b/c", "page c, edited", ["/"])
+    fake_site.responses.clear()
+    second_start = first_end - POLL_CONNECTOR_OFFSET * 60
+    docs, _ = _crawl(connector, start=second_start, end=first_end + 3600)
+
+    assert [doc.id for doc in docs] == [f"{base_url}/b/c"]
+    # the first request is the connectivity check
+    assert fake_site.responses[0] == ("/", 200)
+    assert sorted(fake_site.responses[1:]) == [
+        ("/", 304),
+        ("/a", 304),
+        ("/b", 304),
+        ("/b/c", 200),
+    ]
+
+
+def test_crawler_ignores_state_newer_than_last_successful_run(
+    site: tuple[FakeSite, str], crawl_states: dict[str, WebCrawlState]
+) -> None:
+    fake_site, base_url = site
+    fake_site.set_page("/", "home page", ["/a"])
+    fake_site.set_page("/a", "page a", [])
+
+    connector = WebConnector(base_url=f"{base_url}/", crawler_mode=True)
+    _crawl(connector, start=0, end=1_000_000.0)
+
+    # the previous crawl may not have been indexed, e.g. if its run failed afterwards
+    fake_site.responses.clear()
+    docs, _ = _crawl(connector, start=500_000.0, end=2_000_000.0)
+
+    assert len(docs) == 2
+    assert sorted(fake_site.responses[1:]) == [("/", 200), ("/a", 200)]
+
+
+def test_host_politeness_limiter() -> None:
+    limiter = HostPolitenessLimiter(max_concurrent=2, min_interval=0)
+    lock = threading.Lock()
+    in_flight = {"a": 0, "b": 0}
+    max_in_flight = {"a": 0, "b": 0}
+
+    def _request(host: str) -> None:
+        with limiter.limit(f"https://{host}/page"):
+            with lock:
+                in_flight[host] += 1
+                max_in_flight[host] = max(max_in_flight[host], in_flight[host])
+            time.sleep(0.02)
+            with lock:
+                in_flight[host] -= 1
+
+    threads = [
+        threading.Thread(target=_request, args=(host,)) for host in ["a", "b"] * 5
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert max_in_flight == {"a": 2, "b": 2}
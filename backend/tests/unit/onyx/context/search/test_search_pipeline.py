@@ -0,0 +1,274 @@
+import threading
+from typing import Any
+from typing import cast
+from unittest.mock import MagicMock
+
+import pytest
+
+from onyx.configs.constants import DocumentSource
+from onyx.context.search import pipeline as pipeline_module
+from onyx.context.search.enums import LLMEvaluationType
+from onyx.context.search.enums import SearchType
+from onyx.context.search.models import IndexFilters
+from onyx.context.search.models import InferenceChunk
+from onyx.context.search.models import InferenceChunkUncleaned
+from onyx.context.search.models import SearchQuery
+from onyx.context.search.models import SearchRequest
+from onyx.context.search.pipeline import SearchPipeline
+
+
+def _chunk(document_id: str, chunk_id: int) -> InferenceChunk:
+    return InferenceChunk(
+        chunk_id=chunk_id,
+        document_id=document_id,
+        semantic_identifier=document_id,
+        title=None,
+        blurb="",
+        content=f"{document_id} {chunk_id}",
+        source_links=None,
+        section_continuation=False,
+        source_type=DocumentSource.WEB,
+        boost=0,
+        recency_bias=1.0,
+        score=1.0,
+        hidden=False,
+        metadata={},
+        match_highlights=[],
+        updated_at=None,
+        image_file_name=None,
+        doc_summary="",
+        chunk_context="",
+    )
+
+
+def _search_query(search_request: SearchRequest, **_: Any) -> SearchQuery:
+    return SearchQuery(
+        query=search_request.query,
+        search_type=SearchType.SEMANTIC,
+        filters=IndexFilters(access_control_list=None),
+        evaluation_type=LLMEvaluationType.SKIP,
+        recency_bias_multiplier=1.0,
+        chunks_above=0,
+        chunks_below=0,
+        processed_keywords=[],
+        rerank_settings=None,
+        hybrid_alpha=0.5,
+        max_llm_filter_sections=0,
+        precomputed_query_embedding=search_request.precomputed_query_embedding,
+    )
+
+
+def _make_pipeline(
+    monkeypatch: pytest.MonkeyPatch,
+    embed_queries: Any,
+    retrieved_queries: list[SearchQuery],
+    search_request: SearchRequest | None = None,
+) -> SearchPipeline:
+    monkeypatch.setattr(
+        pipeline_module, "get_current_search_settings", lambda _: MagicMock()
+    )
+    monkeypatch.setattr(
+        pipeline_module, "get_default_document_index", lambda *_: MagicMock()
+    )
+    monkeypatch.setattr(
+        pipeline_module, "get_query_embedding_model", lambda _: MagicMock()
+    )
+    monkeypatch.setattr(pipeline_module, "embed_queries", embed_queries)
+
+    def _retrieve_chunks(query: SearchQuery, **_: Any) -> list:
+        retrieved_queries.append(query)
+        return []
+
+    monkeypatch.setattr(pipeline_module, "retrieve_chunks", _retrieve_chunks)
+
+    return SearchPipeline(
+        search_request=search_request or SearchRequest(query="what is onyx"),
+        user=None,
+        llm=MagicMock(),
+        fast_llm=MagicMock(),
+        skip_query_analysis=True,
+        db_session=MagicMock(),
+    )
+
+
+def test_query_embedding_runs_during_preprocessing(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    embedding_started = threading.Event()
+
+    def _embed_queries(queries: list[str], model: Any) -> list[list[float]]:
+        embedding_started.set()
+        return [[0.5, 0.5]]
+
+    def _retrieval_preprocessing(search_request: SearchRequest, **_: Any) -> Any:
+        # only returns once the embedding has been requested
+        assert embedding_started.wait(timeout=5)
+        return _search_query(search_request)
+
+    monkeypatch.setattr(
+        pipeline_module, "retrieval_preprocessing", _retrieval_preprocessing
+    )
+    retrieved_queries: list[SearchQuery] = []
+    search_pipeline = _make_pipeline(monkeypatch, _embed_queries, retrieved_queries)
+
+    search_pipeline._get_chunks()
+
+    assert retrieved_queries[0].precomputed_query_embedding == [0.5, 0.5]
+    assert set(search_pipeline._stage_timings) >= {
+        "preprocessing",
+        "query_embedding",
+        "query_embedding_wait",
+        "retrieval",
+    }
+
+
+def test_failed_query_embedding_is_left_to_retrieval(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    def _embed_queries(queries: list[str], model: Any) -> list[list[float]]:
+        raise RuntimeError("model server unavailable")
+
+    monkeypatch.setattr(pipeline_module, "retrieval_preprocessing", _search_query)
+    retrieved_queries: list[SearchQuery] = []
+    search_pipeline = _make_pipeline(monkeypatch, _embed_queries, retrieved_queries)
+
+    search_pipeline._get_chunks()
+
+    assert retrieved_queries[0].precomputed_query_embedding is None
+
+
+def test_precomputed_query_embedding_is_not_recomputed(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    embed_queries = MagicMock()
+    monkeypatch.setattr(pipeline_module, "retrieval_preprocessing", _search_query)
+    retrieved_queries: list[SearchQuery] = []
+    search_pipeline = _make_pipeline(
+        monkeypatch,
+        embed_queries,
+        retrieved_queries,
+        search_request=SearchRequest(
+            query="what is onyx", precomputed_query_embedding=[1.0, 0.0]
+        ),
+    )
+
+    search_pipeline._get_chunks()
+
+    embed_queries.assert_not_called()
+    assert retrieved_queries[0].precomputed_query_embedding == [1.0, 0.0]
+
+
+def test_queries_are_retrieved_together(monkeypatch: pytest.MonkeyPatch) -> None:
+    embedded_batches: list[list[str]] = []
+
+    def _embed_queries(queries: list[str], model: Any) -> list[list[float]]:
+        embedded_batches.append(queries)
+        return [[float(i)] for i in range(len(queries))]
+
+    monkeypatch.setattr(
+        pipeline_module,
+        "retrieval_preprocessing",
+        lambda search_request, **_: _search_query(search_request).model_copy(
+            update={"chunks_above": 1, "chunks_below": 1}
+        ),
+    )
+    # stop word removal needs the nltk data
+    monkeypatch.setattr(
+        pipeline_module,
+        "get_processed_keywords",
+        lambda query, search_request: query.split(),
+    )
+    retrieved_batches: list[list[SearchQuery]] = []
+
+    def _retrieve_chunks_for_queries(
+        queries: list[SearchQuery], **_: Any
+    ) -> list[list[InferenceChunk]]:
+        retrieved_batches.append(queries)
+        # both queries find chunk 1 of doc1
+        return [
+            [_chunk("doc1", 1)],
+            [_chunk("doc1", 1), _chunk("doc2", 0)],
+        ]
+
+    monkeypatch.setattr(
+        pipeline_module, "retrieve_chunks_for_queries", _retrieve_chunks_for_queries
+    )
+    search_pipeline = _make_pipeline(
+        monkeypatch,
+        _embed_queries,
+        [],
+        search_request=SearchRequest(query="what is onyx"),
+    )
+    id_based_retrieval = cast(
+        MagicMock, search_pipeline.document_index.id_based_retrieval
+    )
+    id_based_retrieval.return_value = [
+        InferenceChunkUncleaned(
+            **_chunk(document_id, chunk_id).model_dump(), metadata_suffix=None
+        )
+        for document_id, chunk_id in [
+            ("doc1", 0),
+            ("doc1", 1),
+            ("doc1", 2),
+            ("doc2", 0),
+            ("doc2", 1),
+        ]
+    ]
+
+    sections = search_pipeline.retrieve_sections_for_queries(
+        ["onyx features", "onyx connectors", "onyx features"]
+    )
+
+    assert embedded_batches == [["onyx features", "onyx connectors"]]
+    assert [
+        (query.query, query.precomputed_query_embedding)
+        for query in retrieved_batches[0]
+    ] == [("onyx features", [0.0]), ("onyx connectors", [1.0])]
+
+    # the surrounding chunks of both queries are fetched at once, doc1 only once
+    id_based_retrieval.assert_called_once()
+    chunk_requests = id_based_retrieval.call_args.kwargs["chunk_requests"]
+    assert sorted(
+        (request.document_id, request.min_chunk_ind, request.max_chunk_ind)
+        for request in chunk_requests
+    ) == [("doc1", 0, 2), ("doc2", 0, 1)]
+
+    assert [
+        [section.center_chunk.document_id for section in query_sections]
+        for query_sections in sections
+    ] == [["doc1"], ["doc1", "doc2"], ["doc1"]]
+    assert [chunk.chunk_id for chunk in sections[0][0].chunks] == [0, 1, 2]
+
+
+@pytest.mark.parametrize(
+    "evaluation_type", [LLMEvaluationType.SKIP, LLMEvaluationType.BASIC]
+)
+def test_stage_timings_are_logged_once(
+    monkeypatch: pytest.MonkeyPatch, evaluation_type: LLMEvaluationType
+) -> None:
+    monkeypatch.setattr(
+        pipeline_module,
+        "retrieval_preprocessing",
+        lambda search_request, **_: _search_query(search_request).model_copy(
+            update={"evaluation_type": evaluation_type}
+        ),
+    )
+
+    def _search_postprocessing(**_: Any) -> Any:
+        yield []
+        yield []
+
+    monkeypatch.setattr(
+        pipeline_module, "search_postprocessing", _search_postprocessing
+    )
+    search_pipeline = _make_pipeline(monkeypatch, MagicMock(), [])
+    log_stage_timings = MagicMock()
+    monkeypatch.setattr(search_pipeline, "_log_stage_timings", log_stage_timings)
+
+    _ = search_pipeline.reranked_sections
+    _ = search_pipeline.section_relevance
+
+    log_stage_timings.assert_called_once()
+    assert ("section_relevance" in search_pipeline._stage_timings) == (
+        evaluation_type == LLMEvaluationType.BASIC
+    )
@@ -1,3 +1,4 @@
+from onyx.document_index.vespa.shared_utils.utils import build_document_id_selection
 from onyx.document_index.vespa.shared_utils.utils import remove_invalid_unicode_chars
 
 
@@ -18,3 +19,14 @@ def test_remove_invalid_unicode_chars() -> None:
     sanitized = remove_invalid_unicode_chars(text_with_multiple_illegal)
     assert all(c not in sanitized for c in ["\x00", "\ufddb", "\ufffe"])
     assert sanitized == "Hello World!"
+
+
+def test_build_document_id_selection_escapes_string_literal() -> None:
+    assert (
+        build_document_id_selection("test_index", "plain")
+        == "test_index.document_id=='plain'"
+    )
+    assert (
+        build_document_id_selection("test_index", "C:\\docs\\it's.txt")
+        == "test_index.document_id=='C:\\\\docs\\\\it\\'s.txt'"
+    )
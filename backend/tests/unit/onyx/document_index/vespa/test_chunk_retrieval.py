@@ -0,0 +1,179 @@
+import json
+import re
+import threading
+from collections.abc import Callable
+from collections.abc import Iterator
+from http import HTTPStatus
+
+import httpx
+import pytest
+
+from onyx.agents.agent_search.shared_graph_utils.models import QueryExpansionType
+from onyx.context.search.models import IndexFilters
+from onyx.document_index.interfaces import HybridRetrievalRequest
+from onyx.document_index.interfaces import VespaChunkRequest
+from onyx.document_index.vespa.chunk_retrieval import parallel_visit_api_retrieval
+from onyx.document_index.vespa.index import VespaIndex
+from onyx.httpx.httpx_pool import HttpxPool
+
+INDEX_NAME = "test_index"
+
+
+def _hit(document_id: str, chunk_id: int, acl: dict | None = None) -> dict:
+    fields = {
+        "document_id": document_id,
+        "chunk_id": chunk_id,
+        "content": f"{document_id} chunk {chunk_id}",
+        "section_continuation": False,
+        "source_type": "web",
+        "semantic_identifier": document_id,
+    }
+    if acl is not None:
+        fields["access_control_list"] = acl
+    return {"fields": fields}
+
+
+_Handler = Callable[[httpx.Request], httpx.Response]
+
+
+@pytest.fixture
+def pooled_vespa_handler(monkeypatch: pytest.MonkeyPatch) -> Iterator[list[_Handler]]:
+    """Lets the process wide Vespa client be created as it is without an http client
+    pool set up (as in the api server). Only its network I/O is replaced, by the
+    handler appended to the returned list."""
+    handlers: list[_Handler] = []
+    monkeypatch.setattr(
+        httpx.HTTPTransport,
+        "handle_request",
+        lambda self, request: handlers[0](request),
+    )
+    HttpxPool.close_client("vespa")
+    yield handlers
+    HttpxPool.close_client("vespa")
+
+
+def test_visit_retrieval_combines_requests_and_keeps_document_order() -> None:
+    lock = threading.Lock()
+    selections: list[str] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        selection = request.url.params["selection"]
+        with lock:
+            selections.append(selection)
+        requested_ids = re.findall(rf"{INDEX_NAME}.document_id=='([^']+)'", selection)
+        # return the documents in the reverse order, chunks out of order
+        hits = [
+            _hit(document_id, chunk_id)
+            for document_id in reversed(requested_ids)
+            for chunk_id in (1, 0)
+        ]
+        return httpx.Response(HTTPStatus.OK, json={"documents": hits})
+
+    chunk_requests = [VespaChunkRequest(document_id=f"doc_{i}") for i in range(70)]
+    with httpx.Client(transport=httpx.MockTransport(handler)) as http_client:
+        chunks = parallel_visit_api_retrieval(
+            index_name=INDEX_NAME,
+            chunk_requests=chunk_requests,
+            filters=IndexFilters(access_control_list=None),
+            http_client=http_client,
+        )
+
+    # 70 documents fit in 2 selections
+    assert len(selections) == 2
+    assert all("large_chunk_reference_ids == null" in s for s in selections)
+
+    document_ids = list(dict.fromkeys(chunk.document_id for chunk in chunks))
+    assert document_ids == [f"doc_{i}" for i in range(70)]
+    assert len(chunks) == 140
+
+
+def test_visit_retrieval_chunk_ranges_and_acl_postfilter() -> None:
+    seen_selection: list[str] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        seen_selection.append(request.url.params["selection"])
+        return httpx.Response(
+            HTTPStatus.OK,
+            json={
+                "documents": [
+                    _hit("doc_a", 2, acl={"user_email:a@test.com": 1}),
+                    _hit("doc_b", 0, acl={"PUBLIC": 1}),
+                ]
+            },
+        )
+
+    with httpx.Client(transport=httpx.MockTransport(handler)) as http_client:
+        chunks = parallel_visit_api_retrieval(
+            index_name=INDEX_NAME,
+            chunk_requests=[
+                VespaChunkRequest(
+                    document_id="doc_a", min_chunk_ind=1, max_chunk_ind=3
+                ),
+                VespaChunkRequest(document_id="doc_b"),
+            ],
+            filters=IndexFilters(access_control_list=["PUBLIC"]),
+            get_large_chunks=True,
+            http_client=http_client,
+        )
+
+    assert seen_selection == [
+        f"({INDEX_NAME}.document_id=='doc_a' and {INDEX_NAME}.chunk_id>=1 "
+        f"and {INDEX_NAME}.chunk_id<=3) or ({INDEX_NAME}.document_id=='doc_b')"
+    ]
+    assert [chunk.document_id for chunk in chunks] == ["doc_b"]
+
+
+def test_visit_retrieval_without_http_client_uses_the_pooled_client(
+    pooled_vespa_handler: list[_Handler],
+) -> None:
+    pooled_vespa_handler.append(
+        lambda request: httpx.Response(
+            HTTPStatus.OK, json={"documents": [_hit("doc_a", 0)]}
+        )
+    )
+
+    chunks = parallel_visit_api_retrieval(
+        index_name=INDEX_NAME,
+        chunk_requests=[VespaChunkRequest(document_id="doc_a")],
+        filters=IndexFilters(access_control_list=None),
+    )
+
+    assert [chunk.document_id for chunk in chunks] == ["doc_a"]
+
+
+def test_batch_hybrid_retrieval_without_pool_uses_the_pooled_client(
+    pooled_vespa_handler: list[_Handler],
+) -> None:
+    def handler(request: httpx.Request) -> httpx.Response:
+        query = json.loads(request.content)["query"]
+        return httpx.Response(
+            HTTPStatus.OK, json={"root": {"children": [_hit(f"doc_{query}", 0)]}}
+        )
+
+    pooled_vespa_handler.append(handler)
+
+    vespa_index = VespaIndex(
+        index_name=INDEX_NAME,
+        secondary_index_name=None,
+        large_chunks_enabled=False,
+        secondary_large_chunks_enabled=None,
+    )
+    chunks_per_request = vespa_index.batch_hybrid_retrieval(
+        [
+            HybridRetrievalRequest(
+                query=query,
+                query_embedding=[0.0, 1.0],
+                final_keywords=None,
+                filters=IndexFilters(access_control_list=None),
+                hybrid_alpha=0.5,
+                time_decay_multiplier=1.0,
+                num_to_retrieve=10,
+                ranking_profile_type=QueryExpansionType.SEMANTIC,
+            )
+            for query in ["a", "b"]
+        ]
+    )
+
+    assert [
+        [chunk.document_id for chunk in chunks] for chunks in chunks_per_request
+    ] == [["doc_a"], ["doc_b"]]
@@ -0,0 +1,173 @@
+import json
+import threading
+from http import HTTPStatus
+
+import httpx
+import pytest
+
+from onyx.document_index.interfaces import DocumentFieldsUpdate
+from onyx.document_index.interfaces import VespaDocumentFields
+from onyx.document_index.vespa.feed_client import VespaFeedClient
+from onyx.document_index.vespa.feed_client import VespaFeedOperation
+from onyx.document_index.vespa.index import VespaIndex
+from onyx.document_index.vespa.indexing_utils import get_existing_document_ids
+
+
+def _operations(count: int) -> list[VespaFeedOperation]:
+    return [
+        VespaFeedOperation(
+            document_id=f"doc_{i}",
+            url=f"http://vespa/document/v1/default/test_index/docid/{i}",
+            method="POST",
+            body={"fields": {"document_id": f"doc_{i}"}},
+        )
+        for i in range(count)
+    ]
+
+
+def test_feed_sends_every_operation_with_bounded_in_flight() -> None:
+    lock = threading.Lock()
+    in_flight = 0
+    max_seen_in_flight = 0
+    seen_urls: set[str] = set()
+    release = threading.Event()
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        nonlocal in_flight, max_seen_in_flight
+        with lock:
+            in_flight += 1
+            max_seen_in_flight = max(max_seen_in_flight, in_flight)
+            seen_urls.add(str(request.url))
+            if in_flight >= 4:
+                release.set()
+        # hold operations briefly so the window fills up
+        release.wait(timeout=0.05)
+        with lock:
+            in_flight -= 1
+        return httpx.Response(HTTPStatus.OK, json={})
+
+    with httpx.Client(transport=httpx.MockTransport(handler)) as http_client:
+        stats = VespaFeedClient(http_client, max_in_flight=4).feed(_operations(50))
+
+    assert stats.operations == 50
+    assert stats.status_counts == {HTTPStatus.OK: 50}
+    assert len(seen_urls) == 50
+    assert max_seen_in_flight <= 4
+
+
+def test_feed_retries_overloaded_responses() -> None:
+    attempts: dict[str, int] = {}
+    lock = threading.Lock()
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        with lock:
+            attempts[str(request.url)] = attempts.get(str(request.url), 0) + 1
+            attempt = attempts[str(request.url)]
+        if attempt < 3:
+            return httpx.Response(HTTPStatus.TOO_MANY_REQUESTS)
+        return httpx.Response(HTTPStatus.OK, json={})
+
+    with httpx.Client(transport=httpx.MockTransport(handler)) as http_client:
+        stats = VespaFeedClient(http_client, max_in_flight=2, initial_backoff=0.0).feed(
+            _operations(5)
+        )
+
+    assert stats.operations == 5
+    assert stats.retries == 10
+    assert all(count == 3 for count in attempts.values())
+
+
+def test_feed_raises_on_permanent_failure() -> None:
+    def handler(request: httpx.Request) -> httpx.Response:
+        if request.url.path.endswith("/3"):
+            return httpx.Response(HTTPStatus.BAD_REQUEST, text="bad document")
+        return httpx.Response(HTTPStatus.OK, json={})
+
+    with httpx.Client(transport=httpx.MockTransport(handler)) as http_client:
+        with pytest.raises(httpx.HTTPStatusError):
+            VespaFeedClient(http_client, max_in_flight=2).feed(_operations(10))
+
+
+def test_feed_records_failures_when_not_raising() -> None:
+    def handler(request: httpx.Request) -> httpx.Response:
+        if request.url.path.endswith("/3"):
+            return httpx.Response(HTTPStatus.BAD_REQUEST, text="bad document")
+        return httpx.Response(HTTPStatus.OK, json={})
+
+    with httpx.Client(transport=httpx.MockTransport(handler)) as http_client:
+        stats = VespaFeedClient(
+            http_client, max_in_flight=2, raise_on_error=False
+        ).feed(_operations(10))
+
+    assert stats.operations == 9
+    assert list(stats.failures) == ["doc_3"]
+    assert stats.client_error_failures == {"doc_3"}
+
+
+def test_update_multiple_reports_results_per_document() -> None:
+    lock = threading.Lock()
+    updated_boosts: list[float] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        assert request.method == "PUT"
+        boost = json.loads(request.content)["fields"]["boost"]["assign"]
+        if boost == 2:
+            return httpx.Response(HTTPStatus.BAD_REQUEST, text="bad update")
+        with lock:
+            updated_boosts.append(boost)
+        return httpx.Response(HTTPStatus.OK, json={})
+
+    with httpx.Client(transport=httpx.MockTransport(handler)) as http_client:
+        index = VespaIndex(
+            index_name="test_index",
+            secondary_index_name=None,
+            large_chunks_enabled=False,
+            secondary_large_chunks_enabled=None,
+            httpx_client=http_client,
+        )
+        results = index.update_multiple(
+            [
+                DocumentFieldsUpdate(
+                    doc_id=f"doc_{i}",
+                    chunk_count=i + 1,
+                    fields=VespaDocumentFields(boost=i),
+                )
+                for i in range(4)
+            ],
+            tenant_id="test_tenant",
+        )
+
+    assert [result.doc_id for result in results] == [f"doc_{i}" for i in range(4)]
+    assert [result.succeeded for result in results] == [True, True, False, True]
+    # a rejected update is not worth retrying
+    assert results[2].retryable is False
+    assert [result.chunks_affected for result in results] == [1, 2, 3, 4]
+    assert sorted(updated_boosts) == [0, 1, 1, 3, 3, 3, 3]
+
+
+def test_get_existing_document_ids_uses_one_visit_per_batch() -> None:
+    requests: list[httpx.Request] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        assert "selection" in request.url.params
+        return httpx.Response(
+            HTTPStatus.OK,
+            json={
+                "documents": [
+                    {"fields": {"document_id": "doc_1"}},
+                    {"fields": {"document_id": "doc_1"}},
+                    {"fields": {"document_id": "doc_4"}},
+                ]
+            },
+        )
+
+    document_ids = [f"doc_{i}" for i in range(6)]
+    with httpx.Client(transport=httpx.MockTransport(handler)) as http_client:
+        existing = get_existing_document_ids(
+            document_ids, "test_index", http_client, batch_size=3
+        )
+
+    assert existing == {"doc_1", "doc_4"}
+    assert len(requests) == 2
+    assert "test_index.document_id=='doc_0'" in requests[0].url.params["selection"]
@@ -0,0 +1,93 @@
+from collections.abc import Iterator
+from io import BytesIO
+
+import docx  # type: ignore
+import pytest
+
+from onyx.file_processing.extraction_pool import FileExtractionPool
+from onyx.file_processing.extraction_pool import FileExtractionTask
+
+
+def _docx_bytes(text: str) -> bytes:
+    document = docx.Document()
+    document.add_paragraph(text)
+    output = BytesIO()
+    document.save(output)
+    return output.getvalue()
+
+
+def _tasks(count: int) -> list[FileExtractionTask]:
+    return [
+        (
+            FileExtractionTask(f"file_{i}.docx", _docx_bytes(f"docx number {i}"))
+            if i % 2
+            else FileExtractionTask(f"file_{i}.txt", f"text number {i}".encode())
+        )
+        for i in range(count)
+    ]
+
+
+@pytest.fixture(scope="module")
+def worker_pool() -> Iterator[FileExtractionPool]:
+    # workers take a few seconds to start, they are shared by the tests
+    with FileExtractionPool(
+        expected_file_count=2,
+        max_workers=2,
+        min_files_for_workers=1,
+        allow_unstructured=False,
+    ) as pool:
+        yield pool
+
+
+def test_results_are_streamed_in_task_order(worker_pool: FileExtractionPool) -> None:
+    tasks = _tasks(6)
+    results = list(worker_pool.extract_text_and_images(iter(tasks)))
+
+    assert [task for task, _ in results] == tasks
+    assert [result.text_content.strip() for _, result in results] == [
+        f"{'docx' if i % 2 else 'text'} number {i}" for i in range(6)
+    ]
+
+
+def test_unparseable_file_raises_when_extracting_text(
+    worker_pool: FileExtractionPool,
+) -> None:
+    results = worker_pool.extract_file_text(
+        [
+            FileExtractionTask("fine.txt", b"fine"),
+            FileExtractionTask("broken.docx", b"not a zip file"),
+        ]
+    )
+    assert next(results)[1] == "fine"
+    with pytest.raises(RuntimeError, match="broken.docx"):
+        next(results)
+
+
+def test_stuck_worker_is_replaced() -> None:
+    tasks = _tasks(3)
+    with FileExtractionPool(
+        expected_file_count=len(tasks),
+        max_workers=2,
+        min_files_for_workers=1,
+        allow_unstructured=False,
+        # no file can be parsed in time
+        timeout_seconds=0,
+    ) as pool:
+        results = list(pool.extract_text_and_images(tasks))
+
+    assert [task for task, _ in results] == tasks
+    assert all(result.text_content == "" for _, result in results)
+
+
+def test_few_files_are_extracted_in_process() -> None:
+    tasks = _tasks(2)
+    with FileExtractionPool(
+        expected_file_count=len(tasks), max_workers=4, allow_unstructured=False
+    ) as pool:
+        results = list(pool.extract_text_and_images(tasks))
+        assert pool._executor is None
+
+    assert [result.text_content.strip() for _, result in results] == [
+        "text number 0",
+        "docx number 1",
+    ]
@@ -0,0 +1,234 @@
+from collections.abc import Iterator
+from contextlib import contextmanager
+from io import BytesIO
+from pathlib import Path
+from typing import Any
+from unittest.mock import patch
+
+import pytest
+from sqlalchemy.orm import Session
+
+from onyx.configs.constants import FileOrigin
+from onyx.db.models import PGFileStore
+from onyx.file_store.blob_storage import BlobNotFoundError
+from onyx.file_store.blob_storage import LocalDirectoryBlobStorage
+from onyx.file_store.file_store import ObjectStoreBackedFileStore
+
+
+class FakeFileRecords:
+    """Stands in for the file_store table"""
+
+    def __init__(self) -> None:
+        self.records: dict[str, PGFileStore] = {}
+
+    def get_optional(self, file_name: str, db_session: Any) -> PGFileStore | None:
+        return self.records.get(file_name)
+
+    def get(self, file_name: str, db_session: Any) -> PGFileStore:
+        if file_name not in self.records:
+            raise RuntimeError(f"File by name {file_name} does not exist")
+        return self.records[file_name]
+
+    def upsert(self, file_name: str, **kwargs: Any) -> PGFileStore:
+        kwargs.pop("db_session")
+        self.records[file_name] = PGFileStore(file_name=file_name, **kwargs)
+        return self.records[file_name]
+
+    def delete(self, file_name: str, db_session: Any) -> None:
+        self.records.pop(file_name, None)
+
+    def count_by_object_key(self, object_key: str, db_session: Any) -> int:
+        return sum(record.object_key == object_key for record in self.records.values())
+
+
+@pytest.fixture
+def blob_storage(tmp_path: Path) -> LocalDirectoryBlobStorage:
+    return LocalDirectoryBlobStorage(str(tmp_path))
+
+
+@pytest.fixture
+def file_store(
+    blob_storage: LocalDirectoryBlobStorage,
+) -> Iterator[ObjectStoreBackedFileStore]:
+    records = FakeFileRecords()
+
+    @contextmanager
+    def get_session_with_tenant(*, tenant_id: str) -> Iterator[Session]:
+        yield Session()
+
+    module = "onyx.file_store.file_store"
+    with (
+        patch(f"{module}.get_session_with_tenant", get_session_with_tenant),
+        patch(f"{module}.lock_object_key__no_commit"),
+        patch(f"{module}.get_pgfilestore_by_file_name_optional", records.get_optional),
+        patch(f"{module}.get_pgfilestore_by_file_name", records.get),
+        patch(f"{module}.upsert_pgfilestore", records.upsert),
+        patch(f"{module}.delete_pgfilestore_by_file_name", records.delete),
+        patch(
+            f"{module}.count_pgfilestores_by_object_key", records.count_by_object_key
+        ),
+    ):
+        # an unbound session, it only runs the commit hooks
+        yield ObjectStoreBackedFileStore(
+            db_session=Session(), blob_storage=blob_storage, tenant_id="tenant_1"
+        )
+
+
+def _save(
+    file_store: ObjectStoreBackedFileStore,
+    file_name: str,
+    data: bytes,
+    commit: bool = True,
+) -> None:
+    file_store.save_file(
+        file_name=file_name,
+        content=BytesIO(data),
+        display_name=None,
+        file_origin=FileOrigin.OTHER,
+        file_type="application/octet-stream",
+        commit=commit,
+    )
+
+
+def test_local_blob_storage_ranged_reads(
+    blob_storage: LocalDirectoryBlobStorage,
+) -> None:
+    blob_storage.put("tenant_1/ab/abc", BytesIO(b"0123456789"))
+
+    assert blob_storage.exists("tenant_1/ab/abc")
+    with blob_storage.open("tenant_1/ab/abc") as blob:
+        assert blob.read() == b"0123456789"
+    with blob_storage.open("tenant_1/ab/abc", start=2, end=5) as blob:
+        assert blob.read() == b"234"
+    with blob_storage.open("tenant_1/ab/abc", start=8, end=20) as blob:
+        assert blob.read() == b"89"
+
+    blob_storage.delete("tenant_1/ab/abc")
+    blob_storage.delete("tenant_1/ab/abc")
+    assert not blob_storage.exists("tenant_1/ab/abc")
+    with pytest.raises(BlobNotFoundError):
+        blob_storage.open("tenant_1/ab/abc")
+    with pytest.raises(ValueError):
+        blob_storage.open("../outside")
+
+
+def test_same_content_is_stored_once(
+    file_store: ObjectStoreBackedFileStore,
+    blob_storage: LocalDirectoryBlobStorage,
+    tmp_path: Path,
+) -> None:
+    _save(file_store, "a", b"same content")
+    _save(file_store, "b", b"same content")
+    _save(file_store, "c", b"other content")
+
+    record_a = file_store.read_file_record("a")
+    assert record_a.lobj_oid is None
+    assert record_a.object_key == file_store.read_file_record("b").object_key
+    assert record_a.object_key != file_store.read_file_record("c").object_key
+    assert len([path for path in tmp_path.rglob("*") if path.is_file()]) == 2
+
+    assert file_store.read_file("b", mode="b").read() == b"same content"
+    assert (
+        file_store.read_file("c", mode="b", use_tempfile=True).read()
+        == b"other content"
+    )
+
+    # the blob is only deleted with the last file referencing it
+    file_store.delete_file("a")
+    assert blob_storage.exists(record_a.object_key or "")
+    assert file_store.read_file("b", mode="b").read() == b"same content"
+    file_store.delete_file("b")
+    assert not blob_storage.exists(record_a.object_key or "")
+
+
+def test_overwriting_a_file_drops_its_old_blob(
+    file_store: ObjectStoreBackedFileStore,
+    blob_storage: LocalDirectoryBlobStorage,
+) -> None:
+    _save(file_store, "a", b"old content")
+    old_object_key = file_store.read_file_record("a").object_key or ""
+
+    _save(file_store, "a", b"new content")
+
+    assert not blob_storage.exists(old_object_key)
+    assert file_store.read_file("a", mode="b").read() == b"new content"
+
+
+def test_overwriting_a_file_without_commit_drops_its_old_blob_on_commit(
+    file_store: ObjectStoreBackedFileStore,
+    blob_storage: LocalDirectoryBlobStorage,
+) -> None:
+    _save(file_store, "a", b"old content")
+    old_object_key = file_store.read_file_record("a").object_key or ""
+
+    _save(file_store, "a", b"new content", commit=False)
+    assert blob_storage.exists(old_object_key)
+
+    file_store.db_session.commit()
+    assert not blob_storage.exists(old_object_key)
+    assert file_store.read_file("a", mode="b").read() == b"new content"
+
+
+def test_stream_file(file_store: ObjectStoreBackedFileStore) -> None:
+    _save(file_store, "a", b"0123456789")
+
+    assert list(file_store.stream_file("a", chunk_size=4)) == [
+        b"0123",
+        b"4567",
+        b"89",
+    ]
+    assert b"".join(file_store.stream_file("a", start=3, end=7)) == b"3456"
+
+    file_with_mime_type = file_store.get_file_with_mime_type("a")
+    assert file_with_mime_type is not None
+    assert file_with_mime_type.data == b"0123456789"
+    assert file_store.get_file_with_mime_type("missing") is None
+
+
+def test_stream_file_with_mime_type(file_store: ObjectStoreBackedFileStore) -> None:
+    png_header = b"\x89PNG\r\n\x1a\n"
+    _save(file_store, "logo", png_header + b"0123456789")
+
+    streamed_file = file_store.stream_file_with_mime_type("logo", chunk_size=8)
+    assert streamed_file is not None
+    chunks, mime_type = streamed_file
+    assert mime_type == "image/png"
+    assert list(chunks) == [png_header, b"01234567", b"89"]
+
+    assert file_store.stream_file_with_mime_type("missing") is None
+
+
+def test_migrate_large_objects(
+    file_store: ObjectStoreBackedFileStore,
+    blob_storage: LocalDirectoryBlobStorage,
+) -> None:
+    large_objects = {1: b"first", 2: b"second"}
+    # the large object of the first file is gone, it must not block the others
+    legacy_records = [
+        PGFileStore(file_name=f"legacy_{oid}", lobj_oid=oid) for oid in [0, 1, 2]
+    ]
+
+    module = "onyx.file_store.file_store"
+    with (
+        patch(f"{module}.get_pgfilestores_with_lobj", return_value=legacy_records),
+        patch(
+            f"{module}.read_lobj",
+            side_effect=lambda lobj_oid, **kwargs: BytesIO(large_objects[lobj_oid]),
+        ),
+        patch(
+            f"{module}.delete_lobj_by_id",
+            side_effect=lambda lobj_oid, **kwargs: large_objects.pop(lobj_oid),
+        ),
+    ):
+        batch = file_store.migrate_large_objects(batch_size=10)
+
+    assert batch.num_migrated == 2
+    assert batch.num_failed == 1
+    assert batch.last_file_name == "legacy_2"
+    assert large_objects == {}
+    assert legacy_records[0].lobj_oid == 0
+    assert legacy_records[0].object_key is None
+    for record, content in zip(legacy_records[1:], [b"first", b"second"]):
+        assert record.lobj_oid is None
+        with blob_storage.open(record.object_key or "") as blob:
+            assert blob.read() == content
@@ -8,10 +8,12 @@ from onyx.configs.app_configs import USE_DOCUMENT_SUMMARY
 from onyx.configs.constants import DocumentSource
 from onyx.connectors.models import Document
 from onyx.connectors.models import TextSection
+from onyx.indexing import chunker as chunker_module
 from onyx.indexing.chunker import Chunker
 from onyx.indexing.embedder import DefaultIndexingEmbedder
 from onyx.indexing.indexing_pipeline import process_image_sections
 from onyx.llm.utils import MAX_CONTEXT_TOKENS
+from onyx.natural_language_processing.utils import BaseTokenizer
 from tests.unit.onyx.indexing.conftest import MockHeartbeat
 
 
@@ -105,3 +107,56 @@ def test_chunker_heartbeat(
 
     assert mock_heartbeat.call_count == 1
     assert len(chunks) > 0
+
+
+class CountingTokenizer(BaseTokenizer):
+    def __init__(self, tokenizer: BaseTokenizer) -> None:
+        self.tokenizer = tokenizer
+        self.encoded: list[str] = []
+
+    def encode(self, string: str) -> list[int]:
+        self.encoded.append(string)
+        return self.tokenizer.encode(string)
+
+    def tokenize(self, string: str) -> list[str]:
+        return self.tokenizer.tokenize(string)
+
+    def decode(self, tokens: list[int]) -> str:
+        return self.tokenizer.decode(tokens)
+
+
+def test_chunker_caches_tokenization(
+    embedder: DefaultIndexingEmbedder, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    document = Document(
+        id="test_doc",
+        source=DocumentSource.WEB,
+        semantic_identifier="Test Document",
+        metadata={"tags": ["tag1", "tag2"]},
+        doc_updated_at=None,
+        sections=[
+            TextSection(text="This is a short section.", link="link1"),
+            TextSection(text="Another short section.", link="link2"),
+            TextSection(text="This is a long section. " * 200, link="link3"),
+            TextSection(text="This is a short section.", link="link4"),
+        ],
+    )
+    indexing_documents = process_image_sections([document])
+
+    counting_tokenizer = CountingTokenizer(embedder.embedding_model.tokenizer)
+    chunker = Chunker(tokenizer=counting_tokenizer, enable_multipass=True)
+    chunks = next(chunker.chunk_iter(indexing_documents))
+
+    # every text is only tokenized once per document
+    assert len(counting_tokenizer.encoded) == len(set(counting_tokenizer.encoded))
+
+    # and the output is the same as without any caching
+    monkeypatch.setattr(chunker_module, "TOKENIZATION_CACHE_SIZE", 0)
+    uncached_chunker = Chunker(
+        tokenizer=embedder.embedding_model.tokenizer, enable_multipass=True
+    )
+    uncached_chunks = uncached_chunker.chunk(indexing_documents)
+
+    assert [chunk.model_dump() for chunk in chunks] == [
+        chunk.model_dump() for chunk in uncached_chunks
+    ]
@@ -0,0 +1,152 @@
+import threading
+import time
+from typing import Any
+from unittest.mock import Mock
+from unittest.mock import patch
+
+import pytest
+
+from onyx.connectors.models import Document
+from onyx.connectors.models import DocumentSource
+from onyx.connectors.models import TextSection
+from onyx.indexing.chunker import Chunker
+from onyx.indexing.contextual_rag import ContextualRagScheduler
+from onyx.indexing.embedder import DefaultIndexingEmbedder
+from onyx.indexing.indexing_pipeline import add_contextual_summaries
+from onyx.indexing.indexing_pipeline import process_image_sections
+from onyx.llm.utils import get_max_input_tokens
+
+
+class FakeRedis:
+    def __init__(self) -> None:
+        self.data: dict[str, Any] = {}
+
+    def mget(self, keys: list[str]) -> list[Any]:
+        return [self.data.get(key) for key in keys]
+
+    def pipeline(self, transaction: bool = True) -> "FakeRedis":
+        return self
+
+    def set(self, key: str, value: Any, ex: int | None = None) -> None:
+        self.data[key] = value
+
+    def execute(self) -> None:
+        pass
+
+
+def test_scheduler_bounds_concurrency_across_nested_tasks() -> None:
+    lock = threading.Lock()
+    running = 0
+    max_running = 0
+    finished: list[int] = []
+
+    def task(item: int, scheduler: ContextualRagScheduler) -> None:
+        nonlocal running, max_running
+        with lock:
+            running += 1
+            max_running = max(max_running, running)
+        time.sleep(0.01)
+        with lock:
+            running -= 1
+            finished.append(item)
+        if item < 10:
+            scheduler.submit(task, item + 10, scheduler)
+
+    with ContextualRagScheduler(max_concurrent_calls=3) as scheduler:
+        for item in range(10):
+            scheduler.submit(task, item, scheduler)
+        scheduler.wait()
+
+    assert sorted(finished) == list(range(20))
+    assert max_running <= 3
+
+
+def test_scheduler_raises_task_exception() -> None:
+    def task() -> None:
+        raise ValueError("boom")
+
+    with ContextualRagScheduler(max_concurrent_calls=2) as scheduler:
+        scheduler.submit(task)
+        with pytest.raises(ValueError, match="boom"):
+            scheduler.wait()
+
+
+@patch("onyx.llm.utils.GEN_AI_MAX_TOKENS", 4096)
+def test_contextual_summaries_are_reused(embedder: DefaultIndexingEmbedder) -> None:
+    long_section = (
+        "This is a long section that should be split into multiple chunks. " * 100
+    )
+    documents = [
+        Document(
+            id=f"doc_{i}",
+            source=DocumentSource.WEB,
+            semantic_identifier=f"Doc {i}",
+            metadata={},
+            sections=[
+                TextSection(text=f"Start of document_{i}.", link="link1"),
+                TextSection(text=long_section, link="link2"),
+            ],
+        )
+        for i in range(3)
+    ]
+
+    lock = threading.Lock()
+    prompts: list[str] = []
+    fail_chunk_contexts = True
+
+    def mock_llm_invoke(prompt: str, *args: Any, **kwargs: Any) -> Mock:
+        with lock:
+            prompts.append(prompt)
+        # fail the context of the first chunk of doc_2, it is retried by the next run
+        if fail_chunk_contexts and "<chunk>\nStart of document_2." in prompt:
+            raise RuntimeError("LLM failure")
+        m = Mock()
+        m.content = "context"
+        return m
+
+    mock_llm = Mock()
+    mock_llm.config.model_provider = "openai"
+    mock_llm.config.model_name = "gpt-4o"
+    mock_llm.config.max_input_tokens = get_max_input_tokens(
+        model_provider="openai", model_name="gpt-4o"
+    )
+    mock_llm.invoke = mock_llm_invoke
+
+    chunker = Chunker(
+        tokenizer=embedder.embedding_model.tokenizer,
+        enable_multipass=False,
+        enable_contextual_rag=True,
+    )
+    fake_redis = FakeRedis()
+
+    def run() -> list[str]:
+        chunks = chunker.chunk(process_image_sections(documents))
+        with patch(
+            "onyx.indexing.contextual_rag.get_redis_client", return_value=fake_redis
+        ):
+            chunks = add_contextual_summaries(
+                chunks=chunks,
+                llm=mock_llm,
+                tokenizer=embedder.embedding_model.tokenizer,
+                chunk_token_limit=chunker.chunk_token_limit * 2,
+            )
+        assert all(chunk.doc_summary == "context" for chunk in chunks)
+        return [chunk.chunk_context for chunk in chunks]
+
+    chunk_contexts = run()
+    num_chunks = len(chunk_contexts)
+    assert num_chunks > 3
+    assert chunk_contexts.count("") == 1
+    # one summary per document and one context per chunk
+    assert len(prompts) == 3 + num_chunks
+    assert len(fake_redis.data) == 3
+
+    # only the failed chunk context is computed again
+    prompts.clear()
+    fail_chunk_contexts = False
+    assert run() == ["context"] * num_chunks
+    assert len(prompts) == 1
+
+    prompts.clear()
+    assert run() == ["context"] * num_chunks
+    assert prompts == []
@@ -1,4 +1,5 @@
 from collections.abc import Generator
+from unittest.mock import MagicMock
 from unittest.mock import Mock
 from unittest.mock import patch
 
@@ -21,6 +22,35 @@ def mock_embedding_model() -> Generator[Mock, None, None]:
         yield mock
 
 
+def _make_chunk(chunk_id: int, content: str) -> DocAwareChunk:
+    source_doc = Document(
+        id="test_doc",
+        source=DocumentSource.WEB,
+        semantic_identifier="Test Document",
+        metadata={},
+        doc_updated_at=None,
+        sections=[TextSection(text=content, link="link1")],
+    )
+    return DocAwareChunk(
+        chunk_id=chunk_id,
+        blurb=content,
+        content=content,
+        source_links={0: "link1"},
+        section_continuation=False,
+        source_document=source_doc,
+        title_prefix="Title: ",
+        metadata_suffix_semantic="",
+        metadata_suffix_keyword="",
+        mini_chunk_texts=None,
+        large_chunk_reference_ids=[],
+        large_chunk_id=None,
+        image_file_name=None,
+        chunk_context="",
+        doc_summary="",
+        contextual_rag_reserved_tokens=0,
+    )
+
+
 @pytest.mark.parametrize(
     "chunk_context, doc_summary",
     [("Test chunk context", "Test document summary"), ("", "")],
@@ -98,8 +128,59 @@ def test_default_indexing_embedder_embed_chunks(
     )
     # Same for title only embedding call
     mock_embedding_model.return_value.encode.assert_any_call(
-        ["Test Document"],
+        texts=["Test Document"],
         text_type=EmbedTextType.PASSAGE,
+        large_chunks_present=False,
         tenant_id=None,
         request_id=None,
     )
+
+
+def test_embed_chunks_reuses_cached_embeddings(mock_embedding_model: Mock) -> None:
+    stored: dict[str, list[float]] = {}
+
+    def get_cached(content_hashes: list[str], db_session: MagicMock) -> dict:
+        return {h: stored[h] for h in content_hashes if h in stored}
+
+    def upsert(hash_to_embedding: dict, db_session: MagicMock) -> None:
+        stored.update(hash_to_embedding)
+
+    encode = mock_embedding_model.return_value.encode
+    encode.side_effect = lambda texts, **kwargs: [[float(len(text))] for text in texts]
+
+    with (
+        patch("onyx.indexing.embedder.get_session_with_current_tenant"),
+        patch(
+            "onyx.indexing.embedder.get_cached_chunk_embeddings",
+            side_effect=get_cached,
+        ),
+        patch(
+            "onyx.indexing.embedder.upsert_cached_chunk_embeddings__no_commit",
+            side_effect=upsert,
+        ),
+        patch(
+            "onyx.indexing.embedder.mark_cached_chunk_embeddings_used__no_commit"
+        ) as mock_mark_used,
+    ):
+        embedder = DefaultIndexingEmbedder(
+            model_name="test-model",
+            normalize=True,
+            query_prefix=None,
+            passage_prefix=None,
+            use_embedding_cache=True,
+        )
+        first = embedder.embed_chunks([_make_chunk(0, "unchanged")])
+        assert encode.call_count == 2  # chunk text + title
+
+        # re-index of the unchanged chunk plus a new one only embeds the new chunk
+        second = embedder.embed_chunks(
+            [_make_chunk(0, "unchanged"), _make_chunk(1, "changed")]
+        )
+
+    assert encode.call_count == 3
+    assert encode.call_args.kwargs["texts"] == ["Title: changed"]
+    # the reused embeddings (chunk text and title) are kept from being pruned
+    assert sum(len(call.args[0]) for call in mock_mark_used.call_args_list) == 2
+    assert second[0].embeddings == first[0].embeddings
+    assert second[0].title_embedding == first[0].title_embedding
+    assert second[1].embeddings.full_embedding == [float(len("Title: changed"))]
@@ -1,6 +1,8 @@
+from io import BytesIO
 from typing import Any
 from typing import cast
 from typing import List
+from unittest.mock import MagicMock
 from unittest.mock import Mock
 from unittest.mock import patch
 
@@ -11,6 +13,7 @@ from onyx.connectors.models import Document
 from onyx.connectors.models import DocumentSource
 from onyx.connectors.models import ImageSection
 from onyx.connectors.models import TextSection
+from onyx.file_processing.image_summary_cache import ImageSummaryCache
 from onyx.indexing.chunker import Chunker
 from onyx.indexing.embedder import DefaultIndexingEmbedder
 from onyx.indexing.indexing_pipeline import _get_aggregated_chunk_boost_factor
@@ -303,6 +306,8 @@ def test_contextual_rag(
     llm_tokenizer = embedder.embedding_model.tokenizer
 
     mock_llm = Mock()
+    mock_llm.config.model_provider = "openai"
+    mock_llm.config.model_name = "gtp-4o"
     mock_llm.config.max_input_tokens = get_max_input_tokens(
         model_provider="openai", model_name="gtp-4o"
     )
@@ -315,12 +320,18 @@ def test_contextual_rag(
     )
     chunks = chunker.chunk(indexing_documents)
 
-    chunks = add_contextual_summaries(
-        chunks=chunks,
-        llm=mock_llm,
-        tokenizer=llm_tokenizer,
-        chunk_token_limit=chunker.chunk_token_limit * 2,
-    )
+    # nothing is cached yet, the results are only written
+    mock_redis = MagicMock()
+    mock_redis.mget.side_effect = lambda keys: [None] * len(keys)
+    with patch(
+        "onyx.indexing.contextual_rag.get_redis_client", return_value=mock_redis
+    ):
+        chunks = add_contextual_summaries(
+            chunks=chunks,
+            llm=mock_llm,
+            tokenizer=llm_tokenizer,
+            chunk_token_limit=chunker.chunk_token_limit * 2,
+        )
 
     assert len(chunks) == 5
     assert short_section_1 in chunks[0].content
@@ -338,3 +349,101 @@ def test_contextual_rag(
             count += 1
         assert chunk.doc_summary == doc_summary
         assert chunk.chunk_context == chunk_context
+
+
+def test_process_image_sections_summarizes_each_image_once() -> None:
+    image_contents = {"a.png": b"logo", "b.png": b"logo", "c.png": b"chart"}
+    pgfilestores = [
+        Mock(file_name=file_name, display_name=file_name)
+        for file_name in image_contents
+    ]
+
+    summarized: list[bytes] = []
+
+    def mock_summarize(llm: Any, image_data: bytes, context_name: str) -> str:
+        summarized.append(image_data)
+        return f"summary of {image_data.decode()}"
+
+    documents = [
+        Document(
+            id=f"doc_{i}",
+            source=DocumentSource.CONFLUENCE,
+            semantic_identifier=f"Doc {i}",
+            metadata={},
+            sections=[
+                TextSection(text="some text", link="link"),
+                *[
+                    ImageSection(image_file_name=file_name, link="link")
+                    for file_name in file_names
+                ],
+            ],
+        )
+        for i, file_names in enumerate(
+            [["a.png", "c.png"], ["a.png", "b.png", "missing.png"]]
+        )
+    ]
+
+    mock_llm = Mock()
+    mock_llm.config.model_provider = "openai"
+    mock_llm.config.model_name = "gpt-4o"
+    mock_redis = Mock()
+    mock_redis.get.return_value = None
+    summary_cache = ImageSummaryCache()
+
+    with (
+        patch(
+            "onyx.indexing.indexing_pipeline.get_image_extraction_and_analysis_enabled",
+            return_value=True,
+        ),
+        patch(
+            "onyx.indexing.indexing_pipeline.get_default_llm_with_vision",
+            return_value=mock_llm,
+        ),
+        patch("onyx.indexing.indexing_pipeline.get_session_with_current_tenant"),
+        patch(
+            "onyx.indexing.indexing_pipeline.get_pgfilestores_by_file_names",
+            return_value=pgfilestores,
+        ) as mock_get_pgfilestores,
+        patch(
+            "onyx.indexing.indexing_pipeline.get_default_file_store"
+        ) as mock_get_file_store,
+        patch(
+            "onyx.indexing.indexing_pipeline.summarize_image_with_error_handling",
+            side_effect=mock_summarize,
+        ),
+        patch(
+            "onyx.indexing.indexing_pipeline.get_image_summary_cache",
+            return_value=summary_cache,
+        ),
+        patch(
+            "onyx.file_processing.image_summary_cache.get_redis_client",
+            return_value=mock_redis,
+        ),
+    ):
+        read_file_from_record = mock_get_file_store.return_value.read_file_from_record
+        read_file_from_record.side_effect = (
+            lambda file_record, *args, **kwargs: BytesIO(
+                image_contents[file_record.file_name]
+            )
+        )
+        indexing_documents = process_image_sections(documents)
+        assert mock_get_pgfilestores.call_count == 1
+        # the contents are read from the records loaded above, not looked up by name
+        mock_get_file_store.return_value.read_file.assert_not_called()
+        assert sorted(summarized) == [b"chart", b"logo"]
+
+        # a later batch with the same images is served from the cache
+        process_image_sections(documents)
+        assert len(summarized) == 2
+
+    assert [section.text for section in indexing_documents[0].processed_sections] == [
+        "some text",
+        "summary of logo",
+        "summary of chart",
+    ]
+    assert [section.text for section in indexing_documents[1].processed_sections] == [
+        "some text",
+        "summary of logo",
+        "summary of logo",
+        "[Image could not be processed]",
+    ]
@@ -0,0 +1,101 @@
+import queue
+import time
+from collections.abc import Callable
+from collections.abc import Iterator
+from typing import Any
+from typing import cast
+
+from redis.client import Redis
+
+from onyx.key_value_store.near_cache import KVStoreNearCache
+
+
+class FakePubSub:
+    def __init__(self) -> None:
+        self.messages: queue.Queue[dict[str, Any] | Exception] = queue.Queue()
+
+    def subscribe(self, channel: str) -> None:
+        self.messages.put({"type": "subscribe", "channel": channel, "data": 1})
+
+    def listen(self) -> Iterator[dict[str, Any]]:
+        while True:
+            message = self.messages.get()
+            if isinstance(message, Exception):
+                raise message
+            yield message
+
+    def close(self) -> None:
+        pass
+
+
+class FakeRedis:
+    """Delivers published messages to every pubsub created from it"""
+
+    def __init__(self) -> None:
+        self.pubsubs: list[FakePubSub] = []
+
+    def pubsub(self) -> FakePubSub:
+        pubsub = FakePubSub()
+        self.pubsubs.append(pubsub)
+        return pubsub
+
+    def publish(self, channel: str, data: str) -> None:
+        for pubsub in self.pubsubs:
+            pubsub.messages.put({"type": "message", "channel": channel, "data": data})
+
+
+def _wait_for(condition: Callable[[], bool]) -> None:
+    deadline = time.monotonic() + 5
+    while not condition():
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+
+
+def _build_cache(fake_redis: FakeRedis) -> KVStoreNearCache:
+    cache = KVStoreNearCache(
+        maxsize=10,
+        ttl_seconds=60,
+        redis_client_factory=lambda: cast(Redis, fake_redis),
+    )
+    # the first lookup starts the listener
+    _wait_for(lambda: cache._ensure_listening())
+    return cache
+
+
+def test_invalidation_reaches_other_processes() -> None:
+    fake_redis = FakeRedis()
+    reader = _build_cache(fake_redis)
+    writer = _build_cache(fake_redis)
+
+    reader.set("tenant_1", "settings", '{"a": 1}', reader.generation)
+    reader.set("tenant_2", "settings", '{"a": 2}', reader.generation)
+    assert reader.get("tenant_1", "settings") == '{"a": 1}'
+
+    writer.publish_invalidation(cast(Redis, fake_redis), "tenant_1", "settings")
+    _wait_for(lambda: reader.get("tenant_1", "settings") is None)
+
+    # other tenants are not affected
+    assert reader.get("tenant_2", "settings") == '{"a": 2}'
+
+
+def test_value_read_during_invalidation_is_not_cached() -> None:
+    cache = _build_cache(FakeRedis())
+
+    generation = cache.generation
+    cache.invalidate("tenant_1", "settings")
+    cache.set("tenant_1", "settings", '"stale"', generation)
+
+    assert cache.get("tenant_1", "settings") is None
+
+
+def test_cache_is_bypassed_without_subscription() -> None:
+    fake_redis = FakeRedis()
+    cache = _build_cache(fake_redis)
+    cache.set("tenant_1", "settings", '"value"', cache.generation)
+
+    fake_redis.pubsubs[0].messages.put(ConnectionError("connection lost"))
+    _wait_for(lambda: not cache._subscribed.is_set())
+
+    assert cache.get("tenant_1", "settings") is None
+    cache.set("tenant_1", "settings", '"value"', cache.generation)
+    assert cache.get("tenant_1", "settings") is None
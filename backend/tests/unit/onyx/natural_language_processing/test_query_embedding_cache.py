@@ -0,0 +1,145 @@
+import json
+import time
+from collections.abc import Generator
+from unittest.mock import MagicMock
+from unittest.mock import patch
+
+import pytest
+
+from onyx.natural_language_processing.query_embedding_cache import (
+    build_query_embedding_cache_key,
+)
+from onyx.natural_language_processing.query_embedding_cache import QueryEmbeddingCache
+from onyx.natural_language_processing.search_nlp_models import EmbeddingModel
+from onyx.utils.ttl_cache import TTLCache
+from shared_configs.enums import EmbedTextType
+from shared_configs.model_server_models import Embedding
+
+MODULE = "onyx.natural_language_processing.search_nlp_models"
+
+
+def _cache_key(text: str, **overrides: object) -> str:
+    kwargs: dict = dict(
+        model_name="test-model",
+        provider_type=None,
+        query_prefix="search_query: ",
+        normalize=True,
+        reduced_dimension=None,
+    )
+    kwargs.update(overrides)
+    return build_query_embedding_cache_key(text, **kwargs)
+
+
+def test_ttl_cache_evicts_least_recently_used() -> None:
+    cache: TTLCache[str, int] = TTLCache(maxsize=2, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1
+
+    cache.set("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+
+
+def test_ttl_cache_expires_entries() -> None:
+    cache: TTLCache[str, int] = TTLCache(maxsize=2, ttl=0.01)
+    cache.set("a", 1)
+    time.sleep(0.02)
+
+    assert cache.get("a") is None
+    assert len(cache) == 0
+
+
+def test_cache_key_normalizes_whitespace_and_covers_model_settings() -> None:
+    assert _cache_key("what is  onyx?\n") == _cache_key(" what is onyx?")
+    assert _cache_key("q") != _cache_key("q", query_prefix=None)
+    assert _cache_key("q") != _cache_key("q", normalize=False)
+    assert _cache_key("q") != _cache_key("q", reduced_dimension=256)
+    assert _cache_key("q") != _cache_key("q", provider_type="openai")
+
+
+def test_redis_tier_is_shared_and_failures_are_misses() -> None:
+    redis_client = MagicMock()
+    redis_client.get.return_value = json.dumps([0.5, 0.25])
+
+    with patch(
+        "onyx.natural_language_processing.query_embedding_cache.get_redis_client",
+        return_value=redis_client,
+    ):
+        cache = QueryEmbeddingCache(maxsize=8, ttl_seconds=60, redis_enabled=True)
+        assert cache.get("key") == [0.5, 0.25]
+
+        # promoted to the in-process tier
+        redis_client.get.reset_mock()
+        assert cache.get("key") == [0.5, 0.25]
+        redis_client.get.assert_not_called()
+
+        redis_client.get.side_effect = ConnectionError("redis is down")
+        assert cache.get("other") is None
+
+        cache.set("new", [1.0])
+        redis_client.set.assert_called_once()
+        assert redis_client.set.call_args.kwargs["ex"] == 60
+
+
+@pytest.fixture
+def embedding_model() -> Generator[tuple[EmbeddingModel, MagicMock], None, None]:
+    calls = MagicMock(
+        side_effect=lambda texts, **kwargs: [[float(len(text))] for text in texts]
+    )
+    with (
+        patch(f"{MODULE}.get_tokenizer"),
+        patch(
+            f"{MODULE}.get_query_embedding_cache",
+            return_value=QueryEmbeddingCache(
+                maxsize=8, ttl_seconds=60, redis_enabled=False
+            ),
+        ),
+        patch.object(EmbeddingModel, "_batch_encode_texts", calls),
+    ):
+        model = EmbeddingModel(
+            server_host="localhost",
+            server_port=9000,
+            model_name="test-model",
+            normalize=True,
+            query_prefix="search_query: ",
+            passage_prefix="search_document: ",
+            api_key=None,
+            api_url=None,
+            provider_type=None,
+        )
+        yield model, calls
+
+
+def test_encode_only_embeds_cache_misses(
+    embedding_model: tuple[EmbeddingModel, MagicMock],
+) -> None:
+    model, calls = embedding_model
+
+    first = model.encode(["a", "bb"], text_type=EmbedTextType.QUERY)
+    second = model.encode(["bb", "ccc", "ccc", "a"], text_type=EmbedTextType.QUERY)
+
+    assert first == [[1.0], [2.0]]
+    assert second == [[2.0], [3.0], [3.0], [1.0]]
+    assert [call.kwargs["texts"] for call in calls.call_args_list] == [
+        ["a", "bb"],
+        ["ccc"],
+    ]
+
+
+def test_encode_does_not_cache_passages_or_bypassed_queries(
+    embedding_model: tuple[EmbeddingModel, MagicMock],
+) -> None:
+    model, calls = embedding_model
+
+    results: list[list[Embedding]] = [
+        model.encode(["a"], text_type=EmbedTextType.PASSAGE),
+        model.encode(["a"], text_type=EmbedTextType.PASSAGE),
+        model.encode(["a"], text_type=EmbedTextType.QUERY, use_query_cache=False),
+        model.encode(["a"], text_type=EmbedTextType.QUERY, use_query_cache=False),
+    ]
+
+    assert all(result == [[1.0]] for result in results)
+    assert calls.call_count == 4
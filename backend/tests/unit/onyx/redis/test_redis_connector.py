@@ -0,0 +1,29 @@
+from unittest.mock import MagicMock
+from unittest.mock import patch
+
+from onyx.redis.redis_connector import RedisConnector
+from onyx.redis.redis_connector_index import RedisConnectorIndex
+
+
+def test_get_indexing_fenced_ids_uses_one_round_trip() -> None:
+    fenced_keys = {
+        f"test_tenant:{RedisConnectorIndex.fence_key_with_ids(2, 7)}",
+        f"test_tenant:{RedisConnectorIndex.fence_key_with_ids(3, 8)}",
+    }
+    checked_keys: list[str] = []
+
+    pipe = MagicMock()
+    pipe.exists.side_effect = checked_keys.append
+    pipe.execute.side_effect = lambda: [int(key in fenced_keys) for key in checked_keys]
+    redis_client = MagicMock()
+    redis_client.pipeline.return_value = pipe
+
+    with patch(
+        "onyx.redis.redis_connector.get_redis_client", return_value=redis_client
+    ):
+        fenced_ids = RedisConnector.get_indexing_fenced_ids("test_tenant", [1, 2, 3], 7)
+        assert RedisConnector.get_indexing_fenced_ids("test_tenant", [], 7) == set()
+
+    assert fenced_ids == {2}
+    assert pipe.execute.call_count == 1
+    redis_client.exists.assert_not_called()
@@ -0,0 +1,84 @@
+from collections.abc import Generator
+from unittest.mock import MagicMock
+from unittest.mock import patch
+
+import pytest
+
+from onyx.configs.constants import OnyxCeleryTask
+from onyx.redis.redis_connector_credential_pair import RedisConnectorCredentialPair
+
+MODULE = "onyx.redis.redis_connector_credential_pair"
+
+
+@pytest.fixture
+def redis_cc_pair() -> Generator[RedisConnectorCredentialPair, None, None]:
+    with (
+        patch("onyx.redis.redis_object_helper.get_redis_client"),
+        patch(f"{MODULE}.get_connector_credential_pair_from_id"),
+        patch(
+            f"{MODULE}.construct_document_id_select_for_connector_credential_pair_by_needs_sync"
+        ),
+        patch(f"{MODULE}.VESPA_SYNC_BATCH_SIZE", 3),
+    ):
+        yield RedisConnectorCredentialPair("test_tenant", 1)
+
+
+def _mock_db_session(doc_ids: list[str]) -> MagicMock:
+    db_session = MagicMock()
+    db_session.scalars.return_value.yield_per.return_value = doc_ids
+    return db_session
+
+
+def test_generate_tasks_batches_documents(
+    redis_cc_pair: RedisConnectorCredentialPair,
+) -> None:
+    celery_app = MagicMock()
+    redis_client = MagicMock()
+    doc_ids = [f"doc_{i}" for i in range(7)]
+
+    result = redis_cc_pair.generate_tasks(
+        100,
+        celery_app,
+        _mock_db_session(doc_ids),
+        redis_client,
+        MagicMock(),
+        "test_tenant",
+    )
+
+    assert result == (3, 7)
+    assert celery_app.send_task.call_count == 3
+    assert redis_client.sadd.call_count == 3
+
+    sent_batches = []
+    for send_call in celery_app.send_task.call_args_list:
+        assert send_call.args[0] == OnyxCeleryTask.VESPA_METADATA_SYNC_BATCH_TASK
+        sent_batches.append(send_call.kwargs["kwargs"]["document_ids"])
+
+    assert sent_batches == [doc_ids[0:3], doc_ids[3:6], doc_ids[6:7]]
+    assert redis_cc_pair.skip_docs == set(doc_ids)
+
+
+def test_generate_tasks_skips_docs_and_respects_max_tasks(
+    redis_cc_pair: RedisConnectorCredentialPair,
+) -> None:
+    celery_app = MagicMock()
+    doc_ids = [f"doc_{i}" for i in range(10)]
+    redis_cc_pair.set_skip_docs({"doc_0", "doc_4"})
+
+    result = redis_cc_pair.generate_tasks(
+        1,
+        celery_app,
+        _mock_db_session(doc_ids),
+        MagicMock(),
+        MagicMock(),
+        "test_tenant",
+    )
+
+    assert result is not None
+    assert result[0] == 1
+    celery_app.send_task.assert_called_once()
+    assert celery_app.send_task.call_args.kwargs["kwargs"]["document_ids"] == [
+        "doc_1",
+        "doc_2",
+        "doc_3",
+    ]
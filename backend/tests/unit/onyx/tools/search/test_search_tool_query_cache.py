@@ -0,0 +1,133 @@
+import threading
+from typing import Any
+from unittest.mock import MagicMock
+
+import pytest
+from sqlalchemy.orm import Session
+
+from onyx.configs.constants import DocumentSource
+from onyx.context.search.enums import QueryFlow
+from onyx.context.search.enums import SearchType
+from onyx.context.search.models import IndexFilters
+from onyx.tools.tool_implementations.search.search_tool import SearchResponseSummary
+from onyx.tools.tool_implementations.search.search_tool import SearchTool
+
+
+def _summary(query: str) -> SearchResponseSummary:
+    return SearchResponseSummary(
+        rephrased_query=query,
+        top_sections=[],
+        predicted_flow=QueryFlow.QUESTION_ANSWER,
+        predicted_search=None,
+        final_filters=IndexFilters(access_control_list=None),
+        recency_bias_multiplier=1.0,
+    )
+
+
+def _search_tool(
+    monkeypatch: pytest.MonkeyPatch,
+    filters_by_question: dict[str, IndexFilters] | None = None,
+) -> SearchTool:
+    # only the query cache is exercised, skip the persona / LLM setup
+    search_tool = SearchTool.__new__(SearchTool)
+    search_tool.selected_sections = None
+    search_tool._query_retrieval_cache = {}
+    search_tool._query_retrieval_cache_lock = threading.Lock()
+
+    def _build_search_pipeline(question: str, *_: Any) -> MagicMock:
+        search_pipeline = MagicMock()
+        search_pipeline.search_query.filters = (filters_by_question or {}).get(
+            question, IndexFilters(access_control_list=None)
+        )
+        search_pipeline.search_query.recency_bias_multiplier = 1.0
+        search_pipeline.search_query.search_type = SearchType.SEMANTIC
+        return search_pipeline
+
+    monkeypatch.setattr(search_tool, "_build_search_pipeline", _build_search_pipeline)
+    return search_tool
+
+
+def test_queries_are_only_searched_once(monkeypatch: pytest.MonkeyPatch) -> None:
+    search_tool = _search_tool(monkeypatch)
+    searched_batches: list[list[str]] = []
+
+    def _search_for_queries(
+        _: MagicMock, queries: list[str]
+    ) -> list[SearchResponseSummary]:
+        searched_batches.append(queries)
+        return [_summary(query) for query in queries]
+
+    monkeypatch.setattr(search_tool, "_search_for_queries", _search_for_queries)
+
+    first = search_tool.retrieve_sections_for_queries(
+        ["a", "b", "a"], question="a", db_session=MagicMock(spec=Session)
+    )
+    second = search_tool.retrieve_sections_for_queries(
+        ["b", "c"], question="a", db_session=MagicMock(spec=Session)
+    )
+
+    assert searched_batches == [["a", "b"], ["c"]]
+    assert [summary.rephrased_query for summary in first] == ["a", "b", "a"]
+    assert [summary.rephrased_query for summary in second] == ["b", "c"]
+    assert second[0] is first[1]
+
+
+def test_queries_are_shared_between_questions_with_the_same_filters(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    search_tool = _search_tool(
+        monkeypatch,
+        filters_by_question={
+            "about slack": IndexFilters(
+                source_type=[DocumentSource.SLACK], access_control_list=None
+            )
+        },
+    )
+    searched_batches: list[list[str]] = []
+
+    def _search_for_queries(
+        _: MagicMock, queries: list[str]
+    ) -> list[SearchResponseSummary]:
+        searched_batches.append(queries)
+        return [_summary(query) for query in queries]
+
+    monkeypatch.setattr(search_tool, "_search_for_queries", _search_for_queries)
+
+    first = search_tool.retrieve_sections_for_queries(
+        ["b"], question="a", db_session=MagicMock(spec=Session)
+    )
+    second = search_tool.retrieve_sections_for_queries(
+        ["b"], question="c", db_session=MagicMock(spec=Session)
+    )
+    # the filters detected from this question differ
+    third = search_tool.retrieve_sections_for_queries(
+        ["b"], question="about slack", db_session=MagicMock(spec=Session)
+    )
+
+    assert searched_batches == [["b"], ["b"]]
+    assert second[0] is first[0]
+    assert third[0] is not first[0]
+
+
+def test_failed_search_is_not_cached(monkeypatch: pytest.MonkeyPatch) -> None:
+    search_tool = _search_tool(monkeypatch)
+    failures = [RuntimeError("vespa unavailable")]
+
+    def _search_for_queries(
+        _: MagicMock, queries: list[str]
+    ) -> list[SearchResponseSummary]:
+        if failures:
+            raise failures.pop()
+        return [_summary(query) for query in queries]
+
+    monkeypatch.setattr(search_tool, "_search_for_queries", _search_for_queries)
+
+    with pytest.raises(RuntimeError):
+        search_tool.retrieve_sections_for_queries(
+            ["a"], question="a", db_session=MagicMock(spec=Session)
+        )
+
+    summaries = search_tool.retrieve_sections_for_queries(
+        ["a"], question="a", db_session=MagicMock(spec=Session)
+    )
+    assert [summary.rephrased_query for summary in summaries] == ["a"]
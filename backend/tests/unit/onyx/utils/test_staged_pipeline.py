@@ -0,0 +1,135 @@
+import contextvars
+import threading
+import time
+
+import pytest
+
+from onyx.utils.staged_pipeline import PipelineStage
+from onyx.utils.staged_pipeline import StagedPipeline
+
+test_var: contextvars.ContextVar[str] = contextvars.ContextVar(
+    "test_var", default="default"
+)
+
+
+def test_results_come_back_in_submission_order() -> None:
+    def slow_for_even(item: int) -> int:
+        # make earlier items finish after later ones
+        if item % 2 == 0:
+            time.sleep(0.05)
+        return item
+
+    pipeline = StagedPipeline(
+        stages=[
+            PipelineStage("slow", slow_for_even, num_workers=4),
+            PipelineStage("double", lambda item: item * 2, num_workers=2),
+        ],
+        max_queued_items=2,
+    )
+    try:
+        for item in range(10):
+            pipeline.submit(item)
+        results = [result for _, result in pipeline.drain()]
+    finally:
+        pipeline.shutdown()
+
+    assert results == [item * 2 for item in range(10)]
+    assert pipeline.completed_through == 9
+
+
+def test_completed_through_waits_for_earlier_items() -> None:
+    release_first = threading.Event()
+
+    def stage(item: int) -> int:
+        if item == 0:
+            release_first.wait(timeout=5)
+        return item
+
+    pipeline = StagedPipeline(
+        stages=[PipelineStage("stage", stage, num_workers=2)],
+        max_queued_items=2,
+    )
+    try:
+        pipeline.submit(0)
+        pipeline.submit(1)
+        time.sleep(0.2)
+
+        # item 1 is done, but nothing can be handed back before item 0
+        assert list(pipeline.pop_completed()) == []
+        assert pipeline.completed_through == -1
+
+        release_first.set()
+        assert [seq for seq, _ in pipeline.drain()] == [0, 1]
+        assert pipeline.completed_through == 1
+    finally:
+        pipeline.shutdown()
+
+
+def test_submit_blocks_when_pipeline_is_full() -> None:
+    release = threading.Event()
+
+    pipeline = StagedPipeline(
+        stages=[PipelineStage("stage", lambda item: release.wait(timeout=5))],
+        max_queued_items=1,
+    )
+    try:
+        # one item is being worked on, one waits in the queue
+        pipeline.submit(0)
+        time.sleep(0.1)
+        pipeline.submit(1)
+
+        submitted = threading.Event()
+
+        def submit_third() -> None:
+            pipeline.submit(2)
+            submitted.set()
+
+        thread = threading.Thread(target=submit_third)
+        thread.start()
+        assert not submitted.wait(timeout=0.3)
+
+        release.set()
+        assert submitted.wait(timeout=5)
+        thread.join()
+        assert len(list(pipeline.drain())) == 3
+    finally:
+        pipeline.shutdown()
+
+    assert pipeline.utilization()["submit"] > 0
+
+
+def test_stage_exception_is_raised_to_caller() -> None:
+    def failing_stage(item: int) -> int:
+        if item == 1:
+            raise ValueError("boom")
+        return item
+
+    pipeline = StagedPipeline(
+        stages=[PipelineStage("failing", failing_stage)],
+        max_queued_items=2,
+    )
+    try:
+        pipeline.submit(0)
+        pipeline.submit(1)
+        with pytest.raises(ValueError, match="boom"):
+            list(pipeline.drain())
+        with pytest.raises(ValueError, match="boom"):
+            pipeline.submit(2)
+    finally:
+        pipeline.shutdown()
+
+
+def test_workers_see_callers_context() -> None:
+    test_var.set("from caller")
+
+    pipeline = StagedPipeline(
+        stages=[PipelineStage("stage", lambda _: test_var.get())],
+        max_queued_items=1,
+    )
+    try:
+        pipeline.submit(None)
+        results = [result for _, result in pipeline.drain()]
+    finally:
+        pipeline.shutdown()
+
+    assert results == ["from caller"]